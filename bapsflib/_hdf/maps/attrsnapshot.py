@@ -0,0 +1,140 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for the mapping-time snapshot of HDF5 object attributes.
+
+While mapping a file (see :class:`~bapsflib._hdf.maps.core.HDFMap`),
+the mapping classes read attributes through :func:`read_attrs`, which
+reads every attribute of an HDF5 object once and serves all further
+look-ups on that object out of the snapshot.
+"""
+__all__ = ["attrs_snapshot", "AttrsSnapshot", "read_attrs"]
+
+import contextlib
+import contextvars
+import h5py
+
+from typing import Any, Dict, Iterator, Tuple, Union
+
+#: the active snapshot (`None` if there is no active snapshot)
+_SNAPSHOT = contextvars.ContextVar(
+    "attrs_snapshot", default=None
+)  # type: contextvars.ContextVar[Union[None, AttrsSnapshot]]
+
+
+class AttrsSnapshot:
+    """
+    Cache of the attributes of HDF5 objects, keyed by file and object
+    name.  Use :func:`attrs_snapshot` to activate a snapshot.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Parameters
+        ----------
+        enabled : `bool`, optional
+            `True` (DEFAULT) to cache attributes, `False` to read the
+            attributes of an object on every look-up
+        """
+        self._enabled = enabled
+        self._attrs = {}  # type: Dict[Tuple[Any, str], Dict[str, Any]]
+
+        #: number of look-ups served out of the snapshot
+        self.hits = 0
+
+        #: number of look-ups that read the attributes from the file
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """`True` if attributes are cached."""
+        return self._enabled
+
+    def read(self, obj: Union[h5py.Group, h5py.Dataset]) -> Dict[str, Any]:
+        """
+        Dictionary of all attributes of the HDF5 object **obj**.  The
+        returned dictionary is shared and must not be modified.
+        """
+        if not self._enabled:
+            self.misses += 1
+            return _read_all_attrs(obj)
+
+        key = (obj.id.fileno, obj.name)
+        try:
+            attrs = self._attrs[key]
+            self.hits += 1
+        except KeyError:
+            attrs = self._attrs[key] = _read_all_attrs(obj)
+            self.misses += 1
+        return attrs
+
+
+def _read_all_attrs(obj: Union[h5py.Group, h5py.Dataset]) -> Dict[str, Any]:
+    """Read all attributes of the HDF5 object **obj** in one pass."""
+    attrs = {}
+    obj_attrs = obj.attrs
+    for name in obj_attrs:
+        try:
+            attrs[name] = obj_attrs[name]
+        except (OSError, TypeError):  # pragma: no cover
+            # attribute can not be read (e.g. unsupported dtype)
+            pass
+    return attrs
+
+
+@contextlib.contextmanager
+def attrs_snapshot(enabled=True) -> Iterator[AttrsSnapshot]:
+    """
+    Context manager that activates an `AttrsSnapshot` for all
+    :func:`read_attrs` calls made in the context.  If a snapshot is
+    already active, then that snapshot is re-used.
+
+    Parameters
+    ----------
+    enabled : `bool`, optional
+        `True` (DEFAULT) to cache attributes, `False` to read the
+        attributes of an object on every look-up (e.g. for
+        benchmarking)
+
+    Examples
+    --------
+
+    >>> with attrs_snapshot() as snapshot:
+    ...     _map = HDFMap(f, '/', '/', '/')
+    >>> snapshot.hits, snapshot.misses
+    (241, 58)
+    """
+    snapshot = _SNAPSHOT.get()
+    if snapshot is not None:
+        yield snapshot
+        return
+
+    snapshot = AttrsSnapshot(enabled=enabled)
+    token = _SNAPSHOT.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _SNAPSHOT.reset(token)
+
+
+def read_attrs(obj: Union[h5py.Group, h5py.Dataset]) -> Dict[str, Any]:
+    """
+    Dictionary of all attributes of the HDF5 object **obj**.
+
+    If a snapshot is active (see :func:`attrs_snapshot`), then the
+    attributes are only read from the file on the first look-up of
+    **obj**.  The returned dictionary may be shared and must not be
+    modified.
+    """
+    snapshot = _SNAPSHOT.get()
+    if snapshot is None:
+        return _read_all_attrs(obj)
+    return snapshot.read(obj)
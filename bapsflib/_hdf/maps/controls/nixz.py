@@ -19,6 +19,7 @@ import numpy as np
 
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.controls.templates import HDFMapControlTemplate
 from bapsflib._hdf.maps.controls.types import ConType
 from bapsflib.utils import _bytes_to_str
@@ -107,7 +108,7 @@ class HDFMapControlNIXZ(HDFMapControlTemplate):
         names_to_remove = []
         for name in _ml_names:
             if all(
-                attr not in self.group[name].attrs
+                attr not in read_attrs(self.group[name])
                 for attr in ("Nx", "Ny", "dx", "dz", "x0", "z0")
             ):
                 names_to_remove.append(name)
@@ -141,7 +142,7 @@ class HDFMapControlNIXZ(HDFMapControlTemplate):
             for pair in pairs:
                 try:
                     # get attribute value
-                    val = self.group[name].attrs[pair[1]]
+                    val = read_attrs(self.group[name])[pair[1]]
 
                     # condition value
                     if np.issubdtype(type(val), np.bytes_):
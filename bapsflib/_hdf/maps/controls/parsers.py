@@ -16,10 +16,11 @@ device to tell it to change an output.
 """
 __all__ = ["CLParse"]
 
+import functools
 import numpy as np
 import re
 
-from typing import Iterable, Union
+from typing import Any, Dict, Iterable, List, Pattern, Tuple, Union
 from warnings import warn
 
 from bapsflib.utils.warnings import HDFMappingWarning
@@ -61,6 +62,10 @@ class CLParse(object):
         Applies the regular expressions defined in `patterns` to parse
         the command list.
 
+        Parse results are memoized by command list and patterns, so
+        re-parsing an identical command list (e.g. of another
+        configuration or file) does not re-scan the command list.
+
         Parameters
         ----------
         patterns : Union[str, Iterable[str]]
@@ -97,9 +102,6 @@ class CLParse(object):
                       're pattern': re.compile(pattern, re.UNICODE),
                       'dtype': numpy.float64}}
         """
-        # initialize new cl dict
-        cls_dict = {}  # type: dict
-
         # condition patterns
         if isinstance(patterns, str):
             # convert string to list
@@ -109,179 +111,23 @@ class CLParse(object):
             if not all(isinstance(pat, str) for pat in patterns):
                 raise ValueError("`patterns` must be a str or Iterable of strings")
 
-            # ensure all entries are unique
-            patterns = list(set(patterns))
         else:
             raise ValueError("`patterns` must be a string or list of strings")
 
-        # compile all patterns
-        for pattern in patterns:
-            rpat = re.compile(pattern)
-
-            # confirm each pattern has 2 symbolic group names
-            # 1. 'NAME' -- name of the new probe state value
-            # 2. 'VAL' -- the value associated with 'NAME'
-            #
-            if len(rpat.groupindex) == 2:
-                # ensure the VAL symbolic group is defined
-                if "VAL" not in rpat.groupindex:
-                    raise ValueError(
-                        "user needs to define symbolic group VAL for "
-                        "the value of the probe state"
-                    )
-
-                # get name symbolic group name
-                sym_groups = list(rpat.groupindex)
-                name = sym_groups[0] if sym_groups.index("VAL") == 1 else sym_groups[1]
-
-                # check symbolic group is not already defined
-                if name in cls_dict:
-                    raise ValueError(
-                        f"Symbolic group ({name}) defined in multiple RE patterns"
-                    )
-                elif name.lower() == "remainder":
-                    raise ValueError(f"Can NOT use {name} as a symbolic group name")
-
-                # initialize cls dict entry
-                cls_dict[name] = {"re pattern": rpat, "command list": [], "cl str": []}
-            else:
-                raise ValueError(
-                    "user needs to define two symbolic groups, VAL for"
-                    " the value group and NAME for the name of the "
-                    "probe state value"
-                )
-
-        # add a 'remainder' entry to the cls dict
-        cls_dict["remainder"] = {
-            "re pattern": None,
-            "command list": list(self._cl).copy(),
-        }
-        cls_dict["remainder"]["cl str"] = cls_dict["remainder"]["command list"]
+        # parse command list
+        # - patterns are sorted so equivalent pattern sets share the
+        #   memoized results
+        success, cls_dict, messages = _parse_command_list(
+            tuple(self._cl), tuple(sorted(set(patterns)))
+        )
 
-        # scan through state values (ie re patterns)
-        # - iterate 'remainder' first
-        #
-        names = list(cls_dict.keys())
-        names.remove("remainder")
-        names = ["remainder"] + names
-        for name in names:
-            # check 'remainder' entry for NULL strings
-            # - then skip or break
-            if name == "remainder":
-                if "" in cls_dict["remainder"]["command list"]:
-                    del cls_dict["remainder"]
-                    break
-                else:  # pragma: no cover
-                    # this is not covered due to CPython's peephole
-                    # optimizer (see coverage.py issue 198)
-                    continue
-
-            # search for pattern
-            r_cl = []
-            for command in cls_dict["remainder"]["command list"]:
-                results = cls_dict[name]["re pattern"].search(command)
-                if results is not None:
-                    # try to convert the 'VAL' string into float
-                    # - for now, assuming 'VAL' will always be a float
-                    #   or string, NEVER an integer
-                    try:
-                        value = float(results.group("VAL"))
-                    except ValueError:
-                        value = results.group("VAL")  # type: str
-                        value = value.strip()
-                        if value == "":
-                            value = None
-
-                    # add to command list
-                    cls_dict[name]["command list"].append(value)
-                    cls_dict[name]["cl str"].append(results.group(name))
-
-                    # make a new remainder command list
-                    stripped_cmd = command.replace(results.group(name), "").strip()
-                    if stripped_cmd == "":
-                        stripped_cmd = None
-                    r_cl.append(stripped_cmd)
-                else:
-                    cls_dict[name]["command list"].append(None)
-                    cls_dict[name]["cl str"].append(None)
-
-            # update remainder command list
-            # - only if the above 'command list' build does NOT produce
-            #   trivial (None) elements and all elements of 'command
-            #   list' have the same type
-            #
-            if None not in cls_dict[name]["command list"] and all(
-                isinstance(val, type(cls_dict[name]["command list"][0]))
-                for val in cls_dict[name]["command list"]
-            ):
-                cls_dict["remainder"]["command list"] = r_cl
-                cls_dict["remainder"]["cl str"] = cls_dict["remainder"]["command list"]
-
-                # delete and break if 'remainder' as trivial elements
-                # - i.e. RE can NOT be matched anymore
-                #
-                if None in cls_dict["remainder"]["command list"]:
-                    del cls_dict["remainder"]
-                    break
-
-        # remove trivial command lists and convert lists to tuples
-        names = list(cls_dict.keys())
-        for name in names:
-            if None in cls_dict[name]["command list"] or not bool(
-                cls_dict[name]["command list"]
-            ):
-                # command list is trivial
-                del cls_dict[name]
-
-                # issue warning
-                warn(
-                    f"Symbolic group ({name}) removed since some or all of the "
-                    f"'command list' has None values",
-                    HDFMappingWarning,
-                )
-            elif not all(
-                isinstance(val, type(cls_dict[name]["command list"][0]))
-                for val in cls_dict[name]["command list"]
-            ):
-                # ensure all command list elements have the same
-                # type
-                del cls_dict[name]
-
-                # issue warning
-                warn(
-                    f"Symbolic group ({name}) removed since all entries in "
-                    f"'command list' do NOT have the same type",
-                    HDFMappingWarning,
-                )
-            else:
-                # condition 'command list' value and determine 'dtype'
-                if isinstance(cls_dict[name]["command list"][0], float):
-                    # 'command list' is a float
-                    cls_dict[name]["dtype"] = np.float64
-                else:
-                    # 'command list' is a string
-                    mlen = len(max(cls_dict[name]["command list"], key=lambda x: len(x)))
-                    cls_dict[name]["dtype"] = np.dtype((np.str_, mlen))
-
-            # convert lists to tuples
-            # - first check dict `name` has not been deleted
-            if name in cls_dict:
-                cls_dict[name]["command list"] = tuple(cls_dict[name]["command list"])
-                cls_dict[name]["cl str"] = tuple(cls_dict[name]["cl str"])
-
-        # determine if parse was successful
-        success = True
-        if len(cls_dict) == 0:
-            # dictionary is empty
-            success = False
-            cls_dict = {}
-        elif len(cls_dict) == 1 and "remainder" in cls_dict:
-            # only 'remainder' is in dictionary
-            success = False
-            cls_dict = {}
+        # issue warnings of the parse (replayed for memoized results)
+        for message in messages:
+            warn(message, HDFMappingWarning)
 
         # return
-        return success, cls_dict
+        # - copy the entries since callers extend them
+        return success, {name: dict(entry) for name, entry in cls_dict.items()}
 
     def try_patterns(self, patterns: Union[str, Iterable[str]]):
         """
@@ -315,3 +161,209 @@ class CLParse(object):
                 line += str(cls_dict[name]["command list"][ci])
 
             print(line)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_patterns(
+    patterns: Tuple[str, ...]
+) -> Tuple[Tuple[str, ...], Tuple[Pattern, ...]]:
+    """
+    Compile and validate the RE **patterns**.
+
+    Returns
+    -------
+    names : Tuple[str, ...]
+        the symbolic group name of the state value of each pattern
+
+    rpats : Tuple[Pattern, ...]
+        the compiled patterns
+    """
+    names = []
+    rpats = []
+    for pattern in patterns:
+        rpat = re.compile(pattern)
+
+        # confirm each pattern has 2 symbolic group names
+        # 1. 'NAME' -- name of the new probe state value
+        # 2. 'VAL' -- the value associated with 'NAME'
+        #
+        if len(rpat.groupindex) == 2:
+            # ensure the VAL symbolic group is defined
+            if "VAL" not in rpat.groupindex:
+                raise ValueError(
+                    "user needs to define symbolic group VAL for "
+                    "the value of the probe state"
+                )
+
+            # get name symbolic group name
+            sym_groups = list(rpat.groupindex)
+            name = sym_groups[0] if sym_groups.index("VAL") == 1 else sym_groups[1]
+
+            # check symbolic group is not already defined
+            if name in names:
+                raise ValueError(
+                    f"Symbolic group ({name}) defined in multiple RE patterns"
+                )
+            elif name.lower() == "remainder":
+                raise ValueError(f"Can NOT use {name} as a symbolic group name")
+
+            names.append(name)
+            rpats.append(rpat)
+        else:
+            raise ValueError(
+                "user needs to define two symbolic groups, VAL for"
+                " the value group and NAME for the name of the "
+                "probe state value"
+            )
+
+    return tuple(names), tuple(rpats)
+
+
+def _match_pattern(
+    commands: List[str], rpat: Pattern, name: str
+) -> Dict[str, Tuple[Union[float, str, None], Union[str, None]]]:
+    """
+    Search the compiled pattern **rpat** in each of the unique
+    **commands**, and return a dictionary mapping each command to its
+    ``(value, cl_str)`` pair (``(None, None)`` if there is no match).
+    """
+    parsed = {}
+    for command, results in zip(commands, map(rpat.search, commands)):
+        if results is None:
+            parsed[command] = (None, None)
+            continue
+
+        # try to convert the 'VAL' string into float
+        # - for now, assuming 'VAL' will always be a float or string,
+        #   NEVER an integer
+        value, cl_str = results.group("VAL", name)
+        try:
+            value = float(value)
+        except ValueError:
+            value = value.strip()
+            if value == "":
+                value = None
+        parsed[command] = (value, cl_str)
+
+    return parsed
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_command_list(
+    command_list: Tuple[str, ...], patterns: Tuple[str, ...]
+) -> Tuple[bool, Dict[str, Dict[str, Any]], Tuple[str, ...]]:
+    """
+    Apply the RE **patterns** to the **command list**.  This is the
+    memoized work-horse of :meth:`CLParse.apply_patterns`, so identical
+    command lists (e.g. of multiple configurations or files) are only
+    parsed once.
+
+    Returns
+    -------
+    bool
+        `True` if the command list is parsed successfully, `False`
+        otherwise.
+
+    dict
+        results from the command list parsing (must not be modified)
+
+    Tuple[str, ...]
+        warning messages issued by the parsing
+    """
+    names, rpats = _compile_patterns(patterns)
+    messages = []
+
+    # initialize cls dict
+    cls_dict = {}  # type: Dict[str, Dict[str, Any]]
+    for name, rpat in zip(names, rpats):
+        cls_dict[name] = {"re pattern": rpat, "command list": [], "cl str": []}
+
+    # add a 'remainder' entry to the cls dict
+    remainder = list(command_list)  # type: Union[List[Union[str, None]], None]
+
+    # scan through state values (ie re patterns)
+    # - a NULL string in the command list means the command list can
+    #   not be parsed
+    # - the remainder of the command list is stripped of the matches
+    #   of each complete state value, once all of a command is
+    #   stripped no further state values can be matched
+    #
+    if "" in command_list:
+        remainder = None
+    for ii, name in enumerate(names):
+        if remainder is None:
+            break
+
+        # search the remainder command list
+        # - every unique command is only searched once
+        parsed = _match_pattern(list(dict.fromkeys(remainder)), rpats[ii], name)
+        values = [parsed[command][0] for command in remainder]
+        cl_strs = [parsed[command][1] for command in remainder]
+        cls_dict[name]["command list"] = values
+        cls_dict[name]["cl str"] = cl_strs
+
+        # update remainder command list
+        # - only if the above 'command list' build does NOT produce
+        #   trivial (None) elements and all elements of 'command
+        #   list' have the same type
+        #
+        if None not in values and len(set(map(type, values))) == 1:
+            stripped = {}
+            for command, cl_str in zip(remainder, cl_strs):
+                if command not in stripped:
+                    stripped_cmd = command.replace(cl_str, "").strip()
+                    stripped[command] = stripped_cmd if stripped_cmd != "" else None
+            remainder = [stripped[command] for command in remainder]
+
+            # 'remainder' has trivial elements
+            # - i.e. RE can NOT be matched anymore
+            if None in remainder:
+                remainder = None
+    if remainder is not None:
+        cls_dict["remainder"] = {
+            "re pattern": None,
+            "command list": remainder,
+            "cl str": remainder,
+        }
+
+    # remove trivial command lists and convert lists to tuples
+    names = list(cls_dict.keys())
+    for name in names:
+        if None in cls_dict[name]["command list"] or not bool(
+            cls_dict[name]["command list"]
+        ):
+            # command list is trivial
+            del cls_dict[name]
+            messages.append(
+                f"Symbolic group ({name}) removed since some or all of the "
+                f"'command list' has None values"
+            )
+        elif len(set(map(type, cls_dict[name]["command list"]))) != 1:
+            # ensure all command list elements have the same type
+            del cls_dict[name]
+            messages.append(
+                f"Symbolic group ({name}) removed since all entries in "
+                f"'command list' do NOT have the same type"
+            )
+        else:
+            # condition 'command list' value and determine 'dtype'
+            if isinstance(cls_dict[name]["command list"][0], float):
+                # 'command list' is a float
+                cls_dict[name]["dtype"] = np.float64
+            else:
+                # 'command list' is a string
+                mlen = len(max(cls_dict[name]["command list"], key=lambda x: len(x)))
+                cls_dict[name]["dtype"] = np.dtype((np.str_, mlen))
+
+            # convert lists to tuples
+            cls_dict[name]["command list"] = tuple(cls_dict[name]["command list"])
+            cls_dict[name]["cl str"] = tuple(cls_dict[name]["cl str"])
+
+    # determine if parse was successful
+    success = True
+    if len(cls_dict) == 0 or (len(cls_dict) == 1 and "remainder" in cls_dict):
+        # dictionary is empty or only 'remainder' is in dictionary
+        success = False
+        cls_dict = {}
+
+    return success, cls_dict, tuple(messages)
@@ -20,6 +20,7 @@ import re
 
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.controls.templates import HDFMapControlTemplate
 from bapsflib._hdf.maps.controls.types import ConType
 from bapsflib.utils import _bytes_to_str
@@ -248,6 +249,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
 
             # get ml group
             mlg = self.group[gname]
+            mlg_attrs = read_attrs(mlg)
 
             # gather motion list info
             # -- define 'group name' and 'group path' --
@@ -256,7 +258,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
 
             # -- check ML name --
             try:
-                ml_name = mlg.attrs["Motion list"]
+                ml_name = mlg_attrs["Motion list"]
                 if np.issubdtype(type(ml_name), np.bytes_):
                     # decode to 'utf-8'
                     ml_name = _bytes_to_str(ml_name)
@@ -284,7 +286,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
             for pair in pairs:
                 try:
                     # get attribute value
-                    val = mlg.attrs[pair[1]]
+                    val = mlg_attrs[pair[1]]
 
                     # condition value
                     if np.issubdtype(type(val), np.bytes_):
@@ -303,7 +305,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
 
             # -- check 'delta' --
             try:
-                val = np.array([mlg.attrs["Delta x"], mlg.attrs["Delta y"], 0.0])
+                val = np.array([mlg_attrs["Delta x"], mlg_attrs["Delta y"], 0.0])
                 ml["config"]["delta"] = val
             except KeyError:
                 ml["config"]["delta"] = np.array([None, None, None])
@@ -316,7 +318,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
             # -- check 'center' --
             try:
                 val = np.array(
-                    [mlg.attrs["Grid center x"], mlg.attrs["Grid center y"], 0.0]
+                    [mlg_attrs["Grid center x"], mlg_attrs["Grid center y"], 0.0]
                 )
                 ml["config"]["center"] = val
             except KeyError:
@@ -329,7 +331,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
 
             # -- check 'npoints' --
             try:
-                val = np.array([mlg.attrs["Nx"], mlg.attrs["Ny"], 1])
+                val = np.array([mlg_attrs["Nx"], mlg_attrs["Ny"], 1])
                 ml["config"]["npoints"] = val
             except KeyError:
                 ml["config"]["npoints"] = np.array([None, None, None])
@@ -386,6 +388,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
 
             # get pl group
             plg = self.group[gname]
+            plg_attrs = read_attrs(plg)
 
             # gather pl info
             # -- define 'group name', 'group path', and 'probe name' --
@@ -396,7 +399,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
             # -- check PL name --
             try:
                 # get value
-                pl_name = plg.attrs["Probe"]
+                pl_name = plg_attrs["Probe"]
                 if np.issubdtype(type(pl_name), np.bytes_):
                     # decode to 'utf-8'
                     pl_name = _bytes_to_str(pl_name)
@@ -422,7 +425,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
                 pl["config"]["receptacle"] = int(_match.group("RNUM"))
 
                 # get value
-                rnum = plg.attrs["Receptacle"]
+                rnum = plg_attrs["Receptacle"]
 
                 # check against discovered receptacle number
                 if pl["config"]["receptacle"] != rnum:
@@ -454,7 +457,7 @@ class HDFMapControl6K(HDFMapControlTemplate):
             for pair in pairs:
                 try:
                     # get value
-                    val = plg.attrs[pair[1]]
+                    val = plg_attrs[pair[1]]
 
                     # condition value
                     if np.issubdtype(type(val), np.bytes_):
@@ -16,11 +16,13 @@ import numpy as np
 import os
 
 from abc import ABC, abstractmethod
-from typing import Iterable, List, Union
+from typing import Any, Dict, Iterable, List, Tuple, Union
 from warnings import warn
 
 from bapsflib._hdf.maps.controls.parsers import CLParse
 from bapsflib._hdf.maps.controls.types import ConType
+from bapsflib._hdf.maps.layouts import classify_dset_layout, DsetLayout
+from bapsflib.utils.frozen import freeze_cached, FrozenDict
 from bapsflib.utils.warnings import HDFMappingWarning
 
 
@@ -78,6 +80,12 @@ class HDFMapControlTemplate(ABC):
         # initialize configuration dictionary
         self._configs = {}
 
+        # initialize dataset layout cache (see dset_layout())
+        self._dset_layouts = {}  # type: Dict[Tuple[str, Tuple[int, ...]], DsetLayout]
+
+        # initialize frozen configuration cache (see frozen_config())
+        self._frozen_configs = {}  # type: Dict[str, Tuple[Any, FrozenDict]]
+
     @property
     def configs(self) -> dict:
         """
@@ -248,6 +256,64 @@ class HDFMapControlTemplate(ABC):
         ]
         return dnames
 
+    def dset_layout(self, dset: h5py.Dataset, shotnumkey: str) -> DsetLayout:
+        """
+        The shot number layout of control device dataset **dset** (see
+        :func:`~bapsflib._hdf.maps.layouts.classify_dset_layout`).  The
+        layout is classified on first use and cached on the mapping
+        object.  A `~bapsflib.utils.warnings.HDFMappingWarning` is
+        issued once for a dataset whose layout requires scanning the
+        dataset for shot numbers.
+
+        Parameters
+        ----------
+        dset : `h5py.Dataset`
+            control device dataset
+
+        shotnumkey : `str`
+            field name in the dataset that contains the shot numbers
+
+        Returns
+        -------
+        `~bapsflib._hdf.maps.layouts.DsetLayout`
+            the layout of the dataset
+        """
+        key = (dset.name, dset.shape)
+        layout = self._dset_layouts.get(key, None)
+        if layout is None:
+            n_configs = None if self.one_config_per_dset else len(self._configs)
+            layout = classify_dset_layout(dset, shotnumkey, n_configs=n_configs)
+            if layout.is_anomalous:
+                warn(
+                    f"Dataset '{dset.name}' has a {layout.layout_type.value} "
+                    f"shot number layout...shot number look-ups will scan "
+                    f"the dataset",
+                    HDFMappingWarning,
+                )
+            self._dset_layouts[key] = layout
+        return layout
+
+    def frozen_config(self, config_name: str) -> FrozenDict:
+        """
+        Read-only version (see :func:`~bapsflib.utils.frozen.freeze`)
+        of configuration **config_name** of :attr:`configs`.  It is
+        frozen on first use and cached on the mapping object, so the
+        ``info`` of every read shares the same objects.
+
+        Parameters
+        ----------
+        config_name : `str`
+            name of the control device configuration
+
+        Returns
+        -------
+        `~bapsflib.utils.frozen.FrozenDict`
+            the frozen configuration
+        """
+        return freeze_cached(
+            self._configs[config_name], self._frozen_configs, config_name
+        )
+
     @property
     def group(self) -> h5py.Group:
         """Instance of the HDF5 Control Device group"""
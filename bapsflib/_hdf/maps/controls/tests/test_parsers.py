@@ -17,7 +17,7 @@ import unittest as ut
 
 from typing import Tuple
 
-from bapsflib._hdf.maps.controls.parsers import CLParse
+from bapsflib._hdf.maps.controls.parsers import _parse_command_list, CLParse
 from bapsflib.utils.warnings import HDFMappingWarning
 
 
@@ -183,6 +183,41 @@ class TestCLParse(ut.TestCase):
         self.assertFalse(output[0])
         self.assertEqual(output[1], {})
 
+    def test_memoization(self):
+        """Test parse results are memoized across `CLParse` instances."""
+        _parse_command_list.cache_clear()
+        cl = ["FREQ 50.0 VOLT 20", "FREQ 60.0 VOLT 25.0", "FREQ 70.0 VOLT 30"]
+        patterns = [
+            r"(?P<FREQ>(\bFREQ\s)(?P<VAL>(\d+\.\d*|\.\d+|\d+\b)))",
+            r"(?P<VOLT>(\bVOLT\s)(?P<VAL>(\d+\.\d*|\.\d+|\d+\b)))",
+        ]
+        output = CLParse(cl).apply_patterns(patterns)
+
+        # same command list and patterns (in any order)
+        output2 = CLParse(tuple(cl)).apply_patterns(patterns[::-1])
+        self.assertEqual(_parse_command_list.cache_info().hits, 1)
+        self.assertEqual(output, output2)
+
+        # returned entries are independent of the memoized results
+        self.assertIsNot(output[1]["FREQ"], output2[1]["FREQ"])
+        output[1]["FREQ"]["shape"] = ()
+        output3 = CLParse(cl).apply_patterns(patterns)
+        self.assertNotIn("shape", output3[1]["FREQ"])
+
+        # warnings are re-issued for memoized results
+        pattern = r"(?P<MODE>(\bMODE\s)(?P<VAL>(\w+)))"
+        for _ in range(2):
+            with self.assertWarns(HDFMappingWarning):
+                output = CLParse(cl).apply_patterns(pattern)
+            self.assertFalse(output[0])
+
+        # repeated commands
+        cl = ["FREQ 50.0 VOLT 20", "FREQ 60.0 VOLT 20"] * 3
+        output = CLParse(cl).apply_patterns(patterns)
+        self.assertApplyPatternOutput(output)
+        self.assertEqual(output[1]["FREQ"]["command list"], (50.0, 60.0) * 3)
+        self.assertEqual(output[1]["VOLT"]["command list"], (20.0,) * 6)
+
     def assertApplyPatternOutput(self, output: Tuple[bool, dict]):
         # output[0] - success of applying patterns
         # output[1] - state values dictionary
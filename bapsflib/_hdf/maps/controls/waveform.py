@@ -20,6 +20,7 @@ import warnings
 
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.controls.templates import HDFMapControlCLTemplate
 from bapsflib._hdf.maps.controls.types import ConType
 from bapsflib.utils import _bytes_to_str
@@ -106,7 +107,7 @@ class HDFMapControlWaveform(HDFMapControlCLTemplate):
             for pair in pairs:
                 try:
                     # get attribute value
-                    val = cong.attrs[pair[1]]
+                    val = read_attrs(cong)[pair[1]]
 
                     # condition value
                     if pair[0] == "command list":
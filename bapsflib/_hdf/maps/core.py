@@ -21,6 +21,7 @@ import os
 from typing import List, Union
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import attrs_snapshot
 from bapsflib._hdf.maps.controls import HDFMapControls
 from bapsflib._hdf.maps.controls.templates import (
     HDFMapControlCLTemplate,
@@ -90,10 +91,12 @@ class HDFMap(object):
                 self.DEVICE_PATHS[device] = "/"
 
         # attach the mapping dictionaries
-        self.__attach_msi()
-        self.__attach_digitizers()
-        self.__attach_controls()
-        self.__attach_unknowns()
+        # - attributes are read once per HDF5 object while mapping
+        with attrs_snapshot():
+            self.__attach_msi()
+            self.__attach_digitizers()
+            self.__attach_controls()
+            self.__attach_unknowns()
 
     def __repr__(self):
         filename = self._hdf_obj.filename
@@ -23,6 +23,7 @@ import re
 from typing import Any, Dict, Tuple, Union
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.digitizers.templates import HDFMapDigiTemplate
 from bapsflib.utils import _bytes_to_str
 from bapsflib.utils.exceptions import HDFMappingError
@@ -143,6 +144,7 @@ class HDFMapDigiSIS3301(HDFMapDigiTemplate):
         # conns is a tuple of tuples where each tuple is a seed for the
         # elements of `adc_info`
         conns = self._find_adc_connections(adc_name, config_group)
+        config_attrs = read_attrs(config_group)
 
         for conn in conns:
             # define 'bit' and 'clock rate'
@@ -150,8 +152,8 @@ class HDFMapDigiSIS3301(HDFMapDigiTemplate):
             conn[2]["clock rate"] = u.Quantity(100.0, unit="MHz")
 
             # add 'shot average (software)' to dict
-            if "Shots to average" in config_group.attrs:
-                shtave = config_group.attrs["Shots to average"]
+            if "Shots to average" in config_attrs:
+                shtave = config_attrs["Shots to average"]
                 if shtave == 0 or shtave == 1:
                     shtave = None
             else:
@@ -162,12 +164,12 @@ class HDFMapDigiSIS3301(HDFMapDigiTemplate):
             splave = None
             avestr = ""
             find_splave = False
-            if "Samples to average" in config_group.attrs:
-                avestr = config_group.attrs["Samples to average"]
+            if "Samples to average" in config_attrs:
+                avestr = config_attrs["Samples to average"]
                 avestr = _bytes_to_str(avestr)
                 find_splave = True
-            elif "Unnamed" in config_group.attrs:
-                avestr = config_group.attrs["Unnamed"]
+            elif "Unnamed" in config_attrs:
+                avestr = config_attrs["Unnamed"]
                 try:
                     avestr = _bytes_to_str(avestr)
                     find_splave = True
@@ -605,7 +607,7 @@ class HDFMapDigiSIS3301(HDFMapDigiTemplate):
             # get board number
             brd_group = config_group[board]
             try:
-                brd = brd_group.attrs["Board"]
+                brd = read_attrs(brd_group)["Board"]
             except KeyError:
                 raise HDFMappingError(
                     self.info["group path"], "board number attribute 'Board' missing"
@@ -650,7 +652,7 @@ class HDFMapDigiSIS3301(HDFMapDigiTemplate):
                 # get channel number
                 ch_group = brd_group[ch_key]
                 try:
-                    ch = ch_group.attrs["Channel"]
+                    ch = read_attrs(ch_group)["Channel"]
                 except KeyError:
                     raise HDFMappingError(
                         self.info["group path"],
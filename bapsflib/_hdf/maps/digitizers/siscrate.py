@@ -22,6 +22,7 @@ import re
 from typing import Any, Dict, Tuple, Union
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.digitizers.templates import HDFMapDigiTemplate
 from bapsflib.utils.exceptions import HDFMappingError
 from bapsflib.utils.warnings import HDFMappingWarning
@@ -558,7 +559,7 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
             tuple of active (used) analog-digital-converter names
         """
         active_adcs = []
-        adc_types = config_group.attrs["SIS crate board types"]
+        adc_types = read_attrs(config_group)["SIS crate board types"]
         if 2 in adc_types:
             active_adcs.append("SIS 3302")
         if 3 in adc_types:
@@ -644,8 +645,9 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
         }
 
         # get slot numbers and configuration indices
-        slots = config_group.attrs["SIS crate slot numbers"]  # type: np.ndarray
-        indices = config_group.attrs["SIS crate config indices"]  # type: np.ndarray
+        config_attrs = read_attrs(config_group)
+        slots = config_attrs["SIS crate slot numbers"]  # type: np.ndarray
+        indices = config_attrs["SIS crate config indices"]  # type: np.ndarray
 
         # ensure slots and indices are 1D arrays of the same size
         if slots.ndim != 1 or indices.ndim != 1:
@@ -729,6 +731,7 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
                 continue
 
             # find connected channels
+            group_attrs = read_attrs(config_group[name])
             chs = []
             if adc_name == "SIS 3302":
                 _patterns = (r"Enabled\s(?P<CH>\d+)",)
@@ -738,7 +741,7 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
                     r"FPGA 1 Enabled\s(?P<CH>\d+)",
                     r"FPGA 2 Enabled\s(?P<CH>\d+)",
                 )
-            for key, val in config_group[name].attrs.items():
+            for key, val in group_attrs.items():
                 if "Enabled" in key and val == b"TRUE":
                     ch = None
                     for pat in _patterns:
@@ -766,8 +769,8 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
 
             # determine shot averaging
             shot_ave = None
-            if "Shot averaging (software)" in config_group[name].attrs:
-                shot_ave = config_group[name].attrs["Shot averaging (software)"]
+            if "Shot averaging (software)" in group_attrs:
+                shot_ave = group_attrs["Shot averaging (software)"]
                 if shot_ave in (0, 1):
                     shot_ave = None
 
@@ -781,8 +784,8 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
                 # - the HDF5 attribute is the power to 2
                 # - So, a hardware sample of 5 actually means the number
                 #   of points sampled is 2^5
-                if "Sample averaging (hardware)" in config_group[name].attrs:
-                    sample_ave = config_group[name].attrs["Sample averaging (hardware)"]
+                if "Sample averaging (hardware)" in group_attrs:
+                    sample_ave = group_attrs["Sample averaging (hardware)"]
                     if sample_ave == 0:
                         sample_ave = None
                     else:
@@ -792,7 +795,7 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
             if adc_name == "SIS 3305":
                 # has different clock rate modes
                 try:
-                    cr_mode = config_group[name].attrs["Channel mode"]
+                    cr_mode = group_attrs["Channel mode"]
                     cr_mode = int(cr_mode)
                 except (KeyError, ValueError):
                     why = (
@@ -899,7 +902,7 @@ class HDFMapDigiSISCrate(HDFMapDigiTemplate):
             return
         elif not isinstance(self.group[name], h5py.Group):
             return
-        elif all(attr in self.group[name].attrs for attr in expected_attrs):
+        elif all(attr in read_attrs(self.group[name]) for attr in expected_attrs):
             return name
         else:
             return
@@ -11,7 +11,6 @@
 """Module for the template digitizer mappers."""
 __all__ = ["HDFMapDigiTemplate"]
 
-import copy
 import h5py
 import os
 
@@ -19,6 +18,8 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Tuple, Union
 from warnings import warn
 
+from bapsflib._hdf.maps.layouts import classify_dset_layout, DsetLayout
+from bapsflib.utils.frozen import freeze_cached
 from bapsflib.utils.warnings import HDFMappingWarning
 
 
@@ -75,6 +76,13 @@ class HDFMapDigiTemplate(ABC):
         # initialize configuration dictionary
         self._configs = {}
 
+        # initialize dataset layout cache (see dset_layout())
+        self._dset_layouts = {}  # type: Dict[Tuple[str, Tuple[int, ...]], DsetLayout]
+
+        # initialize frozen adc setup cache (see get_adc_info())
+        # - keyed by (config_name, adc, board)
+        self._frozen_configs = {}  # type: Dict[Tuple[str, str, int], Tuple]
+
     @abstractmethod
     def _build_configs(self):
         """
@@ -398,6 +406,42 @@ class HDFMapDigiTemplate(ABC):
 
         return active
 
+    def dset_layout(self, dset: h5py.Dataset, shotnumkey: str) -> DsetLayout:
+        """
+        The shot number layout of header dataset **dset** (see
+        :func:`~bapsflib._hdf.maps.layouts.classify_dset_layout`).  The
+        layout is classified on first use and cached on the mapping
+        object.  A `~bapsflib.utils.warnings.HDFMappingWarning` is
+        issued once for a dataset whose layout requires scanning the
+        dataset for shot numbers.
+
+        Parameters
+        ----------
+        dset : `h5py.Dataset`
+            header dataset of the digitizer
+
+        shotnumkey : `str`
+            field name in the dataset that contains the shot numbers
+
+        Returns
+        -------
+        `~bapsflib._hdf.maps.layouts.DsetLayout`
+            the layout of the dataset
+        """
+        key = (dset.name, dset.shape)
+        layout = self._dset_layouts.get(key, None)
+        if layout is None:
+            layout = classify_dset_layout(dset, shotnumkey)
+            if layout.is_anomalous:
+                warn(
+                    f"Dataset '{dset.name}' has a {layout.layout_type.value} "
+                    f"shot number layout...shot number look-ups will scan "
+                    f"the dataset",
+                    HDFMappingWarning,
+                )
+            self._dset_layouts[key] = layout
+        return layout
+
     @property
     def device_adcs(self) -> Tuple[str, ...]:
         """
@@ -484,7 +528,10 @@ class HDFMapDigiTemplate(ABC):
         # get dictionary and add keys
         # - 'board', 'channel', 'adc', 'digitizer', and
         #   'configuration name'
-        adc_info = copy.deepcopy(conn[2])
+        # - nested values are read-only objects frozen once and shared
+        adc_info = dict(
+            freeze_cached(conn[2], self._frozen_configs, (config_name, adc, board))
+        )
         adc_info["adc"] = adc
         adc_info["board"] = board
         adc_info["channel"] = channel
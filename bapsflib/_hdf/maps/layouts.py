@@ -0,0 +1,345 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for classifying the shot number layout of digitizer header and
+control device datasets.
+"""
+__all__ = ["classify_dset_layout", "DsetLayout", "LayoutType"]
+
+import h5py
+import numpy as np
+
+from enum import Enum
+from typing import Tuple, Union
+
+
+class LayoutType(Enum):
+    """Enum of dataset shot number layouts"""
+
+    #: shot numbers increase by 1 from row to row
+    sequential = "sequential"
+
+    #: shot numbers strictly increase, but skip some shot numbers
+    gapped = "gapped"
+
+    #: shot numbers do not decrease, but some are recorded more than
+    #: once
+    duplicated = "duplicated"
+
+    #: shot numbers do not monotonically increase
+    non_monotonic = "non-monotonic"
+
+    #: configurations of a dataset recording multiple configurations
+    #: are not recorded in a fixed order (or not for the same shot
+    #: numbers)
+    unordered_configs = "unordered configs"
+
+    def __repr__(self):  # pragma: no cover
+        return f"layout.{self.name}"
+
+
+class DsetLayout:
+    """
+    The shot number layout of a dataset, as determined by
+    :func:`classify_dset_layout`.
+
+    For the `~LayoutType.sequential` and `~LayoutType.gapped` layouts,
+    :meth:`lookup` finds the rows of requested shot numbers without
+    reading the dataset.  For all other layouts, :meth:`lookup` returns
+    `None` and the dataset has to be scanned.
+    """
+
+    def __init__(
+        self,
+        layout_type: LayoutType,
+        nshotnum: int = 0,
+        config_order: Union[Tuple[str, ...], None] = None,
+        run_sn: Union[np.ndarray, None] = None,
+        run_row: Union[np.ndarray, None] = None,
+        run_length: Union[np.ndarray, None] = None,
+    ):
+        """
+        Parameters
+        ----------
+        layout_type : `LayoutType`
+            the layout type
+
+        nshotnum : `int`
+            number of recorded shot numbers (per configuration)
+
+        config_order : Tuple[str, ...], optional
+            the order the configurations are recorded in for each shot
+            number, `None` if the dataset records only one
+            configuration
+
+        run_sn : `numpy.ndarray`, optional
+            first shot number of each run of sequential shot numbers
+
+        run_row : `numpy.ndarray`, optional
+            (per configuration) row of the first shot number of each run
+
+        run_length : `numpy.ndarray`, optional
+            number of shot numbers in each run
+        """
+        self._layout_type = layout_type
+        self._nshotnum = nshotnum
+        self._config_order = config_order
+        self._run_sn = run_sn
+        self._run_row = run_row
+        self._run_length = run_length
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} {self._layout_type.value}, "
+            f"nshotnum={self._nshotnum}>"
+        )
+
+    @property
+    def config_order(self) -> Union[Tuple[str, ...], None]:
+        """
+        Order the configurations are recorded in for each shot number
+        (`None` if the dataset records only one configuration).
+        """
+        return self._config_order
+
+    @property
+    def gaps(self) -> np.ndarray:
+        """
+        Array of ``(first, last)`` shot numbers of the gaps of a
+        `~LayoutType.gapped` dataset.
+        """
+        if self._layout_type is not LayoutType.gapped:
+            return np.empty((0, 2), dtype=np.int64)
+        run_end = self._run_sn + self._run_length
+        return np.stack((run_end[:-1], self._run_sn[1:] - 1), axis=1)
+
+    @property
+    def is_anomalous(self) -> bool:
+        """`True` if shot number look-ups require scanning the dataset."""
+        return self._layout_type not in (LayoutType.sequential, LayoutType.gapped)
+
+    @property
+    def layout_type(self) -> LayoutType:
+        """The layout type."""
+        return self._layout_type
+
+    @property
+    def nshotnum(self) -> int:
+        """Number of recorded shot numbers (per configuration)."""
+        return self._nshotnum
+
+    def lookup(
+        self, shotnum: np.ndarray, config_name: Union[str, None] = None
+    ) -> Union[Tuple[np.ndarray, np.ndarray], None]:
+        """
+        Find the dataset rows of the shot numbers **shotnum**.
+
+        Parameters
+        ----------
+        shotnum : `numpy.ndarray`
+            sorted array of desired shot numbers
+
+        config_name : `str`, optional
+            configuration name, required if the dataset records
+            multiple configurations
+
+        Returns
+        -------
+        index : `numpy.ndarray`
+            array of row indices such that
+            ``shotnum[sni] = dset[index, shotnumkey]``
+
+        sni : `numpy.ndarray`
+            boolean array that masks the ``shotnum`` array
+
+        `None` is returned if the layout has no fast look-up.
+        """
+        if self.is_anomalous:
+            return None
+
+        # per-configuration row stretching
+        n_configs, config_subindex = self._config_stride(config_name)
+
+        shotnum = np.asarray(shotnum).astype(np.int64, copy=False)
+        if self._nshotnum == 0:
+            return np.empty(0, dtype=np.int64), np.zeros(shotnum.shape, dtype=bool)
+
+        if self._layout_type is LayoutType.sequential:
+            row = shotnum - self._run_sn[0]
+            sni = (row >= 0) & (row < self._nshotnum)
+        else:
+            # gapped
+            run = np.searchsorted(self._run_sn, shotnum, side="right") - 1
+            run_clipped = np.clip(run, 0, None)
+            offset = shotnum - self._run_sn[run_clipped]
+            sni = (run >= 0) & (offset < self._run_length[run_clipped])
+            row = self._run_row[run_clipped] + offset
+
+        index = row[sni] * n_configs + config_subindex
+        return index, sni
+
+    def lookup_ranges(
+        self, ranges: np.ndarray, config_name: Union[str, None] = None
+    ) -> Union[Tuple[np.ndarray, Union[slice, np.ndarray]], None]:
+        """
+        Find the recorded shot numbers of the ``[start, stop)`` shot
+        number **ranges** (e.g. :attr:`ShotSet.ranges
+        <bapsflib._hdf.utils.shotset.ShotSet.ranges>`) and their
+        dataset rows, without expanding the ranges.
+
+        Parameters
+        ----------
+        ranges : `numpy.ndarray`
+            array of shape ``(n_ranges, 2)`` of sorted, non-overlapping
+            ``[start, stop)`` shot number ranges
+
+        config_name : `str`, optional
+            configuration name, required if the dataset records
+            multiple configurations
+
+        Returns
+        -------
+        sn_ranges : `numpy.ndarray`
+            the ``[start, stop)`` ranges of the recorded shot numbers
+            within **ranges**
+
+        index : Union[`slice`, `numpy.ndarray`]
+            the dataset rows of the recorded shot numbers, a `slice`
+            (hyperslab) if they are a single run of shot numbers
+
+        `None` is returned if the layout is not
+        `~LayoutType.sequential`.
+        """
+        if self._layout_type is not LayoutType.sequential:
+            return None
+
+        # per-configuration row stretching
+        n_configs, config_subindex = self._config_stride(config_name)
+
+        ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        first = self._run_sn[0] if self._nshotnum != 0 else 0
+        lo = np.clip(ranges[:, 0], first, first + self._nshotnum)
+        hi = np.clip(ranges[:, 1], first, first + self._nshotnum)
+        keep = hi > lo
+        sn_ranges = np.stack((lo[keep], hi[keep]), axis=1)
+
+        rows = (sn_ranges - first) * n_configs + config_subindex
+        if rows.shape[0] == 1:
+            start, stop = (int(row) for row in rows[0])
+            index = slice(start, stop - n_configs + 1, n_configs)
+        else:
+            index = np.concatenate(
+                [np.arange(start, stop, n_configs) for start, stop in rows]
+                + [np.empty(0, dtype=np.int64)]
+            )
+        return sn_ranges, index
+
+    def _config_stride(self, config_name: Union[str, None]) -> Tuple[int, int]:
+        """
+        Return the number of configurations recorded per shot number
+        and the row offset of configuration **config_name**.
+        """
+        if self._config_order is None:
+            return 1, 0
+        try:
+            return len(self._config_order), self._config_order.index(config_name)
+        except ValueError:
+            raise ValueError(
+                f"Configuration '{config_name}' is not recorded in the dataset."
+            )
+
+
+def classify_dset_layout(
+    dset: h5py.Dataset, shotnumkey: str, n_configs: Union[int, None] = None
+) -> DsetLayout:
+    """
+    Classify the shot number layout of dataset **dset**.
+
+    This reads the shot number column (and the configuration column of
+    a dataset recording multiple configurations) once.
+
+    Parameters
+    ----------
+    dset : `h5py.Dataset`
+        dataset containing shot numbers
+
+    shotnumkey : `str`
+        field name in the dataset that contains the shot numbers
+
+    n_configs : `int`, optional
+        number of configurations recorded in the dataset, if the
+        dataset records multiple configurations
+
+    Returns
+    -------
+    `DsetLayout`
+        the layout of the dataset
+    """
+    sn = dset[shotnumkey].astype(np.int64)
+
+    config_order = None
+    if n_configs is not None:
+        # find the configuration field
+        configkey = ""
+        for df in dset.dtype.names:
+            if "configuration" in df.casefold():
+                configkey = df
+                break
+        if configkey == "":
+            raise ValueError("Can NOT find a configuration field in the dataset")
+
+        # the configurations must be recorded in a fixed order for the
+        # same shot numbers
+        if sn.size % n_configs != 0:
+            return DsetLayout(LayoutType.unordered_configs)
+        configs = dset[configkey].reshape(-1, n_configs)
+        sn = sn.reshape(-1, n_configs)
+        if configs.shape[0] != 0 and (
+            np.any(configs != configs[0]) or np.any(sn != sn[:, :1])
+        ):
+            return DsetLayout(LayoutType.unordered_configs)
+        config_order = tuple(
+            val.decode("utf-8") if isinstance(val, bytes) else str(val)
+            for val in (configs[0] if configs.shape[0] != 0 else ())
+        )
+        sn = sn[:, 0]
+
+    if sn.size == 0:
+        return DsetLayout(LayoutType.sequential, config_order=config_order)
+
+    diff = np.diff(sn)
+    if np.all(diff == 1):
+        return DsetLayout(
+            LayoutType.sequential,
+            nshotnum=sn.size,
+            config_order=config_order,
+            run_sn=sn[:1],
+            run_row=np.zeros(1, dtype=np.int64),
+            run_length=np.array([sn.size], dtype=np.int64),
+        )
+    elif np.all(diff > 0):
+        run_row = np.concatenate(([0], np.where(diff != 1)[0] + 1))
+        run_length = np.diff(np.append(run_row, sn.size))
+        return DsetLayout(
+            LayoutType.gapped,
+            nshotnum=sn.size,
+            config_order=config_order,
+            run_sn=sn[run_row],
+            run_row=run_row,
+            run_length=run_length,
+        )
+    elif np.all(diff >= 0):
+        return DsetLayout(
+            LayoutType.duplicated, nshotnum=sn.size, config_order=config_order
+        )
+    return DsetLayout(
+        LayoutType.non_monotonic, nshotnum=sn.size, config_order=config_order
+    )
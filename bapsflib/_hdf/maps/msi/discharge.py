@@ -19,6 +19,7 @@ import numpy as np
 
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.msi.templates import HDFMapMSITemplate
 from bapsflib.utils.exceptions import HDFMappingError
 from bapsflib.utils.warnings import HDFMappingWarning
@@ -71,9 +72,10 @@ class HDFMapMSIDischarge(HDFMapMSITemplate):
             ("t0", "Start time"),
             ("dt", "Timestep"),
         ]
+        group_attrs = read_attrs(self.group)
         for pair in pairs:
             try:
-                self._configs[pair[0]] = [self.group.attrs[pair[1]]]
+                self._configs[pair[0]] = [group_attrs[pair[1]]]
             except KeyError:
                 self._configs[pair[0]] = []
                 warn(
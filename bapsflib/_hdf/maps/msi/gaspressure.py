@@ -19,6 +19,7 @@ import numpy as np
 
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.msi.templates import HDFMapMSITemplate
 from bapsflib.utils.exceptions import HDFMappingError
 from bapsflib.utils.warnings import HDFMappingWarning
@@ -65,9 +66,10 @@ class HDFMapMSIGasPressure(HDFMapMSITemplate):
             ("ion gauge calib tag", "Ion gauge calibration tag"),
             ("RGA calib tag", "RGA calibration tag"),
         ]
+        group_attrs = read_attrs(self.group)
         for pair in pairs:
             try:
-                val = self.group.attrs[pair[1]]
+                val = group_attrs[pair[1]]
                 if isinstance(val, (list, tuple, np.ndarray)):
                     self._configs[pair[0]] = val
                 else:
@@ -19,6 +19,7 @@ import numpy as np
 
 from warnings import warn
 
+from bapsflib._hdf.maps.attrsnapshot import read_attrs
 from bapsflib._hdf.maps.msi.templates import HDFMapMSITemplate
 from bapsflib.utils.exceptions import HDFMappingError
 from bapsflib.utils.warnings import HDFMappingWarning
@@ -103,7 +104,7 @@ class HDFMapMSIInterferometerArray(HDFMapMSITemplate):
         self._configs["z"] = []
         for pair in pairs[0:2]:
             try:
-                val = self.group.attrs[pair[1]]
+                val = read_attrs(self.group)[pair[1]]
                 if isinstance(val, (list, tuple, np.ndarray)):
                     self._configs[pair[0]] = val
                 else:
@@ -205,9 +206,10 @@ class HDFMapMSIInterferometerArray(HDFMapMSITemplate):
 
                 # populate general info values
                 self._configs["interferometer name"].append(name)
+                sub_attrs = read_attrs(self.group[name])
                 for pair in pairs[3::]:
                     try:
-                        self._configs[pair[0]].append(self.group[name].attrs[pair[1]])
+                        self._configs[pair[0]].append(sub_attrs[pair[1]])
                     except KeyError:
                         self._configs[pair[0]].append(None)
                         warn(
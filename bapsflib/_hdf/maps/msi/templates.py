@@ -15,6 +15,9 @@ import h5py
 import os
 
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Tuple
+
+from bapsflib.utils.frozen import freeze_cached, FrozenDict
 
 
 class HDFMapMSITemplate(ABC):
@@ -61,6 +64,9 @@ class HDFMapMSITemplate(ABC):
         # initialize self.configs
         self._configs = {}
 
+        # initialize frozen configuration cache (see frozen_configs)
+        self._frozen_configs = {}  # type: Dict[None, Tuple[Any, FrozenDict]]
+
     @property
     def configs(self) -> dict:
         """
@@ -167,6 +173,16 @@ class HDFMapMSITemplate(ABC):
         """
         return self._configs
 
+    @property
+    def frozen_configs(self) -> FrozenDict:
+        """
+        Read-only version (see :func:`~bapsflib.utils.frozen.freeze`)
+        of :attr:`configs`.  It is frozen on first use and cached on the
+        mapping object, so the ``info`` of every read shares the same
+        objects.
+        """
+        return freeze_cached(self._configs, self._frozen_configs, None)
+
     @property
     def info(self) -> dict:
         """
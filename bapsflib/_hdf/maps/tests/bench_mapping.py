@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Benchmark of mapping a file (:class:`~bapsflib._hdf.maps.core.HDFMap`)
+with and without the attribute snapshot
+(:func:`~bapsflib._hdf.maps.attrsnapshot.attrs_snapshot`).
+
+Usage::
+
+    python -m bapsflib._hdf.maps.tests.bench_mapping [n_configs] [repeat]
+"""
+import sys
+import time
+
+from bapsflib._hdf.maps.attrsnapshot import attrs_snapshot
+from bapsflib._hdf.maps.core import HDFMap
+from bapsflib._hdf.maps.tests.fauxhdfbuilder import FauxHDFBuilder
+
+
+def bench_mapping(n_configs=4, repeat=5):
+    """
+    Time the mapping of a faux file with **n_configs** configurations
+    of the 'SIS crate', 'SIS 3301', and '6K Compumotor' modules.
+    """
+    f = FauxHDFBuilder(
+        add_modules={
+            "SIS crate": {"n_configs": n_configs, "sn_size": 10, "nt": 10},
+            "SIS 3301": {"n_configs": n_configs, "sn_size": 10, "nt": 10},
+            "6K Compumotor": {"n_configs": n_configs, "sn_size": 10},
+            "Discharge": {},
+            "Interferometer array": {},
+        }
+    )
+    kwargs = {
+        "control_path": "Raw data + config",
+        "digitizer_path": "Raw data + config",
+        "msi_path": "MSI",
+    }
+    try:
+        for enabled in (False, True):
+            times = []
+            for _ in range(repeat):
+                with attrs_snapshot(enabled=enabled) as snapshot:
+                    tstart = time.perf_counter()
+                    HDFMap(f, **kwargs)
+                    times.append(time.perf_counter() - tstart)
+            print(
+                f"snapshot {'enabled ' if enabled else 'disabled'}: "
+                f"best {min(times) * 1e3:8.2f} ms  "
+                f"(attribute reads {snapshot.misses}, served {snapshot.hits})"
+            )
+    finally:
+        f.cleanup()
+
+
+if __name__ == "__main__":
+    bench_mapping(*(int(arg) for arg in sys.argv[1:3]))
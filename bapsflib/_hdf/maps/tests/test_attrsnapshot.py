@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from bapsflib._hdf.maps.attrsnapshot import attrs_snapshot, AttrsSnapshot, read_attrs
+from bapsflib._hdf.maps.core import HDFMap
+from bapsflib._hdf.maps.tests.fauxhdfbuilder import FauxHDFBuilder
+
+
+class TestAttrsSnapshot(ut.TestCase):
+    """
+    Test case for :func:`~bapsflib._hdf.maps.attrsnapshot.attrs_snapshot`
+    and :func:`~bapsflib._hdf.maps.attrsnapshot.read_attrs`.
+    """
+
+    f = NotImplemented  # type: FauxHDFBuilder
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.f = FauxHDFBuilder(
+            add_modules={
+                "SIS crate": {"n_configs": 2},
+                "6K Compumotor": {"n_configs": 2},
+                "Discharge": {},
+            }
+        )
+        grp = cls.f.create_group("snapshot")
+        grp.attrs["one"] = 1
+        grp.attrs["two"] = np.array([1, 2])
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.f.cleanup()
+
+    def test_read_attrs(self):
+        grp = self.f["snapshot"]
+
+        # no active snapshot
+        attrs = read_attrs(grp)
+        self.assertEqual(set(attrs), {"one", "two"})
+        self.assertEqual(attrs["one"], 1)
+        self.assertTrue(np.array_equal(attrs["two"], [1, 2]))
+
+        # active snapshot
+        with attrs_snapshot() as snapshot:
+            self.assertIsInstance(snapshot, AttrsSnapshot)
+            self.assertTrue(snapshot.enabled)
+            attrs = read_attrs(grp)
+            self.assertEqual((snapshot.hits, snapshot.misses), (0, 1))
+            self.assertIs(read_attrs(self.f["snapshot"]), attrs)
+            self.assertEqual((snapshot.hits, snapshot.misses), (1, 1))
+
+            # nested contexts re-use the active snapshot
+            with attrs_snapshot() as inner:
+                self.assertIs(inner, snapshot)
+                read_attrs(grp)
+            self.assertEqual((snapshot.hits, snapshot.misses), (2, 1))
+
+        # snapshot is deactivated when the context exits
+        grp.attrs["three"] = 3
+        self.assertIn("three", read_attrs(grp))
+        del grp.attrs["three"]
+
+    def test_disabled(self):
+        grp = self.f["snapshot"]
+        with attrs_snapshot(enabled=False) as snapshot:
+            self.assertFalse(snapshot.enabled)
+            attrs = read_attrs(grp)
+            self.assertIsNot(read_attrs(grp), attrs)
+            self.assertEqual((snapshot.hits, snapshot.misses), (0, 2))
+
+    def test_mapping(self):
+        kwargs = {
+            "control_path": "Raw data + config",
+            "digitizer_path": "Raw data + config",
+            "msi_path": "MSI",
+        }
+        _map = HDFMap(self.f, **kwargs)
+
+        with attrs_snapshot() as snapshot:
+            _map_snap = HDFMap(self.f, **kwargs)
+        self.assertGreater(snapshot.hits, 0)
+
+        # mapping is the same with and without a snapshot
+        self.assertEqual(list(_map_snap.controls), list(_map.controls))
+        self.assertEqual(list(_map_snap.digitizers), list(_map.digitizers))
+        self.assertEqual(list(_map_snap.msi), list(_map.msi))
+        for name in ("6K Compumotor",):
+            self.assertEqual(
+                list(_map_snap.controls[name].configs), list(_map.controls[name].configs)
+            )
+        dmap, dmap_snap = _map.digitizers["SIS crate"], _map_snap.digitizers["SIS crate"]
+        self.assertEqual(dmap_snap.active_configs, dmap.active_configs)
+        for config_name in dmap.active_configs:
+            self.assertEqual(
+                dmap_snap.configs[config_name]["SIS 3305"],
+                dmap.configs[config_name]["SIS 3305"],
+            )
+            self.assertEqual(
+                dmap_snap.configs[config_name]["SIS 3302"],
+                dmap.configs[config_name]["SIS 3302"],
+            )
+
+
+if __name__ == "__main__":
+    ut.main()
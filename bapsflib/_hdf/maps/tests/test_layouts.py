@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+import warnings
+
+from bapsflib._hdf.maps.core import HDFMap
+from bapsflib._hdf.maps.layouts import classify_dset_layout, LayoutType
+from bapsflib._hdf.maps.tests.fauxhdfbuilder import FauxHDFBuilder
+from bapsflib._hdf.utils.helpers import build_sndr_for_simple_dset
+from bapsflib.utils.warnings import HDFMappingWarning
+
+
+class TestDsetLayout(ut.TestCase):
+    """
+    Test case for :func:`~bapsflib._hdf.maps.layouts.classify_dset_layout`
+    and :class:`~bapsflib._hdf.maps.layouts.DsetLayout`.
+    """
+
+    f = NotImplemented  # type: FauxHDFBuilder
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.f = FauxHDFBuilder()
+
+    def tearDown(self):
+        super().tearDown()
+        for name in list(self.f):
+            del self.f[name]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.f.cleanup()
+
+    def create_dset(self, name, sn, configs=None):
+        dtype = [("Shot number", np.int32)]
+        if configs is not None:
+            dtype.append(("Configuration name", "S20"))
+        data = np.zeros(len(sn), dtype=dtype)
+        data["Shot number"] = sn
+        if configs is not None:
+            data["Configuration name"] = configs
+        return self.f.create_dataset(name, data=data)
+
+    def assertLookupEqualsScan(self, dset, layout):
+        for shotnum in (
+            [1],
+            [2, 3, 4],
+            [4, 5, 6, 9, 10, 11],
+            np.arange(1, 30),
+            [25, 26],
+        ):
+            shotnum = np.array(shotnum, dtype=np.uint32)
+            index, sni = layout.lookup(shotnum)
+            ref_index, ref_sni = build_sndr_for_simple_dset(shotnum, dset, "Shot number")
+            self.assertTrue(np.array_equal(index, ref_index))
+            self.assertTrue(np.array_equal(sni, ref_sni))
+            self.assertTrue(np.array_equal(shotnum[sni], dset["Shot number"][index]))
+
+    def test_sequential(self):
+        dset = self.create_dset("seq", np.arange(3, 23))
+        layout = classify_dset_layout(dset, "Shot number")
+        self.assertIs(layout.layout_type, LayoutType.sequential)
+        self.assertFalse(layout.is_anomalous)
+        self.assertEqual(layout.nshotnum, 20)
+        self.assertEqual(layout.gaps.shape, (0, 2))
+        self.assertIsNone(layout.config_order)
+        self.assertLookupEqualsScan(dset, layout)
+
+    def test_lookup_ranges(self):
+        dset = self.create_dset("seq", np.arange(3, 23))
+        layout = classify_dset_layout(dset, "Shot number")
+
+        # one range is a slice of rows
+        sn_ranges, index = layout.lookup_ranges(np.array([[1, 10**9]]))
+        self.assertTrue(np.array_equal(sn_ranges, [[3, 23]]))
+        self.assertEqual(index, slice(0, 20, 1))
+
+        # several ranges are an array of rows
+        sn_ranges, index = layout.lookup_ranges(np.array([[1, 5], [10, 12], [30, 40]]))
+        self.assertTrue(np.array_equal(sn_ranges, [[3, 5], [10, 12]]))
+        self.assertTrue(np.array_equal(dset["Shot number"][index], [3, 4, 10, 11]))
+
+        # nothing recorded
+        sn_ranges, index = layout.lookup_ranges(np.array([[30, 40]]))
+        self.assertEqual(sn_ranges.shape, (0, 2))
+        self.assertEqual(index.size, 0)
+
+        # only sequential layouts are resolved by ranges
+        dset = self.create_dset("gap", [1, 2, 3, 7, 8])
+        layout = classify_dset_layout(dset, "Shot number")
+        self.assertIsNone(layout.lookup_ranges(np.array([[1, 5]])))
+
+        # rows of one configuration
+        sn = np.repeat([1, 2, 3, 4], 2)
+        dset = self.create_dset("complex", sn, ["one", "two"] * 4)
+        layout = classify_dset_layout(dset, "Shot number", n_configs=2)
+        sn_ranges, index = layout.lookup_ranges(np.array([[2, 4]]), "two")
+        self.assertTrue(np.array_equal(sn_ranges, [[2, 4]]))
+        self.assertTrue(np.array_equal(dset["Shot number"][index], [2, 3]))
+        self.assertTrue(np.all(dset["Configuration name"][index] == b"two"))
+        with self.assertRaises(ValueError):
+            layout.lookup_ranges(np.array([[2, 4]]), "three")
+
+    def test_gapped(self):
+        dset = self.create_dset("gap", [1, 2, 3, 7, 8, 10, 20, 21])
+        layout = classify_dset_layout(dset, "Shot number")
+        self.assertIs(layout.layout_type, LayoutType.gapped)
+        self.assertFalse(layout.is_anomalous)
+        self.assertTrue(np.array_equal(layout.gaps, [[4, 6], [9, 9], [11, 19]]))
+
+        for shotnum in ([1, 4, 8, 9, 10, 21, 22], np.arange(1, 30)):
+            shotnum = np.array(shotnum)
+            index, sni = layout.lookup(shotnum)
+            self.assertTrue(np.array_equal(shotnum[sni], dset["Shot number"][index]))
+            self.assertTrue(np.array_equal(sni, np.isin(shotnum, dset["Shot number"])))
+
+    def test_anomalous(self):
+        dset = self.create_dset("dup", [1, 2, 2, 3])
+        layout = classify_dset_layout(dset, "Shot number")
+        self.assertIs(layout.layout_type, LayoutType.duplicated)
+        self.assertTrue(layout.is_anomalous)
+        self.assertIsNone(layout.lookup(np.array([1, 2])))
+
+        dset = self.create_dset("nonmono", [1, 3, 2, 4])
+        layout = classify_dset_layout(dset, "Shot number")
+        self.assertIs(layout.layout_type, LayoutType.non_monotonic)
+        self.assertIsNone(layout.lookup(np.array([1, 2])))
+
+    def test_empty(self):
+        dset = self.create_dset("empty", [])
+        layout = classify_dset_layout(dset, "Shot number")
+        self.assertIs(layout.layout_type, LayoutType.sequential)
+        index, sni = layout.lookup(np.array([1, 2]))
+        self.assertEqual(index.size, 0)
+        self.assertTrue(np.array_equal(sni, [False, False]))
+
+    def test_complex(self):
+        sn = np.repeat([1, 2, 3, 5], 2)
+        configs = ["one", "two"] * 4
+        dset = self.create_dset("complex", sn, configs)
+        layout = classify_dset_layout(dset, "Shot number", n_configs=2)
+        self.assertIs(layout.layout_type, LayoutType.gapped)
+        self.assertEqual(layout.config_order, ("one", "two"))
+        self.assertEqual(layout.nshotnum, 4)
+
+        shotnum = np.array([2, 4, 5])
+        index, sni = layout.lookup(shotnum, "two")
+        self.assertTrue(np.array_equal(index, [3, 7]))
+        self.assertTrue(np.array_equal(sni, [True, False, True]))
+        self.assertTrue(np.all(dset["Configuration name"][index] == b"two"))
+        with self.assertRaises(ValueError):
+            layout.lookup(shotnum, "three")
+
+        # configuration order changes
+        dset = self.create_dset("unordered", sn, ["one", "two", "two", "one"] * 2)
+        layout = classify_dset_layout(dset, "Shot number", n_configs=2)
+        self.assertIs(layout.layout_type, LayoutType.unordered_configs)
+        self.assertIsNone(layout.lookup(shotnum, "one"))
+
+        # rows are not a multiple of the number of configurations
+        dset = self.create_dset("missing", sn[:-1], configs[:-1])
+        layout = classify_dset_layout(dset, "Shot number", n_configs=2)
+        self.assertIs(layout.layout_type, LayoutType.unordered_configs)
+
+        # no configuration field
+        dset = self.create_dset("no_config", sn)
+        with self.assertRaises(ValueError):
+            classify_dset_layout(dset, "Shot number", n_configs=2)
+
+
+class TestMapperDsetLayout(ut.TestCase):
+    """
+    Test case for the ``dset_layout()`` method of the digitizer and
+    control device mapping classes.
+    """
+
+    f = NotImplemented  # type: FauxHDFBuilder
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.f = FauxHDFBuilder(
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": 20},
+                "Waveform": {"n_configs": 1, "sn_size": 20},
+            }
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.f.cleanup()
+
+    def test_dset_layout(self):
+        _map = HDFMap(
+            self.f,
+            control_path="Raw data + config",
+            digitizer_path="Raw data + config",
+            msi_path="MSI",
+        )
+
+        # control device
+        cmap = _map.controls["Waveform"]
+        config = list(cmap.configs.values())[0]
+        dset = self.f[config["dset paths"][0]]
+        layout = cmap.dset_layout(dset, "Shot number")
+        self.assertIs(layout.layout_type, LayoutType.sequential)
+        self.assertIs(cmap.dset_layout(dset, "Shot number"), layout)
+
+        # digitizer header with duplicated shot numbers warns once
+        dmap = _map.digitizers["SIS 3301"]
+        config_name = dmap.active_configs[0]
+        brd, chs, _ = dmap.configs[config_name]["SIS 3301"][0]
+        hname = dmap.construct_header_dataset_name(brd, chs[0], config_name=config_name)
+        dset = self.f[f"{dmap.info['group path']}/{hname}"]
+        sn_field = dmap.configs[config_name]["shotnum"]["dset field"][0]
+        data = dset[...]
+        data[sn_field][5] = data[sn_field][4]
+        dset[...] = data
+
+        with self.assertWarns(HDFMappingWarning):
+            layout = dmap.dset_layout(dset, sn_field)
+        self.assertIs(layout.layout_type, LayoutType.duplicated)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertIs(dmap.dset_layout(dset, sn_field), layout)
+
+
+if __name__ == "__main__":
+    ut.main()
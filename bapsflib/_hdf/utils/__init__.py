@@ -15,10 +15,21 @@ access and interface with the HDF5 files generated at BaPSF.
 __all__ = []
 
 from bapsflib._hdf.utils import (
+    asyncfile,
+    export,
     file,
+    fileseries,
     hdfoverview,
     hdfreadcontrols,
     hdfreaddata,
     hdfreadmsi,
     helpers,
+    prefetch,
+    readcache,
+    reduced,
+    sharedmem,
+    shotreader,
+    shotset,
+    spectral,
+    vds,
 )
@@ -0,0 +1,387 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing the :mod:`asyncio` facade
+`~bapsflib._hdf.utils.asyncfile.AsyncFile` for
+`~bapsflib._hdf.utils.file.File`.
+"""
+__all__ = ["AsyncFile"]
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Type, Union
+
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.prefetch import (
+    _discard,
+    _init_worker,
+    _read_shared,
+    _receive,
+    _reopen_args,
+)
+
+#: executor shared by all `AsyncFile` instances that are not given one
+_default_executor = None  # type: Union[ThreadPoolExecutor, None]
+_default_executor_lock = threading.Lock()
+
+
+def _get_default_executor() -> ThreadPoolExecutor:
+    """Return (and create if needed) the shared default executor."""
+    global _default_executor
+
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(thread_name_prefix="bapsflib-read")
+        return _default_executor
+
+
+class AsyncFile:
+    """
+    An :mod:`asyncio` facade for :class:`~bapsflib._hdf.utils.file.File`
+    (or a subclass like :class:`bapsflib.lapd.File`).
+
+    The blocking readers (:meth:`~.file.File.read_controls`,
+    :meth:`~.file.File.read_data`, and :meth:`~.file.File.read_msi`)
+    are run in an executor, and the number of concurrent reads of a
+    single file is limited by ``max_concurrency``.
+
+    With ``processes=True`` the reads are run in a pool of
+    ``max_concurrency`` worker processes, each with its own handle to
+    the HDF5 file (the same file class and device paths as **file**).
+    The reads then run in parallel with each other and with the event
+    loop.  Each result is read into shared memory (see
+    `~bapsflib._hdf.utils.sharedmem.SharedArray`) and copied out of it
+    by the awaiting task, so results are not pickled between the
+    processes.  The file must be on disk and readable by another
+    process (i.e. not open for writing), the ``out`` and
+    ``shared_memory`` keywords are not supported, and starting a
+    worker process takes about a couple of seconds.
+
+    By default (``processes=False``) the reads are run in a thread
+    pool.  This lets a read be awaited (and cancelled) alongside other
+    tasks, but :mod:`h5py` holds the GIL (and its own global lock)
+    during a read, so the reads are serialized with each other and the
+    event loop is blocked for the duration of each HDF5 read call.
+
+    Cancelling an awaiting read (e.g. with `asyncio.Task.cancel` or
+    `asyncio.wait_for`) removes it from the queue if it has not started
+    yet.  A read that is already running can not be interrupted; it is
+    allowed to finish in the background, its result is discarded, and
+    it keeps its concurrency slot until then.
+
+    Examples
+    --------
+
+    >>> async def quick_look(paths):
+    ...     async with AsyncFile.open(paths[0]) as af1, \\
+    ...                AsyncFile.open(paths[1]) as af2:
+    ...         return await asyncio.gather(
+    ...             af1.read_data(1, 1, shotnum=slice(1, 101)),
+    ...             af1.read_data(1, 2, shotnum=slice(1, 101)),
+    ...             af2.read_msi("Discharge"),
+    ...         )
+    >>>
+    >>> data11, data12, discharge = asyncio.run(quick_look(paths))
+    >>>
+    >>> # read in parallel worker processes
+    >>> async def read_all(path, channels):
+    ...     async with AsyncFile.open(path, processes=True,
+    ...                               max_concurrency=4) as af:
+    ...         return await asyncio.gather(
+    ...             *[af.read_data(1, ch) for ch in channels]
+    ...         )
+    """
+
+    def __init__(
+        self,
+        file: File,
+        max_concurrency: int = 2,
+        executor: Union[Executor, None] = None,
+        processes: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        file : `~bapsflib._hdf.utils.file.File`
+            an opened HDF5 file
+
+        max_concurrency : `int`, optional
+            maximum number of concurrent reads of **file** (DEFAULT
+            ``2``)
+
+        executor : `~concurrent.futures.Executor`, optional
+            executor the reads are run in, a thread pool shared by all
+            `AsyncFile` instances is used by default
+
+        processes : `bool`, optional
+            `True` to run the reads in ``max_concurrency`` worker
+            processes, `False` (DEFAULT) to run them in **executor**
+        """
+        if not isinstance(file, File):
+            raise TypeError(f"Expected a bapsflib File object, got type {type(file)}.")
+        elif not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be a positive integer.")
+        elif processes and executor is not None:
+            raise ValueError("`executor` can not be given with `processes=True`.")
+
+        self._file = file
+        self._max_concurrency = max_concurrency
+        self._processes = bool(processes)
+        if self._processes:
+            # spawn (not fork) the workers so they do not inherit this
+            # process's HDF5 library state and open file handles
+            executor = ProcessPoolExecutor(
+                max_workers=max_concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=_reopen_args(file),
+            )
+        self._executor = executor
+        self._semaphore = None  # type: Union[asyncio.Semaphore, None]
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @classmethod
+    def open(
+        cls,
+        name: str,
+        file_cls: Type[File] = File,
+        max_concurrency: int = 2,
+        executor: Union[Executor, None] = None,
+        processes: bool = False,
+        **kwargs,
+    ) -> "_AsyncFileOpener":
+        """
+        Open (and map) an HDF5 file in the executor.  Can be used as
+        ``af = await AsyncFile.open(...)`` or as
+        ``async with AsyncFile.open(...) as af``.
+
+        Parameters
+        ----------
+        name : `str`
+            name (and path) of the HDF5 file
+
+        file_cls : Type[`~bapsflib._hdf.utils.file.File`], optional
+            file class used to open the file (DEFAULT
+            `~bapsflib._hdf.utils.file.File`)
+
+        max_concurrency : `int`, optional
+            maximum number of concurrent reads of the file (DEFAULT
+            ``2``)
+
+        executor : `~concurrent.futures.Executor`, optional
+            executor the reads are run in
+
+        processes : `bool`, optional
+            `True` to run the reads in worker processes (DEFAULT
+            `False`)
+
+        kwargs :
+            keywords passed on to **file_cls**
+        """
+        return _AsyncFileOpener(
+            cls, name, file_cls, max_concurrency, executor, processes, kwargs
+        )
+
+    @property
+    def executor(self) -> Executor:
+        """Executor the reads are run in."""
+        if self._executor is None:
+            return _get_default_executor()
+        return self._executor
+
+    @property
+    def file(self) -> File:
+        """The wrapped :class:`~bapsflib._hdf.utils.file.File` object."""
+        return self._file
+
+    @property
+    def max_concurrency(self) -> int:
+        """Maximum number of concurrent reads of the file."""
+        return self._max_concurrency
+
+    @property
+    def processes(self) -> bool:
+        """`True` if the reads are run in worker processes."""
+        return self._processes
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Return the semaphore limiting the concurrent reads of the file.
+        It is created on first use so it is bound to the running event
+        loop.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        """Close the HDF5 file once all running reads have finished."""
+        if self._closed:
+            return
+        self._closed = True
+
+        # take all concurrency slots so no read is running
+        semaphore = self._get_semaphore()
+        for _ in range(self._max_concurrency):
+            await semaphore.acquire()
+        try:
+            if self._processes:
+                # the worker processes close their files on exit
+                await asyncio.wrap_future(
+                    _get_default_executor().submit(self._executor.shutdown)
+                )
+                await asyncio.wrap_future(
+                    _get_default_executor().submit(self._file.close)
+                )
+            else:
+                await asyncio.wrap_future(self.executor.submit(self._file.close))
+        finally:
+            for _ in range(self._max_concurrency):
+                semaphore.release()
+
+    async def _run(self, func: Callable, *args, _on_cancel=None, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` in the executor once one of the
+        file's concurrency slots is free.  If the awaiting task is
+        cancelled while the call is running, ``_on_cancel`` (if given)
+        is called with the call's future once the call finishes.
+        """
+        if self._closed:
+            raise ValueError("The HDF5 file is closed.")
+
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        try:
+            cfuture = self.executor.submit(func, *args, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # the slot is freed when the call finishes (or is dequeued),
+        # not when the awaiting task is cancelled
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:  # pragma: no cover
+                # event loop is closed
+                pass
+
+        cfuture.add_done_callback(release)
+
+        # cancelling the wrapping future also cancels `cfuture` if it
+        # has not started yet
+        try:
+            return await asyncio.wrap_future(cfuture)
+        except asyncio.CancelledError:
+            if _on_cancel is not None:
+                cfuture.add_done_callback(_on_cancel)
+            raise
+
+    async def _read(self, method: str, *args, **kwargs):
+        """
+        Run the reader **method** of the file in the executor or, with
+        ``processes=True``, in a worker process.
+        """
+        if not self._processes:
+            return await self._run(getattr(self._file, method), *args, **kwargs)
+
+        for key in ("out", "shared_memory"):
+            if key in kwargs:
+                raise TypeError(
+                    f"Keyword `{key}` is not supported with `processes=True`."
+                )
+
+        # a running read can not be cancelled, so the result of a read
+        # whose awaiting task is cancelled is freed once it arrives
+        handle = await self._run(
+            _read_shared, method, args, kwargs, _on_cancel=_discard_read
+        )
+        return _receive(handle)
+
+    async def read_controls(self, *args, **kwargs):
+        """
+        Asynchronous version of
+        :meth:`~bapsflib._hdf.utils.file.File.read_controls`.  Takes
+        the same arguments.
+        """
+        return await self._read("read_controls", *args, **kwargs)
+
+    async def read_data(self, *args, **kwargs):
+        """
+        Asynchronous version of
+        :meth:`~bapsflib._hdf.utils.file.File.read_data`.  Takes the
+        same arguments.
+        """
+        return await self._read("read_data", *args, **kwargs)
+
+    async def read_msi(self, *args, **kwargs):
+        """
+        Asynchronous version of
+        :meth:`~bapsflib._hdf.utils.file.File.read_msi`.  Takes the same
+        arguments.
+        """
+        return await self._read("read_msi", *args, **kwargs)
+
+
+def _discard_read(cfuture: Future):
+    """Free the result of a worker-process read that is not awaited."""
+    if not cfuture.cancelled() and cfuture.exception() is None:
+        _discard(cfuture.result())
+
+
+class _AsyncFileOpener:
+    """
+    Awaitable and asynchronous context manager returned by
+    :meth:`AsyncFile.open`.
+    """
+
+    def __init__(self, cls, name, file_cls, max_concurrency, executor, processes, kwargs):
+        self._cls = cls
+        self._name = name
+        self._file_cls = file_cls
+        self._max_concurrency = max_concurrency
+        self._executor = executor
+        self._processes = processes
+        self._kwargs = kwargs
+        self._afile = None  # type: Union[AsyncFile, None]
+
+    def __await__(self):
+        return self._open().__await__()
+
+    async def __aenter__(self) -> AsyncFile:
+        self._afile = await self._open()
+        return self._afile
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._afile.close()
+
+    async def _open(self) -> AsyncFile:
+        executor = _get_default_executor() if self._executor is None else self._executor
+        call = functools.partial(self._file_cls, self._name, **self._kwargs)
+        file = await asyncio.wrap_future(executor.submit(call))
+        return self._cls(
+            file,
+            max_concurrency=self._max_concurrency,
+            executor=self._executor,
+            processes=self._processes,
+        )
@@ -0,0 +1,153 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for exporting read arrays (e.g.
+`~bapsflib._hdf.utils.hdfreaddata.HDFReadData`) to disk and re-opening
+them as memory-mapped arrays.
+"""
+__all__ = ["load_array", "save_array"]
+
+import numpy as np
+import os
+import pickle
+
+from typing import Union
+
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
+
+#: array classes that can be restored by :func:`load_array`
+_ARRAY_CLASSES = {cls.__name__: cls for cls in (HDFReadControls, HDFReadData, HDFReadMSI)}
+
+#: extension of the meta-info sidecar file
+_META_EXT = ".meta.pkl"
+
+
+def _paths(path: Union[str, os.PathLike]):
+    """Return the array file path and meta-info sidecar file path."""
+    path = os.fspath(path)
+    if not path.endswith(".npy"):
+        path += ".npy"
+    return path, path[:-4] + _META_EXT
+
+
+def save_array(path: Union[str, os.PathLike], data: np.ndarray):
+    """
+    Save a read array (:class:`~.hdfreaddata.HDFReadData`,
+    :class:`~.hdfreadcontrols.HDFReadControls`, or
+    :class:`~.hdfreadmsi.HDFReadMSI`) to disk so it can be re-opened
+    with :func:`load_array`.
+
+    The array is written as an uncompressed, C-contiguous ``.npy`` file
+    and its meta-info (the :attr:`info` dictionary) is pickled to a
+    ``.meta.pkl`` sidecar file next to it.
+
+    Parameters
+    ----------
+    path : `str`
+        path of the ``.npy`` file (the extension is added if missing)
+
+    data : `numpy.ndarray`
+        array to be saved
+
+    Examples
+    --------
+
+    >>> data = f.read_data(1, 1, add_controls=["6K Compumotor"])
+    >>> save_array("run42_b1c1.npy", data)
+    >>>
+    >>> # later
+    >>> data = load_array("run42_b1c1.npy")
+    >>> type(data)
+    bapsflib._hdf.utils.hdfreaddata.HDFReadData
+    """
+    if not isinstance(data, np.ndarray):
+        raise TypeError(f"Expected a numpy array, got type {type(data)}.")
+    elif data.dtype.hasobject:
+        raise ValueError("Arrays with object fields can not be memory-mapped.")
+
+    npy_path, meta_path = _paths(path)
+    cls_name = type(data).__name__
+    meta = {
+        "class": cls_name if cls_name in _ARRAY_CLASSES else None,
+        "_info": getattr(data, "_info", None),
+        "_plasma": getattr(data, "_plasma", None),
+    }
+
+    # write the array in chunks to avoid an extra full copy
+    # - open_memmap writes a standard .npy header
+    arr = np.lib.format.open_memmap(
+        npy_path, mode="w+", dtype=data.dtype, shape=data.shape
+    )
+    if data.ndim == 0:
+        arr[...] = data
+    else:
+        step = max(1, (64 * 1024**2) // max(1, data[:1].nbytes))
+        for start in range(0, data.shape[0], step):
+            arr[start : start + step] = data[start : start + step]
+    arr.flush()
+    del arr
+
+    with open(meta_path, "wb") as fp:
+        pickle.dump(meta, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_array(
+    path: Union[str, os.PathLike], mmap_mode: Union[str, None] = "r"
+) -> np.ndarray:
+    """
+    Re-open an array saved with :func:`save_array` as its original
+    type (e.g. :class:`~.hdfreaddata.HDFReadData`) with its meta-info
+    restored.
+
+    By default the array is memory-mapped, so only the pages that are
+    accessed are read from disk.
+
+    .. note::
+
+        The meta-info sidecar file is un-pickled, so only load files
+        from trusted sources.
+
+    Parameters
+    ----------
+    path : `str`
+        path of the ``.npy`` file (the extension is added if missing)
+
+    mmap_mode : `str`, optional
+        memory-map mode passed to `numpy.load` (``'r'`` (DEFAULT),
+        ``'r+'``, ``'c'``), or `None` to load the array into memory
+
+    Returns
+    -------
+    `numpy.ndarray`
+        the re-opened array
+    """
+    npy_path, meta_path = _paths(path)
+    data = np.load(npy_path, mmap_mode=mmap_mode, allow_pickle=False)
+
+    if not os.path.exists(meta_path):
+        return data
+
+    with open(meta_path, "rb") as fp:
+        meta = pickle.load(fp)
+
+    cls = _ARRAY_CLASSES.get(meta["class"], None)
+    if cls is None:
+        return data
+
+    obj = data.view(cls)
+    if meta["_info"] is not None:
+        obj._info = meta["_info"]
+    if meta["_plasma"] is not None:
+        obj._plasma = meta["_plasma"]
+
+    return obj
@@ -11,15 +11,36 @@
 """Module containing the main HDF5 `~bapsflib._hdf.utils.file.File` class."""
 __all__ = ["File"]
 
+import contextlib
 import h5py
+import numpy as np
 import os
+import threading
 import warnings
 
 from typing import Any, Dict, List, Tuple, Union
 
 from bapsflib._hdf.maps import HDFMap, HDFMapControls, HDFMapDigitizers, HDFMapMSI
+from bapsflib._hdf.utils.readcache import ReadCache
 from bapsflib.utils.warnings import BaPSFWarning
 
+#: serializes the changes to the (process-global) warning filters made
+#: by reads running in concurrent threads
+_warning_filter_lock = threading.RLock()
+
+
+@contextlib.contextmanager
+def _warning_filter(silent: bool):
+    """
+    Context manager that ignores (``silent=True``) or shows any
+    `BaPSFWarning` raised within it.  The filters are restored on exit,
+    and only one thread at a time can be within the context, so
+    concurrent reads do not restore each other's filters.
+    """
+    with _warning_filter_lock, warnings.catch_warnings():
+        warnings.simplefilter("ignore" if silent else "default", category=BaPSFWarning)
+        yield
+
 
 class File(h5py.File):
     """
@@ -80,6 +101,10 @@ class File(h5py.File):
         kwargs["mode"] = mode
         h5py.File.__init__(self, name, **kwargs)
 
+        # -- opt-in read result cache --
+        # (see enable_read_cache())
+        self._read_cache = None  # type: Union[None, ReadCache]
+
         # -- define device paths --
         #: Internal HDF5 path for control devices. (DEFAULT ``'/'``)
         self.CONTROL_PATH = control_path
@@ -92,10 +117,7 @@ class File(h5py.File):
         self.MSI_PATH = msi_path
 
         # -- map and build info --
-        warn_filter = "ignore" if silent else "default"
-        with warnings.catch_warnings():
-            warnings.simplefilter(warn_filter, category=BaPSFWarning)
-
+        with _warning_filter(silent):
             # create map
             self._map_file()
 
@@ -119,6 +141,56 @@ class File(h5py.File):
             msi_path=self.MSI_PATH,
         )
 
+        # cached read results are built from the previous map
+        if getattr(self, "_read_cache", None) is not None:
+            self._read_cache.clear()
+
+    def disable_read_cache(self):
+        """Disable and clear the read result cache."""
+        self._read_cache = None
+
+    def enable_read_cache(self, max_bytes: int = 256 * 1024**2):
+        """
+        Enable an in-session least-recently-used cache for the results
+        of :meth:`read_data` and :meth:`read_controls`.
+
+        Repeated reads are returned as read-only views of the cached
+        result, and reads of a subset of the shot numbers of a cached
+        read are served out of the cached result.  Re-mapping the file
+        (see :meth:`_map_file`) invalidates all cached results.  The
+        cache is only available for files opened in readonly ``'r'``
+        mode since the file contents may change in ``'r+'`` mode.
+
+        Parameters
+        ----------
+        max_bytes : `int`, optional
+            memory budget (in bytes) of the cache (DEFAULT 256 MB)
+
+        Examples
+        --------
+
+        >>> f = File('sample.hdf5')
+        >>> f.enable_read_cache(max_bytes=512 * 1024**2)
+        >>> data = f.read_data(1, 1)  # reads from file
+        >>> data = f.read_data(1, 1)  # returns cached result
+        >>> data.flags.writeable
+        False
+        """
+        if self.mode != "r":
+            raise ValueError(
+                "The read cache is only supported for files opened in "
+                "readonly 'r' mode."
+            )
+        self._read_cache = ReadCache(max_bytes)
+
+    @property
+    def read_cache(self) -> Union[None, ReadCache]:
+        """
+        The read result cache, `None` if not enabled. (see
+        :meth:`enable_read_cache`)
+        """
+        return self._read_cache
+
     @property
     def controls(self) -> HDFMapControls:
         """Dictionary of control device mappings."""
@@ -163,6 +235,8 @@ class File(h5py.File):
         shotnum=slice(None),
         intersection_set=True,
         silent=False,
+        shared_memory=False,
+        out=None,
         **kwargs
     ):
         """
@@ -181,7 +255,7 @@ class File(h5py.File):
             ``('control', 'config')`` in the list. (see
             :func:`~.helpers.condition_controls` for details)
 
-        shotnum : Union[int, list(int), slice(), numpy.array], optional
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
             HDF5 file shot number(s) indicating data entries to be
             extracted
 
@@ -197,12 +271,26 @@ class File(h5py.File):
             `False` (DEFAULT).  Set `True` to ignore any `BaPSFWarning`
              (soft-warnings)
 
+        shared_memory : `bool`, optional
+            `False` (DEFAULT).  Set `True` to allocate the returned
+            array in shared memory and return a picklable
+            `~.sharedmem.SharedArray` handle instead.
+
+        out : `numpy.ndarray`, optional
+            a pre-allocated structured array the read is written into,
+            instead of allocating a new array.  It must have the dtype
+            and at least as many entries as the read (see
+            :meth:`read_controls_spec`).  The returned array is a view of the
+            first entries of **out**, so re-using **out** overwrites
+            previously returned data.
+
         Returns
         -------
         `~.hdfreadcontrols.HDFReadControls`
             `structured numpy array
             <https://numpy.org/doc/stable/user/basics.rec.html>`_ of
-            control device data
+            control device data (or a `~.sharedmem.SharedArray` handle
+            to it if ``shared_memory=True``)
 
         Examples
         --------
@@ -242,9 +330,28 @@ class File(h5py.File):
         # to avoid cyclical imports
         from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
 
-        warn_filter = "ignore" if silent else "default"
-        with warnings.catch_warnings():
-            warnings.simplefilter(warn_filter, category=BaPSFWarning)
+        # check the read cache
+        cache_key = None
+        if (
+            self._read_cache is not None
+            and len(kwargs) == 0
+            and not shared_memory
+            and out is None
+        ):
+            cache_key = self._read_cache.build_key(
+                "read_controls", self.file_map, controls, intersection_set
+            )
+            if cache_key is not None:
+                data = self._read_cache.get(cache_key, shotnum, intersection_set)
+                if data is not None:
+                    return data
+
+        if shared_memory:
+            kwargs["shared_memory"] = True
+        if out is not None:
+            kwargs["out"] = out
+
+        with _warning_filter(silent):
             data = HDFReadControls(
                 self,
                 controls,
@@ -253,8 +360,140 @@ class File(h5py.File):
                 **kwargs
             )
 
+        if shared_memory:
+            return data._shared_array
+        elif cache_key is not None:
+            data = self._read_cache.put(cache_key, shotnum, data)
+
         return data
 
+    def read_control_configs(
+        self,
+        control: str,
+        configs=None,
+        shotnum=slice(None),
+        intersection_set=True,
+        silent=False,
+    ):
+        """
+        Reads several configurations of a control device, reading each
+        control dataset only once.  See
+        :func:`~.hdfreadcontrols.read_control_configs` for more detail.
+
+        Parameters
+        ----------
+        control : `str`
+            name of the control device
+
+        configs : Iterable, optional
+            names of the configurations to read (DEFAULT all
+            configurations)
+
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
+            HDF5 file shot number(s) indicating data entries to be
+            extracted
+
+        intersection_set : `bool`, optional
+            `True` (DEFAULT) will force the returned shot numbers of
+            each configuration to be the intersection of
+            :data:`shotnum` and the shot numbers recorded for that
+            configuration.
+
+        silent : bool, optional
+            `False` (DEFAULT).  Set `True` to ignore any `BaPSFWarning`
+             (soft-warnings)
+
+        Returns
+        -------
+        Dict[Any, ~.hdfreadcontrols.HDFReadControls]
+            dictionary of control device data keyed by configuration
+            name
+
+        Examples
+        --------
+
+        >>> # open HDF5 file
+        >>> f = File('sample.hdf5')
+        >>>
+        >>> # read all '6K Compumotor' configurations
+        >>> cdata = f.read_control_configs('6K Compumotor')
+        >>> list(cdata)
+        [2, 3]
+        """
+        # to avoid cyclical imports
+        from bapsflib._hdf.utils.hdfreadcontrols import read_control_configs
+
+        with _warning_filter(silent):
+            data = read_control_configs(
+                self,
+                control,
+                configs=configs,
+                shotnum=shotnum,
+                intersection_set=intersection_set,
+            )
+
+        return data
+
+    def read_controls_spec(
+        self,
+        controls: List[Union[str, Tuple[str, Any]]],
+        shotnum=slice(None),
+        intersection_set=True,
+        silent=False,
+        **kwargs
+    ) -> Tuple[np.dtype, Tuple[int]]:
+        """
+        The dtype and shape of the array :meth:`read_controls` returns
+        for the same arguments, e.g. to pre-allocate the ``out`` buffer
+        of repeated reads.  Only the shot numbers of the control
+        datasets are read.
+
+        Parameters
+        ----------
+        controls : List[Union[str, Tuple[str, Any]]]
+            control device(s) (see :meth:`read_controls`)
+
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
+            HDF5 file shot number(s) (see :meth:`read_controls`)
+
+        intersection_set : `bool`, optional
+            `True` (DEFAULT) for the intersection of shot numbers,
+            `False` for the union (see :meth:`read_controls`)
+
+        silent : bool, optional
+            `False` (DEFAULT).  Set `True` to ignore any `BaPSFWarning`
+             (soft-warnings)
+
+        Returns
+        -------
+        dtype : `numpy.dtype`
+            dtype of the read array
+
+        shape : Tuple[int]
+            shape of the read array
+
+        Examples
+        --------
+
+        >>> dtype, shape = f.read_controls_spec(['Waveform'])
+        >>> out = np.empty(shape, dtype=dtype)
+        >>> cdata = f.read_controls(['Waveform'], out=out)
+        """
+        # to avoid cyclical imports
+        from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+
+        with _warning_filter(silent):
+            spec = HDFReadControls(
+                self,
+                controls,
+                shotnum=shotnum,
+                intersection_set=intersection_set,
+                return_spec=True,
+                **kwargs
+            )
+
+        return spec
+
     def read_data(
         self,
         board: int,
@@ -268,6 +507,11 @@ class File(h5py.File):
         add_controls=None,
         intersection_set=True,
         silent=False,
+        shared_memory=False,
+        decimate=None,
+        decimate_method="boxcar",
+        out_dtype=None,
+        out=None,
         **kwargs
     ):
         """
@@ -286,7 +530,7 @@ class File(h5py.File):
         index : Union[int, list(int), slice(), numpy.array], optional
             dataset row index
 
-        shotnum : Union[int, list(int), slice(), numpy.array], optional
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
             HDF5 global shot number
 
         digitizer : `str`, optional
@@ -325,12 +569,48 @@ class File(h5py.File):
             `False` (DEFAULT).  Set `True` to ignore any `BaPSFWarning`
             (soft-warnings)
 
+        shared_memory : `bool`, optional
+            `False` (DEFAULT).  Set `True` to allocate the returned
+            array in shared memory and return a picklable
+            `~.sharedmem.SharedArray` handle instead.  The handle can be
+            passed to `multiprocessing` workers, which re-attach to the
+            data without copying it.
+
+        decimate : `int`, optional
+            decimate the ``'signal'`` field by this integer factor as it
+            is read (DEFAULT `None` for no decimation).  The
+            ``'sample average'`` meta-info (and, thus, ``dt``) is scaled
+            by the same factor.
+
+        decimate_method : `str`, optional
+            ``'boxcar'`` (DEFAULT) to average every ``decimate``
+            samples, ``'stride'`` to keep every ``decimate``-th sample,
+            or ``'fir'`` to apply an anti-aliasing filter before
+            striding
+
+        out_dtype : `numpy.dtype`, optional
+            floating point dtype of the ``'signal'`` field, e.g.
+            `numpy.float16` or `numpy.float64` (DEFAULT
+            `numpy.float32`).  The bit-to-voltage conversion is applied
+            block by block directly into this dtype.  Can not be used
+            with ``keep_bits=True`` (unless the bits are averaged by
+            ``decimate``).
+
+        out : `numpy.ndarray`, optional
+            a pre-allocated structured array the read is written into,
+            instead of allocating a new array.  It must have the dtype
+            and at least as many entries as the read (see
+            :meth:`read_data_spec`).  The returned array is a view of the
+            first entries of **out**, so re-using **out** overwrites
+            previously returned data.
+
         Returns
         -------
         `~.hdfreaddata.HDFReadData`
             `structured numpy array
             <https://numpy.org/doc/stable/user/basics.rec.html>`_ of
-            digitized data
+            digitized data (or a `~.sharedmem.SharedArray` handle to it
+            if ``shared_memory=True``)
 
         Examples
         --------
@@ -377,9 +657,50 @@ class File(h5py.File):
         # to avoid cyclical imports
         from bapsflib._hdf.utils.hdfreaddata import HDFReadData
 
-        warn_filter = "ignore" if silent else "default"
-        with warnings.catch_warnings():
-            warnings.simplefilter(warn_filter, category=BaPSFWarning)
+        # check the read cache
+        # - `index` overrides `shotnum`
+        cache_key = None
+        cache_shotnum = (
+            shotnum if isinstance(index, slice) and index == slice(None) else slice(None)
+        )
+        if (
+            self._read_cache is not None
+            and len(kwargs) == 0
+            and not shared_memory
+            and out is None
+        ):
+            cache_key = self._read_cache.build_key(
+                "read_data",
+                self.file_map,
+                board,
+                channel,
+                index,
+                digitizer,
+                adc,
+                config_name,
+                keep_bits,
+                add_controls,
+                intersection_set,
+                decimate,
+                decimate_method,
+                out_dtype,
+            )
+            if cache_key is not None:
+                data = self._read_cache.get(cache_key, cache_shotnum, intersection_set)
+                if data is not None:
+                    return data
+
+        if shared_memory:
+            kwargs["shared_memory"] = True
+        if decimate is not None:
+            kwargs["decimate"] = decimate
+            kwargs["decimate_method"] = decimate_method
+        if out_dtype is not None:
+            kwargs["out_dtype"] = out_dtype
+        if out is not None:
+            kwargs["out"] = out
+
+        with _warning_filter(silent):
             data = HDFReadData(
                 self,
                 board,
@@ -395,8 +716,84 @@ class File(h5py.File):
                 **kwargs
             )
 
+        if shared_memory:
+            return data._shared_array
+        elif cache_key is not None:
+            data = self._read_cache.put(cache_key, cache_shotnum, data)
+
         return data
 
+    def read_data_spec(
+        self,
+        board: int,
+        channel: int,
+        index=slice(None),
+        shotnum=slice(None),
+        digitizer=None,
+        adc=None,
+        config_name=None,
+        keep_bits=False,
+        add_controls=None,
+        intersection_set=True,
+        silent=False,
+        decimate=None,
+        decimate_method="boxcar",
+        out_dtype=None,
+        **kwargs
+    ) -> Tuple[np.dtype, Tuple[int]]:
+        """
+        The dtype and shape of the array :meth:`read_data` returns for
+        the same arguments, e.g. to pre-allocate the ``out`` buffer of
+        repeated reads.  The digitizer signals and control device data
+        are not read, only the shot numbers of the digitizer and
+        control datasets are looked up.  See :meth:`read_data` for a
+        description of the parameters.
+
+        Returns
+        -------
+        dtype : `numpy.dtype`
+            dtype of the read array
+
+        shape : Tuple[int]
+            shape of the read array
+
+        Examples
+        --------
+
+        >>> # pre-allocate a ring of buffers for repeated reads
+        >>> dtype, shape = f.read_data_spec(1, 1, shotnum=[1, 2])
+        >>> ring = [np.empty(shape, dtype=dtype) for _ in range(3)]
+        >>> for ii in range(100):
+        ...     data = f.read_data(1, 1, shotnum=[1, 2], out=ring[ii % 3])
+        """
+        # to avoid cyclical imports
+        from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+
+        if decimate is not None:
+            kwargs["decimate"] = decimate
+            kwargs["decimate_method"] = decimate_method
+        if out_dtype is not None:
+            kwargs["out_dtype"] = out_dtype
+
+        with _warning_filter(silent):
+            spec = HDFReadData(
+                self,
+                board,
+                channel,
+                index=index,
+                shotnum=shotnum,
+                digitizer=digitizer,
+                adc=adc,
+                config_name=config_name,
+                keep_bits=keep_bits,
+                add_controls=add_controls,
+                intersection_set=intersection_set,
+                return_spec=True,
+                **kwargs
+            )
+
+        return spec
+
     def read_msi(self, msi_diag: str, silent=False, **kwargs):
         """
         Reads data from MSI Diagnostic datasets.  See
@@ -435,9 +832,96 @@ class File(h5py.File):
         """
         from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
 
-        warn_filter = "ignore" if silent else "default"
-        with warnings.catch_warnings():
-            warnings.simplefilter(warn_filter, category=BaPSFWarning)
+        with _warning_filter(silent):
             data = HDFReadMSI(self, msi_diag, **kwargs)
 
         return data
+
+    def shot_reader(
+        self,
+        board: int,
+        channel: int,
+        digitizer=None,
+        adc=None,
+        config_name=None,
+        keep_bits=False,
+        add_controls=None,
+        out_dtype=None,
+        silent=False,
+    ):
+        """
+        Create a reader of individual shots of a digitizer channel.
+        Everything except the shot numbers is bound when the reader is
+        created, so repeated reads of one (or a few) shots (e.g. for a
+        live display) are much faster than :meth:`read_data`.  See
+        :class:`~.shotreader.ShotReader` for more detail.
+
+        Parameters
+        ----------
+        board : `int`
+            digitizer board number
+
+        channel : `int`
+            digitizer channel number
+
+        digitizer : `str`, optional
+            name of digitizer
+
+        adc : `str`, optional
+            name of the digitizer's analog-digital converter
+
+        config_name : `str`, optional
+            name of digitizer configuration
+
+        keep_bits : `bool`, optional
+            `True` to keep digitizer signal in bits, `False` (default)
+            to convert digitizer signal to voltage
+
+        add_controls : List[Union[str, Tuple[str, Any]]], optional
+            A list of strings and/or 2-element tuples indicating the
+            control device(s) (see :meth:`read_data`)
+
+        out_dtype : `numpy.dtype`, optional
+            floating point dtype of the ``'signal'`` field (see
+            :meth:`read_data`)
+
+        silent : `bool`, optional
+            `False` (DEFAULT).  Set `True` to ignore any `BaPSFWarning`
+            (soft-warnings)
+
+        Returns
+        -------
+        `~.shotreader.ShotReader`
+            the shot reader
+
+        Examples
+        --------
+
+        >>> # open HDF5 file
+        >>> f = File('sample.hdf5')
+        >>>
+        >>> # bind the reader once
+        >>> reader = f.shot_reader(0, 0, add_controls=['6K Compumotor'])
+        >>>
+        >>> # read the most recent shot
+        >>> data = reader.latest()
+        >>> type(data)
+        bapsflib._hdf.utils.hdfreaddata.HDFReadData
+        """
+        # to avoid cyclical imports
+        from bapsflib._hdf.utils.shotreader import ShotReader
+
+        with _warning_filter(silent):
+            reader = ShotReader(
+                self,
+                board,
+                channel,
+                digitizer=digitizer,
+                adc=adc,
+                config_name=config_name,
+                keep_bits=keep_bits,
+                add_controls=add_controls,
+                out_dtype=out_dtype,
+            )
+
+        return reader
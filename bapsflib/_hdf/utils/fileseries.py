@@ -0,0 +1,547 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing `~bapsflib._hdf.utils.fileseries.FileSeries`, a view
+of several HDF5 files of a run series with a single shot number axis.
+"""
+__all__ = ["FileSeries"]
+
+import copy
+import multiprocessing
+import numpy as np
+import os
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple, Type, Union
+
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.helpers import condition_shotnum
+from bapsflib._hdf.utils.prefetch import (
+    _discard,
+    _read_shared,
+    _receive,
+    _reopen_args,
+)
+from bapsflib._hdf.utils.sharedmem import SharedArray
+from bapsflib.utils.warnings import BaPSFWarning
+
+#: HDF5 files opened by a series worker process, keyed by their
+#: re-open arguments
+_worker_files = {}  # type: Dict[Tuple, File]
+
+
+def _read_file(reopen_args: Tuple, method: str, args: tuple, kwargs) -> SharedArray:
+    """
+    Call the reader **method** of a series file in a worker process
+    (opening the file on first use) and hand the ownership of the
+    result (in shared memory) to the calling process.
+    """
+    file_cls, name, file_kwargs = reopen_args
+    key = (file_cls, name, tuple(sorted(file_kwargs.items())))
+    if key not in _worker_files:
+        _worker_files[key] = file_cls(name, **file_kwargs)
+    return _read_shared(method, args, kwargs, file=_worker_files[key])
+
+
+def _config_signature(file: File) -> Dict[str, Any]:
+    """
+    Build a comparable summary of the digitizer, control device, and
+    MSI configurations mapped for **file**.
+    """
+    digis = {}
+    for digi_name, _dmap in file.digitizers.items():
+        configs = {}
+        for config_name in _dmap.active_configs:
+            config = _dmap.configs[config_name]
+            configs[config_name] = {
+                adc: [
+                    (
+                        brd,
+                        tuple(chs),
+                        tuple(
+                            (key, str(val))
+                            for key, val in sorted(setup.items())
+                            if key != "nshotnum"
+                        ),
+                    )
+                    for brd, chs, setup in config[adc]
+                ]
+                for adc in config["adc"]
+            }
+        digis[digi_name] = configs
+
+    controls = {
+        name: sorted(_cmap.configs.keys()) for name, _cmap in file.controls.items()
+    }
+
+    return {
+        "digitizers": digis,
+        "controls": controls,
+        "msi": sorted(file.msi.keys()),
+    }
+
+
+def _shotnum_range(file: File) -> Tuple[int, int]:
+    """
+    Return the smallest and largest shot number recorded in the
+    digitizer and control device datasets of **file**.
+    """
+    first = []
+    last = []
+    for _dmap in file.digitizers.values():
+        dpath = _dmap.info["group path"]
+        for config_name in _dmap.active_configs:
+            config = _dmap.configs[config_name]
+            sn_field = config["shotnum"]["dset field"][0]
+            for adc in config["adc"]:
+                for brd, chs, _ in config[adc]:
+                    for ch in chs:
+                        with warnings.catch_warnings():
+                            warnings.simplefilter("ignore", category=BaPSFWarning)
+                            hname = _dmap.construct_header_dataset_name(
+                                brd, ch, config_name=config_name, adc=adc
+                            )
+                        sn = file[f"{dpath}/{hname}"][sn_field]
+                        if sn.size != 0:
+                            first.append(sn.min())
+                            last.append(sn.max())
+    for _cmap in file.controls.values():
+        for config in _cmap.configs.values():
+            sn_field = config["shotnum"]["dset field"][0]
+            for path in config["shotnum"]["dset paths"]:
+                sn = file[path][sn_field]
+                if sn.size != 0:
+                    first.append(sn.min())
+                    last.append(sn.max())
+
+    if len(last) == 0:
+        raise ValueError(f"File '{file.filename}' does not record any shot numbers.")
+    return int(min(first)), int(max(last))
+
+
+def _concatenate(parts: List[np.ndarray], offsets: List[int]) -> np.ndarray:
+    """
+    Concatenate the read arrays **parts** and shift their ``'shotnum'``
+    field by **offsets**.
+    """
+    data = np.concatenate(parts).view(type(parts[0]))
+    for attr in ("_info", "_plasma"):
+        if hasattr(parts[0], attr):
+            setattr(data, attr, copy.deepcopy(getattr(parts[0], attr)))
+
+    start = 0
+    for part, offset in zip(parts, offsets):
+        data["shotnum"][start : start + part.shape[0]] += offset
+        start += part.shape[0]
+
+    if hasattr(data, "_info"):
+        data._info["source files"] = tuple(
+            part.info["source file"] for part in parts if "source file" in part.info
+        )
+
+    return data
+
+
+class FileSeries:
+    """
+    A view of the HDF5 files of a run series that share the same
+    digitizer, control device, and MSI configurations, with a single
+    (global) shot number axis.
+
+    Each file's shot numbers are shifted by a per-file offset, so the
+    global shot number of file ``ii`` is its HDF5 shot number plus
+    ``offsets[ii]``.  By default, the offsets put the files back to
+    back in the given order.  Read calls are routed to the files
+    recording the requested (global) shot numbers, and the results are
+    concatenated.
+
+    By default the routed files are read one after the other.  With
+    ``n_workers > 1``, a read routed to several files reads them in
+    parallel worker processes (:mod:`h5py` serializes all HDF5 calls of
+    a process, so threads would not help).  The workers open their own
+    handles to the files (with the same file class and device paths)
+    and hand the results back through shared memory (see
+    `~bapsflib._hdf.utils.sharedmem.SharedArray`).  The files must be
+    on disk and readable by other processes, and the workers are
+    started on the first parallel read (about a couple of seconds), so
+    this pays off for large reads on multi-core machines.
+
+    Examples
+    --------
+
+    >>> fs = FileSeries(['run1.hdf5', 'run2.hdf5'])
+    >>> fs.offsets
+    [0, 1000]
+    >>> data = fs.read_data(1, 1, shotnum=slice(990, 1011),
+    ...                     add_controls=['6K Compumotor'])
+    >>> fs.close()
+    >>>
+    >>> # read the files in parallel
+    >>> with FileSeries(names, n_workers=4) as fs:
+    ...     data = fs.read_data(1, 1)
+    """
+
+    def __init__(
+        self,
+        files: Sequence[Union[str, os.PathLike, File]],
+        file_cls: Type[File] = File,
+        file_kwargs: Union[Dict[str, Any], None] = None,
+        offsets: Union[Sequence[int], None] = None,
+        n_workers: int = 1,
+    ):
+        """
+        Parameters
+        ----------
+        files : List[Union[str, `~bapsflib._hdf.utils.file.File`]]
+            names of the HDF5 files (or opened files) of the series, in
+            order
+
+        file_cls : Type[`~bapsflib._hdf.utils.file.File`], optional
+            file class used to open the named files (DEFAULT
+            `~bapsflib._hdf.utils.file.File`)
+
+        file_kwargs : `dict`, optional
+            keywords passed on to **file_cls** when opening the named
+            files
+
+        offsets : List[int], optional
+            shot number offset of each file, by default the offset of a
+            file is the offset plus the largest shot number of the
+            previous file
+
+        n_workers : `int`, optional
+            maximum number of worker processes reading the files in
+            parallel, ``1`` (DEFAULT) reads the files one after the
+            other in this process
+        """
+        if len(files) == 0:
+            raise ValueError("A file series needs at least one file.")
+        elif (
+            isinstance(n_workers, bool)
+            or not isinstance(n_workers, (int, np.integer))
+            or n_workers < 1
+        ):
+            raise ValueError("`n_workers` must be a positive integer.")
+        if file_kwargs is None:
+            file_kwargs = {}
+
+        self._n_workers = int(n_workers)
+        self._executor = None  # type: Union[ProcessPoolExecutor, None]
+
+        # open files
+        self._files = []  # type: List[File]
+        self._owned = []  # type: List[File]
+        try:
+            for file in files:
+                if isinstance(file, File):
+                    self._files.append(file)
+                elif isinstance(file, (str, os.PathLike)):
+                    file = file_cls(os.fspath(file), **file_kwargs)
+                    self._owned.append(file)
+                    self._files.append(file)
+                else:
+                    raise TypeError(
+                        f"Expected a file name or bapsflib File object, got type "
+                        f"{type(file)}."
+                    )
+
+            self._validate()
+            self._ranges = [_shotnum_range(file) for file in self._files]
+            self._offsets = self._build_offsets(offsets)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._files)
+
+    @property
+    def files(self) -> List[File]:
+        """The files of the series."""
+        return list(self._files)
+
+    @property
+    def n_workers(self) -> int:
+        """Maximum number of worker processes reading the files."""
+        return self._n_workers
+
+    @property
+    def offsets(self) -> List[int]:
+        """The shot number offset of each file."""
+        return list(self._offsets)
+
+    @property
+    def shot_ranges(self) -> List[Tuple[int, int]]:
+        """
+        The smallest and largest global shot number recorded in each
+        file.
+        """
+        return [
+            (first + offset, last + offset)
+            for (first, last), offset in zip(self._ranges, self._offsets)
+        ]
+
+    def close(self):
+        """Close the files opened by the series (and its workers)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for file in self._owned:
+            file.close()
+        self._owned = []
+
+    def locate(self, shotnum, intersection_set: bool = True) -> Dict[int, np.ndarray]:
+        """
+        Find the files recording the global shot number(s) **shotnum**.
+
+        Parameters
+        ----------
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet]
+            global shot number(s)
+
+        intersection_set : `bool`, optional
+            `True` (DEFAULT) to only locate the shot numbers within the
+            shot number range of a file.  `False` to also assign the
+            shot numbers between (or after) the files' ranges to the
+            preceding file (and those before the series to the first
+            file), so a union read of the files returns them as
+            NULL-filled rows.
+
+        Returns
+        -------
+        Dict[int, `numpy.ndarray`]
+            dictionary mapping the index of a file in the series to its
+            (file) shot numbers of the requested shot numbers
+        """
+        shotnum = self._condition_shotnum(shotnum)
+
+        # index of the file each shot number falls in (or after)
+        firsts = [first for first, _ in self.shot_ranges]
+        owner = np.searchsorted(firsts, shotnum, side="right") - 1
+        owner[owner < 0] = 0
+
+        located = {}
+        for ii, ((first, last), offset) in enumerate(zip(self._ranges, self._offsets)):
+            local = shotnum - offset
+            if intersection_set:
+                local = local[(local >= first) & (local <= last)]
+            else:
+                local = local[(owner == ii) & (local > 0)]
+            if local.size != 0:
+                located[ii] = local.astype(np.uint32)
+        return located
+
+    def read_controls(
+        self, controls: List[Union[str, Tuple[str, Any]]], shotnum=slice(None), **kwargs
+    ):
+        """
+        Read control device data of the series, see
+        :meth:`~bapsflib._hdf.utils.file.File.read_controls`.
+
+        Parameters
+        ----------
+        controls : List[Union[str, Tuple[str, Any]]]
+            the control device(s) to read
+
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
+            global shot number(s) to read (DEFAULT all shot numbers)
+
+        kwargs :
+            keywords passed on to
+            :meth:`~bapsflib._hdf.utils.file.File.read_controls`
+        """
+        return self._read("read_controls", (controls,), shotnum, kwargs)
+
+    def read_data(self, board: int, channel: int, shotnum=slice(None), **kwargs):
+        """
+        Read digitizer data of the series, see
+        :meth:`~bapsflib._hdf.utils.file.File.read_data`.
+
+        Parameters
+        ----------
+        board : `int`
+            analog-digital-converter board number
+
+        channel : `int`
+            analog-digital-converter channel number
+
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
+            global shot number(s) to read (DEFAULT all shot numbers)
+
+        kwargs :
+            keywords passed on to
+            :meth:`~bapsflib._hdf.utils.file.File.read_data`
+        """
+        return self._read("read_data", (board, channel), shotnum, kwargs)
+
+    def read_msi(self, msi_diag: str, shotnum=slice(None), **kwargs):
+        """
+        Read MSI diagnostic data of the series, see
+        :meth:`~bapsflib._hdf.utils.file.File.read_msi`.
+
+        Parameters
+        ----------
+        msi_diag : `str`
+            name of MSI diagnostic
+
+        shotnum : Union[int, list(int), slice(), numpy.array, ShotSet], optional
+            global shot number(s) to read, only the files recording
+            them are read (DEFAULT all shot numbers of all files)
+
+        kwargs :
+            keywords passed on to
+            :meth:`~bapsflib._hdf.utils.file.File.read_msi`
+        """
+        if isinstance(shotnum, slice) and shotnum == slice(None):
+            located = {ii: None for ii in range(len(self._files))}
+        else:
+            located = self.locate(shotnum)
+            if len(located) == 0:
+                raise ValueError(
+                    "None of the requested shot numbers are recorded in the series."
+                )
+
+        order = sorted(located)
+        parts = self._read_files("read_msi", (msi_diag,), order, [kwargs] * len(order))
+        for jj, ii in enumerate(order):
+            if located[ii] is not None:
+                parts[jj] = parts[jj][np.isin(parts[jj]["shotnum"], located[ii])]
+        return _concatenate(parts, [self._offsets[ii] for ii in order])
+
+    def _build_offsets(self, offsets: Union[Sequence[int], None]) -> List[int]:
+        """Build (or validate) the per-file shot number offsets."""
+        if offsets is None:
+            offsets = [0]
+            for _, last in self._ranges[:-1]:
+                offsets.append(offsets[-1] + last)
+        elif len(offsets) != len(self._files):
+            raise ValueError(f"Got {len(offsets)} offsets for {len(self._files)} files.")
+        offsets = [int(offset) for offset in offsets]
+
+        # global shot number ranges must not overlap
+        for ii in range(1, len(offsets)):
+            if (
+                self._ranges[ii][0] + offsets[ii]
+                <= self._ranges[ii - 1][1] + offsets[ii - 1]
+            ):
+                raise ValueError(
+                    f"Global shot numbers of file '{self._files[ii].filename}' "
+                    f"overlap with the previous file, check `offsets`."
+                )
+        return offsets
+
+    def _validate(self):
+        """
+        Ensure all files of the series have the same mapped
+        configurations as the first file.
+        """
+        ref = _config_signature(self._files[0])
+        for file in self._files[1:]:
+            sig = _config_signature(file)
+            for key in ("digitizers", "controls", "msi"):
+                if sig[key] != ref[key]:
+                    raise ValueError(
+                        f"The {key} configurations of file '{file.filename}' do not "
+                        f"match those of file '{self._files[0].filename}'."
+                    )
+
+    def _condition_shotnum(self, shotnum) -> np.ndarray:
+        """Condition the global shot number(s) **shotnum**."""
+        if isinstance(shotnum, slice):
+            last = self.shot_ranges[-1][1]
+            if shotnum.stop is not None:
+                last = max(last, shotnum.stop - 1)
+            shotnum = np.arange(*shotnum.indices(last + 1), dtype=np.int64)
+            shotnum = shotnum[shotnum > 0]
+            if shotnum.size == 0:
+                raise ValueError(
+                    "Valid `shotnum` not passed. Resulting array would be NULL"
+                )
+            return shotnum
+
+        return condition_shotnum(shotnum, {}, {}).astype(np.int64)
+
+    def _read(self, method: str, args: tuple, shotnum, kwargs: Dict[str, Any]):
+        """
+        Route the read **method** to the files recording **shotnum**
+        and concatenate the results.
+        """
+        if kwargs.get("shared_memory", False):
+            raise TypeError("Keyword `shared_memory` is not supported.")
+
+        if isinstance(shotnum, slice) and shotnum == slice(None):
+            located = {ii: slice(None) for ii in range(len(self._files))}
+        else:
+            located = self.locate(
+                shotnum, intersection_set=kwargs.get("intersection_set", True)
+            )
+            if len(located) == 0:
+                raise ValueError(
+                    "None of the requested shot numbers are recorded in the series."
+                )
+
+        order = sorted(located)
+        parts = self._read_files(
+            method, args, order, [{**kwargs, "shotnum": located[ii]} for ii in order]
+        )
+        offsets = [self._offsets[ii] for ii in order]
+        return _concatenate(parts, offsets)
+
+    def _read_files(
+        self, method: str, args: tuple, order: List[int], kwargs: List[Dict[str, Any]]
+    ) -> List[np.ndarray]:
+        """
+        Call the reader **method** of the files **order** (with their
+        keywords **kwargs**), in parallel worker processes if the
+        series has ``n_workers > 1``.
+        """
+        if self._n_workers == 1 or len(order) == 1:
+            return [
+                getattr(self._files[ii], method)(*args, **file_kwargs)
+                for ii, file_kwargs in zip(order, kwargs)
+            ]
+
+        if "out" in kwargs[0]:
+            raise TypeError("Keyword `out` is not supported with `n_workers > 1`.")
+
+        if self._executor is None:
+            # spawn (not fork) the workers so they do not inherit this
+            # process's HDF5 library state and open file handles
+            self._executor = ProcessPoolExecutor(
+                max_workers=min(self._n_workers, len(self._files)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        futures = [
+            self._executor.submit(
+                _read_file, _reopen_args(self._files[ii]), method, args, file_kwargs
+            )
+            for ii, file_kwargs in zip(order, kwargs)
+        ]
+
+        parts = []
+        try:
+            for future in futures:
+                parts.append(_receive(future.result()))
+        except BaseException:
+            # free the results that will not be received
+            for future in futures[len(parts) + 1 :]:
+                future.cancel()
+                if not future.cancelled() and future.exception() is None:
+                    _discard(future.result())
+            raise
+        return parts
@@ -12,9 +12,8 @@
 Module containing the main
 `~bapsflib._hdf.utils.hdfreadcontrols.HDFReadControls` class.
 """
-__all__ = ["HDFReadControls"]
+__all__ = ["HDFReadControls", "read_control_configs"]
 
-import copy
 import h5py
 import numpy as np
 import os
@@ -32,9 +31,13 @@ from bapsflib._hdf.utils.file import File
 from bapsflib._hdf.utils.helpers import (
     build_shotnum_dset_relation,
     condition_controls,
+    condition_out,
     condition_shotnum,
     do_shotnum_intersection,
+    do_shotnum_union,
 )
+from bapsflib._hdf.utils.sharedmem import SharedArray
+from bapsflib.utils.frozen import CopyOnWriteDict
 from bapsflib.utils.warnings import BaPSFWarning, HDFMappingWarning
 
 # define type aliases
@@ -109,6 +112,7 @@ class HDFReadControls(np.ndarray):
         controls: ControlsType,
         shotnum=slice(None),
         intersection_set=True,
+        fill_missing=True,
         **kwargs,
     ):
         """
@@ -121,7 +125,7 @@ class HDFReadControls(np.ndarray):
             a list indicating the desired control device names and their
             configuration name (if more than one configuration exists)
 
-        shotnum : Union[int, List[int], slice, numpy.ndarray], optional
+        shotnum : Union[int, List[int], slice, numpy.ndarray, ShotSet], optional
             HDF5 file shot number(s) indicating data entries to be extracted
 
         intersection_set : `bool`, optional
@@ -130,6 +134,17 @@ class HDFReadControls(np.ndarray):
             contained in each control device dataset. `False` will
             return the union instead of the intersection
 
+        fill_missing : `bool`, optional
+            `True` (DEFAULT) will give entries of shot numbers not
+            recorded in a control dataset a NULL value (see Notes).
+            `False` skips this fill for union reads
+            (``intersection_set=False``): only the shot numbers
+            recorded in at least one control dataset are returned,
+            entries missing in a dataset are left zeroed, and a
+            boolean ``'valid'`` field of shape ``(len(controls),)``
+            flags which control datasets recorded each shot number
+            (see ``info['valid sources']``)
+
         Notes
         -----
         Behavior of :data:`shotnum` and :data:`intersection_set`:
@@ -156,6 +171,30 @@ class HDFReadControls(np.ndarray):
         else:
             timeit = False
 
+        # allocate the output array in shared memory
+        # (see File.read_data() and File.read_controls())
+        shared_memory = kwargs.get("shared_memory", False)
+
+        # fill a caller-supplied output buffer
+        # (see File.read_data(), File.read_controls(), and
+        # condition_out())
+        out = kwargs.get("out", None)
+        if out is not None and shared_memory:
+            raise ValueError("`out` and `shared_memory` can not be used together.")
+
+        # only determine the dtype and shape of the read
+        # (see File.read_data_spec() and File.read_controls_spec())
+        # - with spec_shotnum=True the shot numbers of the read are
+        #   returned instead of its shape (see HDFReadData)
+        return_spec = kwargs.get("return_spec", False)
+        spec_shotnum = kwargs.get("spec_shotnum", False)
+
+        # control dataset rows already read into memory
+        # (see read_control_configs())
+        # - dict keyed by control name with values (start, rows), where
+        #   rows[ii] is row start + ii of the control dataset
+        dset_rows = kwargs.get("dset_rows", {})  # type: Dict[str, Tuple[int, np.ndarray]]
+
         # ---- Condition `hdf_file`                                 ----
         # - `hdf_file` is a lapd.File object
         #
@@ -284,10 +323,17 @@ class HDFReadControls(np.ndarray):
 
         # re-filter `index`, `shotnum`, and `sni` if intersection_set
         # requested
+        # - union reads without NULL fills only keep the shot numbers
+        #   recorded in at least one control dataset
+        compact = not intersection_set and not fill_missing
         if intersection_set:
             shotnum, sni_dict, index_dict = do_shotnum_intersection(
                 shotnum, sni_dict, index_dict
             )
+        elif compact:
+            shotnum, sni_dict, index_dict = do_shotnum_union(
+                shotnum, sni_dict, index_dict
+            )
 
         # print execution timing
         if timeit:  # pragma: no cover
@@ -319,8 +365,26 @@ class HDFReadControls(np.ndarray):
             tt.append(time.time())
             print(f"tt - define dtype: {(tt[-1] - tt[-2]) * 1.0e3} ms")
 
+        # add validity mask field
+        # - valid[:, ii] flags the shot numbers recorded in the dataset
+        #   of the ii-th control
+        if compact:
+            dtype.append(("valid", bool, (len(controls),)))
+
         # Initialize Control Data
-        data = np.empty(shape, dtype=dtype)
+        # - for compact reads, entries of missing shot numbers are
+        #   never written, so the array is zero allocated
+        if return_spec:
+            return np.dtype(dtype), (shotnum if spec_shotnum else shape)
+        elif shared_memory:
+            shared_array = SharedArray(shape, dtype)
+            data = shared_array.asarray()
+        elif out is not None:
+            shared_array = None
+            data = condition_out(out, shape, dtype, zeroed=compact)
+        else:
+            shared_array = None
+            data = np.zeros(shape, dtype) if compact else np.empty(shape, dtype=dtype)
         data["shotnum"] = shotnum
 
         # print execution timing
@@ -328,173 +392,202 @@ class HDFReadControls(np.ndarray):
             tt.append(time.time())
             print(f"tt - initialize data np.ndarray: {(tt[-1] - tt[-2]) * 1.0e3} ms")
 
-        # Assign Control Data to Numpy array
-        for control in controls:
-            # control name (cname) and configuration name (cconfn)
-            cname = control[0]
-            cconfn = control[1]
-
-            # get control dataset
-            cmap = _fmap.controls[cname]
-            cconfig = cmap.configs[cconfn]
-            cdset = cdset_dict[cname]
-            sni = sni_dict[cname]
-            index = index_dict[cname].tolist()  # type: List
-
-            # populate control data array
-            # 1. scan over numpy fields
-            # 2. scan over the dset fields that will fill the numpy
-            #    fields
-            # 3. split between a command list fill or a direct fill
-            # 4. NaN fill if intersection_set = False
-            #
-            for nf_name, fconfig in cconfig["state values"].items():
-                # nf_name = the numpy field name
-                # fconfig = the mapping dictionary for nf_name
+        # fill data array
+        # - a shared memory segment is released if the fill fails,
+        #   otherwise it stays linked until the interpreter exits
+        try:
+            # Assign Control Data to Numpy array
+            for ii_control, control in enumerate(controls):
+                # control name (cname) and configuration name (cconfn)
+                cname = control[0]
+                cconfn = control[1]
+
+                # get control dataset
+                cmap = _fmap.controls[cname]
+                cconfig = cmap.configs[cconfn]
+                cdset = cdset_dict[cname]
+                sni = sni_dict[cname]
+                index = index_dict[cname]
+
+                # read rows with a (strided) hyperslab whenever `index` is
+                # a regular stride, e.g. the rows of one configuration in
+                # a dataset recording multiple configurations
+                if cname in dset_rows:
+                    start, rows = dset_rows[cname]
+                    rsel = _index_selection(index - start)
+
+                    def read_field(df_name):
+                        return rows[df_name][rsel]
+
+                else:
+                    rsel = _index_selection(index)
+
+                    def read_field(df_name):
+                        return cdset[rsel, df_name]
+
+                # populate control data array
+                # 1. scan over numpy fields
+                # 2. scan over the dset fields that will fill the numpy
+                #    fields
+                # 3. split between a command list fill or a direct fill
+                # 4. NaN fill if intersection_set = False
                 #
-                for npi, df_name in enumerate(fconfig["dset field"]):
-                    # df_name
-                    #   the dset field name that will fill the numpy
-                    #   field
-                    # npi
-                    #   the index of the numpy array corresponding to
-                    #   nf_name that df_name will fill
+                for nf_name, fconfig in cconfig["state values"].items():
+                    # nf_name = the numpy field name
+                    # fconfig = the mapping dictionary for nf_name
                     #
-                    # assign data
-                    if cmap.has_command_list:
-                        # command list fill
-                        # get command list
-                        cl = fconfig["command list"]
-
-                        # retrieve the array of command indices
-                        ci_arr = cdset[index, df_name]
-
-                        # assign command values to data
-                        for ci, command in enumerate(cl):
-                            # Order of operations
-                            # 1. find where command index (ci) is in the
-                            #    command index array (ci_arr)
-                            # 2. construct a new sni for ci
-                            # 3. fill data
-                            #
-                            # find where ci is in ci_arr
-                            ii = np.where(ci_arr == ci, True, False)
-
-                            # construct new sni
-                            sni_for_ci = np.zeros(sni.shape, dtype=bool)
-                            sni_for_ci[np.where(sni)[0][ii]] = True
-
-                            # assign values
-                            data[nf_name][sni_for_ci] = command
-                    else:
-                        # direct fill (NO command list)
-                        try:
-                            arr = cdset[index, df_name]
-                        except ValueError as err:
-                            mlist = [1] + list(data.dtype[nf_name].shape)
-                            size = reduce(lambda x, y: x * y, mlist)
-                            dtype = data.dtype[nf_name].base
-                            if df_name == "":
-                                # a mapping module gives an empty string
-                                # '' when the dataset does not have a
-                                # necessary field but you want the read
-                                # out to still function
-                                # - e.g. 'xyz' but the dataset only
-                                #   contains values of 'x' and 'z'
-                                #   (the NI_XZ module)
+                    for npi, df_name in enumerate(fconfig["dset field"]):
+                        # df_name
+                        #   the dset field name that will fill the numpy
+                        #   field
+                        # npi
+                        #   the index of the numpy array corresponding to
+                        #   nf_name that df_name will fill
+                        #
+                        # assign data
+                        if cmap.has_command_list:
+                            # command list fill
+                            # get command list
+                            cl = fconfig["command list"]
+
+                            # retrieve the array of command indices
+                            ci_arr = read_field(df_name)
+
+                            # assign command values to data
+                            for ci, command in enumerate(cl):
+                                # Order of operations
+                                # 1. find where command index (ci) is in the
+                                #    command index array (ci_arr)
+                                # 2. construct a new sni for ci
+                                # 3. fill data
                                 #
-                                # create zero array
-                                arr = np.zeros((len(index),), dtype=dtype)
-                            elif size > 1:
-                                # expected field df_name is missing but
-                                # belongs to an array
-                                warn(
-                                    f"Dataset missing field '{df_name}', applying "
-                                    f"NaN fill to to data array",
-                                    HDFMappingWarning,
-                                )
-                                arr = np.zeros((len(index),), dtype=dtype)
-
-                                # NaN fill
-                                if np.issubdtype(dtype, np.signedinteger):
-                                    # any signed-integer
-                                    # unsigned has a 0 fill
-                                    arr[:] = -99999
-                                elif np.issubdtype(dtype, np.floating):
-                                    # any float type
-                                    arr[:] = np.nan
-                                elif np.issubdtype(dtype, np.flexible):
-                                    # string, unicode, void
-                                    # np.zero satisfies this
-                                    pass
-                                else:  # pragma: no cover
-                                    # no real NaN concept exists
-                                    # - this shouldn't happen though
+                                # find where ci is in ci_arr
+                                ii = np.where(ci_arr == ci, True, False)
+
+                                # construct new sni
+                                sni_for_ci = np.zeros(sni.shape, dtype=bool)
+                                sni_for_ci[np.where(sni)[0][ii]] = True
+
+                                # assign values
+                                data[nf_name][sni_for_ci] = command
+                        else:
+                            # direct fill (NO command list)
+                            try:
+                                arr = read_field(df_name)
+                            except ValueError as err:
+                                mlist = [1] + list(data.dtype[nf_name].shape)
+                                size = reduce(lambda x, y: x * y, mlist)
+                                dtype = data.dtype[nf_name].base
+                                if df_name == "":
+                                    # a mapping module gives an empty string
+                                    # '' when the dataset does not have a
+                                    # necessary field but you want the read
+                                    # out to still function
+                                    # - e.g. 'xyz' but the dataset only
+                                    #   contains values of 'x' and 'z'
+                                    #   (the NI_XZ module)
+                                    #
+                                    # create zero array
+                                    arr = np.zeros((index.size,), dtype=dtype)
+                                elif size > 1:
+                                    # expected field df_name is missing but
+                                    # belongs to an array
                                     warn(
-                                        f"dtype ({dtype}) of {nf_name} has no NaN "
-                                        f"concept...no NaN fill done",
-                                        BaPSFWarning,
+                                        f"Dataset missing field '{df_name}', applying "
+                                        f"NaN fill to to data array",
+                                        HDFMappingWarning,
                                     )
+                                    arr = np.zeros((index.size,), dtype=dtype)
+
+                                    # NaN fill
+                                    if np.issubdtype(dtype, np.signedinteger):
+                                        # any signed-integer
+                                        # unsigned has a 0 fill
+                                        arr[:] = -99999
+                                    elif np.issubdtype(dtype, np.floating):
+                                        # any float type
+                                        arr[:] = np.nan
+                                    elif np.issubdtype(dtype, np.flexible):
+                                        # string, unicode, void
+                                        # np.zero satisfies this
+                                        pass
+                                    else:  # pragma: no cover
+                                        # no real NaN concept exists
+                                        # - this shouldn't happen though
+                                        warn(
+                                            f"dtype ({dtype}) of {nf_name} has no NaN "
+                                            f"concept...no NaN fill done",
+                                            BaPSFWarning,
+                                        )
+                                else:
+                                    # expected field df_name is missing
+                                    raise err
+
+                            if data.dtype[nf_name].shape != ():
+                                # field contains an array (e.g. 'xyz')
+                                # data[nf_name][sni, npi] = \
+                                #     cdset[index, df_name]
+                                data[nf_name][sni, npi] = arr
                             else:
-                                # expected field df_name is missing
-                                raise err
-
-                        if data.dtype[nf_name].shape != ():
-                            # field contains an array (e.g. 'xyz')
-                            # data[nf_name][sni, npi] = \
-                            #     cdset[index, df_name]
-                            data[nf_name][sni, npi] = arr
-                        else:
-                            # field is a constant
-                            # data[nf_name][sni] = \
-                            #     cdset[index, df_name]
-                            data[nf_name][sni] = arr
+                                # field is a constant
+                                # data[nf_name][sni] = \
+                                #     cdset[index, df_name]
+                                data[nf_name][sni] = arr
+
+                        # handle NaN fill
+                        if not intersection_set and not compact:
+                            # overhead
+                            sni_not = np.logical_not(sni)
+                            dtype = data.dtype[nf_name].base
+
+                            #
+                            if data.dtype[nf_name].shape != ():
+                                ii = np.s_[sni_not, npi]
+                            else:
+                                ii = np.s_[sni_not]
+
+                            # NaN fill
+                            if np.issubdtype(dtype, np.signedinteger):
+                                data[nf_name][ii] = -99999
+                            elif np.issubdtype(dtype, np.unsignedinteger):
+                                data[nf_name][ii] = 0
+                            elif np.issubdtype(dtype, np.floating):
+                                # any float type
+                                data[nf_name][ii] = np.nan
+                            elif np.issubdtype(dtype, np.flexible):
+                                # string, unicode, void
+                                data[nf_name][ii] = ""
+                            else:
+                                # no real NaN concept exists
+                                # - this shouldn't happen though
+                                warn(
+                                    f"dtype ({dtype}) of {nf_name} has no NaN concept"
+                                    f"...no NaN fill done",
+                                    BaPSFWarning,
+                                )
 
-                    # handle NaN fill
-                    if not intersection_set:
-                        # overhead
-                        sni_not = np.logical_not(sni)
-                        dtype = data.dtype[nf_name].base
+                # flag shot numbers recorded by the control dataset
+                if compact:
+                    data["valid"][:, ii_control] = sni
 
-                        #
-                        if data.dtype[nf_name].shape != ():
-                            ii = np.s_[sni_not, npi]
-                        else:
-                            ii = np.s_[sni_not]
-
-                        # NaN fill
-                        if np.issubdtype(dtype, np.signedinteger):
-                            data[nf_name][ii] = -99999
-                        elif np.issubdtype(dtype, np.unsignedinteger):
-                            data[nf_name][ii] = 0
-                        elif np.issubdtype(dtype, np.floating):
-                            # any float type
-                            data[nf_name][ii] = np.nan
-                        elif np.issubdtype(dtype, np.flexible):
-                            # string, unicode, void
-                            data[nf_name][ii] = ""
-                        else:
-                            # no real NaN concept exists
-                            # - this shouldn't happen though
-                            warn(
-                                f"dtype ({dtype}) of {nf_name} has no NaN concept"
-                                f"...no NaN fill done",
-                                BaPSFWarning,
-                            )
+                # print execution timing
+                if timeit:  # pragma: no cover
+                    tt.append(time.time())
+                    print(f"tt - fill data - {cname}: {(tt[-1] - tt[-2]) * 1.0e3} ms")
 
             # print execution timing
             if timeit:  # pragma: no cover
+                n_controls = len(controls)
                 tt.append(time.time())
-                print(f"tt - fill data - {cname}: {(tt[-1] - tt[-2]) * 1.0e3} ms")
-
-        # print execution timing
-        if timeit:  # pragma: no cover
-            n_controls = len(controls)
-            tt.append(time.time())
-            print(
-                f"tt - fill data array: {(tt[-1] - tt[-n_controls - 2]) * 1.0e3} ms "
-                f"(intersection_set={intersection_set})"
-            )
+                print(
+                    f"tt - fill data array: {(tt[-1] - tt[-n_controls - 2]) * 1.0e3} ms "
+                    f"(intersection_set={intersection_set})"
+                )
+        except BaseException:
+            if shared_array is not None:
+                shared_array.close()
+                shared_array.unlink()
+            raise
 
         # -- Define `obj`                                           ----
         obj = data.view(cls)
@@ -507,6 +600,8 @@ class HDFReadControls(np.ndarray):
             "probe name": None,
             "port": (None, None),
         }
+        if compact:
+            obj._info["valid sources"] = [control[0] for control in controls]
 
         # add control meta-info
         for control in controls:
@@ -519,21 +614,30 @@ class HDFReadControls(np.ndarray):
             cconfig = cmap.configs[cconfn]  # type: dict
 
             # populate
-            obj._info["controls"][cname] = {
-                "device group path": cmap.info["group path"],
-                "device dataset path": cconfig["dset paths"][0],
-                "contype": cmap.contype,
-                "configuration name": cconfn,
-            }
-            for key, val in cconfig.items():
+            obj._info["controls"][cname] = CopyOnWriteDict(
+                {
+                    "device group path": cmap.info["group path"],
+                    "device dataset path": cconfig["dset paths"][0],
+                    "contype": cmap.contype,
+                    "configuration name": cconfn,
+                }
+            )
+            # - values are frozen once by the mapping and shared, they
+            #   are copied when first looked up (copy-on-write)
+            for key, val in cmap.frozen_config(cconfn).items():
                 if key not in ["dset paths", "shotnum", "state values"]:
-                    obj._info["controls"][cname][key] = copy.deepcopy(val)
+                    obj._info["controls"][cname][key] = val
 
         # print execution timing
         if timeit:  # pragma: no cover
             tt.append(time.time())
             print(f"tt - total execution time: {(tt[-1] - tt[0]) * 1.0e3} ms")
 
+        # record meta-info for the shared memory handle
+        if shared_array is not None:
+            shared_array.set_meta(obj)
+            obj._shared_array = shared_array
+
         # return obj
         return obj
 
@@ -562,6 +666,124 @@ class HDFReadControls(np.ndarray):
         return self._info
 
 
+def _index_selection(index: np.ndarray) -> Union[slice, List[int]]:
+    """
+    Convert the row indices **index** into a slice if they form a
+    regular stride (e.g. ``start::n_configs``), otherwise into a list
+    of indices.
+    """
+    if index.size == 1:
+        return slice(int(index[0]), int(index[0]) + 1)
+    elif index.size > 1:
+        step = int(index[1] - index[0])
+        if step > 0 and np.all(np.diff(index) == step):
+            return slice(int(index[0]), int(index[-1]) + 1, step)
+    return index.tolist()
+
+
+def read_control_configs(
+    hdf_file: File,
+    control: str,
+    configs: Union[Iterable[Any], None] = None,
+    shotnum=slice(None),
+    intersection_set=True,
+) -> Dict[Any, HDFReadControls]:
+    """
+    Read several configurations of control device **control** with one
+    read of each control dataset.
+
+    For a control device recording multiple configurations in one
+    dataset (i.e. ``one_config_per_dset`` is `False`), the dataset rows
+    spanning the requested shot numbers are read once and then
+    de-interleaved into the individual configurations.
+
+    Parameters
+    ----------
+    hdf_file : `~bapsflib._hdf.utils.file.File`
+        HDF5 file object
+
+    control : `str`
+        name of the control device
+
+    configs : Iterable, optional
+        names of the configurations to read (DEFAULT all configurations)
+
+    shotnum : Union[int, List[int], slice, numpy.ndarray, ShotSet], optional
+        HDF5 file shot number(s) indicating data entries to be extracted
+
+    intersection_set : `bool`, optional
+        `True` (DEFAULT) will force the returned shot numbers of each
+        configuration to be the intersection of :data:`shotnum` and the
+        shot numbers recorded for that configuration (see
+        :class:`HDFReadControls`)
+
+    Returns
+    -------
+    Dict[Any, HDFReadControls]
+        dictionary of the control device data keyed by configuration
+        name
+    """
+    if not isinstance(hdf_file, File):
+        raise TypeError(f"`hdf_file` is NOT type `{File.__module__}.{File.__qualname__}`")
+
+    _fmap = hdf_file.file_map
+    if control not in _fmap.controls:
+        raise ValueError(f"Control device '{control}' not in HDF5 file")
+    cmap = _fmap.controls[control]  # type: ControlMap
+
+    if configs is None:
+        configs = list(cmap.configs)
+    else:
+        configs = list(configs)
+        for cconfn in configs:
+            if cconfn not in cmap.configs:
+                raise ValueError(
+                    f"'{cconfn}' is not a valid configuration name for control "
+                    f"device '{control}'"
+                )
+
+    # group configurations by their dataset
+    configs_by_dset = {}  # type: Dict[str, List[Any]]
+    for cconfn in configs:
+        cdset_path = cmap.configs[cconfn]["dset paths"][0]
+        configs_by_dset.setdefault(cdset_path, []).append(cconfn)
+
+    # read the rows of each dataset spanning all requested
+    # configurations once
+    dset_rows = {}  # type: Dict[str, Tuple[int, np.ndarray]]
+    for cdset_path, cconfns in configs_by_dset.items():
+        cdset = hdf_file.get(cdset_path)
+        shotnumkey = cmap.configs[cconfns[0]]["shotnum"]["dset field"][0]
+        sn = condition_shotnum(shotnum, {control: cdset}, {control: shotnumkey})
+
+        start = stop = 0
+        for cconfn in cconfns:
+            index = build_shotnum_dset_relation(sn, cdset, shotnumkey, cmap, cconfn)[0]
+            if index.size == 0:
+                continue
+            elif start == stop:
+                start, stop = int(index.min()), int(index.max()) + 1
+            else:
+                start = min(start, int(index.min()))
+                stop = max(stop, int(index.max()) + 1)
+        dset_rows[cdset_path] = (start, cdset[start:stop])
+
+    # de-interleave the configurations
+    data = {}
+    for cconfn in configs:
+        cdset_path = cmap.configs[cconfn]["dset paths"][0]
+        data[cconfn] = HDFReadControls(
+            hdf_file,
+            [(control, cconfn)],
+            shotnum=shotnum,
+            intersection_set=intersection_set,
+            assume_controls_conditioned=True,
+            dset_rows={control: dset_rows[cdset_path]},
+        )
+
+    return data
+
+
 # add example to __new__ docstring
 HDFReadControls.__new__.__doc__ += "\n"
 for line in HDFReadControls.__example_doc__.splitlines():
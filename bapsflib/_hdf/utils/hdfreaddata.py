@@ -16,26 +16,211 @@ Module containing the main
 __all__ = ["HDFReadData"]
 
 import astropy.units as u
-import copy
 import numpy as np
 import os
 import time
 
-from typing import Union
+from typing import Tuple, Union
 from warnings import warn
 
 from bapsflib._hdf.utils.file import File
 from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
 from bapsflib._hdf.utils.helpers import (
+    build_sndr_for_shotset,
     build_sndr_for_simple_dset,
     condition_controls,
+    condition_out,
     condition_shotnum,
+    DECIMATE_METHODS,
+    decimate_rows,
     do_shotnum_intersection,
+    do_shotnum_union,
+    iter_dset_rows,
+    sorted_isin,
 )
+from bapsflib._hdf.utils.sharedmem import SharedArray
+from bapsflib._hdf.utils.shotset import ShotSet
 from bapsflib.plasma import core
+from bapsflib.utils.frozen import CopyOnWriteDict
 from bapsflib.utils.warnings import BaPSFWarning, HDFMappingWarning
 
 
+def _fill_signal(
+    signal: np.ndarray,
+    sel: Union[slice, np.ndarray],
+    block: np.ndarray,
+    scale: Union[Tuple[float, float], None],
+    buffer: Union[np.ndarray, None] = None,
+) -> Union[np.ndarray, None]:
+    """
+    Fill the rows **sel** of the ``'signal'`` field **signal** with
+    **block**.  If **scale** ``(dv, offset)`` is given, the bits of
+    **block** are converted to volts, ``dv * bits - offset``.
+
+    The conversion is always computed in double precision and rounded
+    once to the dtype of **signal**.  A double precision **signal** is
+    converted in place for a `slice` **sel**, otherwise the conversion
+    is done in a double precision block buffer, which is returned so
+    it can be passed as **buffer** to the next call.
+    """
+    if scale is None:
+        signal[sel] = block
+        return buffer
+
+    dv, offset = scale
+    in_place = isinstance(sel, slice) and signal.dtype == np.float64
+    if in_place:
+        volts = signal[sel]
+    else:
+        if (
+            buffer is None
+            or buffer.shape[0] < block.shape[0]
+            or buffer.shape[1:] != block.shape[1:]
+        ):
+            buffer = np.empty(block.shape, dtype=np.float64)
+        volts = buffer[: block.shape[0]]
+    np.multiply(block, dv, out=volts)
+    volts -= offset
+    if not in_place:
+        signal[sel] = volts
+    return buffer
+
+
+def _signal_dtype(
+    dset_dtype: np.dtype, out_dtype: Union[str, np.dtype, None], keep_bits: bool
+) -> np.dtype:
+    """
+    Return the dtype of the ``'signal'`` field.  The digitizer dtype
+    **dset_dtype** is kept if **keep_bits**, otherwise the floating
+    point **out_dtype** is used (`numpy.float32` if `None`).
+    """
+    if keep_bits:
+        if out_dtype is not None:
+            raise ValueError(
+                "`out_dtype` can not be used when the signal is kept as "
+                "integer bits (keep_bits=True)."
+            )
+        return np.dtype(dset_dtype)
+    elif out_dtype is None:
+        return np.dtype(np.float32)
+
+    try:
+        sigtype = np.dtype(out_dtype)
+    except TypeError:
+        sigtype = None
+    if sigtype is None or sigtype.kind != "f":
+        raise ValueError(f"`out_dtype` must be a floating point dtype, got {out_dtype}.")
+    return sigtype
+
+
+def _voltage_scale(
+    dheader, bit: Union[int, None], keep_bits: bool
+) -> Tuple[Union[u.Quantity, None], Union[Tuple[float, float], None]]:
+    """
+    Return the voltage offset recorded in the header dataset
+    **dheader** and the scale ``(dv, offset)`` that converts **bit**
+    resolution digitizer bits to volts, ``dv * bits - offset``.  The
+    scale is `None` if **keep_bits** or if it can not be determined.
+    """
+    try:
+        voffset = dheader[0, "Offset"] * u.volt
+    except ValueError:
+        warn(
+            "Digitizer header dataset is missing the voltage 'Offset' field. ",
+            HDFMappingWarning,
+        )
+        voffset = None
+
+    if keep_bits:
+        return voffset, None
+    elif voffset is None or bit is None:
+        warn(
+            "Unable to calculated voltage step size...'signal' remains as bits",
+            BaPSFWarning,
+        )
+        return voffset, None
+
+    offset = abs(float(voffset.value))
+    return voffset, (2.0 * offset / (2.0**bit - 1.0), offset)
+
+
+def _data_dtype(
+    sigtype: np.dtype,
+    nsamples: int,
+    cdtype: Union[np.dtype, None] = None,
+    nvalid: int = 0,
+) -> np.dtype:
+    """
+    Return the dtype of read data with **nsamples** **sigtype** signal
+    samples, the control fields of **cdtype** (if given) and, if
+    **nvalid** is non-zero, a ``'valid'`` field of **nvalid** flags.
+    """
+    dtype = [
+        ("shotnum", np.uint32, ()),
+        ("signal", sigtype, (nsamples,)),
+        ("xyz", np.float32, (3,)),
+    ]
+    if cdtype is not None:
+        for subdtype in cdtype.descr:
+            if subdtype[0] not in [d[0] for d in dtype] + ["valid"]:
+                dtype.append(subdtype)
+    if nvalid:
+        dtype.append(("valid", bool, (nvalid,)))
+    return np.dtype(dtype)
+
+
+def _data_info(
+    hdf_file: File,
+    dmap,
+    dset_path: str,
+    d_info: dict,
+    board: int,
+    channel: int,
+    voffset: Union[u.Quantity, None],
+    scale: Union[Tuple[float, float], None],
+) -> dict:
+    """
+    Return the ``info`` dict of data read from the dataset
+    **dset_path** of the digitizer mapping **dmap**, without the
+    ``'controls'`` entry.
+    """
+    return {
+        "source file": os.path.abspath(hdf_file.filename),
+        "device group path": dmap.info["group path"],
+        "device dataset path": dset_path,
+        "digitizer": d_info["digitizer"],
+        "configuration name": d_info["configuration name"],
+        "adc": d_info["adc"],
+        "bit": d_info["bit"],
+        "clock rate": d_info["clock rate"],
+        "sample average": d_info["sample average (hardware)"],
+        "shot average": d_info["shot average (software)"],
+        "board": board,
+        "channel": channel,
+        "voltage offset": voffset,
+        "probe name": None,
+        "port": (None, None),
+        "signal units": u.bit if scale is None else u.volt,
+    }
+
+
+def _plasma_info() -> dict:
+    """Return the default plasma parameter dict of read data."""
+    return {
+        "Bo": None,
+        "kT": None,
+        "kTe": None,
+        "kTi": None,
+        "gamma": core.FloatUnit(1.0, "arb"),
+        "m_e": core.ME,
+        "m_i": None,
+        "n": None,
+        "n_e": None,
+        "n_i": None,
+        "Z": None,
+    }
+
+
 # noinspection PyInitNewSignature
 class HDFReadData(np.ndarray):
     """
@@ -125,6 +310,10 @@ class HDFReadData(np.ndarray):
         keep_bits=False,
         add_controls=None,
         intersection_set=True,
+        fill_missing=True,
+        decimate=None,
+        decimate_method="boxcar",
+        out_dtype=None,
         **kwargs,
     ):
         """
@@ -143,7 +332,7 @@ class HDFReadData(np.ndarray):
             dataset row indices to be sliced. Overridden by argument
             ``shotnum``. (DEFAULT ``slice(None)``)
 
-        shotnum : Union[int, List[int], slice, numpy.ndarray], optional
+        shotnum : Union[int, List[int], slice, numpy.ndarray, ShotSet], optional
             HDF5 file shot number(s) indicating data entries to be
             extracted.  Overrides argument ``index``.  (DEFAULT
             ``slice(None)``)
@@ -171,6 +360,36 @@ class HDFReadData(np.ndarray):
             contained in each control device and digitizer dataset.
             `False` will return the union of shot numbers.
 
+        fill_missing : `bool`, optional
+            `True` (DEFAULT) will give entries of shot numbers not
+            recorded in the digitizer (control) datasets a NULL value
+            when ``intersection_set=False``.  `False` skips this fill
+            for union reads: only the shot numbers recorded by at least
+            one source are returned, entries missing in a source are
+            left zeroed, and a boolean ``'valid'`` field flags which
+            sources (the digitizer followed by each control device, see
+            ``info['valid sources']``) recorded each shot number.
+
+        decimate : `int`, optional
+            decimate the ``'signal'`` field by this integer factor as it
+            is read (DEFAULT `None` for no decimation).  The
+            ``'sample average'`` item of :attr:`info` (and, thus,
+            :attr:`dt`) is scaled by the same factor.
+
+        decimate_method : `str`, optional
+            ``'boxcar'`` (DEFAULT) to average every ``decimate``
+            samples, ``'stride'`` to keep every ``decimate``-th sample,
+            or ``'fir'`` to apply an anti-aliasing filter before
+            striding (see :func:`~.helpers.decimate_rows`)
+
+        out_dtype : `numpy.dtype`, optional
+            floating point dtype of the ``'signal'`` field, e.g.
+            `numpy.float16` for quick-look storage or `numpy.float64`
+            for precision analysis (DEFAULT `numpy.float32`).  The
+            bit-to-voltage conversion is applied block by block as the
+            signal is read, directly into this dtype.  Can not be used
+            when the signal is kept as integer bits.
+
         Notes
         -----
 
@@ -195,6 +414,21 @@ class HDFReadData(np.ndarray):
         else:
             timeit = False
 
+        # allocate the output array in shared memory
+        # (see File.read_data() and File.read_controls())
+        shared_memory = kwargs.get("shared_memory", False)
+
+        # fill a caller-supplied output buffer
+        # (see File.read_data(), File.read_controls(), and
+        # condition_out())
+        out = kwargs.get("out", None)
+        if out is not None and shared_memory:
+            raise ValueError("`out` and `shared_memory` can not be used together.")
+
+        # only determine the dtype and shape of the read
+        # (see File.read_data_spec() and File.read_controls_spec())
+        return_spec = kwargs.get("return_spec", False)
+
         # ---- Condition hdf_file                                   ----
         # - `hdf_file` is a lapd.File object
         #
@@ -442,7 +676,14 @@ class HDFReadData(np.ndarray):
             """
             # perform `shotnum` conditioning
             # - `shotnum` is returned as a numpy array
-            shotnum = condition_shotnum(shotnum, {"digi": dheader}, {"digi": shotnumkey})
+            # - a ShotSet is kept as ranges for intersection reads, since
+            #   only its recorded shot numbers are returned
+            shotnum = condition_shotnum(
+                shotnum,
+                {"digi": dheader},
+                {"digi": shotnumkey},
+                keep_ranges=intersection_set,
+            )
 
             # Calc. the corresponding `index` and `sni`
             # - `shotnum` will be converted from list to np.array
@@ -452,15 +693,32 @@ class HDFReadData(np.ndarray):
                 condition_shotnum(shotnum, dheader, shotnumkey,
                                   intersection_set)
             """
-            index, sni = build_sndr_for_simple_dset(shotnum, dheader, shotnumkey)
-
-            # perform intersection
-            if intersection_set:
-                shotnum, sni_dict, index_dict = do_shotnum_intersection(
-                    shotnum, {"digi": sni}, {"digi": index}
+            if isinstance(shotnum, ShotSet):
+                # index is a slice for a contiguous run of shot numbers
+                shotnum, index = build_sndr_for_shotset(
+                    shotnum,
+                    dheader,
+                    shotnumkey,
+                    layout=_dmap.dset_layout(dheader, shotnumkey),
+                )
+                if shotnum.size == 0:
+                    raise ValueError("Input `shotnum` would result in a NULL array")
+                sni = np.ones(shotnum.shape[0], dtype=bool)
+            else:
+                index, sni = build_sndr_for_simple_dset(
+                    shotnum,
+                    dheader,
+                    shotnumkey,
+                    layout=_dmap.dset_layout(dheader, shotnumkey),
                 )
-                sni = sni_dict["digi"]
-                index = index_dict["digi"]
+
+                # perform intersection
+                if intersection_set:
+                    shotnum, sni_dict, index_dict = do_shotnum_intersection(
+                        shotnum, {"digi": sni}, {"digi": index}
+                    )
+                    sni = sni_dict["digi"]
+                    index = index_dict["digi"]
 
             # print execution timing
             if timeit:  # pragma: no cover
@@ -477,14 +735,32 @@ class HDFReadData(np.ndarray):
         # - this will ensure cdata.shape == data.shape all the time
         # - shotnum should always be a ndarray at this point
         #
+        # - for return_spec=True only the control data dtype and shot
+        #   numbers are determined, no control data is read
+        #
+        cdata = None
         if len(controls) != 0:
-            cdata = HDFReadControls(
-                hdf_file,
-                controls,
-                assume_controls_conditioned=True,
-                shotnum=shotnum,
-                intersection_set=intersection_set,
-            )
+            if return_spec:
+                cdtype, cshotnum = HDFReadControls(
+                    hdf_file,
+                    controls,
+                    assume_controls_conditioned=True,
+                    shotnum=shotnum,
+                    intersection_set=intersection_set,
+                    fill_missing=fill_missing,
+                    return_spec=True,
+                    spec_shotnum=True,
+                )
+            else:
+                cdata = HDFReadControls(
+                    hdf_file,
+                    controls,
+                    assume_controls_conditioned=True,
+                    shotnum=shotnum,
+                    intersection_set=intersection_set,
+                    fill_missing=fill_missing,
+                )
+                cdtype, cshotnum = cdata.dtype, cdata["shotnum"]
 
             # print execution timing
             if timeit:  # pragma: no cover
@@ -499,12 +775,56 @@ class HDFReadData(np.ndarray):
             #   one-to-one
             #
             if intersection_set:
-                new_sn_mask = np.isin(shotnum, cdata["shotnum"])
+                new_sn_mask = sorted_isin(shotnum, cshotnum)
                 shotnum = shotnum[new_sn_mask]
+                if isinstance(index, slice):
+                    index = np.arange(*index.indices(dset.shape[0]))
                 index = index[new_sn_mask]
                 sni = np.ones(shotnum.shape[0], dtype=bool)
-        else:
-            cdata = None
+
+        # union reads without NULL fills only keep the shot numbers
+        # recorded by the digitizer or a control device
+        # - csni flags the rows of `shotnum` in cdata
+        compact = not intersection_set and not fill_missing
+        csni = slice(None)
+        if compact:
+            sni_dict = {"digi": sni}
+            if len(controls) != 0:
+                sni_dict["controls"] = sorted_isin(shotnum, cshotnum)
+            shotnum, sni_dict, _ = do_shotnum_union(shotnum, sni_dict, {})
+            sni = sni_dict["digi"]
+            csni = sni_dict.get("controls", csni)
+
+        # ---- Condition `decimate`                                 ----
+        if decimate is None:
+            decimate = 1
+        elif (
+            isinstance(decimate, (bool, np.bool_))
+            or not isinstance(decimate, (int, np.integer))
+            or not (1 <= decimate <= dset.shape[1])
+        ):
+            raise ValueError(
+                f"`decimate` must be an integer between 1 and the number of "
+                f"samples ({dset.shape[1]}), got {decimate}."
+            )
+        elif decimate_method not in DECIMATE_METHODS:
+            raise ValueError(
+                f"`decimate_method` '{decimate_method}' not in valid "
+                f"methods {DECIMATE_METHODS}."
+            )
+
+        # ---- Condition `out_dtype`                                ----
+        # - averaged (or filtered) bits are not integers
+        sigtype = _signal_dtype(
+            dset.dtype,
+            out_dtype,
+            keep_bits and (decimate == 1 or decimate_method == "stride"),
+        )
+
+        # ---- Determine voltage conversion                         ----
+        # signal = dv * bits - offset
+        # - the conversion is applied to each block as it is read
+        voffset, scale = _voltage_scale(dheader, d_info["bit"], keep_bits)
 
         # ---- Build `obj`                                          ----
         # Define dtype and shape
@@ -512,17 +832,13 @@ class HDFReadData(np.ndarray):
         #   file shot number
         # - shotkey = is the field name/key of the dheader shot number
         #   column
-        sigtype = np.float32 if not keep_bits else dset.dtype
         shape = shotnum.shape
-        dtype = [
-            ("shotnum", np.uint32, ()),
-            ("signal", sigtype, (dset.shape[1],)),
-            ("xyz", np.float32, (3,)),
-        ]
-        if len(controls) != 0:
-            for subdtype in cdata.dtype.descr:
-                if subdtype[0] not in [d[0] for d in dtype]:
-                    dtype.append(subdtype)
+        dtype = _data_dtype(
+            sigtype,
+            dset.shape[1] // decimate,
+            cdtype=cdtype if len(controls) != 0 else None,
+            nvalid=1 + len(controls) if compact else 0,
+        )
 
         # print execution timing
         if timeit:  # pragma: no cover
@@ -530,136 +846,151 @@ class HDFReadData(np.ndarray):
             print(f"tt - define dtype: {(tt[-1] - tt[-2]) * 1.0e3} ms")
 
         # Initialize data array
-        data = np.empty(shape, dtype=dtype)
+        if return_spec:
+            return dtype, shape
+        elif shared_memory:
+            shared_array = SharedArray(shape, dtype)
+            data = shared_array.asarray()
+        elif out is not None:
+            shared_array = None
+            data = condition_out(out, shape, dtype, zeroed=compact)
+        else:
+            shared_array = None
+            data = np.zeros(shape, dtype) if compact else np.empty(shape, dtype=dtype)
 
         # print execution timing
         if timeit:  # pragma: no cover
             tt.append(time.time())
             print(f"tt - initialize data np.ndarray: {(tt[-1] - tt[-2]) * 1.0e3} ms")
 
-        # fill 'shotnum' field of data array
-        data["shotnum"] = shotnum
-
-        # fill 'signal' fields of data array
-        index = index.tolist()
-        if intersection_set:
-            # fill signal
-            data["signal"] = dset[index, ...]
-        else:
-            # fill signal
-            data["signal"][sni] = dset[index, ...]
-            if np.issubdtype(data["signal"].dtype, np.integer):
-                data["signal"][np.logical_not(sni)] = 0
-            else:
-                # dtype is np.floating
-                data["signal"][np.logical_not(sni)] = np.nan
+        # fill data array
+        # - a shared memory segment is released if the fill fails,
+        #   otherwise it stays linked until the interpreter exits
+        try:
+            # fill 'shotnum' field of data array
+            data["shotnum"] = shotnum
 
-        # fill fields related to controls
-        if len(controls) != 0:
-            # Note: shot numbers of cdata and data are one-to-one
-            #       by this point so intersection_set is irrelevant
+            # fill 'signal' fields of data array
+            # - rows are read in chunk-aligned blocks so each dataset chunk
+            #   is only read (and decompressed) once
+            # - decimation and voltage conversion are applied block by block
             #
-            if not np.array_equal(data["shotnum"], cdata["shotnum"]):  # pragma: no cover
-                # this should never happen
-                raise ValueError("data['shotnum'] and cdata['shotnum'] are not equal")
-
-            # fill xyz
-            if "xyz" in cdata.dtype.names:
-                data["xyz"] = cdata["xyz"]
+            if intersection_set:
+                # fill signal
+                buffer = None
+                for out_sel, block in iter_dset_rows(dset, index):
+                    buffer = _fill_signal(
+                        data["signal"],
+                        out_sel,
+                        decimate_rows(block, decimate, decimate_method),
+                        scale,
+                        buffer=buffer,
+                    )
             else:
+                # fill signal
+                # - a contiguous run of rows is filled through a slice, so
+                #   no block buffer is needed
+                sni_rows = np.flatnonzero(sni)
+                buffer = None
+                for out_sel, block in iter_dset_rows(dset, index):
+                    rows = sni_rows[out_sel]
+                    if rows[-1] - rows[0] + 1 == rows.shape[0]:
+                        rows = slice(int(rows[0]), int(rows[-1]) + 1)
+                    buffer = _fill_signal(
+                        data["signal"],
+                        rows,
+                        decimate_rows(block, decimate, decimate_method),
+                        scale,
+                        buffer=buffer,
+                    )
+                if not compact:
+                    if np.issubdtype(data["signal"].dtype, np.integer):
+                        data["signal"][np.logical_not(sni)] = 0
+                    else:
+                        # dtype is np.floating
+                        data["signal"][np.logical_not(sni)] = np.nan
+
+            # flag shot numbers recorded by the digitizer
+            if compact:
+                data["valid"][:, 0] = sni
+
+            # fill fields related to controls
+            if len(controls) != 0:
+                # Note: shot numbers of cdata and data[csni] are one-to-one
+                #       by this point so intersection_set is irrelevant
+                #
+                if not np.array_equal(
+                    data["shotnum"][csni], cdata["shotnum"]
+                ):  # pragma: no cover
+                    # this should never happen
+                    raise ValueError("data['shotnum'] and cdata['shotnum'] are not equal")
+
+                # fill xyz
+                if "xyz" in cdata.dtype.names:
+                    data["xyz"][csni] = cdata["xyz"]
+                else:
+                    data["xyz"] = np.nan
+
+                # fill remaining controls
+                for field in cdata.dtype.names:
+                    if field == "valid":
+                        data["valid"][csni, 1:] = cdata["valid"]
+                    elif field not in ("shotnum", "xyz"):
+                        data[field][csni] = cdata[field]
+            else:
+                # fill xyz
                 data["xyz"] = np.nan
 
-            # fill remaining controls
-            for field in cdata.dtype.names:
-                if field not in ("shotnum", "xyz"):
-                    data[field] = cdata[field]
-        else:
-            # fill xyz
-            data["xyz"] = np.nan
-
-        # print execution timing
-        if timeit:  # pragma: no cover
-            tt.append(time.time())
-            print(f"tt - fill data array: {(tt[-1] - tt[-2]) * 1.0e3} ms")
+            # print execution timing
+            if timeit:  # pragma: no cover
+                tt.append(time.time())
+                print(f"tt - fill data array: {(tt[-1] - tt[-2]) * 1.0e3} ms")
+        except BaseException:
+            if shared_array is not None:
+                shared_array.close()
+                shared_array.unlink()
+            raise
 
         # Define obj to be returned
         obj = data.view(cls)
 
-        # get voltage offset
-        try:
-            voffset = dheader[0, "Offset"] * u.volt
-        except ValueError:
-            warn(
-                "Digitizer header dataset is missing the voltage 'Offset' field. ",
-                HDFMappingWarning,
-            )
-            voffset = None
-
         # assign dataset meta-info
-        obj._info = {
-            "source file": os.path.abspath(hdf_file.filename),
-            "device group path": _dmap.info["group path"],
-            "device dataset path": dpath + dname,
-            "digitizer": d_info["digitizer"],
-            "configuration name": d_info["configuration name"],
-            "adc": d_info["adc"],
-            "bit": d_info["bit"],
-            "clock rate": d_info["clock rate"],
-            "sample average": d_info["sample average (hardware)"],
-            "shot average": d_info["shot average (software)"],
-            "board": board,
-            "channel": channel,
-            "voltage offset": voffset,
-            "probe name": None,
-            "port": (None, None),
-            "signal units": u.bit,
-        }
+        obj._info = _data_info(
+            hdf_file, _dmap, dpath + dname, d_info, board, channel, voffset, scale
+        )
+        if decimate != 1:
+            sample_average = obj._info["sample average"]
+            obj._info["sample average"] = decimate * (
+                1 if sample_average is None else sample_average
+            )
         if cdata is not None:
-            obj._info["controls"] = copy.deepcopy(cdata.info["controls"])
+            # control meta-info values are shared read-only objects, so
+            # only the containers are copied (values are copied when
+            # first looked up)
+            obj._info["controls"] = {
+                cname: CopyOnWriteDict(cinfo)
+                for cname, cinfo in cdata.info["controls"].items()
+            }
         else:
             obj._info["controls"] = {}
+        if compact:
+            obj._info["valid sources"] = [d_info["digitizer"]] + [
+                control[0] for control in controls
+            ]
 
         # plasma parameter dict
-        obj._plasma = {
-            "Bo": None,
-            "kT": None,
-            "kTe": None,
-            "kTi": None,
-            "gamma": core.FloatUnit(1.0, "arb"),
-            "m_e": core.ME,
-            "m_i": None,
-            "n": None,
-            "n_e": None,
-            "n_i": None,
-            "Z": None,
-        }  # pragma: no cover
-
-        # convert to voltage
-        # - 'signal' dtype is assigned based on keep_bit
-        #
-        # obj['signal'] = obj['signal'].astype(np.float32, copy=False)
-        #
-        if not keep_bits:
-            if obj.dv is None:
-                warn(
-                    "Unable to calculated voltage step size...'signal' remains as bits",
-                    BaPSFWarning,
-                )
-            else:
-                # define offset
-                offset = abs(obj.info["voltage offset"].value)
-
-                # calc voltage
-                obj["signal"] = (obj.dv.value * obj["signal"]) - offset
-
-                # update 'signal units'
-                obj._info["signal units"] = u.volt
+        obj._plasma = _plasma_info()
 
         # print execution timing
         if timeit:  # pragma: no cover
             tt.append(time.time())
             print(f"tt - execution time: {(tt[-1] - tt[-2]) * 1.0e3} ms")
 
+        # record meta-info for the shared memory handle
+        if shared_array is not None:
+            shared_array.set_meta(obj)
+            obj._shared_array = shared_array
+
         # return obj
         return obj
 
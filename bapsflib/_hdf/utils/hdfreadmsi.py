@@ -14,11 +14,14 @@ Module containing the main `~bapsflib._hdf.utils.hdfreadmsi.HDFReadMSI` class.
 """
 __all__ = ["HDFReadMSI"]
 
-import copy
 import numpy as np
 import os
 
+from typing import List, Union
+
 from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.shotset import ShotSet
+from bapsflib.utils.frozen import CopyOnWriteDict
 
 
 class HDFReadMSI(np.ndarray):
@@ -288,14 +291,18 @@ class HDFReadMSI(np.ndarray):
         obj = data.view(cls)
 
         # ---- Define `_info` attribute                             ----
-        obj._info = {
-            "source file": os.path.abspath(hdf_file.filename),
-            "device name": _map.info["group name"],
-            "device group path": _map.info["group path"],
-        }
-        for key, val in _map.configs.items():
+        obj._info = CopyOnWriteDict(
+            {
+                "source file": os.path.abspath(hdf_file.filename),
+                "device name": _map.info["group name"],
+                "device group path": _map.info["group path"],
+            }
+        )
+        # - values are frozen once by the mapping and shared, they are
+        #   copied when first looked up (copy-on-write)
+        for key, val in _map.frozen_configs.items():
             if key not in ["shape", "shotnum", "signals", "meta"]:
-                obj._info[key] = copy.deepcopy(val)
+                obj._info[key] = val
 
         # ---- Return `obj`                                         ----
         return obj
@@ -323,6 +330,151 @@ class HDFReadMSI(np.ndarray):
         """A dictionary of meta-info for the MSI diagnostic."""
         return self._info
 
+    def align(
+        self,
+        shotnum: Union[int, List[int], np.ndarray, ShotSet],
+        timestamps: Union[List[float], np.ndarray, None] = None,
+        tolerance: Union[float, None] = None,
+    ) -> "HDFReadMSI":
+        """
+        Align the MSI rows to the shots **shotnum** (e.g. the shot
+        numbers of read digitizer data).
+
+        Each shot is matched to the MSI row recorded with the same shot
+        number.  If **timestamps** are given, then any shot without a
+        matching shot number falls back to the MSI row with the nearest
+        ``'timestamp'`` (within **tolerance**).  All shots are matched
+        in one vectorized pass using `numpy.searchsorted`.
+
+        Parameters
+        ----------
+        shotnum : Union[int, List[int], numpy.ndarray, ShotSet]
+            shot numbers to align the MSI rows to
+
+        timestamps : Union[List[float], numpy.ndarray], optional
+            timestamp of each shot in **shotnum**, used to match shots
+            that do not have a matching MSI shot number
+
+        tolerance : `float`, optional
+            maximum difference between a shot timestamp and an MSI
+            timestamp for a timestamp match.  (DEFAULT `None` for no
+            limit)
+
+        Returns
+        -------
+        `HDFReadMSI`
+            array with one row per shot in **shotnum**, with the
+            ``'shotnum'`` field set to **shotnum**.  Rows of shots
+            without a matching MSI row are given a NULL value of
+            ``-99999``, ``0``, `numpy.nan`, or ``""`` depending on the
+            field type.  ``info['msi index']`` is the index of the
+            MSI row of each shot (``-1`` for unmatched shots).
+
+        Examples
+        --------
+
+        >>> mdata = f.read_msi('Discharge')
+        >>> ddata = f.read_data(0, 0)
+        >>> aligned = mdata.align(ddata['shotnum'])
+        >>> aligned['meta']['peak current'].shape == ddata.shape
+        True
+        """
+        # condition `shotnum`
+        shotnum = np.atleast_1d(np.asarray(shotnum))
+        if shotnum.ndim != 1 or not (
+            shotnum.size == 0 or np.issubdtype(shotnum.dtype, np.integer)
+        ):
+            raise ValueError("`shotnum` must be a 1D array of integer shot numbers")
+        shotnum = shotnum.astype(np.int64, copy=False)
+
+        # match by shot number
+        msi_data = self.view(np.ndarray)
+        msi_sn = msi_data["shotnum"].astype(np.int64, copy=False)
+        index = _nearest_index(msi_sn, shotnum, tolerance=0)
+
+        # fall back to nearest timestamp for unmatched shots
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps, dtype=np.float64)
+            if timestamps.shape != shotnum.shape:
+                raise ValueError("`timestamps` must have the same shape as `shotnum`")
+            if "timestamp" not in msi_data.dtype["meta"].names:
+                raise ValueError(
+                    f"MSI diagnostic '{self._info['device name']}' does not "
+                    f"record timestamps"
+                )
+
+            # devices with multiple datasets (e.g. interferometer) record
+            # a timestamp per dataset, use the first
+            msi_ts = msi_data["meta"]["timestamp"].reshape(msi_data.shape[0], -1)[:, 0]
+            unmatched = index == -1
+            index[unmatched] = _nearest_index(
+                msi_ts, timestamps[unmatched], tolerance=tolerance
+            )
+
+        # build aligned array
+        matched = index != -1
+        data = np.empty(shotnum.shape, dtype=self.dtype)
+        data[matched] = msi_data[index[matched]]
+        if not np.all(matched):
+            null_row = np.empty(1, dtype=self.dtype)
+            _null_fill(null_row)
+            data[~matched] = null_row
+        data["shotnum"] = shotnum
+
+        obj = data.view(type(self))
+        obj._info = CopyOnWriteDict({**self._info, "msi index": index})
+        return obj
+
+
+def _nearest_index(
+    values: np.ndarray, targets: np.ndarray, tolerance: Union[float, None] = None
+) -> np.ndarray:
+    """
+    Index of the element of **values** nearest to each of the
+    **targets**, ``-1`` where the nearest element differs by more than
+    **tolerance**.  **values** does not need to be sorted.
+    """
+    index = np.full(targets.shape, -1, dtype=np.int64)
+    if values.size == 0 or targets.size == 0:
+        return index
+
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+
+    # nearest of the neighbors on either side of each target
+    right = np.clip(np.searchsorted(sorted_values, targets), 0, values.size - 1)
+    left = np.clip(right - 1, 0, None)
+    use_left = np.abs(targets - sorted_values[left]) <= np.abs(
+        sorted_values[right] - targets
+    )
+    nearest = np.where(use_left, left, right)
+    matched = np.ones(targets.shape, dtype=bool)
+    if tolerance is not None:
+        matched = np.abs(sorted_values[nearest] - targets) <= tolerance
+    index[matched] = order[nearest[matched]]
+    return index
+
+
+def _null_fill(data: np.ndarray):
+    """
+    Fill the structured array **data** (in-place) with NULL values
+    (``-99999``, ``0``, `numpy.nan`, or ``""``) based on field type.
+    """
+    for name in data.dtype.names:
+        field = data[name]
+        dtype = data.dtype[name].base
+        if dtype.names is not None:
+            _null_fill(field)
+        elif np.issubdtype(dtype, np.signedinteger):
+            data[name] = max(-99999, np.iinfo(dtype).min)
+        elif np.issubdtype(dtype, np.floating):
+            data[name] = np.nan
+        elif np.issubdtype(dtype, np.flexible):
+            data[name] = ""
+        else:
+            # unsigned integers and booleans
+            data[name] = 0
+
 
 # add example to __new__ docstring
 HDFReadMSI.__new__.__doc__ += "\n"
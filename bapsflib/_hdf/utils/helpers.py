@@ -13,28 +13,294 @@ Helper functions that are utilized by the HDF5 utility classes defined
 in module :mod:`bapsflib._hdf.utils`.
 """
 __all__ = [
+    "build_chunk_read_plan",
     "build_shotnum_dset_relation",
     "build_sndr_for_simple_dset",
     "build_sndr_for_complex_dset",
+    "build_sndr_for_shotset",
     "condition_controls",
+    "condition_out",
     "condition_shotnum",
+    "decimate_rows",
     "do_shotnum_intersection",
+    "do_shotnum_union",
+    "iter_dset_rows",
+    "sorted_isin",
 ]
 
 import h5py
 import numpy as np
 
-from typing import Any, Dict, Iterable, List, Tuple, Union
+from scipy import signal
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
 
 from bapsflib._hdf.maps.controls.templates import (
     HDFMapControlCLTemplate,
     HDFMapControlTemplate,
 )
+from bapsflib._hdf.maps.layouts import DsetLayout
 from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.shotset import ShotSet
 
 # define type aliases
 ControlMap = Union[HDFMapControlTemplate, HDFMapControlCLTemplate]
 IndexDict = Dict[str, np.ndarray]
+ReadPlan = List[Tuple[Union[slice, np.ndarray], Union[np.ndarray, None], slice]]
+
+#: upper limit (in bytes) of the rows read from a dataset in one call
+MAX_READ_BLOCK_BYTES = 64 * 1024 * 1024
+
+#: upper limit (in bytes) of a per-read raw-data chunk cache
+MAX_CHUNK_CACHE_BYTES = 256 * 1024 * 1024
+
+#: valid methods for :func:`decimate_rows`
+DECIMATE_METHODS = ("boxcar", "stride", "fir")
+
+
+def build_chunk_read_plan(
+    dset: h5py.Dataset, index: Union[slice, np.ndarray], max_block_bytes: int = None
+) -> ReadPlan:
+    """
+    Build a plan for reading the rows **index** of dataset **dset**
+    such that no dataset chunk is split across two reads, i.e. every
+    chunk is read (and decompressed) only once.
+
+    The requested rows are grouped by the chunk (along the first
+    dimension) they live in, and consecutive chunk groups are combined
+    into read blocks of at most **max_block_bytes**.  A block is read
+    as one contiguous slice if the requested rows are dense within the
+    block, otherwise the block's rows are read as one row selection.
+
+    Parameters
+    ----------
+    dset : `h5py.Dataset`
+        dataset to be read
+
+    index : Union[`slice`, `numpy.ndarray`]
+        sorted array of unique row indices to be read from **dset**, or
+        a `slice` of rows
+
+    max_block_bytes : `int`, optional
+        upper limit of bytes read in one call (DEFAULT
+        :data:`MAX_READ_BLOCK_BYTES`)
+
+    Returns
+    -------
+    `ReadPlan`
+        list of ``(dset_sel, take, out_sel)`` tuples where ``dset_sel``
+        is the row selection passed to **dset**, ``take`` is the array
+        of rows to keep from the read block (`None` if all rows are
+        kept), and ``out_sel`` is the slice of **index** covered by the
+        read, i.e. ``dset[dset_sel][take] == dset[index[out_sel]]``
+    """
+    if max_block_bytes is None:
+        max_block_bytes = MAX_READ_BLOCK_BYTES
+
+    row_nbytes = dset.dtype.itemsize * int(np.prod(dset.shape[1:], dtype=np.int64))
+    max_rows = max(1, max_block_bytes // max(row_nbytes, 1))
+
+    if isinstance(index, slice):
+        start, stop, step = index.indices(dset.shape[0])
+        if step != 1:
+            index = np.arange(start, stop, step)
+        else:
+            # contiguous rows, split at chunk boundaries only
+            chunk_rows = 1 if dset.chunks is None else dset.chunks[0]
+            block_rows = max(1, max_rows // chunk_rows) * chunk_rows
+            plan = []
+            first_row = start
+            while first_row < stop:
+                last_row = min(stop, (first_row // chunk_rows) * chunk_rows + block_rows)
+                plan.append(
+                    (
+                        slice(first_row, last_row),
+                        None,
+                        slice(first_row - start, last_row - start),
+                    )
+                )
+                first_row = last_row
+            return plan
+
+    index = np.asarray(index)
+    size = index.shape[0]
+    if size == 0:
+        return []
+
+    if size > 1 and np.any(np.diff(index) <= 0):
+        # not sorted, let h5py deal with the row selection
+        return [
+            (
+                index[start : start + max_rows],
+                None,
+                slice(start, min(start + max_rows, size)),
+            )
+            for start in range(0, size, max_rows)
+        ]
+
+    # group requested rows by chunk
+    # - contiguous datasets are treated as having 1-row chunks
+    chunk_rows = 1 if dset.chunks is None else dset.chunks[0]
+    chunk_id = index // chunk_rows
+    group_stops = np.append(np.flatnonzero(np.diff(chunk_id)) + 1, size)
+
+    plan = []
+    start = 0
+    while start < size:
+        # extend the read block by whole chunk groups
+        gi = np.searchsorted(group_stops, start + max_rows, side="right") - 1
+        if gi < 0 or group_stops[gi] <= start:
+            # a single chunk group exceeds max_rows, do not split it
+            gi = np.searchsorted(group_stops, start, side="right")
+        stop = int(group_stops[gi])
+
+        first_row = int(index[start])
+        last_row = int(index[stop - 1])
+        nrows = stop - start
+        span = last_row - first_row + 1
+        if span == nrows:
+            # contiguous block of rows
+            plan.append((slice(first_row, last_row + 1), None, slice(start, stop)))
+        elif span <= 2 * nrows and span <= max_rows:
+            # dense block of rows, read the span and take the rows
+            take = index[start:stop] - first_row
+            plan.append((slice(first_row, last_row + 1), take, slice(start, stop)))
+        else:
+            # sparse block of rows
+            plan.append((index[start:stop], None, slice(start, stop)))
+
+        start = stop
+
+    return plan
+
+
+def _chunk_cache_config(dset: h5py.Dataset, plan: ReadPlan) -> Tuple[int, int]:
+    """
+    Determine the raw-data chunk cache size ``(nslots, nbytes)`` needed
+    for **dset** to keep all chunks touched by one read of the read
+    **plan** in memory.
+    """
+    chunks = dset.chunks
+    chunk_nbytes = dset.dtype.itemsize * int(np.prod(chunks, dtype=np.int64))
+
+    # number of chunks spanning the trailing dimensions
+    nchunks_row = 1
+    for dim, chunk_dim in zip(dset.shape[1:], chunks[1:]):
+        nchunks_row *= -(-dim // chunk_dim)
+
+    # largest number of chunk rows touched by a single read
+    max_chunk_rows = 1
+    for dset_sel, take, out_sel in plan:
+        if isinstance(dset_sel, slice):
+            nrows = (dset_sel.stop - 1) // chunks[0] - dset_sel.start // chunks[0] + 1
+            max_chunk_rows = max(max_chunk_rows, nrows)
+
+    nchunks = nchunks_row * max_chunk_rows
+    nbytes = min(nchunks * chunk_nbytes, MAX_CHUNK_CACHE_BYTES)
+
+    # HDF5 recommends ~100 hash slots per cached chunk, ideally prime
+    nslots = max(521, 100 * max(1, nbytes // chunk_nbytes)) | 1
+    while any(nslots % ii == 0 for ii in range(3, int(nslots**0.5) + 1, 2)):
+        nslots += 2
+
+    return nslots, nbytes
+
+
+def iter_dset_rows(
+    dset: h5py.Dataset, index: Union[slice, np.ndarray], max_block_bytes: int = None
+) -> Iterator[Tuple[slice, np.ndarray]]:
+    """
+    Iterate over the rows **index** of dataset **dset** using a
+    chunk-aligned read plan (see :func:`build_chunk_read_plan`).  For
+    chunked datasets, the dataset is re-opened with a raw-data chunk
+    cache sized for the read plan.
+
+    Parameters
+    ----------
+    dset : `h5py.Dataset`
+        dataset to be read
+
+    index : Union[`slice`, `numpy.ndarray`]
+        sorted array of unique row indices to be read from **dset**, or
+        a `slice` of rows
+
+    max_block_bytes : `int`, optional
+        upper limit of bytes read in one call (DEFAULT
+        :data:`MAX_READ_BLOCK_BYTES`)
+
+    Yields
+    ------
+    out_sel : `slice`
+        slice of **index** covered by ``block``
+
+    block : `numpy.ndarray`
+        the dataset rows ``dset[index[out_sel], ...]``
+    """
+    plan = build_chunk_read_plan(dset, index, max_block_bytes=max_block_bytes)
+    if len(plan) == 0:
+        return
+
+    if dset.chunks is not None:
+        nslots, nbytes = _chunk_cache_config(dset, plan)
+        dapl = h5py.h5p.create(h5py.h5p.DATASET_ACCESS)
+        dapl.set_chunk_cache(nslots, nbytes, 1.0)
+        dset = h5py.Dataset(h5py.h5d.open(dset.file.id, dset.name.encode(), dapl=dapl))
+
+    for dset_sel, take, out_sel in plan:
+        if isinstance(dset_sel, np.ndarray):
+            dset_sel = dset_sel.tolist()
+        block = dset[dset_sel, ...]
+        if take is not None:
+            block = block[take, ...]
+        yield out_sel, block
+
+
+def decimate_rows(block: np.ndarray, factor: int, method="boxcar") -> np.ndarray:
+    """
+    Decimate the last axis (time) of **block** by the integer
+    **factor**.  The decimated length is always
+    ``block.shape[-1] // factor``, i.e. trailing samples that do not
+    fill a full decimation window are dropped.
+
+    Parameters
+    ----------
+    block : `numpy.ndarray`
+        array of signals to decimate (e.g. rows read from a digitizer
+        dataset)
+
+    factor : `int`
+        decimation factor
+
+    method : `str`, optional
+        ``'boxcar'`` (DEFAULT) averages every **factor** samples,
+        ``'stride'`` keeps every **factor**-th sample, and ``'fir'``
+        applies a zero-phase anti-aliasing FIR filter before keeping
+        every **factor**-th sample (see `scipy.signal.decimate`)
+
+    Returns
+    -------
+    `numpy.ndarray`
+        the decimated array (`numpy.float64` for the ``'boxcar'`` and
+        ``'fir'`` methods, the dtype of **block** for ``'stride'``)
+    """
+    if method not in DECIMATE_METHODS:
+        raise ValueError(
+            f"Decimation method '{method}' not in valid methods {DECIMATE_METHODS}."
+        )
+
+    nt = block.shape[-1] // factor
+    if factor == 1:
+        return block
+    elif method == "stride":
+        return block[..., : nt * factor : factor]
+    elif method == "boxcar":
+        block = block[..., : nt * factor].reshape(block.shape[:-1] + (nt, factor))
+        return block.mean(axis=-1, dtype=np.float64)
+
+    # method == "fir"
+    block = signal.decimate(
+        block.astype(np.float64, copy=False), factor, ftype="fir", axis=-1
+    )
+    return block[..., :nt]
 
 
 def build_shotnum_dset_relation(
@@ -108,19 +374,27 @@ def build_shotnum_dset_relation(
     #            shotnum[sni] = dset[index, shotnumkey]
     #
     # Calc. index, shotnum, and sni
+    # the dataset layout is classified once and cached on cmap
+    layout = cmap.dset_layout(dset, shotnumkey)
+
     if cmap.one_config_per_dset:
         # the dataset only saves data for one configuration
-        index, sni = build_sndr_for_simple_dset(shotnum, dset, shotnumkey)
+        index, sni = build_sndr_for_simple_dset(shotnum, dset, shotnumkey, layout=layout)
     else:
         # the dataset saves data for multiple configurations
-        index, sni = build_sndr_for_complex_dset(shotnum, dset, shotnumkey, cmap, cconfn)
+        index, sni = build_sndr_for_complex_dset(
+            shotnum, dset, shotnumkey, cmap, cconfn, layout=layout
+        )
 
     # return calculated arrays
     return index.view(), sni.view()
 
 
 def build_sndr_for_simple_dset(
-    shotnum: np.ndarray, dset: h5py.Dataset, shotnumkey: str
+    shotnum: np.ndarray,
+    dset: h5py.Dataset,
+    shotnumkey: str,
+    layout: Union[DsetLayout, None] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compares the **shotnum** numpy array to the specified "simple"
@@ -150,6 +424,10 @@ def build_sndr_for_simple_dset(
         field name in the dataset that contains
         the shot numbers
 
+    layout : `~bapsflib._hdf.maps.layouts.DsetLayout`, optional
+        the classified layout of **dset**, if given and the layout
+        allows it, the indices are found without reading **dset**
+
     Returns
     -------
     index : `numpy.ndarray`
@@ -160,6 +438,12 @@ def build_sndr_for_simple_dset(
     """
     # this is for a dataset that only records data for one configuration
     #
+    # use the fast look-up of the classified layout
+    if layout is not None:
+        found = layout.lookup(shotnum)
+        if found is not None:
+            return found
+
     # get corresponding indices for shotnum
     # build associated sni array
     #
@@ -178,7 +462,7 @@ def build_sndr_for_simple_dset(
             index = shotnum - first_sn
 
             # build sni and filter index
-            sni = np.where(index < dset.shape[0], True, False)
+            sni = np.where((index >= 0) & (index < dset.shape[0]), True, False)
             index = index[sni]
         else:
             # shot numbers are NOT sequential
@@ -220,12 +504,68 @@ def build_sndr_for_simple_dset(
     return index.view(), sni.view()
 
 
+def build_sndr_for_shotset(
+    shotnum: ShotSet,
+    dset: h5py.Dataset,
+    shotnumkey: str,
+    layout: Union[DsetLayout, None] = None,
+) -> Tuple[np.ndarray, Union[slice, np.ndarray]]:
+    """
+    Determine the shot numbers of the `ShotSet` **shotnum** that are
+    recorded in the "simple" dataset **dset** and their dataset
+    indices, such that::
+
+        shotnum_recorded = dset[index, shotnumkey]
+
+    For a `~bapsflib._hdf.maps.layouts.LayoutType.sequential`
+    **layout** the shot number ranges of **shotnum** are resolved
+    without expanding them, and a contiguous run of recorded shot
+    numbers is returned as a `slice` (hyperslab) **index**.  For any
+    other layout **shotnum** is expanded and passed to
+    :func:`build_sndr_for_simple_dset`.
+
+    Parameters
+    ----------
+    shotnum : `~bapsflib._hdf.utils.shotset.ShotSet`
+        desired HDF5 shot numbers
+
+    dset : `h5py.Dataset`
+        dataset containing shot numbers
+
+    shotnumkey : `str`
+        field name in the dataset that contains
+        the shot numbers
+
+    layout : `~bapsflib._hdf.maps.layouts.DsetLayout`, optional
+        the classified layout of **dset**
+
+    Returns
+    -------
+    shotnum : `numpy.ndarray`
+        the shot numbers of **shotnum** recorded in **dset**
+
+    index : Union[`slice`, `numpy.ndarray`]
+        indices of the recorded shot numbers in **dset**
+    """
+    found = None if layout is None else layout.lookup_ranges(shotnum.ranges)
+    if found is not None:
+        sn_ranges, index = found
+        recorded = [np.arange(start, stop, dtype=np.uint32) for start, stop in sn_ranges]
+        return np.concatenate(recorded + [np.empty(0, dtype=np.uint32)]), index
+
+    # irregular layouts need the shot numbers expanded
+    shotnum = shotnum.to_array(dtype=np.uint32)
+    index, sni = build_sndr_for_simple_dset(shotnum, dset, shotnumkey, layout=layout)
+    return shotnum[sni], index
+
+
 def build_sndr_for_complex_dset(
     shotnum: np.ndarray,
     dset: h5py.Dataset,
     shotnumkey: str,
     cmap: ControlMap,
     cconfn: Any,
+    layout: Union[DsetLayout, None] = None,
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compares the **shotnum** numpy array to the specified "complex"
@@ -271,6 +611,10 @@ def build_sndr_for_complex_dset(
     cconfn :
         configuration name for the control device
 
+    layout : `~bapsflib._hdf.maps.layouts.DsetLayout`, optional
+        the classified layout of **dset**, if given and the layout
+        allows it, the indices are found without reading **dset**
+
     Returns
     -------
     index : `numpy.ndarray`
@@ -282,6 +626,12 @@ def build_sndr_for_complex_dset(
     # this is for a dataset that records data for multiple
     # configurations
     #
+    # use the fast look-up of the classified layout
+    if layout is not None:
+        found = layout.lookup(shotnum, cconfn)
+        if found is not None:
+            return found
+
     # Initialize some vals
     n_configs = len(cmap.configs)
 
@@ -361,7 +711,7 @@ def build_sndr_for_complex_dset(
             index = (n_configs * index) + config_subindex
 
             # build sni and filter index
-            sni = np.where(index < dset.shape[0], True, False)
+            sni = np.where((index >= 0) & (index < dset.shape[0]), True, False)
             index = index[sni]
         else:
             # shot numbers are NOT sequential
@@ -535,9 +885,69 @@ def condition_controls(hdf_file: File, controls: Any) -> List[Tuple[str, Any]]:
     return controls
 
 
+def condition_out(out: Any, shape: Tuple[int], dtype, zeroed=False) -> np.ndarray:
+    """
+    Conditions the ``out`` argument (a caller-supplied output buffer)
+    for :class:`~.hdfreadcontrols.HDFReadControls` and
+    :class:`~.hdfreaddata.HDFReadData`.
+
+    Parameters
+    ----------
+    out : `numpy.ndarray`
+        the output buffer, a 1D structured array of dtype **dtype**
+        with at least ``shape[0]`` entries
+
+    shape : Tuple[int]
+        shape of the array to be read
+
+    dtype : `numpy.dtype`
+        dtype of the array to be read
+
+    zeroed : `bool`, optional
+        `True` to zero the returned array (DEFAULT `False`)
+
+    Returns
+    -------
+    `numpy.ndarray`
+        the first ``shape[0]`` entries of **out**, as a plain
+        `numpy.ndarray` view (i.e. sharing memory with **out**)
+
+    Examples
+    --------
+
+    >>> dtype, shape = f.read_data_spec(0, 0, shotnum=[1, 2])
+    >>> out = np.empty(shape, dtype=dtype)
+    >>> data = f.read_data(0, 0, shotnum=[1, 2], out=out)
+    >>> np.shares_memory(data, out)
+    True
+    """
+    if not isinstance(out, np.ndarray):
+        raise TypeError(f"`out` must be a numpy.ndarray, got type {type(out)}.")
+    elif out.dtype != np.dtype(dtype):
+        raise ValueError(
+            f"`out` has dtype {out.dtype}, but the read requires dtype "
+            f"{np.dtype(dtype)}."
+        )
+    elif out.ndim != 1 or out.shape[0] < shape[0]:
+        raise ValueError(
+            f"`out` has shape {out.shape}, but the read requires a 1D array "
+            f"with at least {shape[0]} entries."
+        )
+    elif not out.flags.writeable:
+        raise ValueError("`out` is read-only.")
+
+    data = out.view(np.ndarray)[: shape[0]]
+    if zeroed:
+        data[...] = np.zeros((), dtype=data.dtype)
+    return data
+
+
 def condition_shotnum(
-    shotnum: Any, dset_dict: Dict[str, h5py.Dataset], shotnumkey_dict: Dict[str, str]
-) -> np.ndarray:
+    shotnum: Any,
+    dset_dict: Dict[str, h5py.Dataset],
+    shotnumkey_dict: Dict[str, str],
+    keep_ranges: bool = False,
+) -> Union[np.ndarray, ShotSet]:
     r"""
     Conditions the **shotnum** argument for
     :class:`~bapsflib._hdf.utils.hdfreadcontrols.HDFReadControls` and
@@ -555,16 +965,22 @@ def condition_shotnum(
         dictionary of the shot number field name for each control
         dataset in dset_dict
 
+    keep_ranges : `bool`
+        if `True`, a `~bapsflib._hdf.utils.shotset.ShotSet` **shotnum**
+        is returned as a conditioned `ShotSet` instead of being
+        expanded into an array (DEFAULT `False`)
+
     Returns
     -------
-    `numpy.ndarray`
-        conditioned ``shotnum`` numpy array
+    Union[`numpy.ndarray`, `~bapsflib._hdf.utils.shotset.ShotSet`]
+        conditioned ``shotnum`` numpy array (or `ShotSet` for
+        ``keep_ranges=True``)
 
 
     .. admonition:: Condition Criteria
 
         #. Input **shotnum** should be
-           ``Union[int, List[int,...], slice, np.ndarray]``
+           ``Union[int, List[int,...], slice, np.ndarray, ShotSet]``
         #. Any :math:`\mathbf{shotnum} \le 0` will be removed.
         #. A `ValueError` will be thrown if the conditioned array is
            NULL.
@@ -574,6 +990,7 @@ def condition_shotnum(
     # 2. slice() object
     # 3. List[int, ...]
     # 4. np.array (dtype = np.integer and ndim = 1)
+    # 5. ShotSet
     #
     # Catch each `shotnum` type and convert to numpy array
     #
@@ -588,24 +1005,24 @@ def condition_shotnum(
 
     elif isinstance(shotnum, list):
         # ensure all elements are int
-        if not all(isinstance(sn, int) for sn in shotnum):
-            raise ValueError("Valid `shotnum` not passed. All values NOT int.")
-
-        # remove shot numbers <= 0
-        shotnum.sort()
-        shotnum = list(set(shotnum))
-        shotnum.sort()
-        if min(shotnum) <= 0:
-            # remove values less-than or equal to 0
-            new_sn = [sn for sn in shotnum if sn > 0]
-            shotnum = new_sn
+        # - a list of Python int's converts to an integer array, so
+        #   only fall back to checking each element otherwise
+        arr = np.asarray(shotnum) if len(shotnum) != 0 else np.array([], dtype=int)
+        if not np.issubdtype(arr.dtype, np.integer) or arr.ndim != 1:
+            if not all(isinstance(sn, int) for sn in shotnum):
+                raise ValueError("Valid `shotnum` not passed. All values NOT int.")
+            arr = np.array([int(sn) for sn in shotnum], dtype=np.int64)
+
+        # sort, remove duplicates, and remove shot numbers <= 0
+        shotnum = np.unique(arr)
+        shotnum = shotnum[shotnum > 0]
 
         # ensure not NULL
-        if len(shotnum) == 0:
+        if shotnum.size == 0:
             raise ValueError("Valid `shotnum` not passed. Resulting array would be NULL")
 
         # convert
-        shotnum = np.array(shotnum, dtype=np.uint32)
+        shotnum = shotnum.astype(np.uint32)
 
     elif isinstance(shotnum, slice):
         # determine largest possible shot number
@@ -630,6 +1047,18 @@ def condition_shotnum(
         if shotnum.size == 0:
             raise ValueError("Valid `shotnum` not passed. Resulting array would be NULL")
 
+    elif isinstance(shotnum, ShotSet):
+        # remove shot numbers <= 0
+        shotnum = shotnum.clip(lower=1)
+
+        # ensure not NULL
+        if not shotnum:
+            raise ValueError("Valid `shotnum` not passed. Resulting array would be NULL")
+
+        # convert
+        if not keep_ranges:
+            shotnum = shotnum.to_array(dtype=np.uint32)
+
     elif isinstance(shotnum, np.ndarray):
         if shotnum.ndim != 1:
             shotnum = shotnum.squeeze()
@@ -691,25 +1120,113 @@ def do_shotnum_intersection(
     index_dict : `IndexDict`
         intersected and re-calculated arrays of ``index`` indexing
         values for each dataset
+
+    Notes
+    -----
+    Since every **sni** array masks the same **shotnum** array, the
+    intersection is the logical AND of all **sni** arrays and the
+    **index** array of each dataset is filtered by the intersection
+    mask restricted to its own **sni**.  This is a single linear pass
+    per dataset with no sorting or set look-ups.
     """
     # intersect shot numbers
-    shotnum_intersect = shotnum
+    mask = np.ones(shotnum.shape, dtype=bool)
     for sni in sni_dict.values():
-        shotnum_intersect = np.intersect1d(
-            shotnum_intersect, shotnum[sni], assume_unique=True
-        )
-    if shotnum_intersect.shape[0] == 0:
+        mask &= sni
+    n_intersect = np.count_nonzero(mask)
+    if n_intersect == 0:
         raise ValueError("Input `shotnum` would result in a NULL array")
 
     # now filter
+    # - index[ii] corresponds to the ii-th True entry of sni
     for cname in index_dict:
         sni = sni_dict[cname]
-        mask_for_index = np.isin(shotnum[sni], shotnum_intersect)
-        index_dict[cname] = index_dict[cname][mask_for_index]
-        sni_dict[cname] = np.ones(shotnum_intersect.shape, dtype=bool)
+        index_dict[cname] = index_dict[cname][mask[sni]]
+        sni_dict[cname] = np.ones(n_intersect, dtype=bool)
 
     # update shotnum
-    shotnum = shotnum_intersect
+    shotnum = shotnum[mask]
 
     # return
     return shotnum, sni_dict, index_dict
+
+
+def do_shotnum_union(
+    shotnum: np.ndarray, sni_dict: IndexDict, index_dict: IndexDict
+) -> Tuple[np.ndarray, IndexDict, IndexDict]:
+    """
+    Reduces **shotnum** to the shot numbers recorded in at least one
+    of the datasets, i.e. drops the shot numbers no dataset recorded.
+
+    .. admonition:: Recall Array Relationship
+
+        .. code-block:: python
+
+            shotnum[sni] = dset[index, shotnumkey]
+
+    Parameters
+    ----------
+    shotnum : :term:`array_like`
+        desired HDF5 shot numbers
+
+    sni_dict : `IndexDict`
+        dictionary of all dataset **sni** arrays
+
+    index_dict : `IndexDict`
+        dictionary of all dataset **index** arrays
+
+    Returns
+    -------
+    shotnum : `numpy.ndarray`
+        reduced array of shot numbers (can be empty)
+
+    sni_dict : `IndexDict`
+        re-calculated arrays of ``sni`` indexing values for each
+        dataset, these are the per-dataset masks of the recorded shot
+        numbers
+
+    index_dict : `IndexDict`
+        arrays of ``index`` indexing values for each dataset
+        (unchanged)
+    """
+    # shot numbers recorded in any dataset
+    mask = np.zeros(shotnum.shape, dtype=bool)
+    for sni in sni_dict.values():
+        mask |= sni
+
+    # every recorded shot number is kept, so only `sni` changes
+    sni_dict = {cname: sni[mask] for cname, sni in sni_dict.items()}
+    shotnum = shotnum[mask]
+
+    return shotnum, sni_dict, index_dict
+
+
+def sorted_isin(element: np.ndarray, test_elements: np.ndarray) -> np.ndarray:
+    """
+    Equivalent to `numpy.isin` for a **sorted** **test_elements** array
+    (e.g. a column of returned shot numbers), using a binary search
+    instead of sorting both arrays.
+
+    Parameters
+    ----------
+    element : `numpy.ndarray`
+        input array
+
+    test_elements : `numpy.ndarray`
+        sorted 1D array of values to test each value of **element**
+        against
+
+    Returns
+    -------
+    `numpy.ndarray`
+        boolean array of the same shape as **element** that is `True`
+        where an element of **element** is in **test_elements**
+    """
+    element = np.asarray(element)
+    test_elements = np.asarray(test_elements)
+    if test_elements.size == 0:
+        return np.zeros(element.shape, dtype=bool)
+
+    ii = np.searchsorted(test_elements, element)
+    np.minimum(ii, test_elements.size - 1, out=ii)
+    return test_elements[ii] == element
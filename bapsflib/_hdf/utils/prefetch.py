@@ -0,0 +1,399 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing the read-ahead block iterator
+`~bapsflib._hdf.utils.prefetch.PrefetchReader`.
+"""
+__all__ = ["PrefetchReader"]
+
+import inspect
+import multiprocessing
+import numpy as np
+import warnings
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Tuple, Type, Union
+
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.helpers import condition_shotnum, MAX_READ_BLOCK_BYTES
+from bapsflib._hdf.utils.sharedmem import SharedArray
+from bapsflib.utils.warnings import BaPSFWarning
+
+#: default memory budget (in bytes) for prefetched blocks
+MAX_PREFETCH_BYTES = 512 * 1024 * 1024
+
+#: HDF5 file opened by the read-ahead worker process
+_worker_file = None  # type: Union[File, None]
+
+
+def _init_worker(file_cls: Type[File], name: str, file_kwargs: Dict[str, Any]):
+    """Open the read-ahead worker process's own handle to the HDF5 file."""
+    global _worker_file
+    _worker_file = file_cls(name, **file_kwargs)
+
+
+def _read_block(board: int, channel: int, shotnum: np.ndarray, kwargs) -> SharedArray:
+    """
+    Read a block in the read-ahead worker process into shared memory
+    and hand the ownership of the block to the calling process.
+    """
+    handle = _worker_file.read_data(
+        board, channel, shotnum=shotnum, shared_memory=True, **kwargs
+    )
+    handle._disown()
+    return handle
+
+
+def _read_shared(
+    method: str, args: Tuple, kwargs: Dict[str, Any], file: Union[File, None] = None
+) -> SharedArray:
+    """
+    Call the reader **method** (e.g. ``"read_msi"``) of **file**
+    (DEFAULT the worker process's file) and hand the ownership of the
+    result (in shared memory) to the calling process.
+    """
+    if file is None:
+        file = _worker_file
+    if method in ("read_controls", "read_data"):
+        handle = getattr(file, method)(*args, shared_memory=True, **kwargs)
+    else:
+        handle = SharedArray.from_array(getattr(file, method)(*args, **kwargs))
+    handle._disown()
+    return handle
+
+
+def _reopen_args(file: File) -> Tuple[Type[File], str, Dict[str, Any]]:
+    """
+    Arguments to re-open **file** (with the same device paths) in the
+    read-ahead worker process.
+    """
+    file_cls = type(file)
+    params = inspect.signature(file_cls.__init__).parameters
+    file_kwargs = {
+        key: val
+        for key, val in (
+            ("control_path", file.CONTROL_PATH),
+            ("digitizer_path", file.DIGITIZER_PATH),
+            ("msi_path", file.MSI_PATH),
+            ("silent", True),
+        )
+        if key in params
+    }
+    return file_cls, file.filename, file_kwargs
+
+
+def _receive(handle: SharedArray) -> HDFReadData:
+    """
+    Copy a block read by the worker process out of shared memory and
+    free the shared-memory block.
+    """
+    handle._adopt()
+    try:
+        data = handle.asarray()
+        block = data.copy()
+        del data
+    finally:
+        handle.close()
+        handle.unlink()
+    return block
+
+
+def _discard(handle: SharedArray):
+    """Free a block read by the worker process that is not received."""
+    handle._adopt()
+    handle.close()
+    handle.unlink()
+
+
+class PrefetchReader:
+    """
+    Iterate over the digitized data of one board and channel in blocks
+    of shot numbers, while the following blocks are read in a
+    background worker process.
+
+    The worker process opens its own handle to the HDF5 file (with the
+    same file class and device paths as **file**), so reading and
+    decompressing the next blocks genuinely overlaps with the caller's
+    processing (:mod:`h5py` holds the GIL while reading, so a
+    background thread would not).  Each block is read into shared
+    memory (see `~bapsflib._hdf.utils.sharedmem.SharedArray`) and
+    copied out of it by the caller, so blocks are not pickled between
+    the processes.  The file must be on disk and readable by another
+    process (i.e. not open for writing).  Starting the worker process
+    (interpreter start-up, imports, and mapping the file) delays the
+    first block by about a couple of seconds, and the overlap needs at
+    least two CPUs, so the read-ahead pays off for long iterations on
+    multi-core machines.
+
+    Each block is the result of
+    :meth:`~bapsflib._hdf.utils.file.File.read_data` for the block's
+    shot numbers (including any ``add_controls`` fields), so the
+    concatenation of all blocks is the same as a single
+    :meth:`~bapsflib._hdf.utils.file.File.read_data` call.  If **msi**
+    diagnostics are specified, they are read once (by the caller's
+    process, while the first blocks are read ahead) and each block is
+    yielded as a ``(data, msi_data)`` tuple, where ``msi_data`` maps
+    the diagnostic names to their rows for the block's shot numbers.
+
+    Examples
+    --------
+
+    >>> f = File('sample.hdf5')
+    >>> with PrefetchReader(f, 1, 1, add_controls=['6K Compumotor'],
+    ...                     depth=2) as blocks:
+    ...     for data in blocks:
+    ...         process(data)   # next blocks are read meanwhile
+    """
+
+    def __init__(
+        self,
+        file: File,
+        board: int,
+        channel: int,
+        shotnum=slice(None),
+        block_size: Union[int, None] = None,
+        depth: int = 2,
+        max_bytes: int = MAX_PREFETCH_BYTES,
+        msi: Union[str, List[str], None] = None,
+        **kwargs,
+    ):
+        """
+        Parameters
+        ----------
+        file : `~bapsflib._hdf.utils.file.File`
+            the opened HDF5 file
+
+        board : `int`
+            analog-digital-converter board number
+
+        channel : `int`
+            analog-digital-converter channel number
+
+        shotnum : Union[int, list(int), slice(), numpy.array], optional
+            HDF5 global shot number(s) to iterate over (DEFAULT
+            all shot numbers of the digitizer dataset)
+
+        block_size : `int`, optional
+            number of shot numbers per block, by default the block
+            size is chosen so a block of the digitizer dataset is about
+            :data:`~bapsflib._hdf.utils.helpers.MAX_READ_BLOCK_BYTES`
+            and aligned to the dataset chunks
+
+        depth : `int`, optional
+            maximum number of blocks read ahead of the caller
+            (DEFAULT ``2``)
+
+        max_bytes : `int`, optional
+            memory budget (in bytes) of the read-ahead blocks, at least
+            one block is always read ahead (DEFAULT
+            :data:`MAX_PREFETCH_BYTES`)
+
+        msi : Union[str, List[str]], optional
+            name(s) of MSI diagnostic(s) to include with each block
+
+        kwargs :
+            keywords passed on to
+            :meth:`~bapsflib._hdf.utils.file.File.read_data` (e.g.
+            ``digitizer``, ``adc``, ``config_name``, ``add_controls``,
+            ``intersection_set``, ``silent``)
+        """
+        if not isinstance(file, File):
+            raise TypeError(f"Expected a bapsflib File object, got type {type(file)}.")
+        elif not isinstance(depth, int) or depth < 1:
+            raise ValueError("`depth` must be a positive integer.")
+        elif not isinstance(max_bytes, (int, np.integer)) or max_bytes <= 0:
+            raise ValueError("`max_bytes` must be a positive integer.")
+        elif block_size is not None and (
+            not isinstance(block_size, (int, np.integer)) or block_size < 1
+        ):
+            raise ValueError("`block_size` must be a positive integer.")
+        for key in ("index", "out", "shared_memory"):
+            if key in kwargs:
+                raise TypeError(f"Keyword `{key}` is not supported.")
+
+        if msi is None:
+            msi = []
+        elif isinstance(msi, str):
+            msi = [msi]
+
+        self._file = file
+        self._board = board
+        self._channel = channel
+        self._depth = depth
+        self._max_bytes = int(max_bytes)
+        self._msi = list(msi)
+        self._kwargs = kwargs
+
+        self._blocks = self._plan_blocks(shotnum, block_size)
+
+        self._executor = None  # type: Union[ProcessPoolExecutor, None]
+        self._pending = deque()  # type: Deque[Future]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self) -> Iterator[Union[HDFReadData, Tuple[HDFReadData, Dict]]]:
+        if self._executor is not None:
+            raise RuntimeError("PrefetchReader can only be iterated over once.")
+
+        # spawn (not fork) the worker so it does not inherit this
+        # process's HDF5 library state and open file handles
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=_reopen_args(self._file),
+        )
+        blocks = iter(self._blocks)
+        block_nbytes = 0
+
+        try:
+            self._read_ahead(blocks, block_nbytes)
+
+            silent = self._kwargs.get("silent", False)
+            msi_data = {
+                name: self._file.read_msi(name, silent=silent) for name in self._msi
+            }
+
+            while self._pending:
+                data = _receive(self._pending.popleft().result())
+                block_nbytes = data.nbytes
+                self._read_ahead(blocks, block_nbytes)
+
+                if self._msi:
+                    data = (
+                        data,
+                        {
+                            name: mdata[np.isin(mdata["shotnum"], data["shotnum"])]
+                            for name, mdata in msi_data.items()
+                        },
+                    )
+                yield data
+        finally:
+            self.close()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    @property
+    def blocks(self) -> List[np.ndarray]:
+        """The shot numbers of each block."""
+        return list(self._blocks)
+
+    def close(self):
+        """
+        Stop the read-ahead worker process and free the blocks it has
+        already read.
+        """
+        if self._executor is None:
+            return
+
+        pending = self._pending
+        self._pending = deque()
+        for future in pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+        for future in pending:
+            if future.cancelled() or future.exception() is not None:
+                continue
+            _discard(future.result())
+
+    def _plan_blocks(self, shotnum, block_size) -> List[np.ndarray]:
+        """Split the requested shot numbers into blocks."""
+        kwargs = self._kwargs
+        _fmap = self._file.file_map
+        digitizer = kwargs.get("digitizer", None)
+        if not bool(_fmap.digitizers):
+            raise ValueError("There are no digitizers in the HDF5 file.")
+        elif digitizer is None:
+            _dmap = _fmap.main_digitizer
+            if _dmap is None:
+                raise ValueError(
+                    "No main digitizer is identified...need to specify `digitizer` kwarg"
+                )
+        else:
+            try:
+                _dmap = _fmap.digitizers[digitizer]
+            except KeyError:
+                raise ValueError(
+                    f"Specified Digitizer '{digitizer}' is not among known "
+                    f"digitizers ({list(_fmap.digitizers)})"
+                )
+
+        name_kwargs = {
+            key: kwargs[key]
+            for key in ("config_name", "adc")
+            if kwargs.get(key, None) is not None
+        }
+        warn_filter = "ignore" if kwargs.get("silent", False) else "default"
+        with warnings.catch_warnings():
+            warnings.simplefilter(warn_filter, category=BaPSFWarning)
+            dname, d_info = _dmap.construct_dataset_name(
+                self._board, self._channel, return_info=True, **name_kwargs
+            )
+            dhname = _dmap.construct_header_dataset_name(
+                self._board, self._channel, **name_kwargs
+            )
+        dpath = f"{_dmap.info['group path']}/"
+        dset = self._file[dpath + dname]
+        dheader = self._file[dpath + dhname]
+        config_name = d_info["configuration name"]
+        shotnumkey = _dmap.configs[config_name]["shotnum"]["dset field"][0]
+
+        # requested shot numbers
+        if isinstance(shotnum, slice) and shotnum == slice(None):
+            shotnum = np.unique(dheader[shotnumkey])
+            shotnum = shotnum[shotnum > 0]
+        else:
+            shotnum = condition_shotnum(shotnum, {"digi": dheader}, {"digi": shotnumkey})
+            if kwargs.get("intersection_set", True):
+                shotnum = shotnum[np.isin(shotnum, dheader[shotnumkey])]
+        if shotnum.size == 0:
+            raise ValueError("No valid shot numbers to iterate over.")
+
+        # block size
+        if block_size is None:
+            chunk_rows = 1 if dset.chunks is None else dset.chunks[0]
+            row_bytes = max(1, dset.dtype.itemsize * int(np.prod(dset.shape[1:])))
+            block_size = max(1, MAX_READ_BLOCK_BYTES // row_bytes)
+            block_size = max(chunk_rows, block_size - block_size % chunk_rows)
+
+        return [
+            shotnum[start : start + block_size]
+            for start in range(0, shotnum.size, block_size)
+        ]
+
+    def _read_ahead(self, blocks: Iterator[np.ndarray], block_nbytes: int):
+        """
+        Queue the next blocks on the worker process, up to ``depth``
+        blocks (+ the block being read) ahead of the caller and within
+        the memory budget.  At least one block is always read ahead,
+        and only one until the size of a block (**block_nbytes**) is
+        known.
+        """
+        while len(self._pending) <= self._depth and (
+            not self._pending
+            or 0 < (len(self._pending) + 1) * block_nbytes <= self._max_bytes
+        ):
+            block = next(blocks, None)
+            if block is None:
+                return
+            self._pending.append(
+                self._executor.submit(
+                    _read_block, self._board, self._channel, block, self._kwargs
+                )
+            )
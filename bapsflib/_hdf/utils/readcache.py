@@ -0,0 +1,271 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing the in-session read result cache
+`~bapsflib._hdf.utils.readcache.ReadCache`.
+"""
+__all__ = ["ReadCache"]
+
+import copy
+import numpy as np
+import threading
+
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple, Union
+
+from bapsflib._hdf.utils.shotset import ShotSet
+
+#: marker for a "read all shot numbers" request
+_ALL = "all"
+
+
+def _freeze(val) -> Hashable:
+    """
+    Convert a read argument into a hashable value.  Raises `TypeError`
+    if that is not possible.
+    """
+    if isinstance(val, slice):
+        return "slice", val.start, val.stop, val.step
+    elif isinstance(val, np.ndarray):
+        return "array", str(val.dtype), val.shape, val.tobytes()
+    elif isinstance(val, (list, tuple)):
+        return type(val).__name__, tuple(_freeze(item) for item in val)
+    elif isinstance(val, np.generic):
+        return val.item()
+
+    hash(val)
+    return val
+
+
+def _condition_shotnum(shotnum) -> Tuple[Any, Union[str, np.ndarray, None]]:
+    """
+    Convert **shotnum** into a hashable key and, if possible, the
+    requested set of shot numbers (`_ALL` or a sorted array).  The
+    set is `None` if it can not be determined without reading the
+    file.
+    """
+    if isinstance(shotnum, slice):
+        if shotnum == slice(None):
+            return _ALL, _ALL
+        return _freeze(shotnum), None
+    elif isinstance(shotnum, (int, np.integer)) and not isinstance(shotnum, bool):
+        shotnum = [shotnum]
+    elif isinstance(shotnum, ShotSet):
+        shotnum = shotnum.to_array()
+
+    if isinstance(shotnum, (list, np.ndarray)):
+        arr = np.asarray(shotnum)
+        if arr.ndim != 1 or not np.issubdtype(arr.dtype, np.integer):
+            raise TypeError("unsupported shotnum")
+        arr = np.unique(arr[arr > 0]).astype(np.uint32)
+        return ("array", arr.tobytes()), arr
+
+    raise TypeError("unsupported shotnum")
+
+
+class ReadCache:
+    """
+    A least-recently-used (LRU) cache of read results, bounded by a
+    memory budget.
+
+    Cached arrays are stored read-only and every request is returned
+    as a read-only view (with its own copy of the ``info`` metadata).
+    A request for a subset of the shot numbers of a cached read (e.g.
+    a smaller ``shotnum`` range) is served out of the cached superset.
+    The cache can be shared between threads.
+
+    Examples
+    --------
+
+    >>> f = File('sample.hdf5')
+    >>> f.enable_read_cache(max_bytes=512 * 1024**2)
+    >>> data = f.read_data(1, 1, shotnum=slice(1, 501))   # read file
+    >>> data = f.read_data(1, 1, shotnum=slice(1, 501))   # from cache
+    >>> data = f.read_data(1, 1, shotnum=[5, 10, 20])     # from cache
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Parameters
+        ----------
+        max_bytes : `int`
+            memory budget (in bytes) of the cache
+        """
+        if not isinstance(max_bytes, (int, np.integer)) or max_bytes <= 0:
+            raise ValueError("`max_bytes` must be a positive integer.")
+
+        self._max_bytes = int(max_bytes)
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.RLock()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def max_bytes(self) -> int:
+        """Memory budget (in bytes) of the cache."""
+        return self._max_bytes
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes currently held by the cache."""
+        return self._nbytes
+
+    @staticmethod
+    def build_key(*args, **kwargs) -> Union[Hashable, None]:
+        """
+        Build a cache key from the read arguments (excluding
+        ``shotnum``).  Returns `None` if the arguments are not
+        cacheable.
+        """
+        try:
+            return _freeze(args), _freeze(tuple(sorted(kwargs.items())))
+        except TypeError:
+            return None
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def get(self, key: Hashable, shotnum, intersection_set=True):
+        """
+        Retrieve a cached read result.
+
+        Parameters
+        ----------
+        key : Hashable
+            cache key as returned by :meth:`build_key`
+
+        shotnum : Union[int, list(int), slice(), numpy.array]
+            requested shot numbers
+
+        intersection_set : `bool`, optional
+            `True` (DEFAULT) if the read was requested as an
+            intersection of shot numbers, `False` for a union
+
+        Returns
+        -------
+        Union[`numpy.ndarray`, `None`]
+            read-only view of the cached result, `None` if the request
+            can not be served from the cache
+        """
+        try:
+            shot_key, requested = _condition_shotnum(shotnum)
+        except TypeError:
+            return None
+
+        with self._lock:
+            return self._get(key, shot_key, requested, intersection_set)
+
+    def _get(self, key, shot_key, requested, intersection_set):
+        """Lookup for :meth:`get`, must be called with the lock held."""
+        # exact match
+        entry = self._entries.get((key, shot_key), None)
+        if entry is not None:
+            self._entries.move_to_end((key, shot_key))
+            self.hits += 1
+            return self._readonly_view(entry[0])
+
+        # serve subset from a cached superset
+        if isinstance(requested, np.ndarray):
+            for (ekey, eshot_key), (data, erequested) in reversed(self._entries.items()):
+                if ekey != key or erequested is None:
+                    continue
+
+                if isinstance(erequested, np.ndarray):
+                    if not np.all(np.isin(requested, erequested, assume_unique=True)):
+                        continue
+                elif not intersection_set and not np.all(
+                    np.isin(requested, data["shotnum"], assume_unique=True)
+                ):
+                    # a union read must contain all requested shots
+                    continue
+
+                mask = np.isin(data["shotnum"], requested, assume_unique=True)
+                if not np.any(mask):
+                    # let the reader raise for a NULL result
+                    return None
+
+                self._entries.move_to_end((ekey, eshot_key))
+                self.hits += 1
+                return self._readonly_view(data[mask])
+
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, shotnum, data: np.ndarray) -> np.ndarray:
+        """
+        Add a read result to the cache.  The result will not be cached
+        if it is larger than the memory budget.  The stored array is
+        made read-only.
+
+        Parameters
+        ----------
+        key : Hashable
+            cache key as returned by :meth:`build_key`
+
+        shotnum : Union[int, list(int), slice(), numpy.array]
+            requested shot numbers
+
+        data : `numpy.ndarray`
+            read result
+
+        Returns
+        -------
+        `numpy.ndarray`
+            read-only view of the cached result, or **data** if it was
+            not cached
+        """
+        try:
+            shot_key, requested = _condition_shotnum(shotnum)
+        except TypeError:
+            return data
+
+        if data.nbytes > self._max_bytes:
+            return data
+
+        with self._lock:
+            return self._put(key, shot_key, requested, data)
+
+    def _put(self, key, shot_key, requested, data):
+        """Insert for :meth:`put`, must be called with the lock held."""
+        full_key = (key, shot_key)
+        if full_key in self._entries:
+            self._nbytes -= self._entries.pop(full_key)[0].nbytes
+
+        # evict least recently used entries
+        while self._nbytes + data.nbytes > self._max_bytes:
+            self._nbytes -= self._entries.popitem(last=False)[1][0].nbytes
+
+        data.flags.writeable = False
+        self._entries[full_key] = (data, requested)
+        self._nbytes += data.nbytes
+
+        return self._readonly_view(data)
+
+    @staticmethod
+    def _readonly_view(data: np.ndarray) -> np.ndarray:
+        """
+        Create a read-only view of **data** with its own copy of the
+        ``info`` metadata.
+        """
+        view = data.view()
+        view.flags.writeable = False
+        if hasattr(data, "_info"):
+            view._info = copy.deepcopy(data._info)
+        if hasattr(data, "_plasma"):
+            view._plasma = data._plasma.copy()
+        return view
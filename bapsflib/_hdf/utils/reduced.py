@@ -0,0 +1,488 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for writing reduced companion HDF5 files that can be re-opened
+with :class:`~bapsflib._hdf.utils.file.File`.
+"""
+__all__ = ["write_reduced"]
+
+import h5py
+import numpy as np
+import os
+import re
+
+from typing import Dict, List, Union
+
+from bapsflib._hdf.maps.digitizers.sis3301 import HDFMapDigiSIS3301
+from bapsflib._hdf.maps.digitizers.siscrate import HDFMapDigiSISCrate
+from bapsflib._hdf.maps.digitizers.templates import HDFMapDigiTemplate
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.helpers import (
+    condition_shotnum,
+    DECIMATE_METHODS,
+    decimate_rows,
+    iter_dset_rows,
+)
+
+#: target size (in bytes) of a dataset chunk in the reduced file
+REDUCED_CHUNK_BYTES = 1024 * 1024
+
+
+class _RowPlan:
+    """
+    Rows of a source dataset to write, and whether the rows are
+    digitized signals (to be time windowed and decimated).
+    """
+
+    __slots__ = ("index", "signal")
+
+    def __init__(self, index: np.ndarray, signal: bool = False):
+        self.index = index
+        self.signal = signal
+
+
+def write_reduced(
+    file: File,
+    name: Union[str, os.PathLike],
+    shotnum=slice(None),
+    digitizers: Union[str, List[str], None] = None,
+    time_window: Union[slice, None] = None,
+    decimate: Union[int, None] = None,
+    decimate_method: str = "boxcar",
+    compression: Union[str, None] = "gzip",
+    compression_opts=None,
+    shuffle: bool = True,
+    overwrite: bool = False,
+) -> str:
+    """
+    Write a reduced copy of **file** that can be re-opened with
+    :class:`~bapsflib._hdf.utils.file.File` (using the same
+    ``control_path``, ``digitizer_path``, and ``msi_path``).
+
+    The whole group tree and all attributes are copied, so the
+    digitizer, control device, and MSI mappings of the reduced file are
+    those of **file**.  The reduction is done by:
+
+    * only keeping the rows of the digitizer, digitizer header, control
+      device, and MSI datasets recorded for the **shotnum** shot
+      numbers,
+    * dropping the digitizers not listed in **digitizers**,
+    * only keeping the **time_window** samples of the digitized
+      signals,
+    * decimating the digitized signals along the time axis, where the
+      digitizer's sample averaging attributes are updated so
+      :attr:`~bapsflib._hdf.utils.hdfreaddata.HDFReadData.dt` of the
+      re-read data is correct, and
+    * writing the reduced datasets chunked by shot number (each chunk
+      holds whole shot records of about :data:`REDUCED_CHUNK_BYTES`)
+      and compressed.
+
+    Every dataset with rows per shot number (digitizer, digitizer
+    header, control device, and MSI datasets) is rewritten this way,
+    even if all shot numbers are kept.  The shots are not averaged,
+    since the reduced file keeps one record per shot number.
+
+    Parameters
+    ----------
+    file : `~bapsflib._hdf.utils.file.File`
+        the opened HDF5 file to be reduced
+
+    name : `str`
+        name (and path) of the reduced HDF5 file
+
+    shotnum : Union[int, list(int), slice(), numpy.array], optional
+        HDF5 global shot number(s) to keep (DEFAULT all shot numbers)
+
+    digitizers : Union[str, List[str]], optional
+        name(s) of the mapped digitizers to keep (DEFAULT all
+        digitizers)
+
+    time_window : `slice`, optional
+        range of the time sample indices of the digitized signals to
+        keep, e.g. ``slice(1000, 5000)`` (DEFAULT all samples)
+
+    decimate : `int`, optional
+        decimation factor applied to the digitized signals (DEFAULT
+        no decimation)
+
+    decimate_method : `str`, optional
+        decimation method (see
+        :func:`~bapsflib._hdf.utils.helpers.decimate_rows`), the
+        ``'boxcar'`` and ``'fir'`` methods store the signals as
+        `numpy.float32` bit values (DEFAULT ``'boxcar'``)
+
+    compression : `str`, optional
+        compression filter of the reduced datasets (DEFAULT
+        ``'gzip'``, use `None` to not compress)
+
+    compression_opts : optional
+        options of the compression filter
+
+    shuffle : `bool`, optional
+        apply the HDF5 shuffle filter to the reduced datasets (DEFAULT
+        `True`)
+
+    overwrite : `bool`, optional
+        overwrite **name** if it already exists (DEFAULT `False`)
+
+    Returns
+    -------
+    `str`
+        the name of the reduced HDF5 file
+
+    Examples
+    --------
+
+    >>> f = File('run42.hdf5')
+    >>> write_reduced(f, 'run42_reduced.hdf5', shotnum=slice(1, 501),
+    ...               time_window=slice(1000, 5000), decimate=4)
+    'run42_reduced.hdf5'
+    >>> fr = File('run42_reduced.hdf5')
+    >>> data = fr.read_data(0, 0, add_controls=['6K Compumotor'])
+
+    .. note::
+
+        The sample averaging of a ``'SIS crate'`` digitizer's SIS 3302
+        boards is stored as a power of 2, so the total sample average
+        after decimation must be a power of 2.  The SIS 3305 boards do
+        not record sample averaging, so their signals can not be
+        decimated (use **digitizers** to drop them).
+
+    .. note::
+
+        The time of the first sample is not recorded in the file, so a
+        **time_window** starting after the first sample shifts the
+        time axis of the re-read signals.
+    """
+    if not isinstance(file, File):
+        raise TypeError(f"Expected a bapsflib File object, got type {type(file)}.")
+
+    # condition digitizers
+    if digitizers is None:
+        digitizers = list(file.digitizers)
+    elif isinstance(digitizers, str):
+        digitizers = [digitizers]
+    for digi_name in digitizers:
+        if digi_name not in file.digitizers:
+            raise ValueError(
+                f"Specified Digitizer '{digi_name}' is not among known "
+                f"digitizers ({list(file.digitizers)})"
+            )
+
+    # condition time window
+    if time_window is not None:
+        if not isinstance(time_window, slice):
+            raise TypeError("Keyword `time_window` must be a slice.")
+        elif time_window.step not in (None, 1):
+            raise ValueError("Keyword `time_window` must have a step of 1.")
+
+    # condition decimation
+    if decimate is not None:
+        if isinstance(decimate, bool) or not isinstance(decimate, (int, np.integer)):
+            raise TypeError("Keyword `decimate` must be an integer.")
+        elif decimate < 1:
+            raise ValueError("Keyword `decimate` must be a positive integer.")
+        elif decimate_method not in DECIMATE_METHODS:
+            raise ValueError(
+                f"Decimation method '{decimate_method}' not in valid methods "
+                f"{DECIMATE_METHODS}."
+            )
+        decimate = int(decimate)
+        if decimate == 1:
+            decimate = None
+
+    name = os.fspath(name)
+    if os.path.exists(name) and not overwrite:
+        raise FileExistsError(f"File '{name}' already exists.")
+
+    plans, skip = _build_row_plans(file, shotnum, digitizers)
+    dset_kwargs = {
+        "compression": compression,
+        "compression_opts": compression_opts,
+        "shuffle": shuffle,
+    }
+
+    dest = h5py.File(name, "w")
+    try:
+        _copy_group(
+            file["/"],
+            dest,
+            plans,
+            skip,
+            time_window,
+            decimate,
+            decimate_method,
+            dset_kwargs,
+        )
+
+        # update sample averaging of the decimated digitizers
+        if decimate is not None:
+            for digi_name in digitizers:
+                _scale_sample_average(dest, file.digitizers[digi_name], decimate)
+    except BaseException:
+        # do not leave a partially written file behind
+        dest.close()
+        os.remove(name)
+        raise
+    dest.close()
+
+    return name
+
+
+def _build_row_plans(file: File, shotnum, digitizers: List[str]):
+    """
+    Build the row plans of the reduced datasets and the set of group
+    paths to skip.
+    """
+    # gather datasets that have rows per shot number
+    # - `sn_dsets` maps a dataset path to its shot number field
+    # - `data_paths` maps a digitizer dataset path to its header path
+    sn_dsets = {}  # type: Dict[str, str]
+    data_paths = {}  # type: Dict[str, str]
+    skip = set()
+    for digi_name, _dmap in file.digitizers.items():
+        if digi_name not in digitizers:
+            skip.add(_dmap.info["group path"])
+            continue
+
+        dpath = _dmap.info["group path"] + "/"
+        for config_name, config in _dmap.configs.items():
+            if not config["active"]:
+                continue
+            sn_field = config["shotnum"]["dset field"][0]
+            for adc in config["adc"]:
+                for brd, chs, _ in config[adc]:
+                    for ch in chs:
+                        dname = _dmap.construct_dataset_name(
+                            brd, ch, config_name=config_name, adc=adc
+                        )
+                        hname = _dmap.construct_header_dataset_name(
+                            brd, ch, config_name=config_name, adc=adc
+                        )
+                        sn_dsets[dpath + hname] = sn_field
+                        data_paths[dpath + dname] = dpath + hname
+
+    for _cmap in file.controls.values():
+        for config in _cmap.configs.values():
+            sn_field = config["shotnum"]["dset field"][0]
+            for path in config["shotnum"]["dset paths"]:
+                sn_dsets[path] = sn_field
+
+    # MSI datasets are aligned with their shot number datasets
+    msi_sn_dsets = {}
+    msi_aligned = {}
+    for _mmap in file.msi.values():
+        config = _mmap.configs
+        sn_paths = config["shotnum"]["dset paths"]
+        sn_field = config["shotnum"]["dset field"][0]
+        for path in sn_paths:
+            msi_sn_dsets[path] = sn_field
+        for key in ("signals", "meta"):
+            for sub_config in config[key].values():
+                if not isinstance(sub_config, dict):
+                    # e.g. configs['meta']['shape']
+                    continue
+                for ii, path in enumerate(sub_config["dset paths"]):
+                    sn_path = sn_paths[min(ii, len(sn_paths) - 1)]
+                    if path not in msi_sn_dsets and (
+                        file[path].shape[:1] == file[sn_path].shape[:1]
+                    ):
+                        msi_aligned[path] = sn_path
+
+    # requested shot numbers
+    keep_all = isinstance(shotnum, slice) and shotnum == slice(None)
+    if not keep_all:
+        shotnum = condition_shotnum(
+            shotnum,
+            {path: file[path] for path in sn_dsets},
+            sn_dsets,
+        )
+
+    plans = {}
+    for path, sn_field in {**sn_dsets, **msi_sn_dsets}.items():
+        if keep_all:
+            index = np.arange(file[path].shape[0])
+        else:
+            index = np.where(np.isin(file[path][sn_field], shotnum))[0]
+        plans[path] = _RowPlan(index)
+    for path, sn_path in msi_aligned.items():
+        plans[path] = _RowPlan(plans[sn_path].index)
+
+    # digitizer datasets are aligned with their header datasets
+    for path, header_path in data_paths.items():
+        plans[path] = _RowPlan(plans[header_path].index, signal=True)
+
+    return plans, skip
+
+
+def _copy_attrs(
+    src: Union[h5py.Group, h5py.Dataset], dest: Union[h5py.Group, h5py.Dataset]
+):
+    """Copy the attributes of **src** to **dest**, keeping their dtype."""
+    for key in src.attrs:
+        dest.attrs.create(key, src.attrs[key], dtype=src.attrs.get_id(key).dtype)
+
+
+def _copy_group(
+    src: h5py.Group,
+    dest: h5py.Group,
+    plans: Dict[str, _RowPlan],
+    skip: set,
+    time_window: Union[slice, None],
+    decimate: Union[int, None],
+    decimate_method: str,
+    dset_kwargs: dict,
+):
+    """
+    Recursively copy **src** to **dest**, writing the datasets in
+    **plans** reduced.
+    """
+    _copy_attrs(src, dest)
+
+    for key in src:
+        link = src.get(key, getlink=True)
+        if isinstance(link, h5py.SoftLink):
+            dest[key] = h5py.SoftLink(link.path)
+            continue
+        elif isinstance(link, h5py.ExternalLink):
+            dest[key] = h5py.ExternalLink(link.filename, link.path)
+            continue
+
+        obj = src[key]
+        if obj.name in skip:
+            continue
+        elif isinstance(obj, h5py.Group):
+            _copy_group(
+                obj,
+                dest.create_group(key),
+                plans,
+                skip,
+                time_window,
+                decimate,
+                decimate_method,
+                dset_kwargs,
+            )
+        elif obj.name in plans:
+            plan = plans[obj.name]
+            _write_rows(
+                obj,
+                dest,
+                key,
+                plan.index,
+                time_window if plan.signal else None,
+                decimate if plan.signal else None,
+                decimate_method,
+                dset_kwargs,
+            )
+        else:
+            src.copy(obj, dest, name=key)
+
+
+def _write_rows(
+    dset: h5py.Dataset,
+    dest: h5py.Group,
+    key: str,
+    index: np.ndarray,
+    time_window: Union[slice, None],
+    decimate: Union[int, None],
+    decimate_method: str,
+    dset_kwargs: dict,
+):
+    """
+    Write rows **index** of **dset** (windowed by **time_window** and
+    decimated by **decimate** along the last axis, if given) to a new
+    chunked dataset **key** of **dest**.
+    """
+    shape = (index.size,) + dset.shape[1:]
+    dtype = dset.dtype
+    if time_window is not None:
+        nt = len(range(*time_window.indices(shape[-1])))
+        if nt == 0:
+            raise ValueError(
+                f"Keyword `time_window` selects no samples of dataset "
+                f"'{dset.name}' ({shape[-1]} samples)."
+            )
+        shape = shape[:-1] + (nt,)
+    if decimate is not None:
+        shape = shape[:-1] + (shape[-1] // decimate,)
+        if decimate_method != "stride":
+            dtype = np.dtype(np.float32)
+
+    row_bytes = max(1, dtype.itemsize * int(np.prod(shape[1:])))
+    chunk_rows = max(1, min(shape[0], REDUCED_CHUNK_BYTES // row_bytes))
+    new_dset = dest.create_dataset(
+        key,
+        shape=shape,
+        dtype=dtype,
+        chunks=(chunk_rows,) + shape[1:],
+        maxshape=(None,) + shape[1:],
+        **dset_kwargs,
+    )
+    _copy_attrs(dset, new_dset)
+
+    for out_sel, block in iter_dset_rows(dset, index):
+        if time_window is not None:
+            block = block[..., time_window]
+        if decimate is not None:
+            block = decimate_rows(block, decimate, method=decimate_method)
+        new_dset[out_sel] = block
+
+
+def _scale_sample_average(dest: h5py.File, _dmap: HDFMapDigiTemplate, factor: int):
+    """
+    Scale the hardware sample averaging recorded in the configuration
+    groups of digitizer **_dmap** by **factor**.
+    """
+    for config_name, config in _dmap.configs.items():
+        if not config["active"]:
+            continue
+        cgroup = dest[config["config group path"]]
+
+        if isinstance(_dmap, HDFMapDigiSIS3301):
+            # stored as a string, e.g. 'Average 4 Samples'
+            for adc in config["adc"]:
+                for _, _, setup in config[adc]:
+                    sample_ave = setup["sample average (hardware)"]
+                    sample_ave = factor * (1 if sample_ave is None else sample_ave)
+                    break
+                else:  # pragma: no cover
+                    continue
+                cgroup.attrs["Samples to average"] = np.bytes_(
+                    f"Average {sample_ave} Samples"
+                )
+        elif isinstance(_dmap, HDFMapDigiSISCrate):
+            if len(config.get("SIS 3305", ())) != 0:
+                raise ValueError(
+                    f"The 'SIS 3305' boards of digitizer '{_dmap.device_name}' "
+                    f"do not record sample averaging, so can not be decimated."
+                )
+
+            # SIS 3302 stores the power of 2
+            for gname in cgroup:
+                if not re.fullmatch(r"SIS crate 3302 configurations\[\d+\]", gname):
+                    continue
+                attrs = cgroup[gname].attrs
+                key = "Sample averaging (hardware)"
+                power = int(attrs[key]) if key in attrs else 0
+                sample_ave = factor * 2**power
+                new_power = int(np.log2(sample_ave))
+                if 2**new_power != sample_ave:
+                    raise ValueError(
+                        f"The 'SIS 3302' sample averaging of digitizer "
+                        f"'{_dmap.device_name}' must be a power of 2, but "
+                        f"decimating by {factor} would give {sample_ave}."
+                    )
+                dtype = attrs.get_id(key).dtype if key in attrs else np.uint32
+                attrs.create(key, new_power, dtype=dtype)
+        else:  # pragma: no cover
+            raise ValueError(
+                f"Decimating digitizer '{_dmap.device_name}' is not supported."
+            )
@@ -0,0 +1,231 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing the shared-memory array handle
+`~bapsflib._hdf.utils.sharedmem.SharedArray`.
+"""
+__all__ = ["SharedArray"]
+
+import copy
+import numpy as np
+import sys
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Set, Tuple, Type, Union
+
+#: names of the shared-memory blocks created by this process (or a
+#: forked parent), these are already tracked by the resource tracker
+_OWNED_NAMES = set()  # type: Set[str]
+
+
+class SharedArray:
+    """
+    A picklable handle to a (structured) numpy array that lives in a
+    `multiprocessing.shared_memory.SharedMemory` block.
+
+    Pickling the handle (e.g. sending it to a `multiprocessing` worker)
+    only transfers the name of the shared-memory block, the array
+    layout, and the array meta-info (e.g. the ``info`` dictionary of
+    :class:`~.hdfreaddata.HDFReadData`).  The worker re-attaches to the
+    block without copying the data.
+
+    The process that created the handle owns the shared-memory block
+    and is responsible for calling :meth:`unlink` once all processes
+    are done with the data.
+
+    Examples
+    --------
+
+    >>> f = File('sample.hdf5')
+    >>> handle = f.read_data(1, 1, shared_memory=True)
+    >>>
+    >>> def fit(args):
+    ...     handle, ii = args
+    ...     data = handle.asarray()  # zero-copy HDFReadData
+    ...     return data['signal'][ii].mean()
+    >>>
+    >>> with multiprocessing.Pool() as pool:
+    ...     results = pool.map(fit, [(handle, ii) for ii in range(10)])
+    >>> handle.unlink()
+    """
+
+    def __init__(self, shape: Union[int, Tuple[int, ...]], dtype, name: str = None):
+        """
+        Parameters
+        ----------
+        shape : Union[int, Tuple[int, ...]]
+            shape of the array
+
+        dtype : `numpy.dtype`
+            data type of the array
+
+        name : `str`, optional
+            name of an existing shared-memory block to attach to, if
+            not given a new block is created
+        """
+        self._shape = (shape,) if isinstance(shape, (int, np.integer)) else tuple(shape)
+        self._dtype = np.dtype(dtype)
+        self._cls = np.ndarray  # type: Type[np.ndarray]
+        self._meta = {}  # type: Dict[str, Any]
+
+        nbytes = max(1, self._dtype.itemsize * int(np.prod(self._shape, dtype=np.int64)))
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._owner = True
+            _OWNED_NAMES.add(self._shm.name)
+        else:
+            self._shm = self._attach(name)
+            self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __getstate__(self):
+        return {
+            "name": self.name,
+            "shape": self._shape,
+            "dtype": self._dtype,
+            "cls": self._cls,
+            "meta": self._meta,
+        }
+
+    def __setstate__(self, state):
+        self._shape = state["shape"]
+        self._dtype = state["dtype"]
+        self._cls = state["cls"]
+        self._meta = state["meta"]
+        self._shm = self._attach(state["name"])
+        self._owner = False
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        """
+        Attach to an existing shared-memory block without registering
+        it with this process's resource tracker (the owning process is
+        responsible for un-linking the block).
+        """
+        if sys.version_info >= (3, 13):  # pragma: no cover
+            return shared_memory.SharedMemory(name=name, track=False)
+
+        shm = shared_memory.SharedMemory(name=name)
+        if name in _OWNED_NAMES:
+            # same resource tracker as the owner, do not unregister
+            return shm
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:  # pragma: no cover
+            pass
+        return shm
+
+    def _adopt(self):
+        """
+        Take over the ownership of a shared-memory block released by
+        another process with :meth:`_disown`.  This process is then
+        responsible for un-linking the block.
+        """
+        resource_tracker.register(self._shm._name, "shared_memory")
+        if sys.version_info >= (3, 13):  # pragma: no cover
+            self._shm._track = True
+        _OWNED_NAMES.add(self.name)
+        self._owner = True
+
+    def _disown(self):
+        """
+        Release the ownership of the shared-memory block so it can be
+        handed to another process (see :meth:`_adopt`).  The block is
+        no longer un-linked if this process exits.
+        """
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        if sys.version_info >= (3, 13):  # pragma: no cover
+            self._shm._track = False
+        _OWNED_NAMES.discard(self.name)
+        self._owner = False
+
+    @classmethod
+    def from_array(cls, arr: np.ndarray) -> "SharedArray":
+        """
+        Create a handle by copying **arr** (and its meta-info) into a
+        new shared-memory block.
+        """
+        handle = cls(arr.shape, arr.dtype)
+        handle.asarray(with_meta=False)[...] = arr
+        handle.set_meta(arr)
+        return handle
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Data type of the shared array."""
+        return self._dtype
+
+    @property
+    def name(self) -> str:
+        """Name of the shared-memory block."""
+        return self._shm.name
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of the shared array."""
+        return self._shape
+
+    def asarray(self, with_meta=True) -> np.ndarray:
+        """
+        Return the shared data as a numpy array without copying.
+
+        Parameters
+        ----------
+        with_meta : `bool`, optional
+            `True` (DEFAULT) to return the array as the type it was
+            created from (e.g. :class:`~.hdfreaddata.HDFReadData`) with
+            its meta-info restored, `False` to return a plain
+            `numpy.ndarray`
+        """
+        arr = np.ndarray(self._shape, dtype=self._dtype, buffer=self._shm.buf)
+        if not with_meta or self._cls is np.ndarray:
+            return arr
+
+        arr = arr.view(self._cls)
+        for attr, val in self._meta.items():
+            setattr(arr, attr, copy.copy(val))
+        return arr
+
+    def set_meta(self, arr: np.ndarray):
+        """
+        Record the array type and meta-info (the ``_info`` and
+        ``_plasma`` attributes) of **arr** so they can be restored by
+        :meth:`asarray`.
+        """
+        self._cls = type(arr)
+        self._meta = {
+            attr: getattr(arr, attr)
+            for attr in ("_info", "_plasma")
+            if hasattr(arr, attr)
+        }
+
+    def close(self):
+        """
+        Close this process's access to the shared-memory block.  All
+        arrays returned by :meth:`asarray` must be deleted first.
+        """
+        self._shm.close()
+
+    def unlink(self):
+        """
+        Free the shared-memory block.  This should only be called once,
+        by the process that created the handle, after all processes are
+        done with the data.
+        """
+        self._shm.unlink()
+        _OWNED_NAMES.discard(self._shm.name)
@@ -0,0 +1,350 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing `~bapsflib._hdf.utils.shotreader.ShotReader`, a
+pre-bound reader for reading one (or a few) shots of a digitizer
+channel with minimal overhead (e.g. for live displays).
+"""
+__all__ = ["ShotReader"]
+
+import numpy as np
+
+from typing import Tuple, Union
+from warnings import warn
+
+from bapsflib._hdf.maps.layouts import classify_dset_layout
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import (
+    _data_dtype,
+    _data_info,
+    _fill_signal,
+    _plasma_info,
+    _signal_dtype,
+    _voltage_scale,
+    HDFReadData,
+)
+from bapsflib._hdf.utils.helpers import build_sndr_for_simple_dset, condition_controls
+from bapsflib.utils.frozen import CopyOnWriteDict, freeze
+from bapsflib.utils.warnings import BaPSFWarning
+
+
+class ShotReader:
+    """
+    Reader of individual shots of one digitizer channel.
+
+    Everything that :class:`~.hdfreaddata.HDFReadData` determines on
+    every read (digitizer look-up, dataset names, control conditioning,
+    voltage scaling, and the ``info`` metadata) is determined once when
+    the reader is created.  A :meth:`read` then only looks up the rows
+    of the requested shot numbers and reads those rows.
+
+    The returned arrays are the same as ``File.read_data(board,
+    channel, shotnum=shotnum, add_controls=add_controls)`` would return
+    (with ``intersection_set=True``).  Datasets that grow while the file
+    is open (i.e. a file that is still being written) are supported,
+    newly recorded shot numbers are found on the next :meth:`read`.
+
+    Examples
+    --------
+
+    >>> reader = f.shot_reader(0, 0, add_controls=['6K Compumotor'])
+    >>> data = reader.read(42)
+    >>> data['shotnum']
+    array([42], dtype=uint32)
+    >>> newest = reader.latest()
+    """
+
+    def __init__(
+        self,
+        hdf_file: File,
+        board: int,
+        channel: int,
+        digitizer=None,
+        config_name=None,
+        adc=None,
+        keep_bits=False,
+        add_controls=None,
+        out_dtype=None,
+    ):
+        """
+        Parameters
+        ----------
+        hdf_file : `~bapsflib._hdf.utils.file.File`
+            HDF5 file object
+
+        board : `int`
+            analog-digital-converter board number
+
+        channel : `int`
+            analog-digital-converter channel number
+
+        digitizer : `str`, optional
+            name of the digitizer
+
+        config_name : `str`, optional
+            name of the digitizer configuration
+
+        adc : `str`, optional
+            name of the digitizer's analog-digital converter
+
+        keep_bits : `bool`, optional
+            `True` to keep the digitizer signal in bits, `False`
+            (DEFAULT) to convert the digitizer signal to voltage
+
+        add_controls : List[Union[str, Tuple[str, Any]]], optional
+            a list of strings and/or 2-element tuples indicating the
+            control device(s) to attach (see
+            :func:`~.helpers.condition_controls` for details)
+
+        out_dtype : `numpy.dtype`, optional
+            floating point dtype of the ``'signal'`` field (DEFAULT
+            `numpy.float32`), can not be used with ``keep_bits=True``
+        """
+        # ---- Condition hdf_file                                   ----
+        if not isinstance(hdf_file, File):
+            raise TypeError(
+                f"`hdf_file` is NOT type `{File.__module__}.{File.__qualname__}`"
+            )
+        self._hdf_file = hdf_file
+        _fmap = hdf_file.file_map
+
+        # ---- Condition `add_controls`                             ----
+        if bool(add_controls) and not bool(_fmap.controls):
+            raise ValueError("There are no control devices in the HDF5 file.")
+        if bool(add_controls):
+            self._controls = condition_controls(hdf_file, add_controls)
+        else:
+            self._controls = []
+
+        # ---- Condition `digitizer`                                ----
+        if not bool(_fmap.digitizers):
+            raise ValueError("There are no digitizers in the HDF5 file.")
+        elif digitizer is None:
+            if not bool(_fmap.main_digitizer):
+                raise ValueError(
+                    "No main digitizer is identified..."
+                    "need to specify `digitizer` kwarg"
+                )
+
+            why = (
+                f"Digitizer not specified so assuming the 'main_digitizer' "
+                f"({_fmap.main_digitizer.device_name}) defined in the mappings."
+            )
+            warn(why, BaPSFWarning)
+            _dmap = _fmap.main_digitizer
+        else:
+            try:
+                _dmap = _fmap.digitizers[digitizer]
+            except KeyError:
+                raise ValueError(
+                    f"Specified Digitizer '{digitizer}' is not among known "
+                    f"digitizers ({list(_fmap.digitizers)})"
+                )
+
+        # ---- Gather digitizer dataset info                        ----
+        kwargs = {"return_info": True}
+        if config_name is not None:
+            kwargs["config_name"] = config_name
+        if adc is not None:
+            kwargs["adc"] = adc
+        dname, d_info = _dmap.construct_dataset_name(board, channel, **kwargs)
+        dhname = _dmap.construct_header_dataset_name(board, channel, **kwargs)
+        dpath = f"{_dmap.info['group path']}/"
+        self._dset = hdf_file.get(dpath + dname)
+        self._dheader = hdf_file.get(dpath + dhname)
+
+        if config_name is None:
+            config_name = _dmap.active_configs[0]
+        self._shotnumkey = _dmap.configs[config_name]["shotnum"]["dset field"][0]
+
+        # shot number layout of the header dataset
+        # - re-classified when the dataset grows
+        self._layout = _dmap.dset_layout(self._dheader, self._shotnumkey)
+        self._layout_nrows = self._dheader.shape[0]
+
+        # ---- Condition `out_dtype`                                ----
+        sigtype = _signal_dtype(self._dset.dtype, out_dtype, keep_bits)
+
+        # ---- Voltage scaling                                      ----
+        # scale is (dv, offset) with signal = dv * bits - offset
+        voffset, self._scale = _voltage_scale(self._dheader, d_info["bit"], keep_bits)
+
+        # ---- Pre-load control data                                ----
+        if len(self._controls) != 0:
+            cdata = HDFReadControls(
+                hdf_file, self._controls, assume_controls_conditioned=True
+            )
+            controls_info = freeze(
+                {cname: dict(cinfo) for cname, cinfo in cdata.info["controls"].items()}
+            )
+            self._cdata = cdata.view(np.ndarray)
+        else:
+            controls_info = {}
+            self._cdata = None
+
+        # ---- Define dtype                                         ----
+        self._dtype = _data_dtype(
+            sigtype,
+            self._dset.shape[1],
+            cdtype=None if self._cdata is None else self._cdata.dtype,
+        )
+
+        # ---- Define meta-info                                     ----
+        self._info = _data_info(
+            hdf_file, _dmap, dpath + dname, d_info, board, channel, voffset, self._scale
+        )
+        self._info["controls"] = controls_info
+        self._plasma = _plasma_info()
+
+    @property
+    def info(self):
+        """
+        The ``info`` metadata attached to every read array (see
+        :attr:`.hdfreaddata.HDFReadData.info`).
+        """
+        return self._info
+
+    def _find_rows(self, shotnum: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the header dataset rows of the sorted shot numbers
+        **shotnum**.  Returns the found shot numbers and their rows.
+        """
+        dheader = self._dheader
+        nrows = dheader.shape[0]
+        if nrows != self._layout_nrows:
+            # the dataset grew since the last read
+            self._layout = classify_dset_layout(dheader, self._shotnumkey)
+            self._layout_nrows = nrows
+
+        index, sni = build_sndr_for_simple_dset(
+            shotnum, dheader, self._shotnumkey, layout=self._layout
+        )
+        return shotnum[sni], index
+
+    def _find_controls(self, shotnum: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the pre-loaded control data of the sorted shot numbers
+        **shotnum**.  Shot numbers that are not pre-loaded are read
+        from the control datasets (and added to the pre-loaded data).
+        Returns the mask of found shot numbers and their control data.
+        """
+        found, pos = self._search_controls(shotnum)
+        if not np.all(found):
+            try:
+                new_cdata = HDFReadControls(
+                    self._hdf_file,
+                    self._controls,
+                    assume_controls_conditioned=True,
+                    shotnum=shotnum[~found],
+                )
+            except ValueError:
+                # none of the shot numbers are recorded
+                new_cdata = None
+            if new_cdata is not None and new_cdata.size != 0:
+                cdata = np.concatenate((self._cdata, new_cdata.view(np.ndarray)))
+                self._cdata = cdata[np.argsort(cdata["shotnum"], kind="stable")]
+                found, pos = self._search_controls(shotnum)
+
+        return found, self._cdata[pos[found]]
+
+    def _search_controls(self, shotnum: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the pre-loaded control data for the shot numbers
+        **shotnum**.  Returns the mask of found shot numbers and their
+        position in the pre-loaded data.
+        """
+        cdata_sn = self._cdata["shotnum"]
+        pos = np.searchsorted(cdata_sn, shotnum)
+        if cdata_sn.size == 0:
+            return np.zeros(shotnum.shape, dtype=bool), pos
+        found = cdata_sn[np.minimum(pos, cdata_sn.size - 1)] == shotnum
+        found &= pos < cdata_sn.size
+        return found, pos
+
+    def latest(self, n=1) -> HDFReadData:
+        """
+        Read the **n** most recently recorded shots (DEFAULT 1).  Shots
+        that do not have control data (e.g. it is not written yet) are
+        not returned.
+        """
+        if isinstance(n, (bool, np.bool_)) or not isinstance(n, (int, np.integer)):
+            raise TypeError(f"`n` must be an integer, got type {type(n)}.")
+        elif n < 1:
+            raise ValueError(f"`n` must be >= 1, got {n}.")
+
+        nrows = self._dheader.shape[0]
+        if nrows == 0:
+            return self.read([])
+        shotnum = self._dheader[max(nrows - n, 0) : nrows, self._shotnumkey]
+        return self.read(shotnum)
+
+    def read(self, shotnum) -> HDFReadData:
+        """
+        Read the shot number(s) **shotnum**.
+
+        Parameters
+        ----------
+        shotnum : Union[int, List[int], numpy.ndarray]
+            HDF5 file shot number(s).  Only shot numbers recorded by
+            the digitizer (and the control devices) are returned.
+
+        Returns
+        -------
+        `~.hdfreaddata.HDFReadData`
+            the read data, in the same form as returned by
+            :meth:`~bapsflib._hdf.utils.file.File.read_data`
+        """
+        # ---- Condition shotnum                                    ----
+        shotnum = np.asarray(shotnum)
+        if shotnum.size == 0:
+            shotnum = np.empty(0, dtype=np.int64)
+        elif shotnum.dtype.kind not in "iu" or shotnum.ndim > 1:
+            raise ValueError("Valid `shotnum` not passed")
+        shotnum = np.unique(shotnum).astype(np.int64, copy=False)
+        shotnum = shotnum[shotnum > 0]
+
+        # ---- Find rows                                            ----
+        shotnum, index = self._find_rows(shotnum)
+        if self._cdata is not None:
+            found, cdata = self._find_controls(shotnum)
+            shotnum = shotnum[found]
+            index = index[found]
+        else:
+            cdata = None
+
+        # ---- Build array                                          ----
+        data = np.empty(shotnum.shape, dtype=self._dtype)
+        data["shotnum"] = shotnum
+
+        # read signal
+        # - consecutive rows are read in one call
+        if index.size != 0:
+            if index[-1] - index[0] + 1 == index.size:
+                bits = self._dset[index[0] : index[-1] + 1, ...]
+            else:
+                bits = self._dset[index.tolist(), ...]
+            _fill_signal(data["signal"], slice(None), bits, self._scale)
+
+        # fill fields related to controls
+        if cdata is None:
+            data["xyz"] = np.nan
+        else:
+            names = cdata.dtype.names
+            data["xyz"] = cdata["xyz"] if "xyz" in names else np.nan
+            for field in names:
+                if field not in ("shotnum", "xyz", "valid"):
+                    data[field] = cdata[field]
+
+        obj = data.view(HDFReadData)
+        obj._info = CopyOnWriteDict(self._info)
+        obj._plasma = self._plasma.copy()
+        return obj
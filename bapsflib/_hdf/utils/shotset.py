@@ -0,0 +1,307 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module containing the `~bapsflib._hdf.utils.shotset.ShotSet` class, a
+compact run-length representation of a selection of shot numbers.
+"""
+__all__ = ["ShotSet"]
+
+import numpy as np
+
+from typing import Any, Iterable, Iterator, Tuple, Union
+
+
+class ShotSet:
+    """
+    An immutable, sorted set of shot numbers stored as run-length
+    ranges.
+
+    Contiguous selections (e.g. ``ShotSet(slice(1, 100001))``) are
+    stored as a single ``[start, stop)`` range, so they are never
+    expanded into per-shot arrays until the dense array is needed
+    (see :meth:`to_array`).  Scattered selections fall back to a dense
+    sorted array, which is more compact than one range per shot.
+
+    A `ShotSet` can be passed as the ``shotnum`` argument of
+    :meth:`~bapsflib._hdf.utils.file.File.read_data`,
+    :meth:`~bapsflib._hdf.utils.file.File.read_controls`, and the
+    helpers in :mod:`~bapsflib._hdf.utils.helpers`.
+
+    Examples
+    --------
+
+    >>> shots = ShotSet(slice(1, 1001)) - ShotSet([10, 11, 12])
+    >>> shots.ranges
+    array([[   1,   10],
+           [  13, 1001]])
+    >>> len(shots)
+    997
+    >>> (shots & ShotSet(slice(5, 15))).to_array()
+    array([ 5,  6,  7,  8,  9, 13, 14], dtype=uint32)
+    """
+
+    def __init__(self, shotnum: Union[int, Iterable[int], slice, np.ndarray, "ShotSet"]):
+        """
+        Parameters
+        ----------
+        shotnum : Union[int, List[int], slice, numpy.ndarray, ShotSet]
+            shot numbers in the set.  A `slice` must have a ``stop``
+            value and a positive ``step``.
+        """
+        if isinstance(shotnum, ShotSet):
+            self._ranges = shotnum._ranges
+            self._dense = shotnum._dense
+            return
+
+        if isinstance(shotnum, slice):
+            if shotnum.stop is None:
+                raise ValueError("A `slice` must define a stop value to build a ShotSet.")
+            start = 0 if shotnum.start is None else shotnum.start
+            step = 1 if shotnum.step is None else shotnum.step
+            if step <= 0:
+                raise ValueError(
+                    "A `slice` must have a positive step to build a ShotSet."
+                )
+            elif step == 1:
+                self._set_ranges(np.array([[start, max(start, shotnum.stop)]]))
+                return
+            shotnum = np.arange(start, shotnum.stop, step)
+        elif isinstance(shotnum, (int, np.integer)) and not isinstance(shotnum, bool):
+            shotnum = [shotnum]
+
+        arr = np.asarray(shotnum)
+        if arr.size == 0:
+            arr = arr.astype(np.int64)
+        if arr.ndim != 1 or not np.issubdtype(arr.dtype, np.integer):
+            raise ValueError("A ShotSet can only be built from integer shot numbers.")
+        self._set_dense(np.unique(arr).astype(np.int64, copy=False))
+
+    @classmethod
+    def from_ranges(
+        cls, ranges: Union[np.ndarray, Iterable[Tuple[int, int]]]
+    ) -> "ShotSet":
+        """
+        Build a `ShotSet` from ``(start, stop)`` ranges (``stop`` is
+        exclusive).  Ranges may be unsorted and may overlap.
+        """
+        ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        obj = cls.__new__(cls)
+        obj._set_ranges(_merge_ranges(ranges))
+        return obj
+
+    def _set_dense(self, arr: np.ndarray):
+        """Store the sorted unique array **arr**, compacted if possible."""
+        # one range per run of consecutive shot numbers
+        ranges = _dense_to_ranges(arr)
+        if 2 * ranges.shape[0] <= arr.size:
+            self._ranges = ranges
+            self._dense = None
+        else:
+            self._ranges = None
+            self._dense = arr
+
+    def _set_ranges(self, ranges: np.ndarray):
+        """
+        Store sorted, non-overlapping, non-adjacent **ranges**, falling
+        back to a dense array if that is more compact.
+        """
+        ranges = ranges[ranges[:, 1] > ranges[:, 0]].astype(np.int64, copy=False)
+        if 2 * ranges.shape[0] > np.sum(ranges[:, 1] - ranges[:, 0]):
+            self._ranges = None
+            self._dense = _ranges_to_dense(ranges)
+        else:
+            self._ranges = ranges
+            self._dense = None
+
+    def __repr__(self):
+        ranges = self.ranges
+        if ranges.shape[0] > 4:
+            body = ", ".join(f"{a}:{b}" for a, b in ranges[:2])
+            body += ", ..., " + ", ".join(f"{a}:{b}" for a, b in ranges[-2:])
+        else:
+            body = ", ".join(f"{a}:{b}" for a, b in ranges)
+        return f"{self.__class__.__name__}([{body}])"
+
+    def __len__(self):
+        if self._dense is not None:
+            return self._dense.size
+        return int(np.sum(self._ranges[:, 1] - self._ranges[:, 0]))
+
+    def __bool__(self):
+        return len(self) != 0
+
+    def __iter__(self) -> Iterator[int]:
+        for start, stop in self.ranges:
+            yield from range(start, stop)
+
+    def __contains__(self, item: Any) -> bool:
+        try:
+            item = int(item)
+        except (TypeError, ValueError):
+            return False
+        if self._dense is not None:
+            ii = np.searchsorted(self._dense, item)
+            return bool(ii < self._dense.size and self._dense[ii] == item)
+        ii = np.searchsorted(self._ranges[:, 0], item, side="right") - 1
+        return bool(ii >= 0 and item < self._ranges[ii, 1])
+
+    def __eq__(self, other):
+        if not isinstance(other, ShotSet):
+            return NotImplemented
+        return np.array_equal(self.ranges, other.ranges)
+
+    def __hash__(self):
+        return hash(self.ranges.tobytes())
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.to_array()
+        return arr if dtype is None else arr.astype(dtype)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    @property
+    def is_contiguous(self) -> bool:
+        """`True` if the set is a single run of consecutive shots."""
+        return self.ranges.shape[0] <= 1
+
+    @property
+    def max(self) -> int:
+        """Largest shot number in the set."""
+        if not self:
+            raise ValueError("ShotSet is empty.")
+        return int(self.ranges[-1, 1] - 1)
+
+    @property
+    def min(self) -> int:
+        """Smallest shot number in the set."""
+        if not self:
+            raise ValueError("ShotSet is empty.")
+        return int(self.ranges[0, 0])
+
+    @property
+    def ranges(self) -> np.ndarray:
+        """
+        Array of shape ``(n_runs, 2)`` of the ``[start, stop)`` ranges
+        of consecutive shot numbers in the set.
+        """
+        if self._ranges is None:
+            return _dense_to_ranges(self._dense)
+        return self._ranges
+
+    def clip(self, lower: Union[int, None] = None, upper: Union[int, None] = None):
+        """
+        Return the shot numbers ``lower <= shotnum < upper`` as a new
+        `ShotSet`.
+        """
+        lower = np.iinfo(np.int64).min if lower is None else lower
+        upper = np.iinfo(np.int64).max if upper is None else upper
+        return self.intersection(ShotSet.from_ranges([(lower, upper)]))
+
+    def difference(self, other) -> "ShotSet":
+        """Shot numbers in this set, but not in **other**."""
+        return _combine(self, ShotSet(other), np.logical_and, invert_b=True)
+
+    def intersection(self, other) -> "ShotSet":
+        """Shot numbers in both this set and **other**."""
+        return _combine(self, ShotSet(other), np.logical_and)
+
+    def to_array(self, dtype=np.uint32) -> np.ndarray:
+        """
+        Expand the set into a sorted array of shot numbers of type
+        **dtype**.
+        """
+        if self._dense is not None:
+            return self._dense.astype(dtype)
+        return _ranges_to_dense(self._ranges).astype(dtype, copy=False)
+
+    def union(self, other) -> "ShotSet":
+        """Shot numbers in either this set or **other**."""
+        return _combine(self, ShotSet(other), np.logical_or)
+
+
+def _dense_to_ranges(arr: np.ndarray) -> np.ndarray:
+    """Convert the sorted unique array **arr** into ``[start, stop)`` ranges."""
+    if arr.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(arr) != 1) + 1
+    starts = arr[np.concatenate(([0], breaks))]
+    stops = arr[np.concatenate((breaks - 1, [arr.size - 1]))] + 1
+    return np.stack((starts, stops), axis=1).astype(np.int64, copy=False)
+
+
+def _ranges_to_dense(ranges: np.ndarray) -> np.ndarray:
+    """Expand sorted ``[start, stop)`` **ranges** into a dense array."""
+    if ranges.shape[0] == 0:
+        return np.empty(0, dtype=np.int64)
+    elif ranges.shape[0] == 1:
+        return np.arange(ranges[0, 0], ranges[0, 1], dtype=np.int64)
+
+    # vectorized concatenation of the aranges of all runs
+    # - a cumulative sum of ones, with each run start stepping over the
+    #   gap to the previous run
+    lengths = ranges[:, 1] - ranges[:, 0]
+    arr = np.ones(int(lengths.sum()), dtype=np.int64)
+    arr[0] = ranges[0, 0]
+    arr[np.cumsum(lengths)[:-1]] = ranges[1:, 0] - ranges[:-1, 1] + 1
+    return np.cumsum(arr)
+
+
+def _merge_ranges(ranges: np.ndarray) -> np.ndarray:
+    """Sort and merge overlapping or adjacent ``[start, stop)`` ranges."""
+    ranges = ranges[ranges[:, 1] > ranges[:, 0]]
+    if ranges.shape[0] <= 1:
+        return ranges
+    ranges = ranges[np.argsort(ranges[:, 0], kind="stable")]
+
+    # a new run starts where its start exceeds all previous stops
+    prev_stop = np.maximum.accumulate(ranges[:, 1])
+    new_run = np.concatenate(([True], ranges[1:, 0] > prev_stop[:-1]))
+    run_id = np.cumsum(new_run) - 1
+    starts = ranges[new_run, 0]
+    stops = np.zeros(starts.size, dtype=np.int64)
+    np.maximum.at(stops, run_id, ranges[:, 1])
+    return np.stack((starts, stops), axis=1)
+
+
+def _combine(a: ShotSet, b: ShotSet, op, invert_b=False) -> ShotSet:
+    """
+    Combine the ranges of **a** and **b** with the boolean operator
+    **op** by sweeping over the elementary intervals between all range
+    boundaries.
+    """
+    ra = a.ranges
+    rb = b.ranges
+    bounds = np.unique(np.concatenate((ra.ravel(), rb.ravel())))
+    if bounds.size < 2:
+        return ShotSet.from_ranges(np.empty((0, 2), dtype=np.int64))
+    starts = bounds[:-1]
+    stops = bounds[1:]
+
+    def covered(ranges, points):
+        # number of range starts minus number of range stops <= point
+        return (
+            np.searchsorted(ranges[:, 0], points, side="right")
+            - np.searchsorted(ranges[:, 1], points, side="right")
+        ) > 0
+
+    in_a = covered(ra, starts)
+    in_b = covered(rb, starts)
+    if invert_b:
+        in_b = np.logical_not(in_b)
+    keep = op(in_a, in_b)
+    return ShotSet.from_ranges(np.stack((starts[keep], stops[keep]), axis=1))
@@ -0,0 +1,443 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for streaming (shot block by shot block) spectral analysis of
+digitizer data.
+"""
+__all__ = ["SpectralAccumulator", "stream_spectra", "stream_spectra_parallel"]
+
+import numpy as np
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from scipy import signal
+from typing import Any, Dict, Hashable, List, Tuple, Type, Union
+
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.helpers import sorted_isin
+from bapsflib._hdf.utils.prefetch import PrefetchReader
+
+
+class SpectralAccumulator:
+    """
+    Accumulates Welch-averaged power spectral densities (and, if a
+    second signal is given, cross-spectral densities) over shots, with
+    memory that is independent of the number of shots.
+
+    Shots can be grouped (e.g. by probe position) by passing a key for
+    each shot to :meth:`add`.  Each group keeps its own running sums.
+
+    Examples
+    --------
+
+    >>> acc = SpectralAccumulator(dt=1e-8, nperseg=512)
+    >>> for data in blocks:
+    ...     keys = [tuple(xyz) for xyz in data['xyz']]
+    ...     acc.add(data['signal'], keys=keys)
+    >>> freqs = acc.freqs
+    >>> psd = acc.psd(key=(0.0, 0.0, 0.0))
+    """
+
+    def __init__(
+        self,
+        dt: float,
+        nperseg: int = 256,
+        noverlap: Union[int, None] = None,
+        window="hann",
+        detrend="constant",
+        scaling="density",
+    ):
+        """
+        Parameters
+        ----------
+        dt : `float`
+            temporal step size (in seconds) of the signals
+
+        nperseg : `int`, optional
+            length of each Welch segment (DEFAULT ``256``)
+
+        noverlap : `int`, optional
+            number of points to overlap between segments (DEFAULT
+            ``nperseg // 2``)
+
+        window : Union[`str`, `tuple`, :term:`array_like`], optional
+            window function, see `scipy.signal.get_window` (DEFAULT
+            ``'hann'``)
+
+        detrend : Union[`str`, `False`], optional
+            how to detrend each segment (DEFAULT ``'constant'``)
+
+        scaling : `str`, optional
+            ``'density'`` (DEFAULT) for a spectral density (V**2/Hz) or
+            ``'spectrum'`` for a power spectrum (V**2)
+        """
+        if not np.isfinite(dt) or dt <= 0:
+            raise ValueError(f"`dt` must be a positive number, got {dt}.")
+        elif not isinstance(nperseg, (int, np.integer)) or nperseg < 1:
+            raise ValueError("`nperseg` must be a positive integer.")
+
+        self._dt = float(dt)
+        self._welch_kwargs = {
+            "fs": 1.0 / self._dt,
+            "window": window,
+            "nperseg": int(nperseg),
+            "noverlap": noverlap,
+            "detrend": detrend,
+            "scaling": scaling,
+            "axis": -1,
+        }
+        self._freqs = None  # type: Union[np.ndarray, None]
+        self._groups = {}  # type: Dict[Hashable, Dict[str, Any]]
+
+    @property
+    def dt(self) -> float:
+        """Temporal step size (in seconds) of the signals."""
+        return self._dt
+
+    @property
+    def freqs(self) -> Union[np.ndarray, None]:
+        """
+        Frequency axis (in Hz) of the spectra, `None` until the first
+        signals are added.
+        """
+        return self._freqs
+
+    def keys(self) -> List[Hashable]:
+        """Keys of the accumulated groups."""
+        return list(self._groups)
+
+    def count(self, key: Hashable = None) -> int:
+        """Number of shots accumulated for group **key**."""
+        return self._get_group(key)["count"]
+
+    def add(self, x: np.ndarray, y: np.ndarray = None, keys=None):
+        """
+        Add the signals of a block of shots.
+
+        Parameters
+        ----------
+        x : `numpy.ndarray`
+            signals of shape ``(nshots, nt)``
+
+        y : `numpy.ndarray`, optional
+            signals of a second channel with the same shape as **x**,
+            used for cross-spectra and coherence
+
+        keys : :term:`array_like`, optional
+            a group key for each shot, if omitted all shots are
+            accumulated in the group `None`
+        """
+        x = np.atleast_2d(x)
+        if y is not None:
+            y = np.atleast_2d(y)
+            if y.shape != x.shape:
+                raise ValueError(
+                    f"`x` and `y` must have the same shape, got {x.shape} "
+                    f"and {y.shape}."
+                )
+        if x.shape[0] == 0:
+            return
+
+        # skip shots that were not recorded (e.g. union reads)
+        valid = np.all(np.isfinite(x), axis=-1)
+        if y is not None:
+            valid &= np.all(np.isfinite(y), axis=-1)
+
+        if keys is None:
+            groups = {None: valid}
+        else:
+            if len(keys) != x.shape[0]:
+                raise ValueError("`keys` must have one entry per shot.")
+            groups = {}
+            for ii, key in enumerate(keys):
+                if valid[ii]:
+                    groups.setdefault(key, []).append(ii)
+
+        for key, rows in groups.items():
+            xg = x[rows]
+            if xg.shape[0] == 0:
+                continue
+
+            freqs, pxx = signal.welch(xg, **self._welch_kwargs)
+            self._check_freqs(freqs)
+            group = self._groups.setdefault(
+                key, {"count": 0, "pxx": 0.0, "pyy": None, "pxy": None}
+            )
+            group["count"] += xg.shape[0]
+            group["pxx"] = group["pxx"] + pxx.sum(axis=0)
+
+            if y is not None:
+                yg = y[rows]
+                _, pyy = signal.welch(yg, **self._welch_kwargs)
+                _, pxy = signal.csd(xg, yg, **self._welch_kwargs)
+                group["pyy"] = pyy.sum(axis=0) + (
+                    0.0 if group["pyy"] is None else group["pyy"]
+                )
+                group["pxy"] = pxy.sum(axis=0) + (
+                    0.0 if group["pxy"] is None else group["pxy"]
+                )
+
+    def merge(self, other: "SpectralAccumulator"):
+        """Add the accumulated sums of **other** to this accumulator."""
+        if other.dt != self.dt or other._welch_kwargs != self._welch_kwargs:
+            raise ValueError("Can only merge accumulators with the same settings.")
+        if other.freqs is not None:
+            self._check_freqs(other.freqs)
+
+        for key, ogroup in other._groups.items():
+            group = self._groups.setdefault(
+                key, {"count": 0, "pxx": 0.0, "pyy": None, "pxy": None}
+            )
+            group["count"] += ogroup["count"]
+            group["pxx"] = group["pxx"] + ogroup["pxx"]
+            for name in ("pyy", "pxy"):
+                if ogroup[name] is not None:
+                    group[name] = ogroup[name] + (
+                        0.0 if group[name] is None else group[name]
+                    )
+
+    def psd(self, key: Hashable = None, channel="x") -> np.ndarray:
+        """
+        Shot averaged power spectral density of group **key** for
+        signal ``'x'`` (DEFAULT) or ``'y'``.
+        """
+        if channel not in ("x", "y"):
+            raise ValueError(f"`channel` must be 'x' or 'y', got '{channel}'.")
+
+        group = self._get_group(key)
+        name = "pxx" if channel == "x" else "pyy"
+        if group[name] is None:
+            raise ValueError("No second channel was accumulated.")
+        return group[name] / group["count"]
+
+    def csd(self, key: Hashable = None) -> np.ndarray:
+        """Shot averaged cross-spectral density of group **key**."""
+        group = self._get_group(key)
+        if group["pxy"] is None:
+            raise ValueError("No second channel was accumulated.")
+        return group["pxy"] / group["count"]
+
+    def coherence(self, key: Hashable = None) -> np.ndarray:
+        """Magnitude squared coherence of group **key**."""
+        pxy = self.csd(key)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.abs(pxy) ** 2 / (self.psd(key, "x") * self.psd(key, "y"))
+
+    def _check_freqs(self, freqs: np.ndarray):
+        if self._freqs is None:
+            self._freqs = freqs
+        elif not np.array_equal(freqs, self._freqs):
+            raise ValueError(
+                "Spectra do not have the same frequency axis as the "
+                "previously accumulated spectra."
+            )
+
+    def _get_group(self, key: Hashable) -> Dict[str, Any]:
+        try:
+            return self._groups[key]
+        except KeyError:
+            raise KeyError(f"No shots were accumulated for group {key}.")
+
+
+def _group_keys(data: np.ndarray, group_by: Union[str, None]):
+    """Build the group keys for the shots of **data**."""
+    if group_by is None:
+        return None
+
+    rows = data[group_by]
+    if rows.ndim == 1:
+        return [None if val != val else val for val in rows.tolist()]
+    return [
+        tuple(None if val != val else val for val in row)
+        for row in rows.reshape(rows.shape[0], -1).tolist()
+    ]
+
+
+def stream_spectra(
+    file: File,
+    board: int,
+    channel: int,
+    cross: Union[Tuple[int, int], None] = None,
+    group_by: Union[str, None] = None,
+    nperseg: int = 256,
+    noverlap: Union[int, None] = None,
+    window="hann",
+    detrend="constant",
+    scaling="density",
+    block_size: Union[int, None] = None,
+    depth: int = 2,
+    **kwargs,
+) -> SpectralAccumulator:
+    """
+    Compute Welch-averaged spectra of a digitizer channel by streaming
+    its shots in blocks (see
+    :class:`~bapsflib._hdf.utils.prefetch.PrefetchReader`), so memory
+    does not grow with the number of shots.
+
+    Parameters
+    ----------
+    file : `~bapsflib._hdf.utils.file.File`
+        the opened HDF5 file
+
+    board : `int`
+        analog-digital-converter board number
+
+    channel : `int`
+        analog-digital-converter channel number
+
+    cross : Tuple[int, int], optional
+        ``(board, channel)`` of a second channel (on the same
+        digitizer) for cross-spectra and coherence
+
+    group_by : `str`, optional
+        field of the read data to group the shots by, e.g. ``'xyz'``
+        for probe position or a control device field added with
+        ``add_controls`` (DEFAULT `None` for no grouping)
+
+    nperseg, noverlap, window, detrend, scaling :
+        Welch parameters, see :class:`SpectralAccumulator`
+
+    block_size, depth :
+        read-ahead parameters, see
+        :class:`~bapsflib._hdf.utils.prefetch.PrefetchReader`
+
+    kwargs :
+        keywords passed on to
+        :meth:`~bapsflib._hdf.utils.file.File.read_data` (e.g.
+        ``digitizer``, ``shotnum``, ``add_controls``)
+
+    Returns
+    -------
+    `SpectralAccumulator`
+        the accumulated spectra, the frequency axis is computed from
+        the ``dt`` of the read data
+
+    Examples
+    --------
+
+    >>> acc = stream_spectra(f, 1, 1, cross=(1, 2), group_by='xyz',
+    ...                      add_controls=['6K Compumotor'])
+    >>> for key in acc.keys():
+    ...     plt.semilogy(acc.freqs, acc.coherence(key))
+    """
+    if group_by in ("shotnum", "signal"):
+        raise ValueError(f"Can not group by field '{group_by}'.")
+
+    shotnum = kwargs.pop("shotnum", slice(None))
+    read_kwargs = kwargs.copy()
+    read_kwargs.pop("add_controls", None)
+    read_kwargs["intersection_set"] = True
+    acc = None  # type: Union[SpectralAccumulator, None]
+
+    with PrefetchReader(
+        file,
+        board,
+        channel,
+        shotnum=shotnum,
+        block_size=block_size,
+        depth=depth,
+        **kwargs,
+    ) as blocks:
+        for data in blocks:
+            if acc is None:
+                if data.dt is None:
+                    raise ValueError(
+                        "Unable to determine the temporal step size `dt` of "
+                        "the digitizer data."
+                    )
+                acc = SpectralAccumulator(
+                    dt=data.dt.to("s").value,
+                    nperseg=nperseg,
+                    noverlap=noverlap,
+                    window=window,
+                    detrend=detrend,
+                    scaling=scaling,
+                )
+
+            if group_by is not None and group_by not in data.dtype.names:
+                raise ValueError(f"Field '{group_by}' not in the read data.")
+
+            ysig = None
+            if cross is not None:
+                ydata = file.read_data(
+                    cross[0], cross[1], shotnum=data["shotnum"], **read_kwargs
+                )
+                data = data[sorted_isin(data["shotnum"], ydata["shotnum"])]
+                ysig = ydata["signal"][sorted_isin(ydata["shotnum"], data["shotnum"])]
+
+            acc.add(data["signal"], ysig, keys=_group_keys(data, group_by))
+
+    if acc is None:
+        raise ValueError("No blocks of digitizer data were read.")
+
+    return acc
+
+
+def _stream_spectra_worker(args):
+    """Worker for :func:`stream_spectra_parallel`."""
+    filename, file_cls, file_kwargs, board, channel, kwargs = args
+    with file_cls(filename, **file_kwargs) as file:
+        return stream_spectra(file, board, channel, **kwargs)
+
+
+def stream_spectra_parallel(
+    filename: str,
+    channels: List[Tuple[int, int]],
+    file_cls: Type[File] = File,
+    file_kwargs: Union[Dict[str, Any], None] = None,
+    n_workers: Union[int, None] = None,
+    **kwargs,
+) -> Dict[Tuple[int, int], SpectralAccumulator]:
+    """
+    Run :func:`stream_spectra` for several channels in parallel worker
+    processes.  Each worker opens its own handle to the file.
+
+    Parameters
+    ----------
+    filename : `str`
+        name (and path) of the HDF5 file
+
+    channels : List[Tuple[int, int]]
+        list of ``(board, channel)`` to analyze
+
+    file_cls : Type[`~bapsflib._hdf.utils.file.File`], optional
+        file class used to open the file (DEFAULT
+        `~bapsflib._hdf.utils.file.File`)
+
+    file_kwargs : Dict[str, Any], optional
+        keywords passed on to **file_cls**
+
+    n_workers : `int`, optional
+        number of worker processes (DEFAULT is the smaller of the
+        number of channels and CPUs), ``1`` runs in this process
+
+    kwargs :
+        keywords passed on to :func:`stream_spectra`
+
+    Returns
+    -------
+    Dict[Tuple[int, int], `SpectralAccumulator`]
+        the accumulated spectra of each channel
+    """
+    if file_kwargs is None:
+        file_kwargs = {}
+    channels = [tuple(brdch) for brdch in channels]
+    if n_workers is None:
+        n_workers = min(len(channels), os.cpu_count() or 1)
+
+    args = [(filename, file_cls, file_kwargs, brd, ch, kwargs) for brd, ch in channels]
+    if n_workers <= 1:
+        results = [_stream_spectra_worker(arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(_stream_spectra_worker, args))
+
+    return dict(zip(channels, results))
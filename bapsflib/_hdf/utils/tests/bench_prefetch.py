@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Benchmark of the read/compute overlap of
+:class:`~bapsflib._hdf.utils.prefetch.PrefetchReader` compared to
+reading the same blocks with
+:meth:`~bapsflib._hdf.utils.file.File.read_data` in the loop.  The
+overlap needs at least two CPUs.
+
+Usage::
+
+    python -m bapsflib._hdf.utils.tests.bench_prefetch [sn_size] [block_size]
+"""
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.prefetch import PrefetchReader
+
+
+def _compute(data):
+    """Stand-in for the caller's (GIL holding) processing of a block."""
+    return sum(float(np.abs(np.fft.rfft(row)).max()) for row in data["signal"])
+
+
+def bench_prefetch(sn_size=4000, block_size=250):
+    """
+    Time iterating over a faux 'SIS 3301' file of **sn_size** shots in
+    blocks of **block_size** shots, with and without read-ahead.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-prefetch_") as tempdir:
+        filename = os.path.join(tempdir, "bench.hdf5")
+        f = FauxHDFBuilder(
+            name=filename,
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": sn_size, "nt": 10000},
+                "Waveform": {"n_configs": 1, "sn_size": sn_size},
+            },
+        )
+        bc_indices = np.where(f.modules["SIS 3301"].knobs.active_brdch)
+        brd, ch = bc_indices[0][0], bc_indices[1][0]
+        f.close()
+
+        kwargs = {"add_controls": ["Waveform"], "silent": True}
+        with File(
+            filename,
+            control_path="Raw data + config",
+            digitizer_path="Raw data + config",
+        ) as bf:
+            reader = PrefetchReader(bf, brd, ch, block_size=block_size, **kwargs)
+            blocks = reader.blocks
+
+            t_read = t_compute = 0.0
+            for block in blocks:
+                tstart = time.perf_counter()
+                data = bf.read_data(brd, ch, shotnum=block, **kwargs)
+                t_read += time.perf_counter() - tstart
+
+                tstart = time.perf_counter()
+                _compute(data)
+                t_compute += time.perf_counter() - tstart
+
+            # the first block includes the start-up of the worker process
+            # (interpreter start-up, imports, and mapping the file)
+            tstart = time.perf_counter()
+            for ii, data in enumerate(reader):
+                if ii == 0:
+                    t_startup = time.perf_counter() - tstart
+                    tstart = time.perf_counter()
+                _compute(data)
+            t_prefetch = time.perf_counter() - tstart
+
+    # compare the blocks after the first one
+    n_blocks = len(blocks)
+    t_serial = (t_read + t_compute) * (n_blocks - 1) / n_blocks
+    print(
+        f"{n_blocks} blocks on {os.cpu_count()} CPU(s): read {t_read:.2f} s"
+        f" + compute {t_compute:.2f} s\n"
+        f"  blocks 2-{n_blocks}: serial {t_serial:.2f} s, PrefetchReader"
+        f" {t_prefetch:.2f} s ({t_serial / t_prefetch:.2f}x)\n"
+        f"  worker start-up (first block): {t_startup:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    bench_prefetch(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Benchmark of the single-shot read latency of
+:meth:`~bapsflib._hdf.utils.file.File.read_data` and
+:meth:`~bapsflib._hdf.utils.shotreader.ShotReader.read`.
+
+Usage::
+
+    python -m bapsflib._hdf.utils.tests.bench_shotreader [sn_size] [repeat]
+"""
+import numpy as np
+import sys
+import time
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+
+
+def _latency(func, shots):
+    """Median latency of ``func(shotnum)`` for each shot number."""
+    times = []
+    for shotnum in shots:
+        tstart = time.perf_counter()
+        func(shotnum)
+        times.append(time.perf_counter() - tstart)
+    return np.median(times)
+
+
+def bench_shotreader(sn_size=1000, repeat=200):
+    """
+    Time single-shot reads of a faux 'SIS 3301' file of **sn_size**
+    shots (with and without the 'Waveform' control), reading
+    **repeat** random shots.
+    """
+    f = FauxHDFBuilder(
+        add_modules={
+            "SIS 3301": {"n_configs": 1, "sn_size": sn_size, "nt": 1000},
+            "Waveform": {"n_configs": 1, "sn_size": sn_size},
+        }
+    )
+    bc_indices = np.where(f.modules["SIS 3301"].knobs.active_brdch)
+    brd, ch = bc_indices[0][0], bc_indices[1][0]
+    shots = np.random.default_rng(0).integers(1, sn_size + 1, repeat).tolist()
+    try:
+        with File(
+            f.filename,
+            control_path="Raw data + config",
+            digitizer_path="Raw data + config",
+        ) as bf:
+            for add_controls in (None, ["Waveform"]):
+                kwargs = {"add_controls": add_controls, "silent": True}
+                reader = bf.shot_reader(brd, ch, **kwargs)
+
+                # warm-up (file pages are cached by the OS)
+                reader.read(shots[0])
+                bf.read_data(brd, ch, shotnum=shots[0], **kwargs)
+
+                t_read_data = _latency(
+                    lambda sn: bf.read_data(brd, ch, shotnum=sn, **kwargs), shots
+                )
+                t_reader = _latency(reader.read, shots)
+                print(
+                    f"controls {str(add_controls):13}: "
+                    f"read_data {t_read_data * 1e3:7.3f} ms  "
+                    f"ShotReader.read {t_reader * 1e3:7.3f} ms  "
+                    f"({t_read_data / t_reader:5.1f}x)"
+                )
+    finally:
+        f.cleanup()
+
+
+if __name__ == "__main__":
+    bench_shotreader(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import asyncio
+import numpy as np
+import os
+import tempfile
+import threading
+import unittest as ut
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.asyncfile import AsyncFile
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
+from bapsflib._hdf.utils.sharedmem import _OWNED_NAMES
+
+
+class TestAsyncFile(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.asyncfile.AsyncFile`."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="asyncfile-test_")
+        self.filenames = []
+        for ii in range(2):
+            filename = os.path.join(self.tempdir.name, f"test{ii}.hdf5")
+            bf = FauxHDFBuilder(
+                name=filename,
+                add_modules={
+                    "SIS 3301": {"n_configs": 1, "sn_size": 20, "nt": 50},
+                    "Waveform": {"n_configs": 1, "sn_size": 20},
+                    "Discharge": {},
+                },
+            )
+            bc_indices = np.where(bf.modules["SIS 3301"].knobs.active_brdch)
+            self.brd = bc_indices[0][0]
+            self.ch = bc_indices[1][0]
+            bf.close()
+            self.filenames.append(filename)
+
+        self.file_kw = {
+            "control_path": "Raw data + config",
+            "digitizer_path": "Raw data + config",
+            "msi_path": "MSI",
+            "silent": True,
+        }
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_raises(self):
+        with self.assertRaises(TypeError):
+            AsyncFile(self.filenames[0])
+
+        with File(self.filenames[0], **self.file_kw) as bf:
+            for val in (0, -1, 1.5):
+                with self.assertRaises(ValueError):
+                    AsyncFile(bf, max_concurrency=val)
+
+            executor = ThreadPoolExecutor(max_workers=1)
+            with self.assertRaises(ValueError):
+                AsyncFile(bf, executor=executor, processes=True)
+            executor.shutdown()
+
+        async def run_out():
+            async with AsyncFile.open(
+                self.filenames[0], processes=True, **self.file_kw
+            ) as af:
+                for key in ("out", "shared_memory"):
+                    with self.assertRaises(TypeError):
+                        await af.read_data(self.brd, self.ch, **{key: True})
+
+        asyncio.run(run_out())
+
+    def test_reads(self):
+        async def run():
+            async with AsyncFile.open(
+                self.filenames[0], **self.file_kw
+            ) as af0, AsyncFile.open(self.filenames[1], **self.file_kw) as af1:
+                self.assertIsInstance(af0.file, File)
+                self.assertEqual(af0.max_concurrency, 2)
+
+                results = await asyncio.gather(
+                    af0.read_data(self.brd, self.ch, silent=True),
+                    af0.read_controls(["Waveform"]),
+                    af0.read_msi("Discharge"),
+                    af1.read_data(self.brd, self.ch, add_controls=["Waveform"]),
+                )
+                file = af0.file
+
+            # files are closed
+            self.assertFalse(bool(file.id.valid))
+            with self.assertRaises(ValueError):
+                await af0.read_msi("Discharge")
+            return results
+
+        data, cdata, mdata, data1 = asyncio.run(run())
+        self.assertIsInstance(data, HDFReadData)
+        self.assertIsInstance(cdata, HDFReadControls)
+        self.assertIsInstance(mdata, HDFReadMSI)
+        self.assertIsInstance(data1, HDFReadData)
+
+        with File(self.filenames[0], **self.file_kw) as bf:
+            ref = bf.read_data(self.brd, self.ch, silent=True)
+        self.assertTrue(np.array_equal(data["signal"], ref["signal"]))
+
+        # errors are propagated
+        async def run_error():
+            af = await AsyncFile.open(self.filenames[0], **self.file_kw)
+            try:
+                await af.read_msi("not a diagnostic")
+            finally:
+                await af.close()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_error())
+
+        # an instance created outside an event loop binds its semaphore
+        # to the loop it is first used in
+        with File(self.filenames[0], **self.file_kw) as bf:
+            af = AsyncFile(bf, max_concurrency=1)
+            self.assertIsNone(af._semaphore)
+
+            async def run_reads():
+                return await asyncio.gather(*[af.read_msi("Discharge") for _ in range(3)])
+
+            results = asyncio.run(run_reads())
+            self.assertEqual(len(results), 3)
+            self.assertIsNotNone(af._semaphore)
+
+    def test_warning_filters(self):
+        """Concurrent reads do not change the warning filters."""
+        filters = list(warnings.filters)
+        executor = ThreadPoolExecutor(max_workers=8)
+
+        async def run():
+            async with AsyncFile.open(
+                self.filenames[0], max_concurrency=8, executor=executor, **self.file_kw
+            ) as af:
+                return await asyncio.gather(
+                    *[
+                        af.read_data(self.brd, self.ch, silent=bool(ii % 2))
+                        for ii in range(8)
+                    ]
+                )
+
+        results = asyncio.run(run())
+        executor.shutdown()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(warnings.filters, filters)
+
+    def test_processes(self):
+        owned = set(_OWNED_NAMES)
+
+        async def run():
+            async with AsyncFile.open(
+                self.filenames[0], max_concurrency=2, processes=True, **self.file_kw
+            ) as af:
+                self.assertTrue(af.processes)
+                self.assertIsInstance(af.executor, ProcessPoolExecutor)
+
+                results = await asyncio.gather(
+                    af.read_data(self.brd, self.ch, add_controls=["Waveform"]),
+                    af.read_controls(["Waveform"]),
+                    af.read_msi("Discharge"),
+                )
+
+                # the result of a cancelled read is freed
+                task = asyncio.ensure_future(af.read_data(self.brd, self.ch))
+                await asyncio.sleep(0)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+                # errors are propagated
+                with self.assertRaises(ValueError):
+                    await af.read_msi("not a diagnostic")
+                file = af.file
+
+            self.assertFalse(bool(file.id.valid))
+            return results
+
+        data, cdata, mdata = asyncio.run(run())
+        self.assertEqual(_OWNED_NAMES, owned)
+
+        with File(self.filenames[0], **self.file_kw) as bf:
+            ref = bf.read_data(self.brd, self.ch, add_controls=["Waveform"])
+            cref = bf.read_controls(["Waveform"])
+            mref = bf.read_msi("Discharge")
+
+        for arr, ref_arr, cls in (
+            (data, ref, HDFReadData),
+            (cdata, cref, HDFReadControls),
+            (mdata, mref, HDFReadMSI),
+        ):
+            self.assertIsInstance(arr, cls)
+            self.assertEqual(arr.dtype, ref_arr.dtype)
+            for field in arr.dtype.names:
+                np.testing.assert_array_equal(arr[field], ref_arr[field])
+            self.assertEqual(arr.info.keys(), ref_arr.info.keys())
+        self.assertEqual(data.info["controls"].keys(), ref.info["controls"].keys())
+
+    def test_concurrency_and_cancel(self):
+        executor = ThreadPoolExecutor(max_workers=4)
+        release = threading.Event()
+        state = {"running": 0, "max running": 0, "calls": 0}
+        lock = threading.Lock()
+
+        def blocking_read(*args, **kwargs):
+            with lock:
+                state["calls"] += 1
+                state["running"] += 1
+                state["max running"] = max(state["running"], state["max running"])
+            release.wait(5.0)
+            with lock:
+                state["running"] -= 1
+            return args
+
+        async def run():
+            bf = File(self.filenames[0], **self.file_kw)
+            bf.read_msi = blocking_read
+            af = AsyncFile(bf, max_concurrency=2, executor=executor)
+
+            tasks = [asyncio.ensure_future(af.read_msi(ii)) for ii in range(4)]
+            await asyncio.sleep(0.2)
+
+            # only 2 reads of the file run at once
+            self.assertEqual(state["running"], 2)
+
+            # cancel a queued read and a running read
+            tasks[3].cancel()
+            tasks[0].cancel()
+            await asyncio.sleep(0.1)
+            self.assertEqual(state["running"], 2)
+
+            release.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            await af.close()
+            return results
+
+        results = asyncio.run(run())
+        executor.shutdown()
+
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertIsInstance(results[3], asyncio.CancelledError)
+        self.assertEqual(results[1:3], [(1,), (2,)])
+        self.assertEqual(state["max running"], 2)
+        self.assertEqual(state["calls"], 3)
+
+
+if __name__ == "__main__":
+    ut.main()
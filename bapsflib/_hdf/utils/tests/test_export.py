@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from bapsflib._hdf.utils.export import load_array, save_array
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
+from bapsflib._hdf.utils.tests import TestBase, with_bf
+
+
+class TestExport(TestBase):
+    """
+    Test case for :func:`~bapsflib._hdf.utils.export.save_array` and
+    :func:`~bapsflib._hdf.utils.export.load_array`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 20, "nt": 50})
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 20})
+        self.f.add_module("Discharge", {})
+        bc_indices = np.where(self.f.modules["SIS 3301"].knobs.active_brdch)
+        self.brd = bc_indices[0][0]
+        self.ch = bc_indices[1][0]
+
+        self.tempdir = tempfile.TemporaryDirectory(prefix="export-test_")
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def assertRoundTrip(self, data, cls):
+        path = os.path.join(self.tempdir.name, f"{cls.__name__}")
+        save_array(path, data)
+        self.assertTrue(os.path.exists(f"{path}.npy"))
+        self.assertTrue(os.path.exists(f"{path}.meta.pkl"))
+
+        # memory-mapped
+        loaded = load_array(f"{path}.npy")
+        self.assertIsInstance(loaded, cls)
+        self.assertIsInstance(loaded.base, np.memmap)
+        self.assertFalse(loaded.flags.writeable)
+        self.assertEqual(loaded.dtype, data.dtype)
+        self.assertEqual(loaded.shape, data.shape)
+        self.assertEqual(loaded.info, data.info)
+        self.assertEqual(loaded.tobytes(), data.tobytes())
+
+        # in memory
+        loaded = load_array(path, mmap_mode=None)
+        self.assertIsInstance(loaded, cls)
+        self.assertNotIsInstance(loaded.base, np.memmap)
+        self.assertEqual(loaded.info, data.info)
+
+        return loaded
+
+    @with_bf
+    def test_save_load(self, _bf):
+        data = _bf.read_data(self.brd, self.ch, add_controls=["Waveform"], silent=True)
+        loaded = self.assertRoundTrip(data, HDFReadData)
+        self.assertEqual(loaded.dt, data.dt)
+        self.assertEqual(loaded.plasma, data.plasma)
+
+        cdata = _bf.read_controls(["Waveform"])
+        self.assertRoundTrip(cdata, HDFReadControls)
+
+        mdata = _bf.read_msi("Discharge")
+        self.assertRoundTrip(mdata, HDFReadMSI)
+
+        # sliced (non-contiguous) arrays are written contiguously
+        self.assertRoundTrip(data[::3], HDFReadData)
+
+        # plain arrays
+        path = os.path.join(self.tempdir.name, "plain.npy")
+        save_array(path, np.arange(10))
+        loaded = load_array(path)
+        self.assertIs(type(loaded), np.memmap)
+        self.assertTrue(np.array_equal(loaded, np.arange(10)))
+
+    def test_raises(self):
+        path = os.path.join(self.tempdir.name, "bad.npy")
+        with self.assertRaises(TypeError):
+            save_array(path, [1, 2, 3])
+        with self.assertRaises(ValueError):
+            save_array(path, np.array([1, "a", None], dtype=object))
+
+
+if __name__ == "__main__":
+    ut.main()
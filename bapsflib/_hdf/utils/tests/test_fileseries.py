@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from unittest import mock
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.fileseries import FileSeries
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
+from bapsflib._hdf.utils.sharedmem import _OWNED_NAMES
+
+
+class TestFileSeries(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.fileseries.FileSeries`."""
+
+    file_kwargs = {
+        "control_path": "Raw data + config",
+        "digitizer_path": "Raw data + config",
+        "msi_path": "MSI",
+        "silent": True,
+    }
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="series-test_")
+        self.names = [self.build_file(f"run{ii}.hdf5") for ii in range(2)]
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def build_file(self, name, nt=50):
+        name = os.path.join(self.tempdir.name, name)
+        faux = FauxHDFBuilder(
+            name=name,
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": 20, "nt": nt},
+                "Waveform": {"n_configs": 1, "sn_size": 20},
+                "Discharge": {},
+            },
+        )
+        faux.close()
+        return name
+
+    def open_series(self, names=None, **kwargs) -> FileSeries:
+        return FileSeries(
+            self.names if names is None else names,
+            file_kwargs=self.file_kwargs,
+            **kwargs,
+        )
+
+    def test_shot_axis(self):
+        with self.open_series() as fs:
+            self.assertEqual(len(fs), 2)
+            self.assertEqual(fs.offsets, [0, 20])
+            self.assertEqual(fs.shot_ranges, [(1, 20), (21, 40)])
+
+            located = fs.locate([3, 19, 20, 21, 40, 41])
+            self.assertEqual(list(located), [0, 1])
+            self.assertTrue(np.array_equal(located[0], [3, 19, 20]))
+            self.assertTrue(np.array_equal(located[1], [1, 20]))
+
+        with self.open_series(offsets=[0, 1000]) as fs:
+            self.assertEqual(fs.shot_ranges, [(1, 20), (1001, 1020)])
+
+            # shot numbers between (and after) the files are assigned to
+            # the preceding file for union reads
+            located = fs.locate([3, 20, 500, 1001, 2000], intersection_set=False)
+            self.assertEqual(list(located), [0, 1])
+            self.assertTrue(np.array_equal(located[0], [3, 20, 500]))
+            self.assertTrue(np.array_equal(located[1], [1, 1000]))
+            located = fs.locate([3, 20, 500, 1001, 2000])
+            self.assertTrue(np.array_equal(located[0], [3, 20]))
+            self.assertTrue(np.array_equal(located[1], [1]))
+
+        with self.assertRaises(ValueError):
+            self.open_series(offsets=[0, 10])
+        with self.assertRaises(ValueError):
+            self.open_series(offsets=[0])
+
+    def test_read_data(self):
+        with File(self.names[0], **self.file_kwargs) as f0, File(
+            self.names[1], **self.file_kwargs
+        ) as f1:
+            ref0 = f0.read_data(0, 0, add_controls=["Waveform"], silent=True)
+            ref1 = f1.read_data(0, 0, add_controls=["Waveform"], silent=True)
+
+        with self.open_series() as fs:
+            data = fs.read_data(0, 0, add_controls=["Waveform"], silent=True)
+            self.assertIsInstance(data, HDFReadData)
+            self.assertTrue(np.array_equal(data["shotnum"], np.arange(1, 41)))
+            self.assertTrue(
+                np.array_equal(data["signal"], np.concatenate((ref0, ref1))["signal"])
+            )
+            self.assertEqual(data.dt, ref0.dt)
+            self.assertEqual(len(data.info["source files"]), 2)
+
+            # only the second file is read
+            data = fs.read_data(0, 0, shotnum=slice(25, 30), silent=True)
+            self.assertTrue(np.array_equal(data["shotnum"], np.arange(25, 30)))
+            self.assertTrue(np.array_equal(data["signal"], ref1["signal"][4:9]))
+            self.assertEqual(len(data.info["source files"]), 1)
+
+            # spanning both files
+            data = fs.read_data(0, 0, shotnum=[19, 20, 21, 22], silent=True)
+            self.assertTrue(np.array_equal(data["shotnum"], [19, 20, 21, 22]))
+            self.assertTrue(np.array_equal(data["signal"][:2], ref0["signal"][18:]))
+            self.assertTrue(np.array_equal(data["signal"][2:], ref1["signal"][:2]))
+
+            # union reads keep shot numbers not recorded by any file
+            data = fs.read_data(
+                0, 0, shotnum=[20, 30, 100], intersection_set=False, silent=True
+            )
+            self.assertTrue(np.array_equal(data["shotnum"], [20, 30, 100]))
+            self.assertTrue(np.array_equal(data["signal"][0], ref0["signal"][19]))
+            self.assertTrue(np.array_equal(data["signal"][1], ref1["signal"][9]))
+            self.assertTrue(np.all(np.isnan(data["signal"][2])))
+
+            with self.assertRaises(ValueError):
+                fs.read_data(0, 0, shotnum=[100], silent=True)
+            with self.assertRaises(TypeError):
+                fs.read_data(0, 0, shared_memory=True)
+
+    def test_read_controls_msi(self):
+        with self.open_series() as fs:
+            cdata = fs.read_controls(["Waveform"], shotnum=slice(10, 31))
+            self.assertIsInstance(cdata, HDFReadControls)
+            self.assertTrue(np.array_equal(cdata["shotnum"], np.arange(10, 31)))
+
+            mdata = fs.read_msi("Discharge", silent=True)
+            self.assertIsInstance(mdata, HDFReadMSI)
+            with File(self.names[0], **self.file_kwargs) as f0:
+                ref = f0.read_msi("Discharge", silent=True)
+            self.assertEqual(mdata.shape[0], 2 * ref.shape[0])
+
+            # only the files recording the shot numbers are read
+            with mock.patch.object(
+                fs.files[0], "read_msi", wraps=fs.files[0].read_msi
+            ) as mock_read:
+                mdata = fs.read_msi("Discharge", shotnum=[25, 27, 100], silent=True)
+                mock_read.assert_not_called()
+            self.assertTrue(
+                np.array_equal(
+                    mdata["shotnum"], ref["shotnum"][np.isin(ref["shotnum"], [5, 7])] + 20
+                )
+            )
+            with self.assertRaises(ValueError):
+                fs.read_msi("Discharge", shotnum=[100], silent=True)
+
+    def test_parallel(self):
+        owned = set(_OWNED_NAMES)
+        with self.open_series() as fs:
+            ref = fs.read_data(0, 0, add_controls=["Waveform"], silent=True)
+            cref = fs.read_controls(["Waveform"], shotnum=slice(10, 31))
+            mref = fs.read_msi("Discharge", silent=True)
+
+        with self.open_series(n_workers=2) as fs:
+            self.assertEqual(fs.n_workers, 2)
+            data = fs.read_data(0, 0, add_controls=["Waveform"], silent=True)
+            cdata = fs.read_controls(["Waveform"], shotnum=slice(10, 31))
+            mdata = fs.read_msi("Discharge", silent=True)
+
+            # a read of one file is not sent to the workers
+            with mock.patch(
+                f"{FileSeries.__module__}._read_file", side_effect=AssertionError
+            ):
+                fs.read_data(0, 0, shotnum=slice(25, 30), silent=True)
+
+            # errors are propagated
+            with self.assertRaises(ValueError):
+                fs.read_msi("not a diagnostic")
+            with self.assertRaises(TypeError):
+                fs.read_data(0, 0, out=np.empty(0), silent=True)
+        self.assertIsNone(fs._executor)
+        self.assertEqual(_OWNED_NAMES, owned)
+
+        for arr, ref_arr, cls in (
+            (data, ref, HDFReadData),
+            (cdata, cref, HDFReadControls),
+            (mdata, mref, HDFReadMSI),
+        ):
+            self.assertIsInstance(arr, cls)
+            self.assertEqual(arr.dtype, ref_arr.dtype)
+            for field in arr.dtype.names:
+                np.testing.assert_array_equal(arr[field], ref_arr[field])
+            self.assertEqual(arr.info["source files"], ref_arr.info["source files"])
+
+        for val in (0, 1.5, True):
+            with self.assertRaises(ValueError):
+                self.open_series(n_workers=val)
+
+    def test_validate(self):
+        name = self.build_file("other.hdf5", nt=60)
+        with self.assertRaises(ValueError):
+            self.open_series(names=self.names + [name])
+
+        with self.assertRaises(TypeError):
+            self.open_series(names=[1])
+        with self.assertRaises(ValueError):
+            self.open_series(names=[])
+
+        # opened files are not closed by the series
+        with File(self.names[0], **self.file_kwargs) as f0:
+            with self.open_series(names=[f0, self.names[1]]) as fs:
+                self.assertIs(fs.files[0], f0)
+            self.assertTrue(bool(f0.id))
+
+
+if __name__ == "__main__":
+    ut.main()
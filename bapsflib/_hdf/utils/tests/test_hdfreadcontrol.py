@@ -21,9 +21,10 @@ from unittest import mock
 from bapsflib._hdf.maps import ConType, HDFMap
 from bapsflib._hdf.maps.controls.templates import HDFMapControlTemplate
 from bapsflib._hdf.utils.file import File
-from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls, read_control_configs
 from bapsflib._hdf.utils.tests import TestBase
 from bapsflib.utils.decorators import with_bf
+from bapsflib.utils.frozen import FrozenDict
 from bapsflib.utils.warnings import BaPSFWarning, HDFMappingWarning
 
 
@@ -107,6 +108,31 @@ class TestHDFReadControl(TestBase):
         )
         self.assertCDataObj(data, _bf, control_plus)
 
+        # meta-info is frozen once by the mapping and shared between reads
+        cinfo = data.info["controls"]["Waveform"]
+        cinfo2 = HDFReadControls(_bf, controls, shotnum=sn).info["controls"]["Waveform"]
+        cmap = _bf.file_map.controls["Waveform"]
+        self.assertIsInstance(cmap.frozen_config("config01"), FrozenDict)
+        self.assertIs(cinfo2["command list"], cinfo["command list"])
+
+        # nested meta-info is copied on write
+        self.f.add_module("6K Compumotor", {"n_configs": 1, "n_motionlists": 1})
+        _bf._map_file()
+        sixk_cspec = self.f.modules["6K Compumotor"].config_names[0]
+        cdata = HDFReadControls(_bf, [("6K Compumotor", sixk_cspec)])
+        cdata2 = HDFReadControls(_bf, [("6K Compumotor", sixk_cspec)])
+        mlists = cdata.info["controls"]["6K Compumotor"]["motion lists"]
+        mlname = list(mlists)[0]
+        mlists[mlname]["x"] = 1
+        self.assertEqual(
+            cdata.info["controls"]["6K Compumotor"]["motion lists"][mlname]["x"], 1
+        )
+        self.assertNotEqual(
+            cdata2.info["controls"]["6K Compumotor"]["motion lists"][mlname].get("x"), 1
+        )
+        frozen = _bf.file_map.controls["6K Compumotor"].frozen_config(sixk_cspec)
+        self.assertNotIn("x", frozen["motion lists"][mlname])
+
     @with_bf
     @mock.patch.object(HDFMap, "controls", new_callable=mock.PropertyMock)
     def test_missing_dataset_fields(self, _bf: File, mock_controls):
@@ -796,6 +822,156 @@ class TestHDFReadControl(TestBase):
         cdata = HDFReadControls(_bf, control, intersection_set=False)
         self.assertCDataObj(cdata, _bf, control_plus, intersection_set=False)
 
+    @with_bf
+    def test_multiple_configs(self, _bf: File):
+        """
+        Test reading a control device that records multiple
+        configurations into ONE dataset.
+        """
+        self.f.remove_all_modules()
+        self.f.add_module("Waveform", {"n_configs": 3, "sn_size": 30})
+        _bf._map_file()  # re-map file
+        dset = self.f.modules["Waveform"]["Run time list"][...]
+        cmap = _bf.file_map.controls["Waveform"]
+        cl = np.array(cmap.configs["config02"]["state values"]["FREQ"]["command list"])
+
+        # single configuration is read with a strided selection
+        for shotnum in (slice(None), slice(5, 20), [2, 3, 4, 10, 40]):
+            cdata = HDFReadControls(_bf, [("Waveform", "config02")], shotnum=shotnum)
+            rows = dset[1::3][cdata["shotnum"] - 1]
+            self.assertTrue(np.all(rows["Configuration name"] == b"config02"))
+            self.assertTrue(np.array_equal(cdata["FREQ"], cl[rows["Command index"]]))
+
+        # all configurations are de-interleaved from one read
+        for shotnum in (slice(None), slice(5, 20), [2, 3, 4, 10, 40]):
+            cdata_dict = read_control_configs(_bf, "Waveform", shotnum=shotnum)
+            self.assertEqual(list(cdata_dict), ["config01", "config02", "config03"])
+            for cconfn, cdata in cdata_dict.items():
+                ref = HDFReadControls(_bf, [("Waveform", cconfn)], shotnum=shotnum)
+                self.assertTrue(np.array_equal(cdata, ref))
+                self.assertEqual(
+                    cdata.info["controls"]["Waveform"]["configuration name"], cconfn
+                )
+
+        # subset of configurations
+        cdata_dict = _bf.read_control_configs(
+            "Waveform", configs=["config03"], shotnum=[50], intersection_set=False
+        )
+        self.assertEqual(list(cdata_dict), ["config03"])
+        self.assertTrue(np.array_equal(cdata_dict["config03"]["shotnum"], [50]))
+        self.assertTrue(np.isnan(cdata_dict["config03"]["FREQ"][0]))
+
+        # raise errors
+        with self.assertRaises(TypeError):
+            read_control_configs(self.f, "Waveform")
+        with self.assertRaises(ValueError):
+            read_control_configs(_bf, "Not a control")
+        with self.assertRaises(ValueError):
+            read_control_configs(_bf, "Waveform", configs=["config04"])
+
+    @with_bf
+    def test_fill_missing(self, _bf: File):
+        """Test union reads with validity masks instead of NULL fills."""
+        self.f.remove_all_modules()
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 30})
+        self.f.add_module(
+            "6K Compumotor", {"n_configs": 1, "sn_size": 50, "n_motionlists": 1}
+        )
+        _bf._map_file()  # re-map file
+        sixk_cspec = self.f.modules["6K Compumotor"].config_names[0]
+        controls = [("Waveform", "config01"), ("6K Compumotor", sixk_cspec)]
+        shotnum = np.arange(20, 61)
+
+        ref = HDFReadControls(_bf, controls, shotnum=shotnum, intersection_set=False)
+        cdata = HDFReadControls(
+            _bf, controls, shotnum=shotnum, intersection_set=False, fill_missing=False
+        )
+        self.assertEqual(cdata.info["valid sources"], ["Waveform", "6K Compumotor"])
+        self.assertEqual(cdata.dtype["valid"].shape, (2,))
+
+        # only shot numbers recorded by a control are allocated
+        shotnum = np.arange(20, 51)
+        ref = ref[ref["shotnum"] <= 50]
+        self.assertTrue(np.array_equal(cdata["shotnum"], shotnum))
+        self.assertTrue(np.array_equal(cdata["valid"][:, 0], shotnum <= 30))
+        self.assertTrue(np.all(cdata["valid"][:, 1]))
+
+        # recorded entries match, missing entries are left zeroed
+        for field in ref.dtype.names:
+            for ii, cname in enumerate(cdata.info["valid sources"]):
+                if (
+                    field
+                    not in _bf.file_map.controls[cname].configs[controls[ii][1]][
+                        "state values"
+                    ]
+                ):
+                    continue
+                valid = cdata["valid"][:, ii]
+                self.assertTrue(
+                    np.array_equal(cdata[field][valid], ref[field][valid], equal_nan=True)
+                )
+                self.assertFalse(np.any(cdata[field][~valid]))
+
+        # no shot number is recorded
+        cdata = HDFReadControls(
+            _bf, controls, shotnum=[70, 80], intersection_set=False, fill_missing=False
+        )
+        self.assertEqual(cdata.shape, (0,))
+
+        # intersection is unaffected
+        cdata = HDFReadControls(_bf, controls, shotnum=shotnum, fill_missing=False)
+        self.assertTrue(np.array_equal(cdata["shotnum"], np.arange(20, 31)))
+        self.assertNotIn("valid", cdata.dtype.names)
+        self.assertNotIn("valid sources", cdata.info)
+
+    @with_bf
+    def test_out(self, _bf: File):
+        """Test reading into a caller-supplied output buffer."""
+        self.f.remove_all_modules()
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 30})
+        _bf._map_file()  # re-map file
+        controls = ["Waveform"]
+
+        for kwargs in (
+            {"shotnum": [2, 5, 7]},
+            {"shotnum": np.arange(20, 41), "intersection_set": False},
+            {"shotnum": np.arange(20, 41), "fill_missing": False},
+        ):
+            with self.subTest(kwargs=kwargs):
+                ref = _bf.read_controls(controls, **kwargs)
+                dtype, shape = _bf.read_controls_spec(controls, **kwargs)
+                self.assertEqual((dtype, shape), (ref.dtype, ref.shape))
+
+                # buffers can be larger than the read
+                out = np.ones(shape[0] + 2, dtype=dtype)
+                cdata = _bf.read_controls(controls, out=out, **kwargs)
+                self.assertIsInstance(cdata, HDFReadControls)
+                self.assertTrue(np.shares_memory(cdata, out))
+                self.assertEqual(cdata.shape, shape)
+                self.assertEqual(cdata.info, ref.info)
+                for field in ref.dtype.names:
+                    self.assertTrue(
+                        np.array_equal(cdata[field], ref[field], equal_nan=True)
+                    )
+
+        # incompatible buffers
+        dtype, shape = _bf.read_controls_spec(controls, shotnum=[2, 5, 7])
+        out = np.empty(shape, dtype=dtype)
+        readonly = out.copy()
+        readonly.flags.writeable = False
+        for bad_out, exc in (
+            ([1, 2, 3], TypeError),
+            (np.empty(shape, dtype=np.float64), ValueError),
+            (np.empty(shape[0] - 1, dtype=dtype), ValueError),
+            (np.empty((shape[0], 2), dtype=dtype), ValueError),
+            (readonly, ValueError),
+        ):
+            with self.subTest(out=bad_out):
+                with self.assertRaises(exc):
+                    _bf.read_controls(controls, shotnum=[2, 5, 7], out=bad_out)
+        with self.assertRaises(ValueError):
+            _bf.read_controls(controls, shared_memory=True, out=out)
+
     def assertCDataObj(
         self,
         cdata: HDFReadControls,
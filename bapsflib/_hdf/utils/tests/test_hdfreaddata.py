@@ -514,10 +514,21 @@ class TestHDFReadData(TestBase):
         self.assertEqual(data.info["signal units"], u.volt)
 
         # voltage step size can not be calculated
+        # - the conversion is determined before the signal is read, so
+        #   the bit resolution is removed from the digitizer info
         shotnum = 5
         indices = [4]
+        dmap = _bf.file_map.digitizers[digi]
+        construct_dataset_name = dmap.construct_dataset_name
+
+        def construct_wo_bit(*args, **kwargs):
+            if not kwargs.get("return_info", False):
+                return construct_dataset_name(*args, **kwargs)
+            dname, d_info = construct_dataset_name(*args, **kwargs)
+            return dname, {**d_info, "bit": None}
+
         with mock.patch.object(
-            HDFReadData, "dv", new_callable=mock.PropertyMock(return_value=None)
+            dmap, "construct_dataset_name", side_effect=construct_wo_bit
         ):
             with self.assertWarns(BaPSFWarning):
                 data = HDFReadData(
@@ -535,6 +546,7 @@ class TestHDFReadData(TestBase):
                 np.array_equal(data["signal"], dset[indices, ...].astype(np.float32))
             )
             self.assertEqual(data.info["signal units"], u.bit)
+            self.assertIsNone(data.dv)
 
         # -- `keep_bits=True`                                       ----
         # default behavior
@@ -890,6 +902,315 @@ class TestHDFReadData(TestBase):
             config_name=config_name,
         )
 
+    @with_bf
+    def test_read_chunked_dataset(self, _bf: File):
+        """Test reading from a chunked and compressed digitizer dataset."""
+        # setup
+        sn_size = 50
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": sn_size, "nt": 1000})
+        _mod = self.f.modules["SIS 3301"]
+        config_name = _mod.knobs.active_config[0]
+        bc_indices = np.where(_mod.knobs.active_brdch)
+        brd = bc_indices[0][0]
+        ch = bc_indices[1][0]
+        dset_path = f"Raw data + config/SIS 3301/{config_name} [{brd}:{ch}]"
+
+        # replace dataset with a chunked version
+        raw = np.random.randint(0, 2**14, size=(sn_size, 1000), dtype=np.int16)
+        del self.f[dset_path]
+        self.f.create_dataset(dset_path, data=raw, chunks=(4, 250), compression="gzip")
+        _bf._map_file()
+
+        for shotnum in (slice(None), slice(1, None, 5), [2, 3, 4, 30, 49]):
+            for intersection_set in (True, False):
+                data = HDFReadData(
+                    _bf,
+                    brd,
+                    ch,
+                    shotnum=shotnum,
+                    digitizer="SIS 3301",
+                    keep_bits=True,
+                    intersection_set=intersection_set,
+                )
+                index = data["shotnum"].astype(np.int64) - 1
+                self.assertTrue(np.array_equal(data["signal"], raw[index, ...]))
+
+        # index reads
+        data = HDFReadData(
+            _bf, brd, ch, index=slice(0, None, 7), digitizer="SIS 3301", keep_bits=True
+        )
+        self.assertTrue(np.array_equal(data["signal"], raw[::7, ...]))
+
+    @with_bf
+    def test_read_w_decimate(self, _bf: File):
+        """Test reading data with on-read decimation."""
+        # setup
+        sn_size = 20
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": sn_size, "nt": 100})
+        _mod = self.f.modules["SIS 3301"]
+        config_name = _mod.knobs.active_config[0]
+        bc_indices = np.where(_mod.knobs.active_brdch)
+        brd = bc_indices[0][0]
+        ch = bc_indices[1][0]
+        dset_path = f"Raw data + config/SIS 3301/{config_name} [{brd}:{ch}]"
+        raw = np.random.randint(0, 2**14, size=(sn_size, 100), dtype=np.int16)
+        self.f[dset_path][...] = raw
+        _bf._map_file()
+
+        kw = {"digitizer": "SIS 3301", "keep_bits": True}
+        data = HDFReadData(_bf, brd, ch, **kw)
+        ddata = HDFReadData(_bf, brd, ch, decimate=4, **kw)
+        self.assertEqual(ddata["signal"].shape, (sn_size, 25))
+        self.assertEqual(ddata["signal"].dtype, np.float32)
+        self.assertTrue(
+            np.allclose(ddata["signal"], raw.reshape(sn_size, 25, 4).mean(axis=-1))
+        )
+        self.assertEqual(
+            ddata.info["sample average"], 4 * (data.info["sample average"] or 1)
+        )
+        self.assertTrue(np.isclose(ddata.dt, 4 * data.dt))
+
+        # stride keeps bits as integers
+        ddata = HDFReadData(_bf, brd, ch, decimate=3, decimate_method="stride", **kw)
+        self.assertEqual(ddata["signal"].dtype, raw.dtype)
+        self.assertTrue(np.array_equal(ddata["signal"], raw[:, 0:99:3]))
+
+        # union of shot numbers and voltage conversion
+        vdata = HDFReadData(_bf, brd, ch, shotnum=[1, 2], digitizer="SIS 3301")
+        ddata = HDFReadData(
+            _bf,
+            brd,
+            ch,
+            shotnum=[1, 2, sn_size + 5],
+            digitizer="SIS 3301",
+            intersection_set=False,
+            decimate=5,
+        )
+        self.assertTrue(
+            np.allclose(
+                ddata["signal"][:2],
+                vdata["signal"].reshape(2, 20, 5).mean(axis=-1),
+                rtol=1e-5,
+                atol=1e-6,
+            )
+        )
+        self.assertTrue(np.all(np.isnan(ddata["signal"][2])))
+
+        # decimation can be used with the read functions of `File`
+        ddata = _bf.read_data(brd, ch, decimate=4, **kw)
+        self.assertEqual(ddata["signal"].shape, (sn_size, 25))
+
+        # invalid values
+        for decimate in (0, 101, 2.0, True):
+            with self.assertRaises(ValueError):
+                HDFReadData(_bf, brd, ch, decimate=decimate, **kw)
+        with self.assertRaises(ValueError):
+            HDFReadData(_bf, brd, ch, decimate=2, decimate_method="nope", **kw)
+
+    @with_bf
+    def test_read_w_out_dtype(self, _bf: File):
+        """Test reading the signal into a selected floating point dtype."""
+        # setup
+        sn_size = 20
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": sn_size, "nt": 100})
+        _mod = self.f.modules["SIS 3301"]
+        config_name = _mod.knobs.active_config[0]
+        bc_indices = np.where(_mod.knobs.active_brdch)
+        brd = bc_indices[0][0]
+        ch = bc_indices[1][0]
+        dset_path = f"Raw data + config/SIS 3301/{config_name} [{brd}:{ch}]"
+        raw = np.random.randint(0, 2**14, size=(sn_size, 100), dtype=np.int16)
+        self.f[dset_path][...] = raw
+        _bf._map_file()
+
+        kw = {"digitizer": "SIS 3301"}
+        ref = HDFReadData(_bf, brd, ch, **kw)
+        self.assertEqual(ref["signal"].dtype, np.float32)
+        self.assertEqual(ref.info["signal units"], u.volt)
+        volts = ref.dv.value * raw - abs(ref.info["voltage offset"].value)
+
+        # - the conversion is done in double precision and rounded once
+        #   to the selected dtype
+        for out_dtype in (np.float16, "float32", np.dtype(np.float64)):
+            for shotnum, intersection_set in (
+                (slice(None), True),
+                ([2, 5, 6, 7, sn_size + 3], False),
+                ([2, 3, 4, 10, 11, sn_size + 3], False),
+            ):
+                with self.subTest(out_dtype=out_dtype, shotnum=shotnum):
+                    data = HDFReadData(
+                        _bf,
+                        brd,
+                        ch,
+                        shotnum=shotnum,
+                        intersection_set=intersection_set,
+                        out_dtype=out_dtype,
+                        **kw,
+                    )
+                    self.assertEqual(data["signal"].dtype, np.dtype(out_dtype))
+                    self.assertEqual(data.info["signal units"], u.volt)
+                    index = data["shotnum"][: len(data) - (not intersection_set)] - 1
+                    signal = data["signal"][: index.size]
+                    self.assertTrue(
+                        np.array_equal(signal, volts[index].astype(out_dtype))
+                    )
+                    if not intersection_set:
+                        self.assertTrue(np.all(np.isnan(data["signal"][-1])))
+
+        # averaged bits
+        data = HDFReadData(
+            _bf, brd, ch, keep_bits=True, decimate=4, out_dtype=np.float64, **kw
+        )
+        self.assertEqual(data["signal"].dtype, np.float64)
+        self.assertEqual(data.info["signal units"], u.bit)
+        self.assertTrue(
+            np.allclose(data["signal"], raw.reshape(sn_size, 25, 4).mean(axis=-1))
+        )
+
+        # `File.read_data()`
+        data = _bf.read_data(brd, ch, out_dtype=np.float64, **kw)
+        self.assertEqual(data["signal"].dtype, np.float64)
+        self.assertTrue(np.array_equal(data["signal"], volts))
+
+        # invalid values
+        for out_dtype in (np.int32, "not a dtype", complex):
+            with self.subTest(out_dtype=out_dtype):
+                with self.assertRaises(ValueError):
+                    HDFReadData(_bf, brd, ch, out_dtype=out_dtype, **kw)
+        with self.assertRaises(ValueError):
+            HDFReadData(_bf, brd, ch, keep_bits=True, out_dtype=np.float32, **kw)
+
+    @with_bf
+    def test_read_w_out(self, _bf: File):
+        """Test reading into a caller-supplied output buffer."""
+        # setup
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 20, "nt": 50})
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 15})
+        _bf._map_file()
+        _mod = self.f.modules["SIS 3301"]
+        bc_indices = np.where(_mod.knobs.active_brdch)
+        brd = bc_indices[0][0]
+        ch = bc_indices[1][0]
+
+        for kwargs in (
+            {"shotnum": [2, 5, 7]},
+            {"keep_bits": True},
+            {"add_controls": ["Waveform"]},
+            {"shotnum": np.arange(10, 26), "intersection_set": False},
+            {"shotnum": np.arange(10, 26), "fill_missing": False},
+            {
+                "shotnum": np.arange(10, 26),
+                "add_controls": ["Waveform"],
+                "intersection_set": False,
+            },
+            {
+                "shotnum": np.arange(10, 26),
+                "add_controls": ["Waveform"],
+                "fill_missing": False,
+            },
+            {"decimate": 5},
+        ):
+            with self.subTest(kwargs=kwargs):
+                kwargs["silent"] = True
+                ref = _bf.read_data(brd, ch, **kwargs)
+                dtype, shape = _bf.read_data_spec(brd, ch, **kwargs)
+                self.assertEqual((dtype, shape), (ref.dtype, ref.shape))
+
+                # re-used buffers are overwritten
+                out = np.ones(shape, dtype=dtype)
+                for _ in range(2):
+                    data = _bf.read_data(brd, ch, out=out, **kwargs)
+                    self.assertIsInstance(data, HDFReadData)
+                    self.assertTrue(np.shares_memory(data, out))
+                    self.assertEqual(data.info, ref.info)
+                    for field in ref.dtype.names:
+                        self.assertTrue(
+                            np.array_equal(data[field], ref[field], equal_nan=True)
+                        )
+
+        # the spec does not read control data
+        with mock.patch(
+            "bapsflib._hdf.utils.hdfreadcontrols._index_selection",
+            side_effect=AssertionError("control data read"),
+        ):
+            dtype, shape = _bf.read_data_spec(
+                brd, ch, add_controls=["Waveform"], silent=True
+            )
+        self.assertEqual(shape, (15,))
+        self.assertIn("FREQ", dtype.names)
+
+        # buffers can be larger than the read
+        dtype, shape = _bf.read_data_spec(brd, ch, shotnum=[2, 3], silent=True)
+        out = np.empty(10, dtype=dtype)
+        data = _bf.read_data(brd, ch, shotnum=[2, 3], out=out, silent=True)
+        self.assertEqual(data.shape, shape)
+        self.assertTrue(np.shares_memory(data, out[:2]))
+
+        # incompatible buffers
+        with self.assertRaises(ValueError):
+            _bf.read_data(brd, ch, out=np.empty(10, dtype=dtype), silent=True)
+        with self.assertRaises(ValueError):
+            _bf.read_data(brd, ch, keep_bits=True, out=out, silent=True)
+        with self.assertRaises(ValueError):
+            _bf.read_data(brd, ch, shared_memory=True, out=out, silent=True)
+
+    @with_bf
+    def test_read_w_fill_missing(self, _bf: File):
+        """Test union reads with validity masks instead of NULL fills."""
+        # setup
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 20, "nt": 50})
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 25})
+        _bf._map_file()
+        _mod = self.f.modules["SIS 3301"]
+        bc_indices = np.where(_mod.knobs.active_brdch)
+        brd = bc_indices[0][0]
+        ch = bc_indices[1][0]
+        shotnum = np.arange(10, 31)
+
+        kw = {
+            "shotnum": shotnum,
+            "digitizer": "SIS 3301",
+            "add_controls": ["Waveform"],
+            "intersection_set": False,
+        }
+        ref = HDFReadData(_bf, brd, ch, **kw)
+        data = HDFReadData(_bf, brd, ch, fill_missing=False, **kw)
+        self.assertEqual(data.info["valid sources"], ["SIS 3301", "Waveform"])
+
+        # only shot numbers recorded by the digitizer or a control are
+        # allocated
+        shotnum = np.arange(10, 26)
+        ref = ref[ref["shotnum"] <= 25]
+        self.assertTrue(np.array_equal(data["shotnum"], shotnum))
+        self.assertTrue(np.array_equal(data["valid"][:, 0], shotnum <= 20))
+        self.assertTrue(np.all(data["valid"][:, 1]))
+        self.assertTrue(np.array_equal(data["xyz"], ref["xyz"], equal_nan=True))
+
+        # recorded entries match, missing entries are left zeroed
+        valid = data["valid"][:, 0]
+        self.assertTrue(np.array_equal(data["signal"][valid], ref["signal"][valid]))
+        self.assertFalse(np.any(data["signal"][~valid]))
+        self.assertTrue(np.array_equal(data["FREQ"], ref["FREQ"]))
+
+        # without controls
+        data = HDFReadData(
+            _bf, brd, ch, fill_missing=False, **{**kw, "add_controls": None}
+        )
+        self.assertTrue(np.array_equal(data["shotnum"], np.arange(10, 21)))
+        self.assertTrue(np.all(data["valid"]))
+        self.assertEqual(data.info["valid sources"], ["SIS 3301"])
+
+        # works with the read functions of `File`
+        data = _bf.read_data(brd, ch, fill_missing=False, **kw)
+        self.assertTrue(np.array_equal(data["valid"][:, 0], shotnum <= 20))
+
+        # intersection reads do not get a 'valid' field
+        data = HDFReadData(
+            _bf, brd, ch, fill_missing=False, **{**kw, "intersection_set": True}
+        )
+        self.assertTrue(np.array_equal(data["shotnum"], np.arange(10, 21)))
+        self.assertNotIn("valid", data.dtype.names)
+
     @with_bf
     def test_read_w_index(self, _bf: File):
         """Test reading data using `index` keyword."""
@@ -1138,7 +1459,6 @@ class TestHDFReadData(TestBase):
     def assertControlInData(
         self, cdata: HDFReadControls, data: HDFReadData, shotnum: np.ndarray
     ):
-
         # -- analyze numpy array                                    ----
         self.assertTrue(np.array_equal(data["shotnum"], shotnum))
         self.assertTrue(np.any(np.isin(shotnum, cdata["shotnum"])))
@@ -19,6 +19,7 @@ from bapsflib._hdf.utils.file import File
 from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
 from bapsflib._hdf.utils.tests import TestBase
 from bapsflib.utils.decorators import with_bf
+from bapsflib.utils.frozen import FrozenList
 
 
 class TestHDFReadMSI(TestBase):
@@ -96,6 +97,18 @@ class TestHDFReadMSI(TestBase):
         _map = _bf.file_map.msi["Discharge"]
         self.assertDataObj(self.read(_bf, "Discharge"), _bf, _map)
 
+        # meta-info is frozen once and shared between reads, until it
+        # is looked up (copy-on-write)
+        info = self.read(_bf, "Discharge").info
+        info2 = self.read(_bf, "Discharge").info
+        for key in ("t0", "dt"):
+            self.assertIsInstance(dict.__getitem__(info, key), FrozenList)
+            self.assertIs(dict.__getitem__(info2, key), dict.__getitem__(info, key))
+        info["dt"].append(1.0)
+        info2["t0"][0] = None
+        self.assertEqual(len(info2["dt"]), len(info["dt"]) - 1)
+        self.assertIsNotNone(self.read(_bf, "Discharge").info["t0"][0])
+
     @with_bf
     def test_read_complex(self, _bf: File):
         """
@@ -113,6 +126,58 @@ class TestHDFReadMSI(TestBase):
         _map = _bf.file_map.msi["Interferometer array"]
         self.assertDataObj(self.read(_bf, "Interferometer array"), _bf, _map)
 
+    @with_bf
+    def test_align(self, _bf: File):
+        """Test aligning MSI rows to shot numbers."""
+        # Using 'Discharge' as a test case
+        self.f.add_module("Discharge")
+        dset = self.f["/MSI/Discharge/Discharge summary"]
+        data = dset[...]
+        data["Shot number"] = [8, 3]
+        data["Timestamp"] = [100.0, 50.0]
+        dset[...] = data
+        _bf._map_file()  # re-map file
+        mdata = self.read(_bf, "Discharge")
+
+        # align by shot number
+        shotnum = np.array([3, 5, 8, 8], dtype=np.uint32)
+        aligned = mdata.align(shotnum)
+        self.assertIsInstance(aligned, HDFReadMSI)
+        self.assertEqual(aligned.shape, (4,))
+        self.assertTrue(np.array_equal(aligned["shotnum"], shotnum))
+        self.assertTrue(np.array_equal(aligned.info["msi index"], [1, -1, 0, 0]))
+        self.assertEqual(aligned.info["device name"], "Discharge")
+        self.assertTrue(np.array_equal(aligned["voltage"][0], mdata["voltage"][1]))
+        self.assertTrue(np.array_equal(aligned["voltage"][2], mdata["voltage"][0]))
+        self.assertTrue(np.all(np.isnan(aligned["voltage"][1])))
+        self.assertTrue(np.isnan(aligned["meta"]["timestamp"][1]))
+        self.assertEqual(aligned["meta"]["data valid"][1], -128)
+        self.assertEqual(
+            aligned["meta"]["peak current"][3], mdata["meta"]["peak current"][0]
+        )
+
+        # fall back to nearest timestamp
+        timestamps = np.array([0.0, 53.0, 0.0, 0.0])
+        aligned = mdata.align(shotnum, timestamps=timestamps, tolerance=5.0)
+        self.assertTrue(np.array_equal(aligned.info["msi index"], [1, 1, 0, 0]))
+        self.assertEqual(aligned["meta"]["timestamp"][1], 50.0)
+        aligned = mdata.align(shotnum, timestamps=timestamps, tolerance=1.0)
+        self.assertTrue(np.array_equal(aligned.info["msi index"], [1, -1, 0, 0]))
+        aligned = mdata.align([5, 6], timestamps=[90.0, 70.0])
+        self.assertTrue(np.array_equal(aligned.info["msi index"], [0, 1]))
+
+        # empty selection
+        aligned = mdata.align([])
+        self.assertEqual(aligned.shape, (0,))
+
+        # invalid inputs
+        with self.assertRaises(ValueError):
+            mdata.align([1.5, 2.0])
+        with self.assertRaises(ValueError):
+            mdata.align([[1, 2]])
+        with self.assertRaises(ValueError):
+            mdata.align([1, 2], timestamps=[0.0])
+
     def assertDataObj(self, _data: HDFReadMSI, _bf, _map):
         # data is a structured numpy array
         self.assertIsInstance(_data, np.ndarray)
@@ -15,20 +15,158 @@ import numpy as np
 import unittest as ut
 
 from numpy.lib import recfunctions as rfn
+from unittest import mock
 
 from bapsflib._hdf.maps.controls.waveform import HDFMapControlWaveform
+from bapsflib._hdf.maps.layouts import classify_dset_layout
 from bapsflib._hdf.utils.file import File
 from bapsflib._hdf.utils.helpers import (
+    build_chunk_read_plan,
     build_shotnum_dset_relation,
+    build_sndr_for_shotset,
     condition_controls,
     condition_shotnum,
+    decimate_rows,
     do_shotnum_intersection,
+    do_shotnum_union,
+    iter_dset_rows,
+    sorted_isin,
 )
+from bapsflib._hdf.utils.shotset import ShotSet
 from bapsflib._hdf.utils.tests import TestBase
 from bapsflib.utils import _bytes_to_str
 from bapsflib.utils.decorators import with_bf
 
 
+class TestBuildChunkReadPlan(TestBase):
+    """Test Case for build_chunk_read_plan"""
+
+    def setUp(self):
+        super().setUp()
+        data = np.arange(100 * 8, dtype=np.int16).reshape((100, 8))
+        self.f.create_dataset("chunked", data=data, chunks=(10, 4), compression="gzip")
+        self.f.create_dataset("contiguous", data=data)
+
+    def tearDown(self):
+        del self.f["chunked"]
+        del self.f["contiguous"]
+        super().tearDown()
+
+    def assertPlanValid(self, dset, index, plan):
+        """Assert the read plan covers `index` and reads the right rows."""
+        data = dset[...]
+        covered = []
+        for dset_sel, take, out_sel in plan:
+            block = data[dset_sel, ...]
+            if take is not None:
+                block = block[take, ...]
+            self.assertTrue(np.array_equal(block, data[index[out_sel], ...]))
+            covered.extend(range(out_sel.start, out_sel.stop))
+        self.assertEqual(covered, list(range(index.shape[0])))
+
+    def test_chunked(self):
+        dset = self.f["chunked"]
+        row_nbytes = 8 * dset.dtype.itemsize
+
+        # empty index
+        self.assertEqual(build_chunk_read_plan(dset, np.array([], dtype=int)), [])
+
+        # all rows in one read
+        index = np.arange(100)
+        plan = build_chunk_read_plan(dset, index)
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(plan[0][0], slice(0, 100))
+        self.assertIsNone(plan[0][1])
+        self.assertPlanValid(dset, index, plan)
+
+        # bounded blocks never split a chunk
+        index = np.arange(3, 97)
+        plan = build_chunk_read_plan(dset, index, max_block_bytes=25 * row_nbytes)
+        self.assertPlanValid(dset, index, plan)
+        for dset_sel, take, out_sel in plan[:-1]:
+            self.assertEqual(dset_sel.stop % dset.chunks[0], 0)
+
+        # a chunk larger than the block limit is not split
+        plan = build_chunk_read_plan(dset, index, max_block_bytes=row_nbytes)
+        self.assertEqual(len(plan), 10)
+        self.assertPlanValid(dset, index, plan)
+
+        # dense selection reads a span and takes rows
+        index = np.arange(0, 100, 2)
+        plan = build_chunk_read_plan(dset, index)
+        self.assertEqual(len(plan), 1)
+        self.assertIsInstance(plan[0][0], slice)
+        self.assertIsNotNone(plan[0][1])
+        self.assertPlanValid(dset, index, plan)
+
+        # sparse (every Nth row) selection reads only the rows
+        index = np.arange(0, 100, 15)
+        plan = build_chunk_read_plan(dset, index)
+        self.assertEqual(len(plan), 1)
+        self.assertIsInstance(plan[0][0], np.ndarray)
+        self.assertPlanValid(dset, index, plan)
+
+        # slice of rows is split at chunk boundaries only
+        plan = build_chunk_read_plan(dset, slice(3, 97), max_block_bytes=25 * row_nbytes)
+        self.assertPlanValid(dset, np.arange(3, 97), plan)
+        for dset_sel, take, out_sel in plan[:-1]:
+            self.assertIsNone(take)
+            self.assertEqual(dset_sel.stop % dset.chunks[0], 0)
+        plan = build_chunk_read_plan(dset, slice(0, 100, 15))
+        self.assertPlanValid(dset, np.arange(0, 100, 15), plan)
+        self.assertEqual(build_chunk_read_plan(dset, slice(5, 5)), [])
+
+    def test_contiguous(self):
+        dset = self.f["contiguous"]
+        row_nbytes = 8 * dset.dtype.itemsize
+
+        index = np.arange(100)
+        plan = build_chunk_read_plan(dset, index, max_block_bytes=30 * row_nbytes)
+        self.assertEqual(len(plan), 4)
+        self.assertPlanValid(dset, index, plan)
+
+        index = np.array([1, 5, 6, 50, 99])
+        plan = build_chunk_read_plan(dset, index)
+        self.assertPlanValid(dset, index, plan)
+
+
+class TestBuildSndrForShotset(TestBase):
+    """Test Case for build_sndr_for_shotset"""
+
+    def tearDown(self):
+        for name in ("seq", "gap"):
+            if name in self.f:
+                del self.f[name]
+        super().tearDown()
+
+    def test_build_sndr_for_shotset(self):
+        shots = ShotSet(slice(1, 10**9))
+        for name, sn in (("seq", np.arange(3, 23)), ("gap", [1, 2, 3, 7, 8])):
+            data = np.zeros(len(sn), dtype=[("Shot number", np.int32)])
+            data["Shot number"] = sn
+            dset = self.f.create_dataset(name, data=data)
+            layout = classify_dset_layout(dset, "Shot number")
+
+            for shotnum in (ShotSet(slice(5, 50)), ShotSet([2, 3, 4, 8, 30])):
+                with self.subTest(name=name, shotnum=shotnum):
+                    ex_sn = np.intersect1d(shotnum.to_array(), sn)
+                    for _layout in (layout, None):
+                        _sn, index = build_sndr_for_shotset(
+                            shotnum, dset, "Shot number", layout=_layout
+                        )
+                        self.assertEqual(_sn.dtype, np.uint32)
+                        self.assertTrue(np.array_equal(_sn, ex_sn))
+                        self.assertTrue(np.array_equal(dset["Shot number"][index], ex_sn))
+
+        # sequential layouts resolve ranges without expanding them
+        dset = self.f["seq"]
+        layout = classify_dset_layout(dset, "Shot number")
+        with mock.patch.object(ShotSet, "to_array", side_effect=AssertionError):
+            _sn, index = build_sndr_for_shotset(shots, dset, "Shot number", layout)
+        self.assertTrue(np.array_equal(_sn, np.arange(3, 23)))
+        self.assertEqual(index, slice(0, 20, 1))
+
+
 class TestBuildShotnumDsetRelation(TestBase):
     """Test Case for build_shotnum_dset_relation"""
 
@@ -572,6 +710,7 @@ class TestConditionShotnum(TestBase):
             ([0, 1, 5, 8], np.array([1, 5, 8], dtype=np.uint32)),
             ([-20, -5, 10], np.array([10], dtype=np.uint32)),
             ([1, 2, 4], np.array([1, 2, 4], dtype=np.uint32)),
+            ([8, 1, 5, 8, 1], np.array([1, 5, 8], dtype=np.uint32)),
         ]
         for shotnum, ex_sn in sn:
             _sn = condition_shotnum(shotnum, {}, {})
@@ -650,6 +789,29 @@ class TestConditionShotnum(TestBase):
             self.assertIsInstance(_sn, np.ndarray)
             self.assertTrue(np.array_equal(_sn, ex_sn))
 
+    def test_shotnum_shotset(self):
+        # would result in NULL
+        for shotnum in (ShotSet([-20, -1, 0]), ShotSet([])):
+            with self.assertRaises(ValueError):
+                condition_shotnum(shotnum, {}, {})
+
+        # shotnum valid
+        sn = [
+            (ShotSet(slice(-2, 4)), np.array([1, 2, 3], np.uint32)),
+            (ShotSet([20, 3, 4, 5]), np.array([3, 4, 5, 20], np.uint32)),
+        ]
+        for shotnum, ex_sn in sn:
+            _sn = condition_shotnum(shotnum, {}, {})
+
+            self.assertIsInstance(_sn, np.ndarray)
+            self.assertEqual(_sn.dtype, np.uint32)
+            self.assertTrue(np.array_equal(_sn, ex_sn))
+
+            # keep ShotSet ranges
+            _sn = condition_shotnum(shotnum, {}, {}, keep_ranges=True)
+            self.assertIsInstance(_sn, ShotSet)
+            self.assertTrue(np.array_equal(_sn.to_array(), ex_sn))
+
     def test_shotnum_invalid(self):
         # shotnum not int, List[int], slice, or ndarray
         sn = [1.5, None, True, {}]
@@ -658,6 +820,44 @@ class TestConditionShotnum(TestBase):
                 _sn = condition_shotnum(shotnum, {}, {})
 
 
+class TestDecimateRows(ut.TestCase):
+    """Test Case for decimate_rows"""
+
+    def test_methods(self):
+        block = np.arange(3 * 10, dtype=np.int16).reshape((3, 10))
+
+        # no decimation
+        self.assertIs(decimate_rows(block, 1), block)
+
+        # boxcar
+        out = decimate_rows(block, 3)
+        self.assertEqual(out.shape, (3, 3))
+        self.assertEqual(out.dtype, np.float64)
+        self.assertTrue(np.array_equal(out[0], [1.0, 4.0, 7.0]))
+
+        # stride
+        out = decimate_rows(block, 3, method="stride")
+        self.assertEqual(out.dtype, block.dtype)
+        self.assertTrue(np.array_equal(out, block[:, 0:9:3]))
+
+        # fir
+        tt = np.arange(400)
+        block = np.array([np.sin(2.0 * np.pi * tt / 80.0), np.ones(400)])
+        out = decimate_rows(block, 4, method="fir")
+        self.assertEqual(out.shape, (2, 100))
+        self.assertTrue(np.allclose(out[0, 10:-10], block[0, 40:-40:4], atol=1e-2))
+        self.assertTrue(np.allclose(out[1, 10:-10], 1.0, atol=1e-2))
+
+        # aliased signal at the new Nyquist frequency is filtered out
+        block = np.cos(np.pi * tt / 2.0)[np.newaxis, ...]
+        self.assertTrue(np.all(decimate_rows(block, 4, method="stride") == 1.0))
+        out = decimate_rows(block, 4, method="fir")
+        self.assertTrue(np.all(np.abs(out[:, 10:-10]) < 0.05))
+
+        with self.assertRaises(ValueError):
+            decimate_rows(block, 2, method="not a method")
+
+
 class TestDoShotnumIntersection(ut.TestCase):
     """Test Case for do_shotnum_intersection"""
 
@@ -715,6 +915,104 @@ class TestDoShotnumIntersection(ut.TestCase):
             self.assertTrue(np.array_equal(sni_dict[key], [True] * 2))
             self.assertTrue(np.array_equal(index_dict[key], [5, 6]))
 
+    def test_many_datasets(self):
+        """Test intersection behavior against a set based reference"""
+        rng = np.random.default_rng(7)
+        shotnum = np.arange(1, 201, 1)
+        sni_dict = {}
+        index_dict = {}
+        for name in ("digi", "Waveform", "6K Compumotor", "N5700_PS"):
+            sni = rng.random(shotnum.size) < 0.8
+            sni_dict[name] = sni
+            index_dict[name] = np.flatnonzero(sni) + 3
+        ref_sn = shotnum
+        for sni in sni_dict.values():
+            ref_sn = np.intersect1d(ref_sn, shotnum[sni])
+
+        shotnum_out, sni_out, index_out = do_shotnum_intersection(
+            shotnum, dict(sni_dict), dict(index_dict)
+        )
+        self.assertTrue(np.array_equal(shotnum_out, ref_sn))
+        for name in sni_dict:
+            self.assertTrue(np.all(sni_out[name]))
+            self.assertEqual(sni_out[name].shape, ref_sn.shape)
+            self.assertTrue(np.array_equal(index_out[name], ref_sn - 1 + 3))
+
+
+class TestDoShotnumUnion(ut.TestCase):
+    """Test Case for do_shotnum_union"""
+
+    def test_do_shotnum_union(self):
+        shotnum = np.arange(1, 21, 1)
+        sni_dict = {
+            "digi": np.zeros(shotnum.shape, dtype=bool),
+            "Waveform": np.zeros(shotnum.shape, dtype=bool),
+        }
+        index_dict = {"digi": np.array([0, 1, 2]), "Waveform": np.array([9, 10])}
+        sni_dict["digi"][[2, 3, 4]] = True
+        sni_dict["Waveform"][[4, 8]] = True
+        shotnum_out, sni_out, index_out = do_shotnum_union(shotnum, sni_dict, index_dict)
+        self.assertTrue(np.array_equal(shotnum_out, [3, 4, 5, 9]))
+        self.assertTrue(np.array_equal(sni_out["digi"], [True, True, True, False]))
+        self.assertTrue(np.array_equal(sni_out["Waveform"], [False, False, True, True]))
+        self.assertIs(index_out, index_dict)
+        for name in sni_dict:
+            self.assertTrue(
+                np.array_equal(shotnum_out[sni_out[name]], shotnum[sni_dict[name]])
+            )
+
+        # no shot number is recorded
+        sni_dict = {"digi": np.zeros(shotnum.shape, dtype=bool)}
+        shotnum_out, sni_out, _ = do_shotnum_union(shotnum, sni_dict, {})
+        self.assertEqual(shotnum_out.shape, (0,))
+        self.assertEqual(sni_out["digi"].shape, (0,))
+
+
+class TestSortedIsin(ut.TestCase):
+    """Test Case for sorted_isin"""
+
+    def test_sorted_isin(self):
+        rng = np.random.default_rng(11)
+        test_elements = np.unique(rng.integers(1, 100, size=40))
+        element = rng.integers(-5, 110, size=(10, 7))
+        mask = sorted_isin(element, test_elements)
+        self.assertEqual(mask.shape, element.shape)
+        self.assertTrue(np.array_equal(mask, np.isin(element, test_elements)))
+
+        # empty arrays
+        self.assertTrue(np.array_equal(sorted_isin([1, 2], []), [False, False]))
+        self.assertEqual(sorted_isin([], test_elements).shape, (0,))
+
+
+class TestIterDsetRows(TestBase):
+    """Test Case for iter_dset_rows"""
+
+    def setUp(self):
+        super().setUp()
+        data = np.arange(100 * 8, dtype=np.int16).reshape((100, 8))
+        self.f.create_dataset("chunked", data=data, chunks=(10, 4), compression="gzip")
+        self.f.create_dataset("contiguous", data=data)
+
+    def tearDown(self):
+        del self.f["chunked"]
+        del self.f["contiguous"]
+        super().tearDown()
+
+    def test_iter_dset_rows(self):
+        for name in ("chunked", "contiguous"):
+            dset = self.f[name]
+            data = dset[...]
+            for index in (
+                np.arange(100),
+                np.arange(0, 100, 3),
+                np.array([2, 3, 4, 40, 41, 98]),
+                np.array([], dtype=int),
+            ):
+                out = np.zeros((index.shape[0], 8), dtype=dset.dtype)
+                for out_sel, block in iter_dset_rows(dset, index, max_block_bytes=256):
+                    out[out_sel] = block
+                self.assertTrue(np.array_equal(out, data[index, ...]))
+
 
 if __name__ == "__main__":
     ut.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import functools
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils import sharedmem
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.hdfreadmsi import HDFReadMSI
+from bapsflib._hdf.utils.prefetch import _reopen_args, PrefetchReader
+
+
+def with_bf(func):
+    """
+    Test decorator that passes an opened
+    :class:`~bapsflib._hdf.utils.file.File` of the test file.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self):
+        with File(self.filename, **self.file_kw) as bf:
+            return func(self, bf)
+
+    return wrapper
+
+
+class TestPrefetchReader(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.prefetch.PrefetchReader`."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # the worker process can not open a file that is open for
+        # writing, so the faux file is closed before the tests
+        cls.tempdir = tempfile.TemporaryDirectory(prefix="prefetch-test_")
+        cls.filename = os.path.join(cls.tempdir.name, "test.hdf5")
+        bf = FauxHDFBuilder(
+            name=cls.filename,
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": 50, "nt": 100},
+                "Waveform": {"n_configs": 1, "sn_size": 50},
+                "Discharge": {},
+            },
+        )
+        bc_indices = np.where(bf.modules["SIS 3301"].knobs.active_brdch)
+        cls.brd = bc_indices[0][0]
+        cls.ch = bc_indices[1][0]
+        bf.close()
+
+        cls.file_kw = {
+            "control_path": "Raw data + config",
+            "digitizer_path": "Raw data + config",
+            "msi_path": "MSI",
+            "silent": True,
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.tempdir.cleanup()
+
+    def setUp(self):
+        super().setUp()
+        self.owned_names = set(sharedmem._OWNED_NAMES)
+
+    def tearDown(self):
+        super().tearDown()
+
+        # all shared-memory blocks handed over by the worker are freed
+        self.assertEqual(sharedmem._OWNED_NAMES, self.owned_names)
+
+    @with_bf
+    def test_raises(self, _bf):
+        with self.assertRaises(TypeError):
+            PrefetchReader(None, self.brd, self.ch)
+        with self.assertRaises(TypeError):
+            PrefetchReader(_bf, self.brd, self.ch, index=slice(0, 10))
+        with self.assertRaises(TypeError):
+            PrefetchReader(_bf, self.brd, self.ch, shared_memory=True)
+        for kw in ({"depth": 0}, {"max_bytes": 0}, {"block_size": 0}):
+            with self.assertRaises(ValueError):
+                PrefetchReader(_bf, self.brd, self.ch, **kw)
+        with self.assertRaises(ValueError):
+            PrefetchReader(_bf, self.brd, self.ch, digitizer="not a digitizer")
+        with self.assertRaises(ValueError):
+            PrefetchReader(_bf, self.brd, self.ch, shotnum=[500, 600], silent=True)
+
+    @with_bf
+    def test_iteration(self, _bf):
+        kw = {"add_controls": ["Waveform"], "silent": True}
+        ref = _bf.read_data(self.brd, self.ch, **kw)
+
+        reader = PrefetchReader(_bf, self.brd, self.ch, block_size=15, **kw)
+        self.assertEqual(len(reader), 4)
+        self.assertEqual([block.size for block in reader.blocks], [15, 15, 15, 5])
+        blocks = list(reader)
+        self.assertTrue(all(isinstance(block, HDFReadData) for block in blocks))
+        self.assertEqual(len(blocks), 4)
+        self.assertTrue(
+            np.array_equal(
+                np.concatenate([block["shotnum"] for block in blocks]), ref["shotnum"]
+            )
+        )
+        self.assertTrue(
+            np.array_equal(
+                np.concatenate([block["signal"] for block in blocks]), ref["signal"]
+            )
+        )
+        self.assertEqual(blocks[0].info["controls"], ref.info["controls"])
+
+        # can only be iterated once
+        with self.assertRaises(RuntimeError):
+            list(reader)
+
+        # shot number selection and default block size
+        reader = PrefetchReader(_bf, self.brd, self.ch, shotnum=[5, 6, 40], **kw)
+        blocks = list(reader)
+        self.assertEqual(len(blocks), 1)
+        self.assertTrue(np.array_equal(blocks[0]["shotnum"], [5, 6, 40]))
+
+        # union of shot numbers
+        reader = PrefetchReader(
+            _bf,
+            self.brd,
+            self.ch,
+            shotnum=slice(45, 56),
+            intersection_set=False,
+            block_size=4,
+            silent=True,
+        )
+        shotnum = np.concatenate([block["shotnum"] for block in reader])
+        self.assertTrue(np.array_equal(shotnum, np.arange(45, 56)))
+
+    @with_bf
+    def test_msi(self, _bf):
+        ref = _bf.read_msi("Discharge")
+        reader = PrefetchReader(
+            _bf, self.brd, self.ch, block_size=20, msi="Discharge", silent=True
+        )
+        n_rows = 0
+        for data, msi_data in reader:
+            self.assertIsInstance(msi_data["Discharge"], HDFReadMSI)
+            self.assertEqual(msi_data["Discharge"].info, ref.info)
+            self.assertTrue(
+                np.all(np.isin(msi_data["Discharge"]["shotnum"], data["shotnum"]))
+            )
+            n_rows += msi_data["Discharge"].size
+        self.assertEqual(n_rows, np.count_nonzero(np.isin(ref["shotnum"], range(1, 51))))
+
+    @with_bf
+    def test_depth_and_budget(self, _bf):
+        # the worker does not get ahead of the caller by more than
+        # `depth` blocks (+ the block being read)
+        reader = PrefetchReader(
+            _bf, self.brd, self.ch, block_size=5, depth=1, silent=True
+        )
+        n_blocks = 0
+        for _ in reader:
+            n_blocks += 1
+            self.assertLessEqual(len(reader._pending), 2)
+        self.assertEqual(n_blocks, 10)
+
+        # a memory budget smaller than a block still reads one block
+        # ahead
+        reader = PrefetchReader(
+            _bf, self.brd, self.ch, block_size=5, max_bytes=1, silent=True
+        )
+        n_blocks = 0
+        for _ in reader:
+            n_blocks += 1
+            self.assertEqual(len(reader._pending), 0 if n_blocks == 10 else 1)
+        self.assertEqual(n_blocks, 10)
+
+    @with_bf
+    def test_early_close(self, _bf):
+        with PrefetchReader(
+            _bf, self.brd, self.ch, block_size=5, depth=3, silent=True
+        ) as reader:
+            for _ in reader:
+                workers = list(reader._executor._processes.values())
+                break
+        self.assertEqual(len(reader._pending), 0)
+        self.assertFalse(any(proc.is_alive() for proc in workers))
+
+    @with_bf
+    def test_errors_propagate(self, _bf):
+        # raised by this process
+        reader = PrefetchReader(_bf, self.brd, self.ch, msi="not a diag", silent=True)
+        with self.assertRaises(ValueError):
+            list(reader)
+
+        # raised by the worker process
+        reader = PrefetchReader(
+            _bf, self.brd, self.ch, add_controls=["not a control"], silent=True
+        )
+        with self.assertRaises(ValueError):
+            list(reader)
+
+    @with_bf
+    def test_reopen_args(self, _bf):
+        self.assertEqual(_reopen_args(_bf), (File, _bf.filename, self.file_kw))
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.readcache import ReadCache
+from bapsflib._hdf.utils.shotset import ShotSet
+
+
+class TestReadCache(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.readcache.ReadCache`."""
+
+    @staticmethod
+    def build_data(shotnum):
+        data = np.zeros(len(shotnum), dtype=[("shotnum", np.uint32), ("val", float)])
+        data["shotnum"] = shotnum
+        data["val"] = np.asarray(shotnum) * 2.0
+        return data
+
+    def test_raises(self):
+        for max_bytes in (0, -5, 1.5, "1"):
+            with self.assertRaises(ValueError):
+                ReadCache(max_bytes)
+
+    def test_build_key(self):
+        key = ReadCache.build_key(1, [("a", 2)], slice(None), np.arange(3))
+        self.assertEqual(
+            key, ReadCache.build_key(1, [("a", 2)], slice(None), np.arange(3))
+        )
+        self.assertNotEqual(key, ReadCache.build_key(1, [("a", 2)], slice(None), None))
+
+        # not hashable
+        self.assertIsNone(ReadCache.build_key({"a": 1}))
+
+    def test_get_put(self):
+        cache = ReadCache(10 * 1024)
+        key = cache.build_key("read")
+        data = self.build_data(np.arange(1, 21))
+
+        # empty cache
+        self.assertIsNone(cache.get(key, slice(None)))
+        self.assertEqual(cache.misses, 1)
+
+        # put returns read-only view
+        out = cache.put(key, slice(None), data)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, data.nbytes)
+        self.assertFalse(out.flags.writeable)
+        self.assertTrue(np.array_equal(out, data))
+
+        # exact hit
+        out = cache.get(key, slice(None))
+        self.assertEqual(cache.hits, 1)
+        self.assertFalse(out.flags.writeable)
+        self.assertTrue(np.shares_memory(out, data))
+
+        # subset of a "read all"
+        out = cache.get(key, [3, 4, 30])
+        self.assertTrue(np.array_equal(out["shotnum"], [3, 4]))
+        self.assertFalse(out.flags.writeable)
+
+        # union reads need all requested shots
+        self.assertIsNone(cache.get(key, [3, 4, 30], intersection_set=False))
+
+        # NULL result is left to the reader
+        self.assertIsNone(cache.get(key, [50]))
+
+        # subset of a cached shot number array
+        key2 = cache.build_key("other")
+        cache.put(key2, np.arange(5, 10), self.build_data(np.arange(5, 10)))
+        out = cache.get(key2, 7)
+        self.assertTrue(np.array_equal(out["shotnum"], [7]))
+        self.assertIsNone(cache.get(key2, [4, 7]))
+
+        # slices other than slice(None) only match exactly
+        cache.put(key2, slice(1, 5), self.build_data(np.arange(1, 5)))
+        self.assertIsNotNone(cache.get(key2, slice(1, 5)))
+        self.assertIsNone(cache.get(key2, slice(1, 4)))
+
+        # clear
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_eviction(self):
+        data = self.build_data(np.arange(1, 11))
+        cache = ReadCache(2 * data.nbytes)
+        keys = [cache.build_key(ii) for ii in range(3)]
+
+        cache.put(keys[0], slice(None), data.copy())
+        cache.put(keys[1], slice(None), data.copy())
+        cache.get(keys[0], slice(None))  # keys[0] is now most recent
+        cache.put(keys[2], slice(None), data.copy())
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get(keys[0], slice(None)))
+        self.assertIsNone(cache.get(keys[1], slice(None)))
+        self.assertIsNotNone(cache.get(keys[2], slice(None)))
+
+        # too large to be cached
+        big = self.build_data(np.arange(1, 100))
+        out = cache.put(keys[1], slice(None), big)
+        self.assertIs(out, big)
+        self.assertTrue(big.flags.writeable)
+        self.assertEqual(len(cache), 2)
+
+
+class TestFileReadCache(ut.TestCase):
+    """Test case for the read cache of :class:`~bapsflib._hdf.utils.file.File`."""
+
+    def setUp(self):
+        # the faux file needs to be closed so it can be opened readonly
+        self.tempdir = tempfile.TemporaryDirectory(prefix="readcache-test_")
+        self.filename = os.path.join(self.tempdir.name, "test.hdf5")
+        bf = FauxHDFBuilder(
+            name=self.filename,
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": 50, "nt": 100},
+                "Waveform": {"n_configs": 1, "sn_size": 50},
+            },
+        )
+        bc_indices = np.where(bf.modules["SIS 3301"].knobs.active_brdch)
+        self.brd = bc_indices[0][0]
+        self.ch = bc_indices[1][0]
+        bf.close()
+
+        self.bf = File(
+            self.filename,
+            control_path="Raw data + config",
+            digitizer_path="Raw data + config",
+            msi_path="MSI",
+        )
+
+    def tearDown(self):
+        self.bf.close()
+        self.tempdir.cleanup()
+
+    def test_read_data(self):
+        _bf = self.bf
+        self.assertIsNone(_bf.read_cache)
+        _bf.enable_read_cache(max_bytes=10 * 1024**2)
+        self.assertIsInstance(_bf.read_cache, ReadCache)
+
+        kw = {"add_controls": ["Waveform"], "silent": True}
+        data = _bf.read_data(self.brd, self.ch, **kw)
+        self.assertIsInstance(data, HDFReadData)
+        self.assertFalse(data.flags.writeable)
+        self.assertEqual(_bf.read_cache.misses, 1)
+
+        # repeated read
+        data2 = _bf.read_data(self.brd, self.ch, **kw)
+        self.assertEqual(_bf.read_cache.hits, 1)
+        self.assertIsInstance(data2, HDFReadData)
+        self.assertTrue(np.shares_memory(data2, data))
+        self.assertEqual(data2.info, data.info)
+        self.assertIsNot(data2.info, data.info)
+        self.assertIsNotNone(data2.dt)
+
+        # subset read
+        data3 = _bf.read_data(self.brd, self.ch, shotnum=[2, 5, 10], **kw)
+        self.assertEqual(_bf.read_cache.hits, 2)
+        self.assertTrue(np.array_equal(data3["shotnum"], [2, 5, 10]))
+        self.assertTrue(np.array_equal(data3["signal"], data["signal"][[1, 4, 9]]))
+
+        # different arguments are not served from the cache
+        data4 = _bf.read_data(self.brd, self.ch, keep_bits=True, silent=True)
+        self.assertTrue(data4["signal"].dtype != data["signal"].dtype)
+        self.assertEqual(_bf.read_cache.hits, 2)
+
+        # index reads
+        data5 = _bf.read_data(self.brd, self.ch, index=[1, 2], shotnum=[20], **kw)
+        self.assertTrue(np.array_equal(data5["shotnum"], [2, 3]))
+
+        # reads into an output buffer by-pass the cache
+        hits = _bf.read_cache.hits
+        out = np.empty(data3.shape, dtype=data3.dtype)
+        data6 = _bf.read_data(self.brd, self.ch, shotnum=[2, 5, 10], out=out, **kw)
+        self.assertTrue(np.shares_memory(data6, out))
+        self.assertTrue(data6.flags.writeable)
+        self.assertEqual(_bf.read_cache.hits, hits)
+
+        # re-mapping invalidates the cache
+        _bf._map_file()
+        self.assertEqual(len(_bf.read_cache), 0)
+        self.assertEqual(_bf.read_cache.nbytes, 0)
+        hits = _bf.read_cache.hits
+        _bf.read_data(self.brd, self.ch, **kw)
+        self.assertEqual(_bf.read_cache.hits, hits)
+
+        # disable
+        _bf.disable_read_cache()
+        self.assertIsNone(_bf.read_cache)
+        data = _bf.read_data(self.brd, self.ch, **kw)
+        self.assertTrue(data.flags.writeable)
+
+    def test_read_controls(self):
+        _bf = self.bf
+        _bf.enable_read_cache()
+
+        cdata = _bf.read_controls(["Waveform"], shotnum=slice(None))
+        self.assertIsInstance(cdata, HDFReadControls)
+        cdata2 = _bf.read_controls(["Waveform"], shotnum=[3, 4])
+        self.assertEqual(_bf.read_cache.hits, 1)
+        self.assertTrue(np.array_equal(cdata2, cdata[2:4]))
+
+        # ShotSet selections
+        cdata3 = _bf.read_controls(["Waveform"], shotnum=ShotSet(slice(3, 5)))
+        self.assertEqual(_bf.read_cache.hits, 2)
+        self.assertTrue(np.array_equal(cdata3, cdata2))
+
+    def test_mode_rplus(self):
+        self.bf.close()
+        with File(self.filename, mode="r+", silent=True) as _bf:
+            with self.assertRaises(ValueError):
+                _bf.enable_read_cache()
+
+
+if __name__ == "__main__":
+    ut.main()
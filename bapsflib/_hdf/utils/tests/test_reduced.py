@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.helpers import decimate_rows
+from bapsflib._hdf.utils.reduced import write_reduced
+from bapsflib._hdf.utils.tests import TestBase, with_bf
+
+
+class TestWriteReduced(TestBase):
+    """Test case for :func:`~bapsflib._hdf.utils.reduced.write_reduced`."""
+
+    def setUp(self):
+        super().setUp()
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 20, "nt": 64})
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 20})
+        self.f.add_module("Discharge", {})
+        bc_indices = np.where(self.f.modules["SIS 3301"].knobs.active_brdch)
+        self.brd = bc_indices[0][0]
+        self.ch = bc_indices[1][0]
+
+        self.tempdir = tempfile.TemporaryDirectory(prefix="reduced-test_")
+        self.rname = os.path.join(self.tempdir.name, "reduced.hdf5")
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def open_reduced(self) -> File:
+        return File(
+            self.rname,
+            control_path=self.control_path,
+            digitizer_path=self.digitizer_path,
+            msi_path=self.msi_path,
+            silent=True,
+        )
+
+    @with_bf
+    def test_copy(self, _bf):
+        self.assertEqual(write_reduced(_bf, self.rname), self.rname)
+
+        with self.open_reduced() as rf:
+            self.assertEqual(list(rf.digitizers), list(_bf.digitizers))
+            self.assertEqual(list(rf.controls), list(_bf.controls))
+            self.assertEqual(list(rf.msi), list(_bf.msi))
+
+            ref = _bf.read_data(self.brd, self.ch, add_controls=["Waveform"], silent=True)
+            data = rf.read_data(self.brd, self.ch, add_controls=["Waveform"], silent=True)
+            for field in ("shotnum", "signal", "xyz", "FREQ"):
+                self.assertTrue(np.array_equal(data[field], ref[field], equal_nan=True))
+            self.assertEqual(data.dt, ref.dt)
+
+            ref = _bf.read_msi("Discharge", silent=True)
+            data = rf.read_msi("Discharge", silent=True)
+            self.assertEqual(data.tobytes(), ref.tobytes())
+
+            # all per-shot datasets are rewritten chunked and compressed
+            dmap = rf.digitizers["SIS 3301"]
+            cmap = rf.controls["Waveform"]
+            mmap = rf.msi["Discharge"]
+            dpath = dmap.info["group path"]
+            paths = [
+                f"{dpath}/{dmap.construct_dataset_name(self.brd, self.ch)}",
+                f"{dpath}/{dmap.construct_header_dataset_name(self.brd, self.ch)}",
+                *cmap.configs[list(cmap.configs)[0]]["shotnum"]["dset paths"],
+                *mmap.configs["shotnum"]["dset paths"],
+            ]
+            for path in paths:
+                self.assertEqual(rf[path].compression, "gzip")
+                self.assertEqual(rf[path].maxshape[0], None)
+
+        # existing file is not overwritten by default
+        with self.assertRaises(FileExistsError):
+            write_reduced(_bf, self.rname)
+        write_reduced(_bf, self.rname, overwrite=True)
+
+    @with_bf
+    def test_shotnum_and_decimate(self, _bf):
+        shotnum = [2, 3, 5, 8, 13]
+        write_reduced(
+            _bf, self.rname, shotnum=slice(2, 14), decimate=4, compression="lzf"
+        )
+
+        ref = _bf.read_data(
+            self.brd, self.ch, shotnum=shotnum, add_controls=["Waveform"], silent=True
+        )
+        with self.open_reduced() as rf:
+            dmap = rf.digitizers["SIS 3301"]
+            dname = dmap.construct_dataset_name(self.brd, self.ch)
+            dset = rf[f"{dmap.info['group path']}/{dname}"]
+            self.assertEqual(dset.shape, (12, 16))
+            self.assertEqual(dset.compression, "lzf")
+            self.assertEqual(dset.chunks, (12, 16))
+
+            data = rf.read_data(
+                self.brd,
+                self.ch,
+                shotnum=shotnum,
+                add_controls=["Waveform"],
+                silent=True,
+            )
+            self.assertTrue(np.array_equal(data["shotnum"], ref["shotnum"]))
+            self.assertTrue(
+                np.allclose(
+                    data["signal"], decimate_rows(ref["signal"], 4), rtol=1e-5, atol=1e-6
+                )
+            )
+            self.assertTrue(np.array_equal(data["FREQ"], ref["FREQ"]))
+            self.assertEqual(data.info["sample average"], 4)
+            self.assertEqual(data.dt, 4 * ref.dt)
+
+            # controls are reduced too
+            cdata = rf.read_controls(["Waveform"])
+            self.assertTrue(np.array_equal(cdata["shotnum"], np.arange(2, 14)))
+
+    @with_bf
+    def test_time_window(self, _bf):
+        write_reduced(_bf, self.rname, time_window=slice(8, 40), decimate=4)
+
+        ref = _bf.read_data(self.brd, self.ch, silent=True)
+        with self.open_reduced() as rf:
+            data = rf.read_data(self.brd, self.ch, silent=True)
+            self.assertEqual(data["signal"].shape, (20, 8))
+            self.assertTrue(
+                np.allclose(
+                    data["signal"],
+                    decimate_rows(ref["signal"][:, 8:40], 4),
+                    rtol=1e-5,
+                    atol=1e-6,
+                )
+            )
+            self.assertEqual(data.dt, 4 * ref.dt)
+
+        write_reduced(_bf, self.rname, time_window=slice(-16, None), overwrite=True)
+        with self.open_reduced() as rf:
+            data = rf.read_data(self.brd, self.ch, silent=True)
+            self.assertTrue(np.array_equal(data["signal"], ref["signal"][:, -16:]))
+            self.assertEqual(data.dt, ref.dt)
+
+        with self.assertRaises(TypeError):
+            write_reduced(_bf, self.rname, time_window=(8, 40), overwrite=True)
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, time_window=slice(8, 40, 2), overwrite=True)
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, time_window=slice(100, 200), overwrite=True)
+
+    @with_bf
+    def test_drop_digitizer(self, _bf):
+        self.f.add_module("SIS crate", {})
+        _bf._map_file()
+
+        # 'SIS 3305' boards can not be decimated
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, decimate=2)
+        self.assertFalse(os.path.exists(self.rname))
+
+        write_reduced(_bf, self.rname, digitizers="SIS 3301", decimate=2)
+        with self.open_reduced() as rf:
+            self.assertEqual(list(rf.digitizers), ["SIS 3301"])
+
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, digitizers="not a digitizer", overwrite=True)
+
+    @with_bf
+    def test_siscrate_decimate(self, _bf):
+        self.f.remove_module("SIS 3301")
+        self.f.add_module("SIS crate", {})
+        knobs = self.f.modules["SIS crate"].knobs
+        active_brdch = knobs.active_brdch.copy()
+        active_brdch["SIS 3305"][0][0] = False
+        knobs.active_brdch = active_brdch
+        _bf._map_file()
+
+        # sample averaging of the 'SIS 3302' is a power of 2
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, decimate=3)
+        write_reduced(_bf, self.rname, decimate=4, decimate_method="stride")
+
+        ref = _bf.read_data(1, 1, adc="SIS 3302", silent=True)
+        with self.open_reduced() as rf:
+            data = rf.read_data(1, 1, adc="SIS 3302", silent=True)
+            self.assertEqual(data.info["sample average"], 4)
+            self.assertTrue(np.array_equal(data["signal"], ref["signal"][:, ::4]))
+
+            cgroup = rf[
+                rf.digitizers["SIS crate"].configs[data.info["configuration name"]][
+                    "config group path"
+                ]
+            ]
+            for gname in cgroup:
+                if "3302" in gname:
+                    self.assertEqual(
+                        cgroup[gname].attrs["Sample averaging (hardware)"], 2
+                    )
+                    self.assertIsInstance(
+                        cgroup[gname].attrs["Sample averaging (hardware)"], np.uint32
+                    )
+
+    @with_bf
+    def test_raises(self, _bf):
+        with self.assertRaises(TypeError):
+            write_reduced(self.f, self.rname)
+        with self.assertRaises(TypeError):
+            write_reduced(_bf, self.rname, decimate=2.0)
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, decimate=0)
+        with self.assertRaises(ValueError):
+            write_reduced(_bf, self.rname, decimate=2, decimate_method="bogus")
+        self.assertFalse(os.path.exists(self.rname))
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import multiprocessing as mp
+import numpy as np
+import pickle
+import unittest as ut
+
+from unittest import mock
+
+from bapsflib._hdf.utils.hdfreadcontrols import HDFReadControls
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils import sharedmem
+from bapsflib._hdf.utils.sharedmem import SharedArray
+from bapsflib._hdf.utils.tests import TestBase, with_bf
+
+
+def _worker_sum(args):
+    handle, ii = args
+    data = handle.asarray()
+    return type(data).__name__, float(data["signal"][ii].sum())
+
+
+class TestSharedArray(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.sharedmem.SharedArray`."""
+
+    def test_create_attach(self):
+        dtype = [("shotnum", np.uint32), ("signal", np.float32, (10,))]
+        with SharedArray(5, dtype) as handle:
+            self.assertEqual(handle.shape, (5,))
+            self.assertEqual(handle.dtype, np.dtype(dtype))
+
+            arr = handle.asarray()
+            self.assertIs(type(arr), np.ndarray)
+            arr["shotnum"] = np.arange(1, 6)
+
+            # attach by name
+            other = SharedArray(5, dtype, name=handle.name)
+            self.assertTrue(np.array_equal(other.asarray()["shotnum"], np.arange(1, 6)))
+
+            # pickled handle re-attaches to the same memory
+            other = pickle.loads(pickle.dumps(handle))
+            other.asarray()["shotnum"][0] = 42
+            self.assertEqual(arr["shotnum"][0], 42)
+
+            del arr
+            other.close()
+
+    def test_from_array(self):
+        src = np.arange(12, dtype=np.float64).reshape(3, 4)
+        with SharedArray.from_array(src) as handle:
+            arr = handle.asarray()
+            self.assertTrue(np.array_equal(arr, src))
+            self.assertFalse(np.shares_memory(arr, src))
+            del arr
+
+
+class TestFileSharedMemory(TestBase):
+    """
+    Test case for the ``shared_memory`` keyword of
+    :meth:`~bapsflib._hdf.utils.file.File.read_data` and
+    :meth:`~bapsflib._hdf.utils.file.File.read_controls`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 20, "nt": 50})
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 20})
+        bc_indices = np.where(self.f.modules["SIS 3301"].knobs.active_brdch)
+        self.brd = bc_indices[0][0]
+        self.ch = bc_indices[1][0]
+
+    @with_bf
+    def test_read_data(self, _bf):
+        ref = _bf.read_data(self.brd, self.ch, add_controls=["Waveform"], silent=True)
+        handle = _bf.read_data(
+            self.brd,
+            self.ch,
+            add_controls=["Waveform"],
+            silent=True,
+            shared_memory=True,
+        )
+        self.assertIsInstance(handle, SharedArray)
+
+        data = handle.asarray()
+        self.assertIsInstance(data, HDFReadData)
+        self.assertEqual(data.info, ref.info)
+        self.assertEqual(data.dt, ref.dt)
+        self.assertTrue(np.array_equal(data["shotnum"], ref["shotnum"]))
+        self.assertTrue(np.array_equal(data["signal"], ref["signal"]))
+        self.assertEqual(data.dtype, ref.dtype)
+
+        # workers see the data without copying
+        with mp.Pool(2) as pool:
+            results = pool.map_async(_worker_sum, [(handle, ii) for ii in range(3)]).get(
+                timeout=30
+            )
+        for ii, (cls_name, val) in enumerate(results):
+            self.assertEqual(cls_name, "HDFReadData")
+            self.assertEqual(val, float(ref["signal"][ii].sum()))
+
+        del data
+        handle.close()
+        handle.unlink()
+
+    @with_bf
+    def test_read_controls(self, _bf):
+        ref = _bf.read_controls(["Waveform"])
+        with _bf.read_controls(["Waveform"], shared_memory=True) as handle:
+            cdata = handle.asarray()
+            self.assertIsInstance(cdata, HDFReadControls)
+            self.assertEqual(cdata.info, ref.info)
+            self.assertTrue(np.array_equal(cdata, ref))
+            del cdata
+
+    @with_bf
+    def test_failed_fill(self, _bf):
+        # the shared memory segment is released if the fill fails
+        owned = set(sharedmem._OWNED_NAMES)
+        for target, read in (
+            (
+                "bapsflib._hdf.utils.hdfreaddata.iter_dset_rows",
+                lambda: _bf.read_data(self.brd, self.ch, silent=True, shared_memory=True),
+            ),
+            (
+                "bapsflib._hdf.utils.hdfreadcontrols._index_selection",
+                lambda: _bf.read_controls(["Waveform"], shared_memory=True),
+            ),
+        ):
+            with self.subTest(target=target):
+                with mock.patch(target, side_effect=KeyboardInterrupt), mock.patch.object(
+                    SharedArray, "unlink", autospec=True, side_effect=SharedArray.unlink
+                ) as mock_unlink:
+                    with self.assertRaises(KeyboardInterrupt):
+                        read()
+                self.assertEqual(mock_unlink.call_count, 1)
+                self.assertEqual(sharedmem._OWNED_NAMES, owned)
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.hdfreaddata import HDFReadData
+from bapsflib._hdf.utils.shotreader import ShotReader
+
+
+class TestShotReader(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.shotreader.ShotReader`."""
+
+    f = NotImplemented  # type: FauxHDFBuilder
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.f = FauxHDFBuilder(
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": 50, "nt": 100},
+                "Waveform": {"n_configs": 1, "sn_size": 40},
+            }
+        )
+        bc_indices = np.where(cls.f.modules["SIS 3301"].knobs.active_brdch)
+        cls.brd = bc_indices[0][0]
+        cls.ch = bc_indices[1][0]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.f.cleanup()
+
+    def setUp(self):
+        super().setUp()
+        self.bf = File(
+            self.f.filename,
+            control_path="Raw data + config",
+            digitizer_path="Raw data + config",
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.bf.close()
+
+    def assertReadEqual(self, data, ref):
+        self.assertIsInstance(data, HDFReadData)
+        self.assertEqual(data.dtype, ref.dtype)
+        for field in ref.dtype.names:
+            self.assertTrue(
+                np.array_equal(data[field], ref[field], equal_nan=True), msg=field
+            )
+        info = dict(data.info)
+        ref_info = dict(ref.info)
+        self.assertEqual(info.pop("controls"), ref_info.pop("controls"))
+        self.assertEqual(info, ref_info)
+        self.assertEqual(data.dt, ref.dt)
+
+    def test_read(self):
+        _bf = self.bf
+        for kwargs in (
+            {},
+            {"keep_bits": True},
+            {"add_controls": ["Waveform"]},
+            {"out_dtype": np.float64},
+        ):
+            reader = _bf.shot_reader(self.brd, self.ch, silent=True, **kwargs)
+            self.assertIsInstance(reader, ShotReader)
+            for shotnum in (1, [2], [5, 3, 5], np.array([10, 11, 12]), [40, 45, 60]):
+                with self.subTest(kwargs=kwargs, shotnum=shotnum):
+                    data = reader.read(shotnum)
+                    ref = _bf.read_data(
+                        self.brd, self.ch, shotnum=shotnum, silent=True, **kwargs
+                    )
+                    self.assertReadEqual(data, ref)
+
+            # every read has its own info
+            data = reader.read(3)
+            data.info["probe name"] = "probe"
+            self.assertIsNone(reader.read(3).info["probe name"])
+            self.assertIsNone(reader.info["probe name"])
+
+        # shot numbers not recorded
+        reader = _bf.shot_reader(
+            self.brd, self.ch, add_controls=["Waveform"], silent=True
+        )
+        for shotnum in ([], [0], [45, 60], -5):
+            with self.subTest(shotnum=shotnum):
+                data = reader.read(shotnum)
+                self.assertIsInstance(data, HDFReadData)
+                self.assertEqual(data.shape, (0,))
+
+        # nested control meta-info is copied on write
+        data = reader.read(3)
+        data.info["controls"]["Waveform"]["command list"] = ()
+        self.assertEqual(data.info["controls"]["Waveform"]["command list"], ())
+        self.assertNotEqual(
+            reader.read(3).info["controls"]["Waveform"]["command list"], ()
+        )
+
+        # invalid shot numbers
+        for shotnum in (1.5, "one", [[1, 2]]):
+            with self.subTest(shotnum=shotnum):
+                self.assertRaises(ValueError, reader.read, shotnum)
+
+    def test_latest(self):
+        _bf = self.bf
+        reader = _bf.shot_reader(self.brd, self.ch, silent=True)
+        self.assertTrue(np.array_equal(reader.latest()["shotnum"], [50]))
+        self.assertTrue(np.array_equal(reader.latest(3)["shotnum"], [48, 49, 50]))
+        self.assertEqual(reader.latest(100).shape, (50,))
+
+        # only shots with control data
+        reader = _bf.shot_reader(
+            self.brd, self.ch, add_controls=["Waveform"], silent=True
+        )
+        self.assertEqual(reader.latest(5).shape, (0,))
+        self.assertTrue(np.array_equal(reader.latest(12)["shotnum"], [39, 40]))
+
+        for n, exc in ((0, ValueError), (1.5, TypeError), (True, TypeError)):
+            with self.subTest(n=n):
+                self.assertRaises(exc, reader.latest, n)
+
+    def test_control_reload(self):
+        _bf = self.bf
+        reader = _bf.shot_reader(
+            self.brd, self.ch, add_controls=["Waveform"], silent=True
+        )
+
+        # control data that is not pre-loaded is read on demand
+        reader._cdata = reader._cdata[:0]
+        data = reader.read([5, 3, 45])
+        ref = _bf.read_data(
+            self.brd, self.ch, shotnum=[3, 5], add_controls=["Waveform"], silent=True
+        )
+        self.assertReadEqual(data, ref)
+        self.assertTrue(np.array_equal(reader._cdata["shotnum"], [3, 5]))
+
+        data = reader.read([4, 5])
+        self.assertTrue(np.array_equal(data["shotnum"], [4, 5]))
+        self.assertTrue(np.array_equal(reader._cdata["shotnum"], [3, 4, 5]))
+
+    def test_raises(self):
+        _bf = self.bf
+        self.assertRaises(TypeError, ShotReader, self.f, self.brd, self.ch)
+        self.assertRaises(
+            ValueError, _bf.shot_reader, self.brd, self.ch, digitizer="not a digitizer"
+        )
+        self.assertRaises(
+            ValueError, _bf.shot_reader, self.brd, self.ch, add_controls=["not a control"]
+        )
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from unittest import mock
+
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.shotset import ShotSet
+from bapsflib._hdf.utils.tests import TestBase
+from bapsflib.utils.decorators import with_bf
+
+
+class TestShotSet(ut.TestCase):
+    """Test case for :class:`~bapsflib._hdf.utils.shotset.ShotSet`."""
+
+    def test_construction(self):
+        # contiguous selections are a single range
+        shots = ShotSet(slice(1, 10**9))
+        self.assertTrue(shots.is_contiguous)
+        self.assertEqual(len(shots), 10**9 - 1)
+        self.assertTrue(np.array_equal(shots.ranges, [[1, 10**9]]))
+        self.assertEqual((shots.min, shots.max), (1, 10**9 - 1))
+        self.assertIn(500, shots)
+        self.assertNotIn(10**9, shots)
+
+        # lists and arrays are sorted and made unique
+        for shotnum in ([5, 3, 4, 4, 10], np.array([10, 3, 4, 5])):
+            shots = ShotSet(shotnum)
+            self.assertTrue(np.array_equal(shots.ranges, [[3, 6], [10, 11]]))
+            self.assertTrue(np.array_equal(shots.to_array(), [3, 4, 5, 10]))
+            self.assertEqual(shots.to_array().dtype, np.uint32)
+            self.assertEqual(list(shots), [3, 4, 5, 10])
+
+        # other inputs
+        self.assertEqual(ShotSet(7), ShotSet([7]))
+        self.assertEqual(ShotSet(ShotSet([1, 2])), ShotSet(slice(1, 3)))
+        self.assertTrue(np.array_equal(ShotSet(slice(1, 10, 4)), [1, 5, 9]))
+        self.assertEqual(len(ShotSet([])), 0)
+        self.assertFalse(ShotSet([]))
+        self.assertEqual(
+            ShotSet.from_ranges([(5, 8), (1, 3), (2, 6), (10, 12)]),
+            ShotSet.from_ranges([(1, 8), (10, 12)]),
+        )
+
+        # invalid inputs
+        for shotnum in (slice(1, None), slice(10, 1, -1), [1.5], [[1, 2]], True):
+            with self.assertRaises(ValueError):
+                ShotSet(shotnum)
+        with self.assertRaises(ValueError):
+            ShotSet([]).min
+
+    def test_set_operations(self):
+        rng = np.random.default_rng(3)
+        for _ in range(100):
+            a = np.unique(rng.integers(0, 80, size=rng.integers(0, 60)))
+            b = np.unique(rng.integers(0, 80, size=rng.integers(0, 60)))
+            sa, sb = ShotSet(a), ShotSet(b)
+
+            self.assertTrue(np.array_equal(sa | sb, np.union1d(a, b)))
+            self.assertTrue(np.array_equal(sa & sb, np.intersect1d(a, b)))
+            self.assertTrue(np.array_equal(sa - sb, np.setdiff1d(a, b)))
+            self.assertEqual(len(sa | sb), np.union1d(a, b).size)
+
+        # operands are converted to ShotSet
+        shots = ShotSet(slice(1, 101)) - [10, 11, 12]
+        self.assertTrue(np.array_equal(shots.ranges, [[1, 10], [13, 101]]))
+        self.assertEqual(
+            shots.intersection(slice(5, 15)), ShotSet([5, 6, 7, 8, 9, 13, 14])
+        )
+        self.assertEqual(shots.clip(lower=95), ShotSet(slice(95, 101)))
+
+
+class TestShotSetReads(TestBase):
+    """Test reading data with a :class:`ShotSet` selection."""
+
+    def setUp(self):
+        super().setUp()
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 30})
+        self.f.add_module("Waveform", {"n_configs": 1, "sn_size": 30})
+
+    @with_bf
+    def test_reads(self, _bf: File):
+        shots = ShotSet(slice(2, 8)) | [20, 21]
+        data = _bf.read_data(0, 0, shotnum=shots, add_controls=["Waveform"], silent=True)
+        ref = _bf.read_data(
+            0, 0, shotnum=shots.to_array(), add_controls=["Waveform"], silent=True
+        )
+        self.assertTrue(np.array_equal(data["shotnum"], [2, 3, 4, 5, 6, 7, 20, 21]))
+        for field in ("signal", "FREQ"):
+            self.assertTrue(np.array_equal(data[field], ref[field]))
+
+        cdata = _bf.read_controls(["Waveform"], shotnum=ShotSet(slice(-5, 4)))
+        self.assertTrue(np.array_equal(cdata["shotnum"], [1, 2, 3]))
+
+        # ranges are resolved without expanding them
+        ref = _bf.read_data(0, 0, silent=True)
+        with mock.patch.object(ShotSet, "to_array", side_effect=AssertionError):
+            data = _bf.read_data(0, 0, shotnum=ShotSet(slice(1, 10**9)), silent=True)
+        for field in ("shotnum", "signal"):
+            self.assertTrue(np.array_equal(data[field], ref[field]))
+        with self.assertRaises(ValueError):
+            _bf.read_data(0, 0, shotnum=ShotSet(slice(100, 10**9)), silent=True)
+
+
+if __name__ == "__main__":
+    ut.main()
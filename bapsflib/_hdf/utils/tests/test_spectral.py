@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from scipy import signal
+from unittest import mock
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.spectral import (
+    SpectralAccumulator,
+    stream_spectra,
+    stream_spectra_parallel,
+)
+
+
+class TestSpectralAccumulator(ut.TestCase):
+    """
+    Test case for :class:`~bapsflib._hdf.utils.spectral.SpectralAccumulator`.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.x = rng.normal(size=(40, 512))
+        self.y = 0.5 * self.x + rng.normal(size=(40, 512))
+        self.welch_kw = {"fs": 1.0e8, "nperseg": 64, "axis": -1}
+
+    def test_raises(self):
+        for dt in (0.0, -1.0, np.nan):
+            with self.assertRaises(ValueError):
+                SpectralAccumulator(dt)
+        with self.assertRaises(ValueError):
+            SpectralAccumulator(1e-8, nperseg=0)
+
+        acc = SpectralAccumulator(1e-8, nperseg=64)
+        with self.assertRaises(ValueError):
+            acc.add(self.x, self.y[:, :100])
+        with self.assertRaises(ValueError):
+            acc.add(self.x, keys=[1, 2])
+        with self.assertRaises(KeyError):
+            acc.psd()
+
+        acc.add(self.x)
+        with self.assertRaises(ValueError):
+            acc.csd()
+        with self.assertRaises(ValueError):
+            acc.psd(channel="z")
+
+    def test_accumulate(self):
+        acc = SpectralAccumulator(1e-8, nperseg=64)
+        self.assertIsNone(acc.freqs)
+
+        # add in blocks
+        for start in range(0, 40, 15):
+            acc.add(self.x[start : start + 15], self.y[start : start + 15])
+        self.assertEqual(acc.count(), 40)
+        self.assertEqual(acc.keys(), [None])
+
+        freqs, pxx = signal.welch(self.x, **self.welch_kw)
+        _, pyy = signal.welch(self.y, **self.welch_kw)
+        _, pxy = signal.csd(self.x, self.y, **self.welch_kw)
+        self.assertTrue(np.allclose(acc.freqs, freqs))
+        self.assertTrue(np.allclose(acc.psd(), pxx.mean(axis=0)))
+        self.assertTrue(np.allclose(acc.psd(channel="y"), pyy.mean(axis=0)))
+        self.assertTrue(np.allclose(acc.csd(), pxy.mean(axis=0)))
+        coh = np.abs(pxy.mean(axis=0)) ** 2 / (pxx.mean(axis=0) * pyy.mean(axis=0))
+        self.assertTrue(np.allclose(acc.coherence(), coh))
+
+        # NaN (not recorded) shots are skipped
+        x = self.x[:2].copy()
+        x[0, 5] = np.nan
+        acc = SpectralAccumulator(1e-8, nperseg=64)
+        acc.add(x)
+        self.assertEqual(acc.count(), 1)
+
+    def test_groups_and_merge(self):
+        keys = [ii % 2 for ii in range(40)]
+        acc = SpectralAccumulator(1e-8, nperseg=64)
+        acc.add(self.x[:20], keys=keys[:20])
+        acc2 = SpectralAccumulator(1e-8, nperseg=64)
+        acc2.add(self.x[20:], keys=keys[20:])
+        acc.merge(acc2)
+
+        self.assertEqual(sorted(acc.keys()), [0, 1])
+        self.assertEqual(acc.count(0), 20)
+        _, pxx = signal.welch(self.x[1::2], **self.welch_kw)
+        self.assertTrue(np.allclose(acc.psd(1), pxx.mean(axis=0)))
+
+        with self.assertRaises(ValueError):
+            acc.merge(SpectralAccumulator(1e-8, nperseg=32))
+
+
+class TestStreamSpectra(ut.TestCase):
+    """
+    Test case for :func:`~bapsflib._hdf.utils.spectral.stream_spectra`
+    and :func:`~bapsflib._hdf.utils.spectral.stream_spectra_parallel`.
+    """
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="spectral-test_")
+        self.filename = os.path.join(self.tempdir.name, "test.hdf5")
+        bf = FauxHDFBuilder(
+            name=self.filename,
+            add_modules={
+                "SIS 3301": {"n_configs": 1, "sn_size": 30, "nt": 256},
+                "Waveform": {"n_configs": 1, "sn_size": 30},
+            },
+        )
+        active_brdch = bf.modules["SIS 3301"].knobs.active_brdch.copy()
+        active_brdch[0, :2] = True
+        bf.modules["SIS 3301"].knobs.active_brdch = active_brdch
+        bc_indices = np.where(bf.modules["SIS 3301"].knobs.active_brdch)
+        self.channels = list(zip(bc_indices[0][:2], bc_indices[1][:2]))
+        bf.close()
+
+        self.file_kw = {
+            "control_path": "Raw data + config",
+            "digitizer_path": "Raw data + config",
+            "msi_path": "MSI",
+            "silent": True,
+        }
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_stream_spectra(self):
+        (brd, ch), cross = self.channels
+        with File(self.filename, **self.file_kw) as bf:
+            data = bf.read_data(brd, ch, silent=True)
+            ydata = bf.read_data(*cross, silent=True)
+            kw = {"fs": 1.0 / data.dt.to("s").value, "nperseg": 64, "axis": -1}
+            _, pxx = signal.welch(data["signal"], **kw)
+            _, pxy = signal.csd(data["signal"], ydata["signal"], **kw)
+
+            acc = stream_spectra(
+                bf, brd, ch, cross=cross, nperseg=64, block_size=7, silent=True
+            )
+            self.assertEqual(acc.count(), 30)
+            self.assertTrue(np.isclose(acc.dt, data.dt.to("s").value))
+            self.assertTrue(np.allclose(acc.psd(), pxx.mean(axis=0), rtol=1e-4))
+            self.assertTrue(np.allclose(acc.csd(), pxy.mean(axis=0), rtol=1e-4))
+
+            # group by a control field
+            cdata = bf.read_controls(["Waveform"])
+            acc = stream_spectra(
+                bf,
+                brd,
+                ch,
+                group_by="FREQ",
+                add_controls=["Waveform"],
+                nperseg=64,
+                block_size=7,
+                silent=True,
+            )
+            self.assertEqual(
+                sorted(acc.keys()), sorted(np.unique(cdata["FREQ"]).tolist())
+            )
+            self.assertEqual(sum(acc.count(key) for key in acc.keys()), 30)
+
+            # group by position
+            acc = stream_spectra(bf, brd, ch, group_by="xyz", nperseg=64, silent=True)
+            self.assertEqual(acc.keys(), [(None, None, None)])
+
+            with self.assertRaises(ValueError):
+                stream_spectra(bf, brd, ch, group_by="signal", silent=True)
+            with self.assertRaises(ValueError):
+                stream_spectra(bf, brd, ch, group_by="not a field", silent=True)
+
+            # no blocks read
+            with mock.patch(
+                f"{stream_spectra.__module__}.PrefetchReader.__iter__",
+                return_value=iter([]),
+            ), self.assertRaises(ValueError):
+                stream_spectra(bf, brd, ch, silent=True)
+
+    def test_stream_spectra_parallel(self):
+        kw = {"nperseg": 64, "silent": True}
+        results = stream_spectra_parallel(
+            self.filename, self.channels, file_kwargs=self.file_kw, n_workers=2, **kw
+        )
+        self.assertEqual(list(results), self.channels)
+
+        with File(self.filename, **self.file_kw) as bf:
+            for brdch, acc in results.items():
+                ref = stream_spectra(bf, *brdch, **kw)
+                self.assertTrue(np.allclose(acc.psd(), ref.psd()))
+
+        # serial
+        results = stream_spectra_parallel(
+            self.filename, self.channels[:1], file_kwargs=self.file_kw, **kw
+        )
+        self.assertEqual(results[self.channels[0]].count(), 30)
+
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from unittest import mock
+
+from bapsflib._hdf.utils.tests import TestBase, with_bf
+from bapsflib._hdf.utils.vds import build_channel_vds, ChannelStack
+
+
+class TestChannelStack(TestBase):
+    """
+    Test case for :func:`~bapsflib._hdf.utils.vds.build_channel_vds` and
+    :class:`~bapsflib._hdf.utils.vds.ChannelStack`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.f.add_module("SIS 3301", {"n_configs": 1, "sn_size": 20, "nt": 32})
+        knobs = self.f.modules["SIS 3301"].knobs
+        active_brdch = knobs.active_brdch.copy()
+        active_brdch[0, :3] = True
+        knobs.active_brdch = active_brdch
+        self.channels = [(0, 0), (0, 1), (0, 2)]
+
+        self.tempdir = tempfile.TemporaryDirectory(prefix="vds-test_")
+        self.sidecar = os.path.join(self.tempdir.name, "sidecar.hdf5")
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def raw_signal(self, _bf, brd, ch):
+        dmap = _bf.digitizers["SIS 3301"]
+        dname = dmap.construct_dataset_name(brd, ch, config_name=dmap.active_configs[0])
+        return _bf[f"{dmap.info['group path']}/{dname}"][...]
+
+    @with_bf
+    def test_build(self, _bf):
+        sidecar, group_path = build_channel_vds(_bf, sidecar=self.sidecar)
+        self.assertEqual(sidecar, self.sidecar)
+
+        with h5py.File(sidecar, "r") as sf:
+            grp = sf[group_path]
+            self.assertTrue(grp["signal"].is_virtual)
+            self.assertTrue(grp["header"].is_virtual)
+            self.assertEqual(grp["signal"].shape, (3, 20, 32))
+            self.assertEqual(grp["header"].shape, (3, 20))
+            self.assertTrue(np.array_equal(grp["channels"][...], self.channels))
+            self.assertTrue(np.array_equal(grp["shotnum"][...], np.arange(1, 21)))
+            for ii, (brd, ch) in enumerate(self.channels):
+                self.assertTrue(
+                    np.array_equal(grp["signal"][ii], self.raw_signal(_bf, brd, ch))
+                )
+
+        # cached group is re-used, unless a rebuild is requested
+        with h5py.File(sidecar, "a") as sf:
+            sf[group_path].attrs["marker"] = True
+        build_channel_vds(_bf, sidecar=self.sidecar)
+        with h5py.File(sidecar, "r") as sf:
+            self.assertIn("marker", sf[group_path].attrs)
+        build_channel_vds(_bf, sidecar=self.sidecar, rebuild=True)
+        with h5py.File(sidecar, "r") as sf:
+            self.assertNotIn("marker", sf[group_path].attrs)
+
+    @with_bf
+    def test_default_sidecar(self, _bf):
+        root = os.path.splitext(os.path.abspath(_bf.filename))[0]
+        with ChannelStack(_bf) as stack:
+            self.assertEqual(stack.sidecar, root + ".SIS_3301.config01.SIS_3301.vds.hdf5")
+            self.assertTrue(os.path.exists(stack.sidecar))
+            sidecar = stack.sidecar
+        os.remove(sidecar)
+
+        # sidecar is cached elsewhere if the source directory is read-only
+        with mock.patch(
+            f"{ChannelStack.__module__}.os.access", return_value=False
+        ), mock.patch(
+            f"{ChannelStack.__module__}._cache_dir", return_value=self.tempdir.name
+        ):
+            with ChannelStack(_bf) as stack:
+                self.assertEqual(os.path.dirname(stack.sidecar), self.tempdir.name)
+                self.assertTrue(os.path.exists(stack.sidecar))
+                signal, _ = stack.read()
+                self.assertEqual(signal.shape, (3, 20, 32))
+
+    @with_bf
+    def test_live_stacks(self, _bf):
+        """Several stacks of one file can be open at the same time."""
+        self.f.add_module("SIS crate", {})
+        _bf._map_file()
+
+        stacks = [
+            ChannelStack(_bf, digitizer="SIS 3301"),
+            ChannelStack(_bf, digitizer="SIS crate", adc="SIS 3302"),
+            ChannelStack(_bf, digitizer="SIS crate", adc="SIS 3305"),
+            ChannelStack(_bf, digitizer="SIS 3301"),
+        ]
+        try:
+            self.assertEqual(len({stack.sidecar for stack in stacks}), 3)
+            self.assertEqual(stacks[0].sidecar, stacks[3].sidecar)
+            for stack in stacks:
+                signal, shotnum = stack.read()
+                self.assertEqual(signal.shape[:2], (len(stack.channels), shotnum.size))
+        finally:
+            for stack in stacks:
+                stack.close()
+                if os.path.exists(stack.sidecar):
+                    os.remove(stack.sidecar)
+
+    @with_bf
+    def test_read(self, _bf):
+        with ChannelStack(_bf, digitizer="SIS 3301", sidecar=self.sidecar) as stack:
+            self.assertEqual(stack.channels, self.channels)
+            self.assertTrue(np.array_equal(stack.shotnum, np.arange(1, 21)))
+            self.assertEqual(stack.info["digitizer"], "SIS 3301")
+            self.assertEqual(stack.info["adc"], "SIS 3301")
+
+            # all channels and shot numbers
+            signal, shotnum = stack.read()
+            self.assertEqual(signal.shape, (3, 20, 32))
+            self.assertTrue(np.array_equal(shotnum, np.arange(1, 21)))
+            for ii, (brd, ch) in enumerate(self.channels):
+                self.assertTrue(np.array_equal(signal[ii], self.raw_signal(_bf, brd, ch)))
+
+            # unordered channels and non-consecutive shot numbers
+            signal, shotnum = stack.read(
+                channels=[(0, 2), (0, 0)], shotnum=[2, 3, 4, 10, 15, 30]
+            )
+            self.assertTrue(np.array_equal(shotnum, [2, 3, 4, 10, 15]))
+            rows = shotnum - 1
+            self.assertTrue(np.array_equal(signal[0], self.raw_signal(_bf, 0, 2)[rows]))
+            self.assertTrue(np.array_equal(signal[1], self.raw_signal(_bf, 0, 0)[rows]))
+
+            # single channel and slice of shot numbers
+            signal, shotnum = stack.read(channels=(0, 1), shotnum=slice(5, 9))
+            self.assertEqual(signal.shape, (1, 4, 32))
+            self.assertTrue(np.array_equal(signal[0], self.raw_signal(_bf, 0, 1)[4:8]))
+
+            # no recorded shot numbers
+            signal, shotnum = stack.read(shotnum=[50])
+            self.assertEqual(signal.shape, (3, 0, 32))
+
+            with self.assertRaises(ValueError):
+                stack.read(channels=[(1, 1)])
+
+    @with_bf
+    def test_raises(self, _bf):
+        with self.assertRaises(TypeError):
+            build_channel_vds(self.f, sidecar=self.sidecar)
+        with self.assertRaises(ValueError):
+            build_channel_vds(_bf, digitizer="not a digitizer", sidecar=self.sidecar)
+        with self.assertRaises(ValueError):
+            build_channel_vds(_bf, config_name="not a config", sidecar=self.sidecar)
+        with self.assertRaises(ValueError):
+            build_channel_vds(_bf, adc="SIS 3305", sidecar=self.sidecar)
+
+
+if __name__ == "__main__":
+    ut.main()
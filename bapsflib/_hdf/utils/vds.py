@@ -0,0 +1,537 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for stacking the digitizer channels of a configuration into
+HDF5 virtual datasets (see
+`~bapsflib._hdf.utils.vds.ChannelStack`).
+"""
+__all__ = ["build_channel_vds", "ChannelStack"]
+
+import h5py
+import hashlib
+import numpy as np
+import os
+import re
+import sys
+import warnings
+
+from typing import Any, Dict, List, Tuple, Union
+
+from bapsflib._hdf.maps.digitizers.templates import HDFMapDigiTemplate
+from bapsflib._hdf.utils.file import File
+from bapsflib._hdf.utils.helpers import condition_shotnum
+from bapsflib.utils.warnings import BaPSFWarning
+
+
+def _cache_dir() -> str:
+    """User cache directory for sidecar files."""
+    if sys.platform == "win32":  # pragma: no cover
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~/AppData/Local"))
+    elif sys.platform == "darwin":  # pragma: no cover
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", "") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "bapsflib", "vds")
+
+
+def _sidecar_name(file: File, group_path: str) -> str:
+    """
+    Default name of the sidecar file holding the virtual dataset group
+    **group_path** of **file**.  Each group gets its own sidecar file,
+    next to **file** or, if that directory is not writable, in the
+    user cache directory.
+    """
+    src_name = os.path.abspath(file.filename)
+    src_dir, basename = os.path.split(src_name)
+    root = os.path.splitext(basename)[0]
+    tag = ".".join(
+        re.sub(r"[^\w\-]+", "_", name) for name in group_path.strip("/").split("/")
+    )
+    if os.access(src_dir, os.W_OK):
+        return os.path.join(src_dir, f"{root}.{tag}.vds.hdf5")
+
+    # cached sidecar files are named uniquely per source file
+    cache_dir = _cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = hashlib.sha1(src_name.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{root}-{digest}.{tag}.vds.hdf5")
+
+
+def _resolve_config(
+    file: File,
+    digitizer: Union[str, None],
+    config_name: Union[str, None],
+    adc: Union[str, None],
+) -> Tuple[HDFMapDigiTemplate, str, str]:
+    """Resolve the digitizer map, configuration name, and adc name."""
+    if not bool(file.digitizers):
+        raise ValueError("There are no digitizers in the HDF5 file.")
+    elif digitizer is None:
+        _dmap = file.file_map.main_digitizer
+        if _dmap is None:
+            raise ValueError(
+                "No main digitizer is identified...need to specify `digitizer` kwarg"
+            )
+    elif digitizer not in file.digitizers:
+        raise ValueError(
+            f"Specified Digitizer '{digitizer}' is not among known "
+            f"digitizers ({list(file.digitizers)})"
+        )
+    else:
+        _dmap = file.digitizers[digitizer]
+
+    if config_name is None:
+        if len(_dmap.active_configs) != 1:
+            raise ValueError(
+                f"Digitizer '{_dmap.device_name}' does not have exactly one active "
+                f"configuration...`config_name` kwarg must be specified."
+            )
+        config_name = _dmap.active_configs[0]
+    elif config_name not in _dmap.active_configs:
+        raise ValueError(
+            f"Configuration '{config_name}' is not an active configuration of "
+            f"digitizer '{_dmap.device_name}'."
+        )
+
+    config = _dmap.configs[config_name]
+    if adc is None:
+        if len(config["adc"]) != 1:
+            raise ValueError(
+                f"Configuration '{config_name}' uses multiple adc's "
+                f"{config['adc']}...`adc` kwarg must be specified."
+            )
+        adc = config["adc"][0]
+    elif adc not in config["adc"]:
+        raise ValueError(
+            f"Specified adc ({adc}) is not in specified configuration ({config_name})."
+        )
+
+    return _dmap, config_name, adc
+
+
+def build_channel_vds(
+    file: File,
+    digitizer: Union[str, None] = None,
+    config_name: Union[str, None] = None,
+    adc: Union[str, None] = None,
+    sidecar: Union[str, os.PathLike, None] = None,
+    rebuild: bool = False,
+) -> Tuple[str, str]:
+    """
+    Build HDF5 virtual datasets that stack all connected channels of a
+    digitizer configuration, and cache them in a sidecar HDF5 file.
+
+    The group ``/<digitizer>/<config_name>/<adc>`` of the sidecar file
+    contains:
+
+    .. csv-table::
+        :header: "Dataset", "Description"
+        :widths: 20, 60
+
+        "``'signal'``", "
+        virtual dataset of shape ``(nchannel, nshotnum, nt)`` stacking
+        the digitizer datasets
+        "
+        "``'header'``", "
+        virtual dataset of shape ``(nchannel, nshotnum)`` stacking the
+        header datasets
+        "
+        "``'channels'``", "
+        the ``(board, channel)`` numbers of each stacked channel
+        "
+        "``'shotnum'``", "
+        the shot numbers of each row (common to all channels)
+        "
+
+    The group is re-used if it was built from the same source file
+    (same path, size, and modification time), otherwise it is rebuilt.
+    An up-to-date group is only opened read-only, so a sidecar file
+    that is held open by a `ChannelStack` can be re-used.  Rebuilding a
+    group requires the sidecar file to not be open anywhere else.
+
+    Parameters
+    ----------
+    file : `~bapsflib._hdf.utils.file.File`
+        the opened HDF5 file
+
+    digitizer : `str`, optional
+        name of the digitizer (DEFAULT the main digitizer)
+
+    config_name : `str`, optional
+        name of the digitizer configuration (DEFAULT the active
+        configuration)
+
+    adc : `str`, optional
+        name of the analog-digital-converter (DEFAULT the
+        configuration's adc, if it uses only one)
+
+    sidecar : `str`, optional
+        name of the sidecar HDF5 file (DEFAULT the name of **file**
+        with the digitizer, configuration, and adc names and the
+        extension ``.vds.hdf5``, placed next to **file** or in the user
+        cache directory if the directory of **file** is not writable)
+
+    rebuild : `bool`, optional
+        rebuild the virtual datasets even if the cached ones are up to
+        date (DEFAULT `False`)
+
+    Returns
+    -------
+    sidecar : `str`
+        name of the sidecar HDF5 file
+
+    group_path : `str`
+        path of the group containing the virtual datasets
+    """
+    if not isinstance(file, File):
+        raise TypeError(f"Expected a bapsflib File object, got type {type(file)}.")
+
+    _dmap, config_name, adc = _resolve_config(file, digitizer, config_name, adc)
+    group_path = "/".join(
+        name.replace("/", "_") for name in ("", _dmap.device_name, config_name, adc)
+    )
+    sidecar = _sidecar_name(file, group_path) if sidecar is None else os.fspath(sidecar)
+
+    # gather stacked datasets
+    config = _dmap.configs[config_name]
+    dpath = _dmap.info["group path"]
+    channels = []
+    dset_paths = []
+    header_paths = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=BaPSFWarning)
+        for brd, chs, _ in config[adc]:
+            for ch in chs:
+                dname = _dmap.construct_dataset_name(
+                    brd, ch, config_name=config_name, adc=adc
+                )
+                hname = _dmap.construct_header_dataset_name(
+                    brd, ch, config_name=config_name, adc=adc
+                )
+                channels.append((brd, ch))
+                dset_paths.append(f"{dpath}/{dname}")
+                header_paths.append(f"{dpath}/{hname}")
+    if len(channels) == 0:
+        raise ValueError(
+            f"Configuration '{config_name}' has no connected '{adc}' channels."
+        )
+
+    src_name = os.path.abspath(file.filename)
+    src_stat = os.stat(src_name)
+    source = {
+        "source file": src_name,
+        "source size": np.int64(src_stat.st_size),
+        "source mtime": np.int64(src_stat.st_mtime_ns),
+        "dataset paths": np.array(dset_paths, dtype=h5py.string_dtype()),
+    }
+
+    # check the cached group read-only, so a sidecar file that is
+    # already open read-only (e.g. by a ChannelStack) can be re-used
+    if not rebuild and os.path.exists(sidecar):
+        with h5py.File(sidecar, "r") as sf:
+            if group_path in sf and all(
+                key in sf[group_path].attrs
+                and np.array_equal(sf[group_path].attrs[key], val)
+                for key, val in source.items()
+            ):
+                return sidecar, group_path
+
+    with h5py.File(sidecar, "a") as sf:
+        if group_path in sf:
+            del sf[group_path]
+
+        grp = sf.create_group(group_path)
+        try:
+            _build_group(grp, file, src_name, channels, dset_paths, header_paths, config)
+        except BaseException:
+            del sf[group_path]
+            raise
+
+        for key, val in source.items():
+            grp.attrs[key] = val
+
+    return sidecar, group_path
+
+
+def _build_group(
+    grp: h5py.Group,
+    file: File,
+    src_name: str,
+    channels: List[Tuple[int, int]],
+    dset_paths: List[str],
+    header_paths: List[str],
+    config: Dict[str, Any],
+):
+    """Create the virtual datasets in group **grp**."""
+    dset = file[dset_paths[0]]
+    hdset = file[header_paths[0]]
+    nshotnum, nt = dset.shape
+    for dset_path, header_path in zip(dset_paths, header_paths):
+        if (
+            file[dset_path].shape != dset.shape
+            or file[dset_path].dtype != dset.dtype
+            or file[header_path].shape != hdset.shape
+            or file[header_path].dtype != hdset.dtype
+        ):
+            raise ValueError(
+                f"Dataset '{dset_path}' (or its header) does not have the same "
+                f"shape and dtype as '{dset_paths[0]}', can not stack channels."
+            )
+
+    nch = len(channels)
+    layout = h5py.VirtualLayout(shape=(nch, nshotnum, nt), dtype=dset.dtype)
+    hlayout = h5py.VirtualLayout(shape=(nch, nshotnum), dtype=hdset.dtype)
+    for ii, (dset_path, header_path) in enumerate(zip(dset_paths, header_paths)):
+        layout[ii] = h5py.VirtualSource(src_name, dset_path, shape=(nshotnum, nt))
+        hlayout[ii] = h5py.VirtualSource(
+            src_name, header_path, shape=(nshotnum,), dtype=hdset.dtype
+        )
+    grp.create_virtual_dataset("signal", layout)
+    grp.create_virtual_dataset("header", hlayout)
+
+    # the shot numbers of all channels must line up
+    sn_field = config["shotnum"]["dset field"][0]
+    shotnum = hdset[sn_field]
+    for header_path in header_paths[1:]:
+        if not np.array_equal(file[header_path][sn_field], shotnum):
+            raise ValueError(
+                f"Header dataset '{header_path}' does not record the same shot "
+                f"numbers as '{header_paths[0]}', can not stack channels."
+            )
+
+    grp.create_dataset("channels", data=np.array(channels, dtype=np.int32))
+    grp.create_dataset("shotnum", data=shotnum)
+    grp.attrs["shotnum field"] = sn_field
+
+
+class ChannelStack:
+    """
+    Read multiple channels of a digitizer configuration through the
+    virtual datasets built by :func:`build_channel_vds`.
+
+    A read of any set of channels and shot numbers is done as one
+    hyperslab selection of the stacked ``'signal'`` virtual dataset,
+    instead of one dataset open and read per channel.  The returned
+    signals are the raw (bit) values of the digitizer datasets, use
+    :attr:`info` to convert them.
+
+    Examples
+    --------
+
+    >>> f = File('run42.hdf5')
+    >>> with ChannelStack(f, digitizer='SIS 3301') as stack:
+    ...     signal, shotnum = stack.read(
+    ...         channels=[(0, 0), (0, 3), (1, 2)], shotnum=slice(1, 101)
+    ...     )
+    >>> signal.shape
+    (3, 100, 16384)
+    """
+
+    def __init__(
+        self,
+        file: File,
+        digitizer: Union[str, None] = None,
+        config_name: Union[str, None] = None,
+        adc: Union[str, None] = None,
+        sidecar: Union[str, os.PathLike, None] = None,
+        rebuild: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        file : `~bapsflib._hdf.utils.file.File`
+            the opened HDF5 file
+
+        digitizer : `str`, optional
+            name of the digitizer (DEFAULT the main digitizer)
+
+        config_name : `str`, optional
+            name of the digitizer configuration (DEFAULT the active
+            configuration)
+
+        adc : `str`, optional
+            name of the analog-digital-converter (DEFAULT the
+            configuration's adc, if it uses only one)
+
+        sidecar : `str`, optional
+            name of the sidecar HDF5 file (DEFAULT see
+            :func:`build_channel_vds`)
+
+        rebuild : `bool`, optional
+            rebuild the virtual datasets even if the cached ones are up
+            to date (DEFAULT `False`)
+        """
+        self._sidecar, group_path = build_channel_vds(
+            file,
+            digitizer=digitizer,
+            config_name=config_name,
+            adc=adc,
+            sidecar=sidecar,
+            rebuild=rebuild,
+        )
+        _dmap, config_name, adc = _resolve_config(file, digitizer, config_name, adc)
+
+        self._sf = h5py.File(self._sidecar, "r")
+        self._group = self._sf[group_path]
+        self._channels = [tuple(int(val) for val in bc) for bc in self._group["channels"]]
+        self._shotnum = self._group["shotnum"][...]
+
+        brd, ch = self._channels[0]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=BaPSFWarning)
+            _, info = _dmap.construct_dataset_name(
+                brd, ch, config_name=config_name, adc=adc, return_info=True
+            )
+            hname = _dmap.construct_header_dataset_name(
+                brd, ch, config_name=config_name, adc=adc
+            )
+        self._header_dset = file[f"{_dmap.info['group path']}/{hname}"]
+        self._sn_field = self._group.attrs["shotnum field"]
+        self._info = {
+            "source file": os.path.abspath(file.filename),
+            "digitizer": _dmap.device_name,
+            "configuration name": config_name,
+            "adc": adc,
+            "bit": info["bit"],
+            "clock rate": info["clock rate"],
+            "sample average": info["sample average (hardware)"],
+            "shot average": info["shot average (software)"],
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def channels(self) -> List[Tuple[int, int]]:
+        """The ``(board, channel)`` numbers of the stacked channels."""
+        return list(self._channels)
+
+    @property
+    def header(self) -> h5py.Dataset:
+        """The stacked ``(nchannel, nshotnum)`` header virtual dataset."""
+        return self._group["header"]
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        """Meta-info of the stacked digitizer configuration."""
+        return self._info.copy()
+
+    @property
+    def shotnum(self) -> np.ndarray:
+        """The shot numbers of the stacked datasets' rows."""
+        return self._shotnum.copy()
+
+    @property
+    def sidecar(self) -> str:
+        """Name of the sidecar HDF5 file."""
+        return self._sidecar
+
+    @property
+    def signal(self) -> h5py.Dataset:
+        """The stacked ``(nchannel, nshotnum, nt)`` virtual dataset."""
+        return self._group["signal"]
+
+    def close(self):
+        """Close the sidecar HDF5 file."""
+        self._sf.close()
+
+    def read(
+        self, channels: Union[List[Tuple[int, int]], None] = None, shotnum=slice(None)
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the signals of **channels** for shot numbers **shotnum**
+        in one hyperslab read.
+
+        Parameters
+        ----------
+        channels : List[Tuple[int, int]], optional
+            the ``(board, channel)`` numbers to read (DEFAULT all
+            stacked channels)
+
+        shotnum : Union[int, list(int), slice(), numpy.array], optional
+            HDF5 global shot number(s) to read (DEFAULT all shot
+            numbers)
+
+        Returns
+        -------
+        signal : `numpy.ndarray`
+            array of shape ``(len(channels), len(shotnum), nt)`` with
+            the raw digitizer values
+
+        shotnum : `numpy.ndarray`
+            the shot numbers of the read rows (only shot numbers
+            recorded in the datasets are read)
+        """
+        # channel indices
+        if channels is None:
+            ch_index = np.arange(len(self._channels))
+        else:
+            if isinstance(channels, tuple) and len(channels) == 2:
+                channels = [channels]
+            try:
+                ch_index = np.array(
+                    [self._channels.index(tuple(bc)) for bc in channels], dtype=np.intp
+                )
+            except ValueError:
+                raise ValueError(
+                    f"Requested channels {channels} are not all among the stacked "
+                    f"channels {self._channels}."
+                )
+        if ch_index.size == 0:
+            raise ValueError("No channels requested.")
+
+        # row indices
+        if isinstance(shotnum, slice) and shotnum == slice(None):
+            rows = np.arange(self._shotnum.size)
+        else:
+            shotnum = condition_shotnum(
+                shotnum, {"header": self._header_dset}, {"header": self._sn_field}
+            )
+            rows = np.where(np.isin(self._shotnum, shotnum))[0]
+
+        dset = self._group["signal"]
+        nt = dset.shape[2]
+        sorted_ch, inverse = np.unique(ch_index, return_inverse=True)
+        out = np.empty((sorted_ch.size, rows.size, nt), dtype=dset.dtype)
+
+        if rows.size != 0:
+            # build the hyperslab selection as the union of blocks of
+            # consecutive channels and rows
+            fspace = dset.id.get_space()
+            fspace.select_none()
+            for ch_start, ch_count in _runs(sorted_ch):
+                for row_start, row_count in _runs(rows):
+                    fspace.select_hyperslab(
+                        (ch_start, row_start, 0),
+                        (1, 1, 1),
+                        block=(ch_count, row_count, nt),
+                        op=h5py.h5s.SELECT_OR,
+                    )
+            mspace = h5py.h5s.create_simple(out.shape)
+            dset.id.read(mspace, fspace, out)
+
+        if not np.array_equal(sorted_ch, ch_index):
+            out = out[inverse.reshape(-1)]
+
+        return out, self._shotnum[rows]
+
+
+def _runs(index: np.ndarray) -> List[Tuple[int, int]]:
+    """Split a sorted index array into ``(start, count)`` runs."""
+    if index.size == 0:
+        return []
+    breaks = np.where(np.diff(index) != 1)[0] + 1
+    starts = np.concatenate(([0], breaks))
+    stops = np.concatenate((breaks, [index.size]))
+    return [(int(index[a]), int(b - a)) for a, b in zip(starts, stops)]
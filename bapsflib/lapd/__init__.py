@@ -18,8 +18,10 @@ diameters, port spacing, etc.).  The :mod:`~bapsflib.lapd.tools` package
 contains functions and classes relevant for calculating LaPD parameters
 (e.g. converting port number to axial z location, etc.).
 """
-__all__ = ["ConType", "File"]
+__all__ = ["ConType", "File", "RunCatalog", "ShotSet"]
 
 from bapsflib._hdf.maps.controls.types import ConType
+from bapsflib._hdf.utils.shotset import ShotSet
 from bapsflib.lapd import _hdf, constants, tools
+from bapsflib.lapd._hdf.catalog import RunCatalog
 from bapsflib.lapd._hdf.file import File
@@ -14,4 +14,4 @@ written in the HDF5 files generated by the Large Plasma Device (LaPD).
 """
 __all__ = []
 
-from bapsflib.lapd._hdf import file, lapdmap, lapdoverview
+from bapsflib.lapd._hdf import catalog, file, lapdmap, lapdoverview
@@ -0,0 +1,631 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Module for defining the directory-scale LaPD run catalog
+`~bapsflib.lapd._hdf.catalog.RunCatalog`.
+"""
+__all__ = ["RunCatalog"]
+
+import json
+import numpy as np
+import os
+import sqlite3
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from bapsflib.lapd._hdf.file import File
+from bapsflib.utils import _bytes_to_str
+
+#: SQL statements that define the catalog schema
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT,
+    lapd_version TEXT,
+    investigator TEXT,
+    exp_name TEXT,
+    exp_description TEXT,
+    exp_set_name TEXT,
+    exp_set_description TEXT,
+    run_name TEXT,
+    run_description TEXT,
+    run_status TEXT,
+    run_date TEXT
+);
+CREATE TABLE IF NOT EXISTS digitizers (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    digitizer TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    adc TEXT NOT NULL,
+    board INTEGER NOT NULL,
+    channel INTEGER NOT NULL,
+    dset_path TEXT,
+    first_shotnum INTEGER,
+    last_shotnum INTEGER,
+    nshotnum INTEGER,
+    nt INTEGER,
+    bit INTEGER,
+    clock_rate REAL,
+    sample_average INTEGER,
+    shot_average INTEGER
+);
+CREATE TABLE IF NOT EXISTS controls (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    control TEXT NOT NULL,
+    contype TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    probe_name TEXT,
+    port INTEGER,
+    receptacle INTEGER,
+    first_shotnum INTEGER,
+    last_shotnum INTEGER,
+    nshotnum INTEGER
+);
+CREATE TABLE IF NOT EXISTS motion_lists (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    control TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    info TEXT
+);
+CREATE TABLE IF NOT EXISTS msi (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    diagnostic TEXT NOT NULL,
+    first_shotnum INTEGER,
+    last_shotnum INTEGER,
+    nshotnum INTEGER
+);
+CREATE INDEX IF NOT EXISTS digitizers_lookup
+    ON digitizers (digitizer, adc, board, channel);
+CREATE INDEX IF NOT EXISTS controls_lookup ON controls (control, port);
+"""
+
+#: mapping of `files` table columns to `lapd.File.info` keys
+_FILE_INFO_COLUMNS = {
+    "lapd_version": "lapd version",
+    "investigator": "investigator",
+    "exp_name": "exp name",
+    "exp_description": "exp description",
+    "exp_set_name": "exp set name",
+    "exp_set_description": "exp set description",
+    "run_name": "run name",
+    "run_description": "run description",
+    "run_status": "run status",
+    "run_date": "run date",
+}
+
+
+def _to_builtin(val):
+    """
+    Convert numpy/bytes values into types that SQLite and `json` can
+    store.
+    """
+    if isinstance(val, (bytes, np.bytes_)):
+        return _bytes_to_str(val)
+    elif isinstance(val, np.ndarray):
+        return [_to_builtin(item) for item in val.tolist()]
+    elif isinstance(val, (list, tuple)):
+        return [_to_builtin(item) for item in val]
+    elif isinstance(val, dict):
+        return {str(key): _to_builtin(item) for key, item in val.items()}
+    elif isinstance(val, np.generic):
+        return val.item()
+    elif val is None or isinstance(val, (bool, int, float, str)):
+        return val
+    return str(val)
+
+
+def _config_name_from_json(val) -> Any:
+    """
+    Decode a control configuration name stored as JSON text (names
+    can be `int` or `str`, e.g. for the '6K Compumotor').
+    """
+    try:
+        return json.loads(val)
+    except (TypeError, ValueError):
+        return val
+
+
+def _to_int(val) -> Optional[int]:
+    """Convert `val` to an `int` or return `None` if not possible."""
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def _shotnum_range(dset, field: str) -> tuple:
+    """
+    Return the (first, last, size) shot number tuple of a dataset by
+    only reading its first and last rows.
+    """
+    size = dset.shape[0]
+    if size == 0:
+        return None, None, 0
+    first = int(dset[0, field])
+    last = int(dset[-1, field])
+    return first, last, size
+
+
+def _scan_file(path: str) -> Dict[str, Any]:
+    """
+    Map the HDF5 file at `path` and collect all catalog records for
+    it.  This is a module level function so it can be dispatched to
+    worker processes.
+    """
+    stat = os.stat(path)
+    record = {
+        "path": path,
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "error": None,
+        "info": {},
+        "digitizers": [],
+        "controls": [],
+        "motion lists": [],
+        "msi": [],
+    }  # type: Dict[str, Any]
+
+    try:
+        with File(path, silent=True) as lapdf:
+            fmap = lapdf.file_map
+            record["info"] = {
+                col: _to_builtin(lapdf.info.get(key, None))
+                for col, key in _FILE_INFO_COLUMNS.items()
+            }
+
+            # ---- digitizers ----
+            for digi_name, digi in fmap.digitizers.items():
+                for config_name, config in digi.configs.items():
+                    sn_field = config["shotnum"]["dset field"][0]
+                    for adc in config["adc"]:
+                        for brd, chs, setup in config[adc]:
+                            for ch in chs:
+                                dset_path = None
+                                sn_range = (None, None, None)
+                                try:
+                                    dset_name = digi.construct_dataset_name(
+                                        brd, ch, config_name=config_name, adc=adc
+                                    )
+                                    hdset_name = digi.construct_header_dataset_name(
+                                        brd, ch, config_name=config_name, adc=adc
+                                    )
+                                except ValueError:
+                                    # configuration is not active
+                                    pass
+                                else:
+                                    dset_path = f"{digi.group.name}/{dset_name}"
+                                    hdset = digi.group.get(hdset_name)
+                                    if hdset is not None:
+                                        sn_range = _shotnum_range(hdset, sn_field)
+
+                                clock_rate = setup["clock rate"]
+                                record["digitizers"].append(
+                                    {
+                                        "digitizer": digi_name,
+                                        "config_name": config_name,
+                                        "active": int(bool(config["active"])),
+                                        "adc": adc,
+                                        "board": int(brd),
+                                        "channel": int(ch),
+                                        "dset_path": dset_path,
+                                        "first_shotnum": sn_range[0],
+                                        "last_shotnum": sn_range[1],
+                                        "nshotnum": sn_range[2],
+                                        "nt": _to_int(setup["nt"]),
+                                        "bit": _to_int(setup["bit"]),
+                                        "clock_rate": (
+                                            None
+                                            if clock_rate is None
+                                            else float(clock_rate.to("Hz").value)
+                                        ),
+                                        "sample_average": _to_int(
+                                            setup["sample average (hardware)"]
+                                        ),
+                                        "shot_average": _to_int(
+                                            setup["shot average (software)"]
+                                        ),
+                                    }
+                                )
+
+            # ---- controls ----
+            for cname, cmap in fmap.controls.items():
+                for config_name, config in cmap.configs.items():
+                    sn_range = (None, None, None)
+                    dset = lapdf.get(config["shotnum"]["dset paths"][0])
+                    if dset is not None:
+                        sn_range = _shotnum_range(
+                            dset, config["shotnum"]["dset field"][0]
+                        )
+
+                    probe = config.get("probe", {})
+                    if not isinstance(probe, dict):
+                        probe = {}
+                    record["controls"].append(
+                        {
+                            "control": cname,
+                            "contype": cmap.contype.value,
+                            "config_name": json.dumps(_to_builtin(config_name)),
+                            "probe_name": _to_builtin(probe.get("probe name", None)),
+                            "port": _to_int(probe.get("port", None)),
+                            "receptacle": _to_int(config.get("receptacle", None)),
+                            "first_shotnum": sn_range[0],
+                            "last_shotnum": sn_range[1],
+                            "nshotnum": sn_range[2],
+                        }
+                    )
+
+                    motion_lists = config.get("motion lists", {})
+                    if not isinstance(motion_lists, dict):
+                        continue
+                    for ml_name, ml_info in motion_lists.items():
+                        record["motion lists"].append(
+                            {
+                                "control": cname,
+                                "config_name": json.dumps(_to_builtin(config_name)),
+                                "name": str(ml_name),
+                                "info": json.dumps(_to_builtin(ml_info)),
+                            }
+                        )
+
+            # ---- MSI ----
+            for diag_name, diag in fmap.msi.items():
+                sn_range = (None, None, None)
+                sn_config = diag.configs.get("shotnum", {})
+                sn_paths = sn_config.get("dset paths", ())
+                if len(sn_paths) != 0:
+                    dset = lapdf.get(sn_paths[0])
+                    if dset is not None:
+                        sn_range = _shotnum_range(dset, sn_config["dset field"][0])
+                record["msi"].append(
+                    {
+                        "diagnostic": diag_name,
+                        "first_shotnum": sn_range[0],
+                        "last_shotnum": sn_range[1],
+                        "nshotnum": sn_range[2],
+                    }
+                )
+    except Exception as err:
+        # record the failure so the file is not re-scanned until it
+        # changes on disk
+        record["error"] = f"{type(err).__name__}: {err}"
+        for key in ("digitizers", "controls", "motion lists", "msi"):
+            record[key] = []
+
+    return record
+
+
+class RunCatalog:
+    """
+    A directory-scale catalog of LaPD HDF5 files backed by a local
+    SQLite database.
+
+    The catalog stores the mapped metadata of each file (digitizer
+    configurations and active board/channels, control device
+    configurations and motion lists, MSI diagnostics, experiment and
+    run info, and shot number ranges) so runs can be located without
+    opening every file.  Files are only re-mapped when their
+    modification time or size changes.
+
+    Examples
+    --------
+
+    >>> cat = RunCatalog('runs.sqlite')
+    >>> cat.update('/data/lapd/2024_campaign')
+    >>> hits = cat.query(
+    ...     adc='SIS 3302', board=3, channel=2,
+    ...     control='6K Compumotor', port=27)
+    >>> hits[0]['path']
+    '/data/lapd/2024_campaign/run_12.hdf5'
+    >>> with File(hits[0]['path']) as f:
+    ...     data = f.read_data(**hits[0]['read spec'])
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        """
+        Parameters
+        ----------
+        database : `str`, optional
+            path to the SQLite database file, which is created if it
+            does not exist (DEFAULT ``':memory:'``)
+        """
+        self._database = database
+        self._conn = sqlite3.connect(database)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def database(self) -> str:
+        """Path to the SQLite database."""
+        return self._database
+
+    def close(self):
+        """Close the connection to the SQLite database."""
+        self._conn.close()
+
+    def files(self, include_errors: bool = False) -> List[str]:
+        """
+        List of all cataloged file paths.
+
+        Parameters
+        ----------
+        include_errors : `bool`, optional
+            `True` to also include files that could not be mapped
+            (DEFAULT `False`)
+        """
+        sql = "SELECT path FROM files"
+        if not include_errors:
+            sql += " WHERE error IS NULL"
+        return [row["path"] for row in self._conn.execute(sql + " ORDER BY path")]
+
+    def update(
+        self,
+        directory: str,
+        pattern: Union[str, Iterable[str]] = (".hdf5", ".h5"),
+        recursive: bool = False,
+        n_workers: Optional[int] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Scan `directory` for HDF5 files and (re-)catalog every file
+        that is new or has changed since the last scan.  Entries for
+        files that no longer exist in `directory` are removed.
+
+        Parameters
+        ----------
+        directory : `str`
+            directory to scan
+
+        pattern : Union[`str`, Iterable[`str`]], optional
+            file name extension(s) of the files to catalog
+            (DEFAULT ``('.hdf5', '.h5')``)
+
+        recursive : `bool`, optional
+            `True` to also scan sub-directories (DEFAULT `False`)
+
+        n_workers : `int`, optional
+            number of worker processes used to map files,  `1` maps
+            the files in the current process (DEFAULT is the number of
+            CPUs)
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            dictionary with keys ``'added'``, ``'updated'``,
+            ``'unchanged'``, ``'removed'``, and ``'failed'`` listing
+            the affected file paths
+        """
+        if isinstance(pattern, str):
+            pattern = (pattern,)
+        pattern = tuple(pattern)
+        directory = os.path.abspath(directory)
+        if not os.path.isdir(directory):
+            raise ValueError(f"'{directory}' is not a directory.")
+
+        # ---- discover files ----
+        found = []  # type: List[str]
+        for root, dirs, fnames in os.walk(directory):
+            found.extend(
+                os.path.join(root, fname) for fname in fnames if fname.endswith(pattern)
+            )
+            if not recursive:
+                break
+        found.sort()
+
+        # ---- compare against catalog ----
+        known = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self._conn.execute("SELECT path, mtime, size FROM files")
+            if os.path.dirname(row["path"]) == directory
+            or (recursive and row["path"].startswith(directory + os.sep))
+        }
+        report = {
+            "added": [],
+            "updated": [],
+            "unchanged": [],
+            "removed": [],
+            "failed": [],
+        }  # type: Dict[str, List[str]]
+        to_scan = []
+        for path in found:
+            stat = os.stat(path)
+            if path not in known:
+                report["added"].append(path)
+                to_scan.append(path)
+            elif known[path] != (stat.st_mtime, stat.st_size):
+                report["updated"].append(path)
+                to_scan.append(path)
+            else:
+                report["unchanged"].append(path)
+        report["removed"] = sorted(set(known) - set(found))
+
+        # ---- map files ----
+        if n_workers == 1 or len(to_scan) <= 1:
+            records = [_scan_file(path) for path in to_scan]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                records = list(executor.map(_scan_file, to_scan))
+
+        # ---- store ----
+        with self._conn:
+            for path in report["removed"]:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            for record in records:
+                self._store(record)
+                if record["error"] is not None:
+                    report["failed"].append(record["path"])
+
+        return report
+
+    def _store(self, record: Dict[str, Any]):
+        """Write the records of one scanned file to the database."""
+        self._conn.execute("DELETE FROM files WHERE path = ?", (record["path"],))
+
+        columns = ["path", "mtime", "size", "error"] + list(_FILE_INFO_COLUMNS)
+        values = [record["path"], record["mtime"], record["size"], record["error"]]
+        values.extend(record["info"].get(col, None) for col in _FILE_INFO_COLUMNS)
+        cursor = self._conn.execute(
+            f"INSERT INTO files ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            values,
+        )
+        file_id = cursor.lastrowid
+
+        for table, key in (
+            ("digitizers", "digitizers"),
+            ("controls", "controls"),
+            ("motion_lists", "motion lists"),
+            ("msi", "msi"),
+        ):
+            rows = record[key]
+            if len(rows) == 0:
+                continue
+            columns = ["file_id"] + list(rows[0])
+            self._conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [[file_id] + list(row.values()) for row in rows],
+            )
+
+    def query(
+        self,
+        digitizer: Optional[str] = None,
+        adc: Optional[str] = None,
+        board: Optional[int] = None,
+        channel: Optional[int] = None,
+        config_name: Optional[str] = None,
+        control: Optional[str] = None,
+        port: Optional[int] = None,
+        receptacle: Optional[int] = None,
+        probe_name: Optional[str] = None,
+        msi: Optional[str] = None,
+        **info,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the catalog for active digitizer channels.
+
+        Every argument is an optional filter, only entries matching all
+        given filters are returned.
+
+        Parameters
+        ----------
+        digitizer : `str`, optional
+            name of the digitizer (e.g. ``'SIS crate'``)
+
+        adc : `str`, optional
+            name of the analog-digital-converter (e.g. ``'SIS 3302'``)
+
+        board : `int`, optional
+            digitizer board number
+
+        channel : `int`, optional
+            digitizer channel number
+
+        config_name : `str`, optional
+            digitizer configuration name
+
+        control : `str`, optional
+            name of a control device that must have been used in the
+            run (e.g. ``'6K Compumotor'``)
+
+        port : `int`, optional
+            LaPD port number of the control device probe
+
+        receptacle : `int`, optional
+            receptacle number of the control device probe
+
+        probe_name : `str`, optional
+            name of the control device probe
+
+        msi : `str`, optional
+            name of a MSI diagnostic that must be present in the file
+
+        info : optional
+            filters on the file info, keys are the `files` table
+            columns (e.g. ``run_name='my run'``,
+            ``investigator='Everson'``)
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            list of dictionaries with the ``'path'`` to the HDF5 file
+            and a ``'read spec'`` dictionary of keywords that can be
+            passed directly to
+            :meth:`~bapsflib.lapd._hdf.file.File.read_data`
+        """
+        unknown = set(info) - set(_FILE_INFO_COLUMNS)
+        if len(unknown) != 0:
+            raise TypeError(f"Unexpected keyword argument(s) {sorted(unknown)}.")
+
+        use_controls = any(
+            val is not None for val in (control, port, receptacle, probe_name)
+        )
+        sql = (
+            "SELECT f.path, d.digitizer, d.adc, d.config_name, d.board, d.channel"
+            + (", c.control, c.config_name AS control_config" if use_controls else "")
+            + " FROM digitizers d JOIN files f ON f.id = d.file_id"
+            + (" JOIN controls c ON c.file_id = d.file_id" if use_controls else "")
+            + " WHERE d.active = 1 AND d.dset_path IS NOT NULL"
+        )
+        params = []  # type: List[Any]
+        for column, val in (
+            ("d.digitizer", digitizer),
+            ("d.adc", adc),
+            ("d.board", board),
+            ("d.channel", channel),
+            ("d.config_name", config_name),
+            ("c.control", control),
+            ("c.port", port),
+            ("c.receptacle", receptacle),
+            ("c.probe_name", probe_name),
+        ):
+            if val is not None:
+                sql += f" AND {column} = ?"
+                params.append(val)
+        for column, val in info.items():
+            sql += f" AND f.{column} = ?"
+            params.append(val)
+        if msi is not None:
+            sql += (
+                " AND EXISTS (SELECT 1 FROM msi m"
+                " WHERE m.file_id = f.id AND m.diagnostic = ?)"
+            )
+            params.append(msi)
+        sql += " ORDER BY f.path, d.digitizer, d.adc, d.board, d.channel"
+
+        results = []
+        for row in self._conn.execute(sql, params):
+            read_spec = {
+                "board": row["board"],
+                "channel": row["channel"],
+                "digitizer": row["digitizer"],
+                "adc": row["adc"],
+                "config_name": row["config_name"],
+            }  # type: Dict[str, Any]
+            if use_controls:
+                read_spec["add_controls"] = [
+                    (row["control"], _config_name_from_json(row["control_config"]))
+                ]
+            results.append({"path": row["path"], "read spec": read_spec})
+
+        return results
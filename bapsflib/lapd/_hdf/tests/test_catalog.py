@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import os
+import tempfile
+import unittest as ut
+
+from bapsflib._hdf.maps import FauxHDFBuilder
+from bapsflib.lapd._hdf.catalog import RunCatalog
+from bapsflib.lapd._hdf.file import File
+
+
+class TestRunCatalog(ut.TestCase):
+    """Test case for :class:`~bapsflib.lapd._hdf.catalog.RunCatalog`."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="catalog-test_")
+        self.dirname = self.tempdir.name
+
+        # file with SIS crate + 6K Compumotor
+        self.path_sixk = os.path.join(self.dirname, "run_sixk.hdf5")
+        bf = FauxHDFBuilder(
+            name=self.path_sixk,
+            add_modules={
+                "SIS crate": {"n_configs": 1, "sn_size": 20, "nt": 50},
+                "6K Compumotor": {"n_configs": 1, "sn_size": 20},
+                "Discharge": {},
+            },
+        )
+        bf.close()
+
+        # file with only a SIS 3301
+        self.path_3301 = os.path.join(self.dirname, "run_3301.hdf5")
+        bf = FauxHDFBuilder(
+            name=self.path_3301,
+            add_modules={"SIS 3301": {"n_configs": 1, "sn_size": 30, "nt": 50}},
+        )
+        bf.close()
+
+        # file that is not HDF5
+        self.path_bad = os.path.join(self.dirname, "not_hdf5.hdf5")
+        with open(self.path_bad, "w") as fp:
+            fp.write("not an HDF5 file")
+
+        self.catalog = RunCatalog()
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tempdir.cleanup()
+
+    def test_update(self):
+        cat = self.catalog
+
+        # initial scan
+        report = cat.update(self.dirname, n_workers=1)
+        self.assertEqual(
+            report["added"], sorted([self.path_sixk, self.path_3301, self.path_bad])
+        )
+        self.assertEqual(report["failed"], [self.path_bad])
+        self.assertEqual(report["updated"], [])
+        self.assertEqual(report["unchanged"], [])
+        self.assertEqual(cat.files(), sorted([self.path_sixk, self.path_3301]))
+        self.assertEqual(
+            cat.files(include_errors=True),
+            sorted([self.path_sixk, self.path_3301, self.path_bad]),
+        )
+
+        # re-scan is incremental
+        report = cat.update(self.dirname, n_workers=1)
+        self.assertEqual(report["added"], [])
+        self.assertEqual(report["failed"], [])
+        self.assertEqual(len(report["unchanged"]), 3)
+
+        # modified file gets re-scanned
+        os.utime(self.path_3301, (0.0, 1.0))
+        report = cat.update(self.dirname, n_workers=1)
+        self.assertEqual(report["updated"], [self.path_3301])
+
+        # removed file gets removed
+        os.remove(self.path_bad)
+        report = cat.update(self.dirname, n_workers=1)
+        self.assertEqual(report["removed"], [self.path_bad])
+        self.assertEqual(
+            cat.files(include_errors=True), sorted([self.path_sixk, self.path_3301])
+        )
+
+        # scanning with worker processes gives the same catalog
+        with RunCatalog() as cat2:
+            report = cat2.update(self.dirname, n_workers=2)
+            self.assertEqual(len(report["added"]), 2)
+            self.assertEqual(cat2.files(), cat.files())
+            self.assertEqual(cat2.query(), cat.query())
+
+        # not a directory
+        with self.assertRaises(ValueError):
+            cat.update(self.path_3301)
+
+    def test_query(self):
+        cat = self.catalog
+        cat.update(self.dirname, n_workers=1)
+
+        # all active channels
+        hits = cat.query()
+        self.assertEqual({hit["path"] for hit in hits}, {self.path_sixk, self.path_3301})
+
+        # digitizer filters
+        hits = cat.query(adc="SIS 3302", board=1, channel=1)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]["path"], self.path_sixk)
+        self.assertEqual(
+            hits[0]["read spec"],
+            {
+                "board": 1,
+                "channel": 1,
+                "digitizer": "SIS crate",
+                "adc": "SIS 3302",
+                "config_name": "config01",
+            },
+        )
+        self.assertEqual(cat.query(adc="SIS 3302", board=3, channel=2), [])
+
+        # control filters
+        hits = cat.query(digitizer="SIS crate", control="6K Compumotor", port=27)
+        self.assertEqual(len(hits), 2)
+        self.assertTrue(all(hit["path"] == self.path_sixk for hit in hits))
+        self.assertEqual(cat.query(control="6K Compumotor", port=28), [])
+
+        # MSI and info filters
+        self.assertEqual(len(cat.query(msi="Discharge")), 2)
+        hits = cat.query(run_description="some description", adc="SIS 3301")
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]["path"], self.path_3301)
+        with self.assertRaises(TypeError):
+            cat.query(not_a_column="value")
+
+        # read spec can be used to read data
+        hit = cat.query(adc="SIS 3302", control="6K Compumotor", port=27)[0]
+        with File(hit["path"], silent=True) as lapdf:
+            # control configuration names keep their type
+            self.assertEqual(
+                hit["read spec"]["add_controls"],
+                [("6K Compumotor", list(lapdf.controls["6K Compumotor"].configs)[0])],
+            )
+            data = lapdf.read_data(**hit["read spec"], silent=True)
+            self.assertEqual(data.shape, (20,))
+            self.assertIn("xyz", data.dtype.names)
+
+    def test_persistence(self):
+        db_path = os.path.join(self.dirname, "catalog.sqlite")
+        with RunCatalog(db_path) as cat:
+            self.assertEqual(cat.database, db_path)
+            cat.update(self.dirname, n_workers=1)
+            hits = cat.query()
+
+        with RunCatalog(db_path) as cat:
+            self.assertEqual(cat.query(), hits)
+            report = cat.update(self.dirname, n_workers=1)
+            self.assertEqual(report["added"], [])
+
+
+if __name__ == "__main__":
+    ut.main()
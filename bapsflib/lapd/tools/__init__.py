@@ -12,6 +12,6 @@
 This package contains a variety of tools (functions, classes, etc.)
 relevant to the LaPD and its configuration.
 """
-__all__ = ["portnum_to_z", "z_to_portnum"]
+__all__ = ["portnum_to_z", "xyz_to_lapd", "z_to_portnum"]
 
-from bapsflib.lapd.tools.tools import portnum_to_z, z_to_portnum
+from bapsflib.lapd.tools.tools import portnum_to_z, xyz_to_lapd, z_to_portnum
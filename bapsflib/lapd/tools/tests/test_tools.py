@@ -17,7 +17,15 @@ import unittest as ut
 
 import bapsflib.lapd.constants as const
 
-from bapsflib.lapd.tools import portnum_to_z, z_to_portnum
+from bapsflib._hdf.maps.tests.fauxhdfbuilder import FauxHDFBuilder
+from bapsflib._hdf.utils.file import File
+from bapsflib.lapd.tools import portnum_to_z, xyz_to_lapd, z_to_portnum
+
+
+class _InfoArray(np.ndarray):
+    """Array with an ``info`` dictionary, like read data arrays."""
+
+    info = {}
 
 
 class TestTools(ut.TestCase):
@@ -63,6 +71,76 @@ class TestTools(ut.TestCase):
         self.assertEqual(portnum.unit, u.dimensionless_unscaled)
         self.assertEqual(portnum.value, val.value)
 
+    def test_xyz_to_lapd(self):
+        xyz = np.array([[1.0, 2.0, 0.0], [3.0, -4.0, 5.0], [np.nan] * 3])
+        expected = xyz.copy()
+        expected[:, 2] += portnum_to_z(27).value
+
+        # positions array and explicit port
+        lapd_xyz = xyz_to_lapd(xyz, port=27)
+        self.assertIsInstance(lapd_xyz, u.Quantity)
+        self.assertEqual(lapd_xyz.unit, u.cm)
+        self.assertTrue(np.allclose(lapd_xyz.value, expected, equal_nan=True))
+        self.assertEqual(xyz[1, 2], 5.0)
+
+        # port per position
+        lapd_xyz = xyz_to_lapd(xyz, port=[27, 27, 30])
+        self.assertTrue(np.allclose(lapd_xyz.value[:2], expected[:2]))
+
+        # structured array with the port in `info`
+        data = np.zeros(3, dtype=[("shotnum", np.uint32), ("xyz", np.float64, 3)])
+        data["xyz"] = xyz
+        data = data.view(_InfoArray)
+        data.info = {"controls": {"6K Compumotor": {"probe": {"port": 27}}}}
+        lapd_xyz = xyz_to_lapd(data)
+        self.assertTrue(np.allclose(lapd_xyz.value, expected, equal_nan=True))
+
+        data.info = {"controls": {}, "port": (27, "E")}
+        lapd_xyz = xyz_to_lapd(data)
+        self.assertTrue(np.allclose(lapd_xyz.value, expected, equal_nan=True))
+
+        # port can not be determined
+        data.info = {
+            "controls": {
+                "6K Compumotor": {"probe": {"port": 27}},
+                "NI_XZ": {"probe": {"port": 30}},
+            }
+        }
+        with self.assertRaises(ValueError):
+            xyz_to_lapd(data)
+        data.info = {"controls": {}, "port": (None, None)}
+        with self.assertRaises(ValueError):
+            xyz_to_lapd(data)
+
+        # invalid positions
+        with self.assertRaises(ValueError):
+            xyz_to_lapd(np.zeros((3, 2)), port=27)
+        with self.assertRaises(ValueError):
+            xyz_to_lapd(np.zeros(3, dtype=[("x", np.float64)]), port=27)
+
+    def test_xyz_to_lapd_read_controls(self):
+        faux = FauxHDFBuilder(
+            add_modules={"6K Compumotor": {"n_configs": 1, "sn_size": 20}}
+        )
+        try:
+            with File(faux.filename, control_path="Raw data + config") as bf:
+                cdata = bf.read_controls(["6K Compumotor"])
+                port = cdata.info["controls"]["6K Compumotor"]["probe"]["port"]
+                lapd_xyz = xyz_to_lapd(cdata)
+                self.assertEqual(lapd_xyz.shape, (20, 3))
+                self.assertTrue(
+                    np.array_equal(lapd_xyz.value[:, :2], cdata["xyz"][:, :2])
+                )
+                self.assertTrue(
+                    np.allclose(
+                        lapd_xyz.value[:, 2],
+                        cdata["xyz"][:, 2] + portnum_to_z(port).value,
+                        equal_nan=True,
+                    )
+                )
+        finally:
+            faux.cleanup()
+
 
 if __name__ == "__main__":
     ut.main()
@@ -9,7 +9,7 @@
 #   license terms and contributor agreement.
 #
 """Main sub-module for LaPD tool functionality."""
-__all__ = ["portnum_to_z", "z_to_portnum"]
+__all__ = ["portnum_to_z", "xyz_to_lapd", "z_to_portnum"]
 
 import astropy.units as u
 import numpy as np
@@ -72,3 +72,95 @@ def z_to_portnum(
 
     # return
     return portnum
+
+
+def xyz_to_lapd(
+    data: np.ndarray, port: Union[int, float, np.ndarray, None] = None
+) -> u.Quantity:
+    """
+    Converts the probe ``'xyz'`` positions of a whole read (e.g. a
+    :class:`~bapsflib._hdf.utils.hdfreadcontrols.HDFReadControls` or
+    :class:`~bapsflib._hdf.utils.hdfreaddata.HDFReadData` array) into
+    LaPD global coordinates in one vectorized operation.
+
+    The transverse positions ``x`` and ``y`` are kept, and the axial
+    position ``z`` is offset by the axial location of the probe port
+    (see :func:`portnum_to_z`).
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        structured array with an ``'xyz'`` field (in cm), or an array
+        of shape ``(..., 3)`` of positions
+
+    port : Union[int, float, numpy.ndarray], optional
+        LaPD port number of the probe, or an array of port numbers (one
+        per position).  If omitted, the port of the probe recorded in
+        ``data.info['controls']`` (e.g. the probe list of the
+        ``'6K Compumotor'``) or ``data.info['port']`` is used.
+
+    Returns
+    -------
+    `astropy.units.Quantity`
+        array of shape ``(..., 3)`` of LaPD global coordinates in cm
+
+    .. note::
+
+        Port 53 defines z = 0 cm and is the most Northern port.  The +z
+        axis points South towards the main cathode.
+
+    Examples
+    --------
+
+    >>> cdata = f.read_controls([('6K Compumotor', 2)])
+    >>> xyz = xyz_to_lapd(cdata)
+    >>> xyz.shape
+    (1000, 3)
+    """
+    # get positions
+    if data.dtype.names is not None:
+        if "xyz" not in data.dtype.names:
+            raise ValueError("`data` does not have an 'xyz' field")
+        xyz = data["xyz"]
+    else:
+        xyz = data
+    xyz = np.array(xyz, dtype=np.float64)
+    if xyz.shape[-1:] != (3,):
+        raise ValueError(f"Positions have shape {xyz.shape}, expected (..., 3).")
+
+    # determine the probe port
+    if port is None:
+        port = _deployed_port(getattr(data, "info", {}))
+    port = np.asarray(port, dtype=np.float64)
+
+    # offset z by the port location
+    # - constants are reduced to plain values once, so no unit objects
+    #   are created per position
+    spacing = const.port_spacing.cgs.value
+    ref_port = const.ref_port.value
+    xyz[..., 2] += spacing * (ref_port - port)
+
+    return u.Quantity(xyz, unit=u.cm, copy=False)
+
+
+def _deployed_port(info: dict) -> Union[int, float]:
+    """
+    Port number of the probe recorded in the ``info`` dictionary of a
+    read array.
+    """
+    ports = set()
+    for cinfo in (info.get("controls") or {}).values():
+        probe = cinfo.get("probe")
+        if isinstance(probe, dict) and probe.get("port") is not None:
+            ports.add(probe["port"])
+    if len(ports) == 1:
+        return ports.pop()
+    elif len(ports) > 1:
+        raise ValueError(
+            f"Controls record multiple probe ports {sorted(ports)}, specify `port`."
+        )
+
+    port = info.get("port", (None, None))[0]
+    if port is None:
+        raise ValueError("The probe port is not recorded in `data`, specify `port`.")
+    return port
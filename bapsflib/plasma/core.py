@@ -77,6 +77,10 @@ class FloatUnit(float):
     def __init__(self, value, cgs_unit):
         super().__init__()
 
+    def __getnewargs__(self):
+        # needed for pickling
+        return float(self), self._unit
+
     @property
     def unit(self):
         """units of constant"""
@@ -107,6 +111,10 @@ class IntUnit(int):
     def __init__(self, value, cgs_unit):
         super().__init__()
 
+    def __getnewargs__(self):
+        # needed for pickling
+        return int(self), self._unit
+
     @property
     def unit(self):
         """units of constant"""
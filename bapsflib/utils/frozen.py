@@ -0,0 +1,305 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Read-only containers for metadata that is shared between the mapping
+classes and read results (e.g. the ``info`` dictionaries of read
+arrays) instead of being deep copied, and copy-on-write containers
+that hold them in the read results.
+"""
+__all__ = [
+    "CopyOnWriteDict",
+    "CopyOnWriteList",
+    "freeze",
+    "freeze_cached",
+    "FrozenDict",
+    "FrozenList",
+    "thaw",
+]
+
+import copy
+import numpy as np
+import operator
+
+from typing import Any, Dict, Hashable, Tuple
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(
+        f"'{self.__class__.__name__}' object is read-only, use .copy() to get "
+        f"a mutable copy"
+    )
+
+
+class FrozenDict(dict):
+    """
+    A read-only `dict`.  Since it can not be modified, it is shared
+    instead of copied (:func:`copy.copy` and :func:`copy.deepcopy`
+    return the same object).  Use :meth:`copy` to get a mutable
+    (shallow) copy.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict.__repr__(self)})"
+
+    def copy(self) -> dict:
+        """Mutable shallow copy as a `dict`."""
+        return dict(self)
+
+
+class FrozenList(list):
+    """
+    A read-only `list`.  Since it can not be modified, it is shared
+    instead of copied (:func:`copy.copy` and :func:`copy.deepcopy`
+    return the same object).  Use :meth:`copy` to get a mutable
+    (shallow) copy.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __iadd__ = _readonly
+    __imul__ = _readonly
+    append = _readonly
+    clear = _readonly
+    extend = _readonly
+    insert = _readonly
+    pop = _readonly
+    remove = _readonly
+    reverse = _readonly
+    sort = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list.__repr__(self)})"
+
+    def copy(self) -> list:
+        """Mutable shallow copy as a `list`."""
+        return list(self)
+
+
+def freeze(obj: Any) -> Any:
+    """
+    Return a read-only version of **obj**, recursively.
+
+    * `dict` and `list` objects are converted into `FrozenDict` and
+      `FrozenList` objects
+    * `set` objects are converted into `frozenset` objects
+    * `numpy.ndarray` objects are converted into read-only views, so no
+      data is copied
+    * already frozen objects and all other objects are returned as-is
+    """
+    if isinstance(obj, (FrozenDict, FrozenList)):
+        return obj
+    elif isinstance(obj, dict):
+        return FrozenDict((key, freeze(val)) for key, val in obj.items())
+    elif isinstance(obj, list):
+        return FrozenList(freeze(val) for val in obj)
+    elif isinstance(obj, tuple) and type(obj) is tuple:
+        return tuple(freeze(val) for val in obj)
+    elif isinstance(obj, set):
+        return frozenset(obj)
+    elif isinstance(obj, np.ndarray) and obj.flags.writeable:
+        view = obj.view()
+        view.flags.writeable = False
+        return view
+    return obj
+
+
+def _top_level(obj: Any) -> Tuple[Any, ...]:
+    """The keys and values (or items) directly held by **obj**."""
+    if isinstance(obj, dict):
+        return tuple(obj) + tuple(obj.values())
+    elif isinstance(obj, list):
+        return tuple(obj)
+    return (obj,)
+
+
+def freeze_cached(obj: Any, cache: Dict[Hashable, Tuple[Any, Any]], key: Hashable) -> Any:
+    """
+    Return :func:`freeze` of **obj**, freezing it only once and storing
+    the result in **cache** under **key**.  This lets a mapping object
+    freeze its configuration once and share it across reads.  The
+    cached object is re-frozen if a top-level key or value of **obj**
+    has been added, removed, or replaced since it was frozen.
+    """
+    top_level = _top_level(obj)
+    entry = cache.get(key, None)
+    if (
+        entry is None
+        or len(entry[0]) != len(top_level)
+        or not all(map(operator.is_, entry[0], top_level))
+    ):
+        entry = (top_level, freeze(obj))
+        cache[key] = entry
+    return entry[1]
+
+
+def thaw(obj: Any) -> Any:
+    """
+    Return a private mutable (shallow) copy of a value frozen by
+    :func:`freeze`, or **obj** itself if it is not frozen.
+
+    * `FrozenDict` and `FrozenList` objects are copied into
+      `CopyOnWriteDict` and `CopyOnWriteList` objects, so their own
+      frozen values are only copied once they are looked up
+    * `frozenset` objects are copied into `set` objects
+    * read-only `numpy.ndarray` objects are copied
+    * `tuple` objects holding frozen values are rebuilt with the
+      values thawed
+    """
+    if isinstance(obj, FrozenDict):
+        return CopyOnWriteDict(obj)
+    elif isinstance(obj, FrozenList):
+        return CopyOnWriteList(obj)
+    elif isinstance(obj, frozenset):
+        return set(obj)
+    elif isinstance(obj, np.ndarray) and not obj.flags.writeable:
+        return obj.copy()
+    elif isinstance(obj, tuple) and type(obj) is tuple:
+        thawed = tuple(thaw(val) for val in obj)
+        if any(new is not old for new, old in zip(thawed, obj)):
+            return thawed
+    return obj
+
+
+class CopyOnWriteDict(dict):
+    """
+    A `dict` holding values frozen by :func:`freeze` that are shared
+    with other objects (e.g. the mapping configurations in the ``info``
+    of read arrays).  A frozen value is replaced by a private mutable
+    copy (see :func:`thaw`) the first time it is looked up, so the
+    dictionary (and everything nested in it) can be modified like a
+    regular `dict` without affecting the shared values.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        val = dict.__getitem__(self, key)
+        thawed = thaw(val)
+        if thawed is not val:
+            dict.__setitem__(self, key, thawed)
+        return thawed
+
+    def __copy__(self):
+        return self.__class__(self)
+
+    def __deepcopy__(self, memo):
+        # frozen values deep copy to themselves, so they stay shared
+        return self.__class__(
+            (copy.deepcopy(key, memo), copy.deepcopy(val, memo))
+            for key, val in dict.items(self)
+        )
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def copy(self) -> "CopyOnWriteDict":
+        """Shallow copy, frozen values stay shared."""
+        return self.__class__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        for key in self:
+            self[key]
+        return dict.items(self)
+
+    def pop(self, key, *args):
+        return thaw(dict.pop(self, key, *args))
+
+    def popitem(self):
+        key, val = dict.popitem(self)
+        return key, thaw(val)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            dict.__setitem__(self, key, default)
+        return self[key]
+
+    def values(self):
+        for key in self:
+            self[key]
+        return dict.values(self)
+
+
+class CopyOnWriteList(list):
+    """
+    A `list` holding values frozen by :func:`freeze` that are shared
+    with other objects.  A frozen value is replaced by a private
+    mutable copy (see :func:`thaw`) the first time it is looked up.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__class__(list.__getitem__(self, index))
+
+        val = list.__getitem__(self, index)
+        thawed = thaw(val)
+        if thawed is not val:
+            list.__setitem__(self, index, thawed)
+        return thawed
+
+    def __iter__(self):
+        for ii in range(len(self)):
+            yield self[ii]
+
+    def __reversed__(self):
+        for ii in range(len(self) - 1, -1, -1):
+            yield self[ii]
+
+    def __copy__(self):
+        return self.__class__(list.__iter__(self))
+
+    def __deepcopy__(self, memo):
+        return self.__class__(copy.deepcopy(val, memo) for val in list.__iter__(self))
+
+    def __reduce__(self):
+        return self.__class__, (list(list.__iter__(self)),)
+
+    def copy(self) -> "CopyOnWriteList":
+        """Shallow copy, frozen values stay shared."""
+        return self.__class__(list.__iter__(self))
+
+    def pop(self, index=-1):
+        return thaw(list.pop(self, index))
@@ -0,0 +1,201 @@
+import copy
+import numpy as np
+import pickle
+import unittest as ut
+
+from bapsflib.utils.frozen import (
+    CopyOnWriteDict,
+    CopyOnWriteList,
+    freeze,
+    freeze_cached,
+    FrozenDict,
+    FrozenList,
+    thaw,
+)
+
+
+class TestFreeze(ut.TestCase):
+    """Tests for `bapsflib.utils.frozen.freeze`."""
+
+    def test_freeze(self):
+        arr = np.arange(5)
+        obj = {
+            "name": "probe",
+            "list": [1, {"a": 2}],
+            "tuple": (1, [2]),
+            "set": {1, 2},
+            "array": arr,
+        }
+        frozen = freeze(obj)
+
+        self.assertIsInstance(frozen, FrozenDict)
+        self.assertIsInstance(frozen["list"], FrozenList)
+        self.assertIsInstance(frozen["list"][1], FrozenDict)
+        self.assertIsInstance(frozen["tuple"][1], FrozenList)
+        self.assertIsInstance(frozen["set"], frozenset)
+        self.assertEqual(frozen["list"], obj["list"])
+        self.assertEqual(frozen["tuple"], obj["tuple"])
+
+        # arrays are read-only views
+        self.assertFalse(frozen["array"].flags.writeable)
+        self.assertTrue(np.shares_memory(frozen["array"], arr))
+        self.assertTrue(arr.flags.writeable)
+
+        # frozen objects are returned as-is
+        self.assertIs(freeze(frozen), frozen)
+        self.assertIs(freeze(frozen["array"]), frozen["array"])
+
+    def test_read_only(self):
+        frozen = freeze({"a": [1, 2], "b": 2})
+        for func, args in (
+            (frozen.__setitem__, ("c", 3)),
+            (frozen.__delitem__, ("a",)),
+            (frozen.update, ({"c": 3},)),
+            (frozen.pop, ("a",)),
+            (frozen.setdefault, ("c", 3)),
+            (frozen.clear, ()),
+            (frozen["a"].append, (3,)),
+            (frozen["a"].__setitem__, (0, 3)),
+            (frozen["a"].sort, ()),
+        ):
+            with self.subTest(func=func):
+                self.assertRaises(TypeError, func, *args)
+
+        # copies
+        self.assertIs(copy.copy(frozen), frozen)
+        self.assertIs(copy.deepcopy(frozen), frozen)
+        self.assertIs(copy.deepcopy({"x": frozen})["x"], frozen)
+        mutable = frozen.copy()
+        self.assertIs(type(mutable), dict)
+        mutable["c"] = 3
+        self.assertNotIn("c", frozen)
+        self.assertIs(type(frozen["a"].copy()), list)
+
+        # pickle
+        unpickled = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(unpickled, FrozenDict)
+        self.assertEqual(unpickled, frozen)
+
+    def test_freeze_cached(self):
+        cache = {}
+        obj = {"a": [1, 2], "b": np.arange(3)}
+        frozen = freeze_cached(obj, cache, "key")
+        self.assertIsInstance(frozen, FrozenDict)
+        self.assertEqual(frozen["a"], obj["a"])
+
+        # frozen only once
+        self.assertIs(freeze_cached(obj, cache, "key"), frozen)
+
+        # re-frozen if a top-level value is replaced, added, or removed
+        obj["a"] = [3]
+        refrozen = freeze_cached(obj, cache, "key")
+        self.assertIsNot(refrozen, frozen)
+        self.assertEqual(refrozen["a"], [3])
+        obj["c"] = 1
+        self.assertIn("c", freeze_cached(obj, cache, "key"))
+        del obj["c"]
+        self.assertNotIn("c", freeze_cached(obj, cache, "key"))
+
+        # lists
+        obj = [1, {"a": 2}]
+        frozen = freeze_cached(obj, cache, "list")
+        self.assertIsInstance(frozen, FrozenList)
+        self.assertIs(freeze_cached(obj, cache, "list"), frozen)
+        obj.append(3)
+        self.assertEqual(freeze_cached(obj, cache, "list")[-1], 3)
+
+
+class TestCopyOnWrite(ut.TestCase):
+    """
+    Tests for `bapsflib.utils.frozen.CopyOnWriteDict`,
+    `bapsflib.utils.frozen.CopyOnWriteList`, and
+    `bapsflib.utils.frozen.thaw`.
+    """
+
+    def setUp(self):
+        self.shared = freeze(
+            {
+                "motion lists": {"ml": {"x": [1, 2], "array": np.arange(3)}},
+                "tuple": (1, [2]),
+                "set": {1, 2},
+            }
+        )
+
+    def test_thaw(self):
+        shared = self.shared
+        thawed = thaw(shared)
+        self.assertIsInstance(thawed, CopyOnWriteDict)
+        self.assertEqual(thawed, shared)
+        self.assertIs(dict.__getitem__(thawed, "motion lists"), shared["motion lists"])
+        self.assertIsInstance(thaw(shared["motion lists"]["ml"]["x"]), CopyOnWriteList)
+        self.assertTrue(thaw(shared["motion lists"]["ml"]["array"]).flags.writeable)
+        self.assertIsInstance(thaw(shared["tuple"])[1], CopyOnWriteList)
+        self.assertIsInstance(thaw(shared["set"]), set)
+
+        # non-frozen objects are returned as-is
+        for obj in ({"a": 1}, [1], (1, 2), np.arange(2), "a"):
+            self.assertIs(thaw(obj), obj)
+
+    def test_write(self):
+        shared = self.shared
+        info = CopyOnWriteDict(probe=shared)
+        info2 = CopyOnWriteDict(probe=shared)
+
+        info["probe"]["motion lists"]["ml"]["x"][0] = 9
+        info["probe"]["motion lists"]["ml"]["array"][0] = 9
+        info["probe"]["motion lists"]["ml"]["y"] = 1
+        info["probe"]["tuple"][1].append(3)
+        info["probe"]["set"].add(3)
+        self.assertEqual(info["probe"]["motion lists"]["ml"]["x"], [9, 2])
+        self.assertEqual(info["probe"]["motion lists"]["ml"]["array"][0], 9)
+        self.assertEqual(info["probe"]["tuple"], (1, [2, 3]))
+
+        # the shared values and other holders are not changed
+        self.assertEqual(shared["motion lists"]["ml"]["x"], [1, 2])
+        self.assertEqual(shared["motion lists"]["ml"]["array"][0], 0)
+        self.assertNotIn("y", shared["motion lists"]["ml"])
+        self.assertEqual(shared["tuple"], (1, [2]))
+        self.assertEqual(shared["set"], {1, 2})
+        self.assertEqual(info2["probe"]["motion lists"]["ml"]["x"], [1, 2])
+
+        # all look-ups thaw
+        info = CopyOnWriteDict(probe=shared, other=1)
+        self.assertIsInstance(info.get("probe"), CopyOnWriteDict)
+        for val in CopyOnWriteDict(probe=shared).values():
+            self.assertIsInstance(val, CopyOnWriteDict)
+        for _, val in CopyOnWriteDict(probe=shared).items():
+            self.assertIsInstance(val, CopyOnWriteDict)
+        self.assertIsInstance(CopyOnWriteDict(probe=shared).pop("probe"), CopyOnWriteDict)
+        self.assertIsInstance(
+            CopyOnWriteDict(probe=shared).setdefault("probe"), CopyOnWriteDict
+        )
+        self.assertIsNone(info.get("not a key"))
+        mlists = CopyOnWriteList([shared["motion lists"]])
+        self.assertIsInstance(mlists[0], CopyOnWriteDict)
+        self.assertIsInstance(list(CopyOnWriteList([shared]))[0], CopyOnWriteDict)
+        self.assertIsInstance(CopyOnWriteList([shared]).pop(), CopyOnWriteDict)
+        self.assertIsInstance(CopyOnWriteList([shared])[:1], CopyOnWriteList)
+
+    def test_copies(self):
+        shared = self.shared
+        info = CopyOnWriteDict(probe=shared)
+
+        # copies keep sharing the frozen values
+        for other in (info.copy(), copy.copy(info), copy.deepcopy(info)):
+            self.assertIsInstance(other, CopyOnWriteDict)
+            self.assertIs(dict.__getitem__(other, "probe"), shared)
+        other = copy.deepcopy(CopyOnWriteList([shared]))
+        self.assertIs(list.__getitem__(other, 0), shared)
+
+        # pickle
+        unpickled = pickle.loads(pickle.dumps(info))
+        self.assertIsInstance(unpickled, CopyOnWriteDict)
+        self.assertIsInstance(dict.__getitem__(unpickled, "probe"), FrozenDict)
+        self.assertEqual(unpickled["probe"]["tuple"], info["probe"]["tuple"])
+        unpickled = pickle.loads(pickle.dumps(CopyOnWriteList([shared])))
+        self.assertIsInstance(unpickled, CopyOnWriteList)
+        self.assertIsInstance(list.__getitem__(unpickled, 0), FrozenDict)
+
+
+if __name__ == "__main__":
+    ut.main()